@@ -1,7 +1,40 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
+
+# Models whose changes alter a store's agent context fragment
+STORE_CONTEXT_MODELS = (
+    'stores.Store',
+    'stores.StoreProduct',
+    'stores.StoreCategory',
+)
 
 
 class AgentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.agents'
     verbose_name = 'AI Agents'
+
+    def ready(self):
+        from .context_service import invalidate_customer_context, invalidate_store_context
+
+        for model in STORE_CONTEXT_MODELS:
+            post_save.connect(
+                invalidate_store_context,
+                sender=model,
+                dispatch_uid=f'agent_context_save_{model}',
+            )
+            post_delete.connect(
+                invalidate_store_context,
+                sender=model,
+                dispatch_uid=f'agent_context_delete_{model}',
+            )
+        post_save.connect(
+            invalidate_customer_context,
+            sender='stores.StoreOrder',
+            dispatch_uid='agent_context_save_stores.StoreOrder',
+        )
+        post_delete.connect(
+            invalidate_customer_context,
+            sender='stores.StoreOrder',
+            dispatch_uid='agent_context_delete_stores.StoreOrder',
+        )
@@ -0,0 +1,293 @@
+"""
+Agent context snapshots - cached prompt fragments for ``LangchainService``.
+
+The dynamic context of a bot turn is assembled from fragments kept in the
+shared Django cache (Redis in production) under versioned keys:
+
+* ``agent_context:store:<store_id>:<version>`` holds a store's menu, delivery
+  and opening hours text;
+* ``agent_context:customer:<phone>:<version>`` holds a customer's recent
+  orders and favourite products;
+* ``agent_context:store_for:<version>:<agent_id>:<account_id>`` maps an agent
+  and WhatsApp account to the store whose menu the agent presents.
+
+Saving or deleting a store, product or category bumps the store's version,
+and saving or deleting an order bumps its customer's version, once the
+transaction commits (see the receivers at the bottom, connected in
+``AgentsConfig.ready``). Entries also expire after ``AGENT_CONTEXT_CACHE_TTL``
+seconds to pick up bulk updates that bypass model signals.
+
+Fragments are rendered in a fixed order from explicitly ordered querysets,
+and the store fragment comes before the per-customer ones, so the prompt of
+a store is byte-identical across turns up to the customer section.
+"""
+import logging
+import time
+from collections import Counter
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION_KEY = 'agent_context:store_version:{store_id}'
+STORE_KEY = 'agent_context:store:{store_id}:{version}'
+CUSTOMER_VERSION_KEY = 'agent_context:customer_version:{phone}'
+CUSTOMER_KEY = 'agent_context:customer:{phone}:{version}'
+ROUTING_VERSION_KEY = 'agent_context:routing_version'
+ROUTING_KEY = 'agent_context:store_for:{version}:{agent_id}:{account_id}'
+
+# Store whose menu is used when neither the conversation nor the agent has one
+FALLBACK_STORE_SLUG = 'pastita'
+
+MENU_PRODUCT_LIMIT = 20
+RECENT_ORDER_LIMIT = 3
+ORDER_HISTORY_STATUSES = ['completed', 'delivered', 'paid']
+
+
+class AgentContextService:
+    """Build, cache and invalidate the prompt fragments of AI agents."""
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, 'AGENT_CONTEXT_CACHE_TTL', 600)
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def _get_version(self, key: str) -> int:
+        version = cache.get(key)
+        if version is None:
+            # Seed from the clock so an evicted counter never reuses the
+            # version of a fragment that is still cached.
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key) or 0
+        return int(version)
+
+    def _bump(self, key: str) -> None:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"[AGENT CONTEXT] Failed to bump {key}: {e}")
+
+    def invalidate_store(self, store_id) -> None:
+        """Orphan a store's fragment and every cached agent-to-store mapping."""
+        self._bump(STORE_VERSION_KEY.format(store_id=store_id))
+        self._bump(ROUTING_VERSION_KEY)
+
+    def invalidate_customer(self, phone: str) -> None:
+        """Orphan a customer's order summary."""
+        self._bump(CUSTOMER_VERSION_KEY.format(phone=phone))
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def build_context(self, agent, phone_number: str, conversation_id: Optional[str] = None) -> str:
+        """Dynamic context of one bot turn, assembled from cached fragments."""
+        from apps.conversations.models import Conversation
+
+        customer_name = ''
+        account_id = None
+        if conversation_id:
+            try:
+                conversation = Conversation.objects.filter(id=conversation_id).only(
+                    'contact_name', 'account',
+                ).first()
+            except Exception as e:
+                logger.error(f"[AGENT CONTEXT] Error loading conversation {conversation_id}: {e}")
+                conversation = None
+            if conversation is not None:
+                customer_name = conversation.contact_name
+                account_id = conversation.account_id
+
+        context_parts: List[str] = []
+        if agent.context_prompt:
+            context_parts.append(agent.context_prompt)
+
+        store_id = self.resolve_store_id(agent, account_id)
+        if store_id:
+            context_parts.append(self.get_store_fragment(store_id))
+
+        if customer_name:
+            context_parts.append(f"Nome do cliente: {customer_name}")
+        if phone_number:
+            context_parts.append(self.get_customer_fragment(phone_number))
+
+        return "\n\n".join(part for part in context_parts if part)
+
+    def resolve_store_id(self, agent, account_id=None) -> Optional[str]:
+        """
+        Store whose menu the agent presents: the conversation account's store,
+        else the store of the agent's first account, else the fallback store.
+        """
+        key = ROUTING_KEY.format(
+            version=self._get_version(ROUTING_VERSION_KEY),
+            agent_id=agent.pk,
+            account_id=account_id or '',
+        )
+        store_id = cache.get(key)
+        if store_id is None:
+            try:
+                store_id = self._resolve_store_id(agent, account_id) or ''
+            except Exception as e:
+                logger.error(f"[AGENT CONTEXT] Error resolving store for agent {agent.pk}: {e}")
+                return None
+            cache.set(key, store_id, self.ttl)
+        return store_id or None
+
+    def _resolve_store_id(self, agent, account_id=None) -> Optional[str]:
+        from apps.stores.models import Store
+
+        account_ids = [account_id] if account_id else []
+        first_account = agent.accounts.values_list('id', flat=True).first()
+        if first_account:
+            account_ids.append(first_account)
+        for candidate in account_ids:
+            store_id = Store.objects.filter(whatsapp_account_id=candidate).values_list('id', flat=True).first()
+            if store_id:
+                return str(store_id)
+
+        store_id = Store.objects.filter(slug=FALLBACK_STORE_SLUG).values_list('id', flat=True).first()
+        if store_id is None:
+            logger.warning(f"[AGENT CONTEXT] Fallback store '{FALLBACK_STORE_SLUG}' not found!")
+            return None
+        return str(store_id)
+
+    def get_store_fragment(self, store_id) -> str:
+        """Menu, delivery and opening hours text of a store."""
+        # Read the version before building so a concurrent change can only
+        # orphan this fragment, never be hidden by it.
+        key = STORE_KEY.format(store_id=store_id, version=self._get_version(STORE_VERSION_KEY.format(store_id=store_id)))
+        fragment = cache.get(key)
+        if fragment is None:
+            from apps.stores.models import Store
+
+            store = Store.objects.filter(pk=store_id).first()
+            try:
+                fragment = self.build_store_fragment(store) if store else ''
+            except Exception as e:
+                logger.error(f"[AGENT CONTEXT] Error loading store menu: {e}")
+                return ''
+            cache.set(key, fragment, self.ttl)
+        return fragment
+
+    def get_customer_fragment(self, phone: str) -> str:
+        """Recent orders and favourite products of a customer."""
+        key = CUSTOMER_KEY.format(phone=phone, version=self._get_version(CUSTOMER_VERSION_KEY.format(phone=phone)))
+        fragment = cache.get(key)
+        if fragment is None:
+            try:
+                fragment = self.build_customer_fragment(phone)
+            except Exception as e:
+                logger.error(f"[AGENT CONTEXT] Error loading customer/order data: {e}")
+                return ''
+            cache.set(key, fragment, self.ttl)
+        return fragment
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def build_store_fragment(self, store) -> str:
+        from apps.stores.models import StoreProduct
+
+        parts = []
+        products = StoreProduct.objects.filter(
+            store=store,
+            is_active=True
+        ).select_related('category').order_by('sort_order', 'name', 'id')[:MENU_PRODUCT_LIMIT]
+
+        if products:
+            menu_text = f"\n📋 CARDÁPIO - {store.name}:\n"
+            current_category = None
+
+            for product in products:
+                if product.category and product.category.name != current_category:
+                    current_category = product.category.name
+                    menu_text += f"\n【{current_category}】\n"
+
+                menu_text += f"• {product.name} - R$ {product.price}"
+                if product.description:
+                    desc = product.description[:60] + "..." if len(product.description) > 60 else product.description
+                    menu_text += f" ({desc})"
+                menu_text += "\n"
+
+            parts.append(menu_text)
+
+            if store.delivery_enabled:
+                delivery_text = "\n🚚 ENTREGA:\n"
+                delivery_text += f"• Taxa de entrega: R$ {store.default_delivery_fee}\n"
+                if store.free_delivery_threshold:
+                    delivery_text += f"• Grátis acima de: R$ {store.free_delivery_threshold}\n"
+                parts.append(delivery_text)
+
+        if store.operating_hours:
+            hours_text = "\n⏰ HORÁRIO DE FUNCIONAMENTO:\n"
+            for day, hours in store.operating_hours.items():
+                hours_text += f"• {day}: {hours.get('open', '--:--')} - {hours.get('close', '--:--')}\n"
+            parts.append(hours_text)
+
+        return "\n\n".join(parts)
+
+    def build_customer_fragment(self, phone: str) -> str:
+        from apps.stores.models import StoreOrder, StoreOrderItem
+
+        recent_orders = list(
+            StoreOrder.objects.filter(
+                customer_phone=phone,
+                status__in=ORDER_HISTORY_STATUSES,
+            ).prefetch_related(
+                Prefetch('items', queryset=StoreOrderItem.objects.order_by('created_at', 'id'))
+            ).order_by('-created_at', '-id')[:RECENT_ORDER_LIMIT]
+        )
+        if not recent_orders:
+            return ''
+
+        orders_text = "📦 HISTÓRICO DE PEDIDOS RECENTES:\n"
+        all_items = []
+        for order in recent_orders:
+            items = list(order.items.all())
+            items_text = ", ".join([f"{item.quantity}x {item.product_name}" for item in items[:3]])
+            if len(items) > 3:
+                items_text += " e mais..."
+            orders_text += f"- {order.created_at.strftime('%d/%m/%Y')}: {items_text} - Total: R$ {order.total}\n"
+            all_items.extend(item.product_name for item in items)
+
+        parts = [orders_text]
+        if all_items:
+            favorites = Counter(all_items).most_common(3)
+            parts.append("❤️ PRODUTOS FAVORITOS DO CLIENTE: " + ", ".join([f[0] for f in favorites]))
+        return "\n\n".join(parts)
+
+
+def _store_id_for(instance) -> Any:
+    from apps.stores.models import Store
+
+    if isinstance(instance, Store):
+        return instance.pk
+    return getattr(instance, 'store_id', None)
+
+
+def invalidate_store_context(sender, instance, **kwargs) -> None:
+    """Signal receiver: orphan the store's agent context after a change commits."""
+    store_id = _store_id_for(instance)
+    if store_id:
+        transaction.on_commit(lambda: agent_context_service.invalidate_store(store_id))
+
+
+def invalidate_customer_context(sender, instance, **kwargs) -> None:
+    """Signal receiver: orphan the order summary of the order's customer after it commits."""
+    phone = getattr(instance, 'customer_phone', '')
+    if phone:
+        transaction.on_commit(lambda: agent_context_service.invalidate_customer(phone))
+
+
+# Singleton instance
+agent_context_service = AgentContextService()
@@ -25,6 +25,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langchain_community.chat_message_histories import RedisChatMessageHistory
 
 from apps.core.exceptions import BaseAPIException
+from .context_service import agent_context_service
 from .models import Agent, AgentConversation, AgentMessage
 
 logger = logging.getLogger(__name__)
@@ -167,168 +168,12 @@ class LangchainService:
     def _build_dynamic_context(self, phone_number: str, conversation_id: Optional[str] = None) -> str:
         """
         Build dynamic context with menu, customer info, order history, etc.
-        This provides the agent with real-time business data.
+        This provides the agent with real-time business data, assembled from
+        cached fragments (see ``apps.agents.context_service``).
         """
-        # DEBUG: Log início da construção do contexto
-        logger.info(f"[AGENT CONTEXT] Building context for phone: {phone_number}, conversation: {conversation_id}")
+        full_context = agent_context_service.build_context(self.agent, phone_number, conversation_id)
         
-        context_parts = []
-        
-        # Add agent's static context prompt
-        if self.agent.context_prompt:
-            context_parts.append(self.agent.context_prompt)
-        
-        # 1. Load customer info and order history
-        try:
-            from apps.conversations.models import Conversation
-            from apps.stores.models import StoreOrder
-            
-            # Get customer name from conversation
-            customer_name = ""
-            if conversation_id:
-                try:
-                    conv = Conversation.objects.get(id=conversation_id)
-                    if conv.contact_name:
-                        customer_name = conv.contact_name
-                        context_parts.append(f"Nome do cliente: {customer_name}")
-                except Conversation.DoesNotExist:
-                    pass
-            
-            # Get recent orders from this customer
-            if phone_number:
-                recent_orders = StoreOrder.objects.filter(
-                    customer_phone=phone_number,
-                    status__in=['completed', 'delivered', 'paid']
-                ).select_related('store').prefetch_related('items')[:3]
-                
-                if recent_orders:
-                    orders_text = "📦 HISTÓRICO DE PEDIDOS RECENTES:\n"
-                    for order in recent_orders:
-                        items = order.items.all()[:3]
-                        items_text = ", ".join([f"{item.quantity}x {item.product_name}" for item in items])
-                        if len(order.items.all()) > 3:
-                            items_text += " e mais..."
-                        orders_text += f"- {order.created_at.strftime('%d/%m/%Y')}: {items_text} - Total: R$ {order.total}\n"
-                    context_parts.append(orders_text)
-                    
-                    # Add favorite products based on order history
-                    from collections import Counter
-                    all_items = []
-                    for order in recent_orders:
-                        for item in order.items.all():
-                            all_items.append(item.product_name)
-                    
-                    if all_items:
-                        favorites = Counter(all_items).most_common(3)
-                        fav_text = "❤️ PRODUTOS FAVORITOS DO CLIENTE: " + ", ".join([f[0] for f in favorites])
-                        context_parts.append(fav_text)
-                        
-        except Exception as e:
-            logger.error(f"[AGENT CONTEXT] Error loading customer/order data: {e}")
-        
-        # 2. Load store menu/catalog
-        try:
-            # Try to get store from conversation or agent accounts
-            store = None
-            
-            # First try from conversation
-            if conversation_id:
-                try:
-                    from apps.conversations.models import Conversation
-                    conv = Conversation.objects.select_related('account').get(id=conversation_id)
-                    if hasattr(conv.account, 'store'):
-                        store = conv.account.store
-                except:
-                    pass
-            
-            # If not found, try from agent's associated accounts
-            if not store:
-                try:
-                    from apps.stores.models import Store
-                    # Get first store from agent's accounts
-                    agent_accounts = self.agent.accounts.all()
-                    logger.info(f"[AGENT CONTEXT] Agent accounts count: {agent_accounts.count()}")
-                    if agent_accounts:
-                        first_account = agent_accounts.first()
-                        logger.info(f"[AGENT CONTEXT] First account: {first_account}")
-                        if hasattr(first_account, 'store') and first_account.store:
-                            store = first_account.store
-                            logger.info(f"[AGENT CONTEXT] Found store via account.store: {store.name}")
-                        # Try stores many-to-many relation
-                        elif hasattr(first_account, 'stores') and first_account.stores.exists():
-                            store = first_account.stores.first()
-                            logger.info(f"[AGENT CONTEXT] Found store via account.stores: {store.name}")
-                except Exception as e:
-                    logger.error(f"[AGENT CONTEXT] Error loading store from accounts: {e}")
-            
-            # FALLBACK: If no store found, use 'pastita' store
-            if not store:
-                try:
-                    from apps.stores.models import Store
-                    store = Store.objects.filter(slug='pastita').first()
-                    if store:
-                        logger.info(f"[AGENT CONTEXT] Using fallback store: {store.name}")
-                    else:
-                        logger.warning("[AGENT CONTEXT] Fallback store 'pastita' not found!")
-                except Exception as e:
-                    logger.error(f"[AGENT CONTEXT] Error loading fallback store: {e}")
-            
-            # Load products from store
-            if store:
-                try:
-                    from apps.stores.models import StoreProduct
-                    products = StoreProduct.objects.filter(
-                        store=store,
-                        is_active=True
-                    ).select_related('category')[:20]
-                    
-                    if products:
-                        menu_text = f"\n📋 CARDÁPIO - {store.name}:\n"
-                        current_category = None
-                        
-                        for product in products:
-                            if product.category and product.category.name != current_category:
-                                current_category = product.category.name
-                                menu_text += f"\n【{current_category}】\n"
-                            
-                            price = product.price
-                            menu_text += f"• {product.name} - R$ {price}"
-                            if product.description:
-                                desc = product.description[:60] + "..." if len(product.description) > 60 else product.description
-                                menu_text += f" ({desc})"
-                            menu_text += "\n"
-                        
-                        context_parts.append(menu_text)
-                        
-                        # Add delivery info
-                        if store.delivery_enabled:
-                            delivery_text = f"\n🚚 ENTREGA:\n"
-                            delivery_text += f"• Taxa de entrega: R$ {store.default_delivery_fee}\n"
-                            if store.free_delivery_threshold:
-                                delivery_text += f"• Grátis acima de: R$ {store.free_delivery_threshold}\n"
-                            context_parts.append(delivery_text)
-                            
-                except Exception as e:
-                    logger.error(f"[AGENT CONTEXT] Error loading store products: {e}")
-            
-        except Exception as e:
-            logger.error(f"[AGENT CONTEXT] Error loading store menu: {e}")
-        
-        # 3. Load business hours
-        try:
-            if store and store.operating_hours:
-                hours_text = "\n⏰ HORÁRIO DE FUNCIONAMENTO:\n"
-                for day, hours in store.operating_hours.items():
-                    hours_text += f"• {day}: {hours.get('open', '--:--')} - {hours.get('close', '--:--')}\n"
-                context_parts.append(hours_text)
-        except Exception as e:
-            logger.error(f"[AGENT CONTEXT] Error loading business hours: {e}")
-        
-        # Combine all context parts
-        full_context = "\n\n".join(context_parts)
-        
-        # DEBUG: Log tamanho do contexto
-        logger.info(f"[AGENT CONTEXT] Context built: {len(full_context)} chars, {len(context_parts)} parts")
+        logger.info(f"[AGENT CONTEXT] Context built for conversation {conversation_id}: {len(full_context)} chars")
         
         # Remove accents to avoid encoding issues with API
         return remove_accents(full_context)
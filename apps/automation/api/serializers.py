@@ -516,9 +516,9 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
             'id', 'schedule', 'schedule_name',
             'name', 'report_type',
             'period_start', 'period_end',
-            'status', 'status_display',
+            'status', 'status_display', 'progress',
             'file_path', 'file_size', 'file_format',
-            'records_count', 'generation_time_ms',
+            'records_count', 'generation_time_ms', 'parameters',
             'error_message',
             'email_sent', 'email_sent_at', 'email_recipients',
             'created_by', 'created_by_name',
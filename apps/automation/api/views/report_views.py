@@ -8,9 +8,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
-from django.http import FileResponse
 
 from apps.automation.models import ReportSchedule, GeneratedReport
+from apps.core.export_views import ranged_file_response
 from apps.automation.api.serializers import (
     ReportScheduleSerializer,
     CreateReportScheduleSerializer,
@@ -241,16 +241,17 @@ class GeneratedReportViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if not report.file_path or not os.path.exists(report.file_path):
+        if not report.file_exists():
             return Response(
                 {'error': 'Report file not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return FileResponse(
-            open(report.file_path, 'rb'),
-            as_attachment=True,
-            filename=os.path.basename(report.file_path)
+        return ranged_file_response(
+            request,
+            report.open_file(),
+            report.get_file_size(),
+            os.path.basename(report.file_path)
         )
     
     @action(detail=True, methods=['post'])
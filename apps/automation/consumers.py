@@ -147,7 +147,7 @@ class AutomationConsumer(AsyncJsonWebsocketConsumer):
 
 
 # Utility functions to send WebSocket events
-def send_automation_event(event_type: str, data: dict, company_id: str = None):
+def send_automation_event(event_type: str, data: dict, company_id: str = None, user_id=None):
     """
     Send automation event to WebSocket clients.
     
@@ -155,6 +155,7 @@ def send_automation_event(event_type: str, data: dict, company_id: str = None):
         event_type: Type of event (session_created, session_updated, etc.)
         data: Event data
         company_id: Optional company ID to send to specific company group
+        user_id: Optional user ID to send only to that user's connections
     """
     from asgiref.sync import async_to_sync
     from channels.layers import get_channel_layer
@@ -165,7 +166,9 @@ def send_automation_event(event_type: str, data: dict, company_id: str = None):
         return
     
     # Determine target group
-    if company_id:
+    if user_id:
+        group_name = f"user_{user_id}_automation"
+    elif company_id:
         group_name = f"company_{company_id}_automation"
     else:
         group_name = "automation"
@@ -215,6 +218,6 @@ def notify_scheduled_message_sent(message_data: dict, company_id: str):
     send_automation_event('scheduled_message_sent', {'message': message_data}, company_id)
 
 
-def notify_report_generated(report_data: dict, company_id: str = None):
-    """Notify about report generated."""
-    send_automation_event('report_generated', {'report': report_data}, company_id)
+def notify_report_generated(report_data: dict, company_id: str = None, user_id=None):
+    """Notify about report generation progress or completion."""
+    send_automation_event('report_generated', {'report': report_data}, company_id, user_id=user_id)
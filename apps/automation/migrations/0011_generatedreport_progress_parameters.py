@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("automation", "0010_merge_20260303_1511"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generatedreport",
+            name="progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="generatedreport",
+            name="parameters",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,9 +1,13 @@
 """
 Automation models - Company profiles, auto messages, customer sessions, scheduled messages, and reports.
 """
+import os
+
+from django.core.files.storage import default_storage
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.core.models import BaseModel
+from apps.core.services.templating import SINGLE, render_template
 
 User = get_user_model()
 
@@ -321,6 +325,10 @@ class GeneratedReport(BaseModel):
     # Stats
     records_count = models.PositiveIntegerField(default=0)
     generation_time_ms = models.PositiveIntegerField(default=0)
+    progress = models.PositiveSmallIntegerField(default=0)
+    
+    # Export job parameters (filters passed to the export builder)
+    parameters = models.JSONField(default=dict, blank=True)
     
     # Error
     error_message = models.TextField(blank=True)
@@ -348,6 +356,36 @@ class GeneratedReport(BaseModel):
     def __str__(self):
         return f"{self.name} ({self.created_at.strftime('%Y-%m-%d')})"
 
+    # Files are stored in default_storage; older reports kept absolute local paths.
+
+    def _is_local_path(self) -> bool:
+        return os.path.isabs(self.file_path)
+
+    def file_exists(self) -> bool:
+        if not self.file_path:
+            return False
+        if self._is_local_path():
+            return os.path.exists(self.file_path)
+        return default_storage.exists(self.file_path)
+
+    def get_file_size(self) -> int:
+        if self._is_local_path():
+            return os.path.getsize(self.file_path)
+        return default_storage.size(self.file_path)
+
+    def open_file(self):
+        if self._is_local_path():
+            return open(self.file_path, 'rb')
+        return default_storage.open(self.file_path, 'rb')
+
+    def delete_file(self) -> None:
+        if not self.file_exists():
+            return
+        if self._is_local_path():
+            os.remove(self.file_path)
+        else:
+            default_storage.delete(self.file_path)
+
 
 class CompanyProfile(BaseModel):
     """
@@ -805,10 +843,7 @@ class AutoMessage(BaseModel):
 
     def render_message(self, context: dict) -> str:
         """Render message with context variables."""
-        message = self.message_text
-        for key, value in context.items():
-            message = message.replace(f"{{{key}}}", str(value))
-        return message
+        return render_template(self.message_text, context, syntax=SINGLE)
 
 
 class CustomerSession(BaseModel):
@@ -8,6 +8,8 @@ from typing import Dict, Any, Optional
 import time
 import logging
 
+from apps.core.services.templating import render_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -212,12 +214,7 @@ class FlowExecutor:
         if not template:
             return ''
         
-        result = template
-        for key, value in self.session.context.items():
-            placeholder = f'{{{{{key}}}}}'
-            result = result.replace(placeholder, str(value))
-        
-        return result
+        return render_template(template, self.session.context)
     
     def _find_start_node(self, nodes: Dict) -> Optional[Dict]:
         """Encontra nó do tipo 'start' ou retorna primeiro nó."""
@@ -12,6 +12,8 @@ from decimal import Decimal
 from django.conf import settings
 from django.db.models import Q
 
+from apps.whatsapp.intents.matcher import PriorityMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -235,14 +237,13 @@ class IntentDetector:
         """Detecta a intenção da mensagem."""
         message_lower = message.lower().strip()
 
-        for intent, patterns in self.PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower, re.IGNORECASE):
-                    return intent, {'confidence': 0.95}
+        # PATTERNS em ordem de prioridade, avaliados numa única chamada
+        intent = _INTENT_MATCHER.match(message_lower)
+        if intent:
+            return intent, {'confidence': 0.95}
 
         # Tenta extrair quantidade + produto
-        quantity_pattern = r'(\d+)\s+(?:unidades?|uni|por[çc][õo]es?|pratos?|potes?)?\s*(?:de\s+)?(.+)'
-        match = re.search(quantity_pattern, message_lower, re.IGNORECASE)
+        match = _QUANTITY_RE.search(message_lower)
         if match:
             return IntentType.ADD_TO_CART, {
                 'quantity': int(match.group(1)),
@@ -251,8 +252,7 @@ class IntentDetector:
             }
 
         # Padrão: número + produto (ex: "2 rondelli de frango")
-        simple_qty_pattern = r'^(\d+)\s+(.+)$'
-        match = re.search(simple_qty_pattern, message_lower, re.IGNORECASE)
+        match = _SIMPLE_QUANTITY_RE.search(message_lower)
         if match:
             potential_product = match.group(2).strip()
             if any(word in potential_product for word in ['rondelli', 'lasanha', 'nhoque', 'talharim', 'fettuccine', 'molho']):
@@ -263,8 +263,7 @@ class IntentDetector:
                 }
 
         # Padrão simples: só o nome do produto
-        simple_product = r'^(rondelli|lasanha|nhoque|talharim|fettuccine|molho)'
-        if re.search(simple_product, message_lower, re.IGNORECASE):
+        if _SIMPLE_PRODUCT_RE.search(message_lower):
             return IntentType.ADD_TO_CART, {
                 'product_name': message_lower,
                 'confidence': 0.8
@@ -273,6 +272,15 @@ class IntentDetector:
         return IntentType.UNKNOWN, {'confidence': 0.0}
 
 
+# Padrões compilados uma única vez, na importação
+_INTENT_MATCHER = PriorityMatcher(IntentDetector.PATTERNS.items(), re.IGNORECASE)
+_QUANTITY_RE = re.compile(
+    r'(\d+)\s+(?:unidades?|uni|por[çc][õo]es?|pratos?|potes?)?\s*(?:de\s+)?(.+)', re.IGNORECASE
+)
+_SIMPLE_QUANTITY_RE = re.compile(r'^(\d+)\s+(.+)$', re.IGNORECASE)
+_SIMPLE_PRODUCT_RE = re.compile(r'^(rondelli|lasanha|nhoque|talharim|fettuccine|molho)', re.IGNORECASE)
+
+
 class PastitaOrchestrator:
     """Orquestrador estável - sem dependência de LLM externo."""
 
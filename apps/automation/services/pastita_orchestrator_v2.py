@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from django.conf import settings
 from django.db.models import Q
 
+from apps.whatsapp.intents.matcher import PriorityMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -206,10 +208,10 @@ class IntentDetector:
         """Detecta intenção da mensagem."""
         message_lower = message.lower().strip()
 
-        for intent, patterns in cls.PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower, re.IGNORECASE):
-                    return intent, {"confidence": 1.0, "method": "regex"}
+        # PATTERNS em ordem de prioridade, avaliados numa única chamada
+        intent = _INTENT_MATCHER.match(message_lower)
+        if intent:
+            return intent, {"confidence": 1.0, "method": "regex"}
 
         if re.match(r'^\d+$', message_lower):
             return IntentType.ADD_TO_CART, {"confidence": 0.8, "method": "regex", "quantity": int(message_lower)}
@@ -217,6 +219,10 @@ class IntentDetector:
         return IntentType.UNKNOWN, {"confidence": 0.0, "method": "none"}
 
 
+# Padrões compilados uma única vez, na importação
+_INTENT_MATCHER = PriorityMatcher(IntentDetector.PATTERNS.items(), re.IGNORECASE)
+
+
 # =============================================================================
 # PASTITA ORCHESTRATOR
 # =============================================================================
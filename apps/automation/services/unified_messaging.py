@@ -18,11 +18,13 @@ Usage:
 """
 
 import logging
-from typing import Optional, Dict, Any, List
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable
 from datetime import datetime
 from django.utils import timezone
 from django.db import transaction
 
+from apps.core.exceptions import WhatsAppRateLimitError
 from apps.whatsapp.models import WhatsAppAccount, Message
 from apps.automation.models import ScheduledMessage
 from apps.campaigns.models import Campaign, CampaignRecipient
@@ -66,6 +68,36 @@ class UnifiedMessagingService:
         Returns:
             ScheduledMessage instance
         """
+        # Create the scheduled message
+        scheduled = UnifiedMessagingService._build_scheduled_message(
+            account=account,
+            to_number=to_number,
+            message_data=message_data,
+            scheduled_at=scheduled_at,
+            source=source,
+            campaign_id=campaign_id,
+            created_by=created_by,
+            contact_name=contact_name,
+            timezone_str=timezone_str,
+        )
+        scheduled.save()
+        
+        logger.info(f"Scheduled message created: {scheduled.id} for {to_number} at {scheduled_at}")
+        return scheduled
+    
+    @staticmethod
+    def _build_scheduled_message(
+        account: WhatsAppAccount,
+        to_number: str,
+        message_data: Dict[str, Any],
+        scheduled_at: datetime,
+        source: str = 'manual',
+        campaign_id: Optional[str] = None,
+        created_by=None,
+        contact_name: str = '',
+        timezone_str: str = 'America/Sao_Paulo'
+    ) -> ScheduledMessage:
+        """Build an unsaved ScheduledMessage (see ``schedule_message``)."""
         # Determine message type from data
         message_type = message_data.get('message_type', 'text')
         
@@ -77,8 +109,7 @@ class UnifiedMessagingService:
         media_url = message_data.get('media_url', '')
         buttons = message_data.get('buttons', [])
         
-        # Create the scheduled message
-        scheduled = ScheduledMessage.objects.create(
+        return ScheduledMessage(
             account=account,
             to_number=to_number,
             contact_name=contact_name,
@@ -97,24 +128,22 @@ class UnifiedMessagingService:
             campaign_id=campaign_id,
             created_by=created_by,
         )
-        
-        logger.info(f"Scheduled message created: {scheduled.id} for {to_number} at {scheduled_at}")
-        return scheduled
     
     @classmethod
     def schedule_campaign_messages(
         cls,
         campaign: Campaign,
-        recipients: List[Dict[str, Any]],
-        batch_size: int = 100
+        recipients: Iterable[Dict[str, Any]],
+        batch_size: int = 1000
     ) -> int:
         """
         Schedule messages for a campaign.
-        Creates ScheduledMessage entries for each recipient.
+        Creates ScheduledMessage entries for each recipient, ``batch_size``
+        recipients per transaction with bulk inserts.
         
         Args:
             campaign: Campaign instance
-            recipients: List of dicts with 'phone_number', 'contact_name', 'variables'
+            recipients: Iterable of dicts with 'phone_number', 'contact_name', 'variables'
             batch_size: Number of messages to create in each batch
             
         Returns:
@@ -129,46 +158,60 @@ class UnifiedMessagingService:
             message_data['template_name'] = campaign.template.name
             message_data['template_language'] = campaign.template.language
         
-        with transaction.atomic():
-            for recipient_data in recipients:
-                phone = recipient_data.get('phone_number')
-                name = recipient_data.get('contact_name', '')
-                variables = recipient_data.get('variables', {})
-                
-                if not phone:
-                    continue
-                
-                # Create or update CampaignRecipient
-                recipient, created = CampaignRecipient.objects.update_or_create(
-                    campaign=campaign,
-                    phone_number=phone,
-                    defaults={
-                        'contact_name': name,
-                        'variables': variables,
-                        'status': CampaignRecipient.RecipientStatus.PENDING,
-                    }
-                )
-                
-                # Schedule the message
-                scheduled = cls.schedule_message(
-                    account=campaign.account,
-                    to_number=phone,
-                    message_data=message_data,
-                    scheduled_at=campaign.scheduled_at or timezone.now(),
-                    source='campaign',
-                    campaign_id=str(campaign.id),
-                    created_by=campaign.created_by,
-                    contact_name=name,
+        scheduled_at = campaign.scheduled_at or timezone.now()
+        recipients = (r for r in recipients if r.get('phone_number'))
+        
+        while True:
+            chunk = list(islice(recipients, batch_size))
+            if not chunk:
+                break
+            # Last entry per phone wins, as with one update_or_create per recipient
+            by_phone = {r['phone_number']: r for r in chunk}
+            
+            with transaction.atomic():
+                # Create or update CampaignRecipients
+                CampaignRecipient.objects.bulk_create(
+                    [
+                        CampaignRecipient(
+                            campaign=campaign,
+                            phone_number=phone,
+                            contact_name=r.get('contact_name', ''),
+                            variables=r.get('variables', {}),
+                            status=CampaignRecipient.RecipientStatus.PENDING,
+                        )
+                        for phone, r in by_phone.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['campaign', 'phone_number'],
+                    update_fields=['contact_name', 'variables', 'status'],
                 )
                 
-                # Link recipient to scheduled message
-                recipient.message_id = str(scheduled.id)
-                recipient.save(update_fields=['message_id'])
-                
-                scheduled_count += 1
+                # Schedule the messages
+                scheduled = ScheduledMessage.objects.bulk_create([
+                    cls._build_scheduled_message(
+                        account=campaign.account,
+                        to_number=phone,
+                        message_data=message_data,
+                        scheduled_at=scheduled_at,
+                        source='campaign',
+                        campaign_id=str(campaign.id),
+                        created_by=campaign.created_by,
+                        contact_name=r.get('contact_name', ''),
+                    )
+                    for phone, r in by_phone.items()
+                ])
                 
-                if scheduled_count % batch_size == 0:
-                    logger.info(f"Scheduled {scheduled_count} messages for campaign {campaign.id}")
+                # Link recipients to their scheduled messages
+                scheduled_ids = {message.to_number: str(message.id) for message in scheduled}
+                linked = list(CampaignRecipient.objects.filter(
+                    campaign=campaign, phone_number__in=list(scheduled_ids)
+                ).only('id', 'phone_number'))
+                for recipient in linked:
+                    recipient.message_id = scheduled_ids[recipient.phone_number]
+                CampaignRecipient.objects.bulk_update(linked, ['message_id'], batch_size=batch_size)
+            
+            scheduled_count += len(scheduled)
+            logger.info(f"Scheduled {scheduled_count} messages for campaign {campaign.id}")
         
         # Update campaign stats
         campaign.total_recipients = scheduled_count
@@ -189,6 +232,8 @@ class UnifiedMessagingService:
         Returns:
             Dict with counts: {'processed': int, 'sent': int, 'failed': int}
         """
+        from apps.whatsapp.services.send_scheduler import BULK, TRANSACTIONAL, send_priority
+        
         now = timezone.now()
         
         # Get due messages
@@ -198,12 +243,23 @@ class UnifiedMessagingService:
         ).select_related('account')[:batch_size]
         
         results = {'processed': 0, 'sent': 0, 'failed': 0}
+        throttled_accounts = set()
         
         for scheduled in due_messages:
+            if scheduled.account_id in throttled_accounts:
+                continue
+            # Campaign sends yield to conversational traffic on the same number
+            lane = BULK if scheduled.campaign_id else TRANSACTIONAL
             try:
                 results['processed'] += 1
-                cls._send_scheduled_message(scheduled)
+                with send_priority(lane):
+                    cls._send_scheduled_message(scheduled)
                 results['sent'] += 1
+            except WhatsAppRateLimitError as e:
+                # Leave the number's messages pending for the next run, other accounts keep sending
+                logger.warning(f"Scheduled message {scheduled.id} throttled: {e.message}")
+                results['processed'] -= 1
+                throttled_accounts.add(scheduled.account_id)
             except Exception as e:
                 logger.error(f"Failed to send scheduled message {scheduled.id}: {e}")
                 scheduled.status = ScheduledMessage.Status.FAILED
@@ -21,6 +21,7 @@ from apps.agents.models import Agent
 from apps.agents.services import LangchainService
 from apps.automation.models import CompanyProfile, AutoMessage, CustomerSession, IntentLog
 from apps.automation.services.context_service import AutomationContextService
+from apps.core.services.templating import SINGLE, render_template
 from apps.whatsapp.intents.detector import IntentDetector, IntentType
 from apps.whatsapp.intents.handlers import get_handler, HandlerResult
 from apps.whatsapp.services.whatsapp_api_service import WhatsAppAPIService
@@ -203,28 +204,21 @@ class UnifiedService:
     
     def _render_template(self, template: AutoMessage, session_data: Dict) -> str:
         """Renderiza template com variáveis."""
-        text = template.message_text
-        
-        # Helper para garantir string
-        def safe_str(value, default=''):
-            if value is None:
-                return default
-            return str(value)
-        
-        # Variáveis básicas
-        text = text.replace('{customer_name}', safe_str(self.conversation.contact_name, 'Cliente'))
-        text = text.replace('{company_name}', safe_str(self.company.company_name if self.company else None, 'Nossa Loja'))
-        text = text.replace('{phone}', safe_str(self.conversation.phone_number))
-        
-        # Carrinho
+        company_name = self.company.company_name if self.company else None
         cart_total = session_data.get('cart_total') or 0
-        text = text.replace('{cart_total}', f"R$ {float(cart_total):.2f}")
-        text = text.replace('{cart_items}', safe_str(session_data.get('cart_items_count'), '0'))
-        
-        # Pedido
-        text = text.replace('{order_id}', safe_str(session_data.get('order_id')))
+        cart_items = session_data.get('cart_items_count')
         
-        return text
+        return render_template(template.message_text, {
+            # Variáveis básicas
+            'customer_name': self.conversation.contact_name if self.conversation.contact_name is not None else 'Cliente',
+            'company_name': company_name if company_name is not None else 'Nossa Loja',
+            'phone': self.conversation.phone_number,
+            # Carrinho
+            'cart_total': f"R$ {float(cart_total):.2f}",
+            'cart_items': cart_items if cart_items is not None else '0',
+            # Pedido
+            'order_id': session_data.get('order_id'),
+        }, syntax=SINGLE)
     
     def process_message(self, message_text: str) -> UnifiedResponse:
         """
@@ -19,6 +19,7 @@ from .unified_messaging_tasks import (
 from .scheduled import (
     send_scheduled_message,
     generate_report,
+    run_export_job,
     process_scheduled_reports,
     cleanup_old_reports
 )
@@ -35,6 +36,7 @@ __all__ = [
     'send_scheduled_message',
     'process_scheduled_messages',
     'generate_report',
+    'run_export_job',
     'process_scheduled_reports',
     'cleanup_old_reports',
     'process_campaign_batch',
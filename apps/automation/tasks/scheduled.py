@@ -3,16 +3,18 @@ Celery tasks for scheduled messages and automated reports.
 """
 import logging
 import os
+import tempfile
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 from celery import shared_task
 from django.utils import timezone
-from django.conf import settings
 from django.core.mail import EmailMessage
 from django.db import models
 
+from apps.core.services.exports import ProgressCallback, Sheet
+
 logger = logging.getLogger(__name__)
 
 
@@ -293,7 +295,7 @@ def generate_report(self, schedule_id: str = None, report_type: str = None,
         generation_time = int((time.time() - start_time) * 1000)
         report.status = GeneratedReport.Status.COMPLETED
         report.file_path = file_path
-        report.file_size = os.path.getsize(file_path) if file_path and os.path.exists(file_path) else 0
+        report.file_size = report.get_file_size() if report.file_exists() else 0
         report.records_count = records_count
         report.generation_time_ms = generation_time
         report.save()
@@ -340,74 +342,146 @@ def generate_report(self, schedule_id: str = None, report_type: str = None,
         raise self.retry(exc=e, countdown=300)
 
 
-def _generate_report_file(report, data: Dict[str, Any], export_format: str) -> str:
-    """Generate report file and return path."""
-    import json
-    
-    # Create reports directory
-    reports_dir = os.path.join(settings.BASE_DIR, 'reports')
-    os.makedirs(reports_dir, exist_ok=True)
-    
+@shared_task(bind=True, max_retries=2)
+def run_export_job(self, report_id: str):
+    """
+    Run an export job created by ``start_export_job``.
+
+    Rows are streamed from the export's queryset into the report file and
+    progress is pushed to the requesting user through ``report_generated``
+    events on the automation WebSocket.
+    """
+    from ..models import GeneratedReport
+    from ..consumers import notify_report_generated
+    from apps.core.services.exports import get_export
+
+    start_time = time.time()
+    try:
+        report = GeneratedReport.objects.get(id=report_id)
+    except GeneratedReport.DoesNotExist:
+        logger.warning(f"Export job not found: {report_id}")
+        return None
+
+    def notify(status: str, **extra):
+        notify_report_generated({
+            'id': str(report.id),
+            'name': report.name,
+            'status': status,
+            'progress': report.progress,
+            'records_count': report.records_count,
+            **extra,
+        }, user_id=report.created_by_id)
+
+    definition = get_export(report.report_type)
+    if definition is None:
+        report.status = GeneratedReport.Status.FAILED
+        report.error_message = f"Unknown export type: {report.report_type}"
+        report.save(update_fields=['status', 'error_message', 'updated_at'])
+        notify('failed', error=report.error_message)
+        return None
+
+    try:
+        source = definition.build(report.parameters)
+        total = source.count()
+
+        def on_progress(written: int):
+            progress = min(99, written * 100 // total) if total else 99
+            report.records_count = written
+            if progress == report.progress:
+                return
+            report.progress = progress
+            GeneratedReport.objects.filter(id=report.id).update(
+                progress=progress,
+                records_count=written,
+            )
+            notify('generating')
+
+        notify('generating')
+        file_path = _generate_report_file(
+            report,
+            [(definition.sheet_name, source.headers, source.rows())],
+            report.file_format,
+            on_progress,
+        )
+
+        report.status = GeneratedReport.Status.COMPLETED
+        report.progress = 100
+        report.file_path = file_path
+        report.file_size = report.get_file_size()
+        report.generation_time_ms = int((time.time() - start_time) * 1000)
+        report.save()
+        notify('completed', file_size=report.file_size)
+
+        logger.info(f"Export job {report.id} finished with {report.records_count} records")
+        return str(report.id)
+
+    except Exception as e:
+        logger.error(f"Error running export job {report_id}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        report.status = GeneratedReport.Status.FAILED
+        report.error_message = str(e)
+        report.save(update_fields=['status', 'error_message', 'updated_at'])
+        notify('failed', error=str(e))
+        return None
+
+
+def _generate_report_file(
+    report,
+    data: Union[Dict[str, Any], Iterable[Sheet]],
+    export_format: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> str:
+    """
+    Generate report file in default_storage and return its name.
+
+    ``data`` is either a mapping of sheet name to a list of row dicts
+    (scheduled reports) or ``(sheet name, headers, rows)`` tuples whose rows
+    are consumed lazily (export jobs). The file is built in a temporary file
+    and handed to the storage backend, which uploads it in chunks.
+    """
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+    from apps.core.services.exports import write_csv, write_xlsx, xlsx_available
+
+    sheets = _dict_sheets(data) if isinstance(data, dict) else data
+
     timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
     filename = f"report_{report.report_type}_{timestamp}"
-    
-    if export_format == 'xlsx':
-        try:
-            from openpyxl import Workbook
-            
-            wb = Workbook()
-            wb.remove(wb.active)  # Remove default sheet
-            
-            for sheet_name, sheet_data in data.items():
-                if not sheet_data:
-                    continue
-                
-                ws = wb.create_sheet(title=sheet_name[:31])  # Excel limit
-                
-                # Write headers
-                if sheet_data:
-                    headers = list(sheet_data[0].keys())
-                    for col, header in enumerate(headers, 1):
-                        ws.cell(row=1, column=col, value=header)
-                    
-                    # Write data
-                    for row_idx, row_data in enumerate(sheet_data, 2):
-                        for col_idx, header in enumerate(headers, 1):
-                            value = row_data.get(header, '')
-                            if isinstance(value, datetime):
-                                value = value.isoformat()
-                            ws.cell(row=row_idx, column=col_idx, value=str(value) if value else '')
-            
-            file_path = os.path.join(reports_dir, f"{filename}.xlsx")
-            wb.save(file_path)
-            return file_path
-            
-        except ImportError:
-            # Fallback to CSV
+
+    if export_format == 'xlsx' and not xlsx_available():
+        # Fallback to CSV
+        export_format = 'csv'
+
+    with tempfile.TemporaryFile() as output:
+        if export_format == 'xlsx':
+            write_xlsx(output, sheets, on_progress)
+        else:
             export_format = 'csv'
-    
-    if export_format == 'csv':
-        import csv
-        
-        file_path = os.path.join(reports_dir, f"{filename}.csv")
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = None
-            for sheet_name, sheet_data in data.items():
-                if not sheet_data:
-                    continue
-                
-                # Write section header
-                f.write(f"\n=== {sheet_name.upper()} ===\n")
-                
-                headers = list(sheet_data[0].keys())
-                writer = csv.DictWriter(f, fieldnames=headers)
-                writer.writeheader()
-                for row in sheet_data:
-                    writer.writerow({k: str(v) if v else '' for k, v in row.items()})
-        
-        return file_path
-    
-    return ''
+            write_csv(output, sheets, on_progress, section_titles=isinstance(data, dict))
+        output.seek(0)
+        return default_storage.save(f"reports/{filename}.{export_format}", File(output))
+
+
+def _dict_sheets(data: Dict[str, Any]) -> List[Sheet]:
+    """Sheets for scheduled reports, built from lists of row dicts."""
+    sheets = []
+    for sheet_name, sheet_data in data.items():
+        if not sheet_data:
+            continue
+        headers = list(sheet_data[0].keys())
+        rows = (
+            [_report_cell(row.get(header, '')) for header in headers]
+            for row in sheet_data
+        )
+        sheets.append((sheet_name, headers, rows))
+    return sheets
+
+
+def _report_cell(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value) if value else ''
 
 
 def _send_report_email(report, recipients: list):
@@ -439,8 +513,9 @@ Sistema WhatsApp Business
             to=recipients
         )
         
-        if report.file_path and os.path.exists(report.file_path):
-            email.attach_file(report.file_path)
+        if report.file_exists():
+            with report.open_file() as report_file:
+                email.attach(os.path.basename(report.file_path), report_file.read())
         
         email.send()
         
@@ -492,9 +567,9 @@ def cleanup_old_reports():
     
     for report in old_reports:
         # Delete file
-        if report.file_path and os.path.exists(report.file_path):
+        if report.file_path:
             try:
-                os.remove(report.file_path)
+                report.delete_file()
             except OSError as e:
                 logger.warning(f"Failed to delete report file {report.file_path}: {str(e)}")
         
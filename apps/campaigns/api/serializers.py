@@ -85,9 +85,13 @@ class ContactListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'account', 'name', 'description',
             'contacts', 'contact_count', 'source', 'imported_at',
+            'import_status', 'import_summary',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'id', 'contact_count', 'imported_at', 'import_status', 'import_summary',
             'created_at', 'updated_at',
         ]
-        read_only_fields = ['id', 'contact_count', 'imported_at', 'created_at', 'updated_at']
 
 
 class ContactListCreateSerializer(serializers.Serializer):
@@ -102,8 +106,19 @@ class ContactListCreateSerializer(serializers.Serializer):
     )
 
 
+class AddContactListSerializer(serializers.Serializer):
+    """Serializer for adding a contact list's contacts as recipients."""
+    contact_list_id = serializers.UUIDField()
+
+
 class ImportContactsSerializer(serializers.Serializer):
-    """Serializer for importing contacts from CSV."""
+    """Serializer for importing contacts from CSV (inline content or uploaded file)."""
     account_id = serializers.UUIDField()
     name = serializers.CharField(max_length=255)
-    csv_content = serializers.CharField()
+    csv_content = serializers.CharField(required=False)
+    file = serializers.FileField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs.get('csv_content') and not attrs.get('file'):
+            raise serializers.ValidationError("Provide csv_content or file")
+        return attrs
@@ -23,6 +23,7 @@ from .serializers import (
     CampaignCreateSerializer,
     CampaignRecipientSerializer,
     AddRecipientsSerializer,
+    AddContactListSerializer,
     ContactListSerializer,
     ContactListCreateSerializer,
     ImportContactsSerializer,
@@ -396,6 +397,24 @@ class CampaignViewSet(viewsets.ModelViewSet):
             return Response({'added': count})
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @extend_schema(summary="Add a contact list to campaign recipients", request=AddContactListSerializer)
+    @action(detail=True, methods=['post'])
+    def add_contact_list(self, request, pk=None):
+        """Add every contact of a contact list as a campaign recipient."""
+        serializer = AddContactListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        service = CampaignService()
+        try:
+            summary = service.add_recipients_from_contact_list(
+                str(pk), str(serializer.validated_data['contact_list_id'])
+            )
+            return Response({'added': summary.imported, **summary.as_dict()})
+        except ContactList.DoesNotExist:
+            return Response({'error': 'Contact list not found'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @extend_schema_view(
@@ -436,11 +455,28 @@ class ContactListViewSet(viewsets.ModelViewSet):
     @extend_schema(summary="Import contacts from CSV", request=ImportContactsSerializer)
     @action(detail=False, methods=['post'])
     def import_csv(self, request):
-        """Import contacts from CSV."""
+        """
+        Import contacts from CSV.
+        
+        Uploaded files are imported in the background (202); poll the contact
+        list for ``import_status`` and ``import_summary``.
+        """
         serializer = ImportContactsSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         service = CampaignService()
+        if serializer.validated_data.get('file'):
+            contact_list = service.start_contact_import(
+                account_id=serializer.validated_data['account_id'],
+                name=serializer.validated_data['name'],
+                csv_file=serializer.validated_data['file'],
+                created_by=request.user
+            )
+            return Response(
+                ContactListSerializer(contact_list).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+        
         try:
             contact_list = service.import_contacts_from_csv(
                 account_id=serializer.validated_data['account_id'],
@@ -119,6 +119,7 @@ class CampaignRecipient(models.Model):
     
     class RecipientStatus(models.TextChoices):
         PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
         SENT = 'sent', 'Sent'
         DELIVERED = 'delivered', 'Delivered'
         READ = 'read', 'Read'
@@ -177,6 +178,13 @@ class CampaignRecipient(models.Model):
 class ContactList(models.Model):
     """Contact list for campaigns."""
     
+    class ImportStatus(models.TextChoices):
+        NONE = '', 'None'
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     account = models.ForeignKey(
         WhatsAppAccount,
@@ -194,6 +202,13 @@ class ContactList(models.Model):
     # Import info
     source = models.CharField(max_length=50, blank=True)  # csv, manual, api
     imported_at = models.DateTimeField(null=True, blank=True)
+    import_status = models.CharField(
+        max_length=20,
+        choices=ImportStatus.choices,
+        default=ImportStatus.NONE,
+        blank=True
+    )
+    import_summary = models.JSONField(default=dict, blank=True)  # rows, imported, rejected sample
     
     created_by = models.ForeignKey(
         User,
@@ -211,3 +226,26 @@ class ContactList(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.contact_count} contacts)"
+
+
+class ContactListMember(models.Model):
+    """Contact of a list imported in bulk (CSV imports)."""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    contact_list = models.ForeignKey(
+        ContactList,
+        on_delete=models.CASCADE,
+        related_name='members'
+    )
+    
+    phone_number = models.CharField(max_length=20)
+    contact_name = models.CharField(max_length=255, blank=True)
+    variables = models.JSONField(default=dict, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['contact_list', 'phone_number']
+    
+    def __str__(self):
+        return self.phone_number
@@ -1,17 +1,30 @@
 """
 Campaign service for managing marketing campaigns.
 """
+import io
+import itertools
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import QuerySet
 from django.utils import timezone
 
+from apps.core.services.templating import render_components, render_template
 from apps.whatsapp.models import WhatsAppAccount
 from apps.whatsapp.services import MessageService
 # Import unified messaging service for integration
 from apps.automation.services import UnifiedMessagingService
-from ..models import Campaign, CampaignRecipient, ContactList
+from ..models import Campaign, CampaignRecipient, ContactList, ContactListMember
+from .dispatch_service import CampaignDispatcher
+from .import_service import (
+    ContactImporter,
+    ImportProgressCallback,
+    ImportSummary,
+    iter_contacts,
+    iter_csv_contacts,
+)
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -117,8 +130,8 @@ class CampaignService:
         
         if celery_available:
             try:
-                from ..tasks import process_campaign
-                process_campaign.delay(str(campaign.id))
+                from ..tasks import start_campaign_workers
+                start_campaign_workers(str(campaign.id))
                 logger.info(f"Campaign {campaign_id} queued for async processing via Celery")
             except Exception as e:
                 logger.warning(f"Celery task failed for campaign {campaign_id}: {e}")
@@ -144,10 +157,15 @@ class CampaignService:
                     logger.info(f"Campaign {campaign_id} completed synchronously. Total: {total_processed}")
                     break
                 
+                if not (result.get('processed') or result.get('failed') or result.get('throttled')):
+                    logger.info(f"Campaign {campaign_id}: {result['remaining']} recipients still in flight")
+                    break
+                
                 logger.info(f"Campaign {campaign_id}: processed {result['processed']}, remaining {result['remaining']}")
                 
-                # Small delay between batches
-                time.sleep(0.5)
+                # Back off while the number is throttled
+                if result.get('throttled'):
+                    time.sleep(1)
         
         return campaign
     
@@ -186,8 +204,8 @@ class CampaignService:
         campaign.save()
         
         # Trigger async processing
-        from ..tasks import process_campaign
-        process_campaign.delay(str(campaign.id))
+        from ..tasks import start_campaign_workers
+        start_campaign_workers(str(campaign.id))
         
         return campaign
     
@@ -266,6 +284,9 @@ class CampaignService:
             'pending': campaign.recipients.filter(
                 status=CampaignRecipient.RecipientStatus.PENDING
             ).count(),
+            'sending': campaign.recipients.filter(
+                status=CampaignRecipient.RecipientStatus.SENDING
+            ).count(),
             'started_at': campaign.started_at.isoformat() if campaign.started_at else None,
             'completed_at': campaign.completed_at.isoformat() if campaign.completed_at else None,
         }
@@ -275,121 +296,91 @@ class CampaignService:
         campaign_id: str,
         batch_size: int = 100,
     ) -> Dict[str, int]:
-        """Process a batch of campaign recipients."""
-        campaign = Campaign.objects.get(id=campaign_id)
+        """
+        Claim and send one batch of campaign recipients.
+
+        Safe to run from several workers at once on the same campaign; each
+        call claims its own recipients (see ``CampaignDispatcher``).
+        """
+        campaign = Campaign.objects.select_related('account', 'template').get(id=campaign_id)
         
         if campaign.status != Campaign.CampaignStatus.RUNNING:
             logger.warning(f"Campaign {campaign_id} is not running (status: {campaign.status})")
             return {'processed': 0, 'remaining': 0}
         
-        # Get pending recipients
-        recipients = list(campaign.recipients.filter(
-            status=CampaignRecipient.RecipientStatus.PENDING
-        )[:batch_size])
+        message_service = MessageService()
+        dispatcher = CampaignDispatcher(
+            send=lambda campaign, recipient: self._send_to_recipient(message_service, campaign, recipient)
+        )
         
+        recipients = dispatcher.claim_batch(campaign, batch_size)
         if not recipients:
-            logger.info(f"Campaign {campaign_id}: No pending recipients found")
-            remaining = campaign.recipients.filter(
-                status=CampaignRecipient.RecipientStatus.PENDING
-            ).count()
-            if remaining == 0:
-                campaign.status = Campaign.CampaignStatus.COMPLETED
-                campaign.completed_at = timezone.now()
-                campaign.save()
-            return {'processed': 0, 'remaining': remaining}
+            logger.info(f"Campaign {campaign_id}: No claimable recipients found")
+            return {'processed': 0, 'failed': 0, 'remaining': dispatcher.complete_if_done(campaign)}
         
         logger.info(f"Campaign {campaign_id}: Processing {len(recipients)} recipients")
         
-        message_service = MessageService()
-        processed = 0
-        failed = 0
-        
-        for recipient in recipients:
-            try:
-                logger.debug(f"Sending message to {recipient.phone_number}")
-                
-                # Send message
-                if campaign.template:
-                    message = message_service.send_template_message(
-                        account_id=str(campaign.account.id),
-                        to=recipient.phone_number,
-                        template_name=campaign.template.name,
-                        language_code=campaign.template.language,
-                        components=self._build_template_components(
-                            campaign.message_content,
-                            recipient.variables
-                        ),
-                    )
-                else:
-                    text = self._personalize_message(
-                        campaign.message_content.get('text', ''),
-                        recipient.variables
-                    )
-                    message = message_service.send_text_message(
-                        account_id=str(campaign.account.id),
-                        to=recipient.phone_number,
-                        text=text,
-                    )
-                
-                recipient.message_id = str(message.id)
-                recipient.whatsapp_message_id = message.whatsapp_message_id
-                recipient.status = CampaignRecipient.RecipientStatus.SENT
-                recipient.sent_at = timezone.now()
-                recipient.save()
-                
-                campaign.messages_sent += 1
-                processed += 1
-                
-                logger.info(f"Campaign {campaign_id}: Sent to {recipient.phone_number} (msg_id: {message.whatsapp_message_id})")
-                
-            except Exception as e:
-                logger.error(f"Campaign {campaign_id}: Error sending to {recipient.phone_number}: {e}", exc_info=True)
-                recipient.status = CampaignRecipient.RecipientStatus.FAILED
-                recipient.failed_at = timezone.now()
-                recipient.error_message = str(e)
-                recipient.save()
-                
-                campaign.messages_failed += 1
-                failed += 1
-        
-        # Check if campaign is complete
-        remaining = campaign.recipients.filter(
-            status=CampaignRecipient.RecipientStatus.PENDING
-        ).count()
-        
-        if remaining == 0:
-            campaign.status = Campaign.CampaignStatus.COMPLETED
-            campaign.completed_at = timezone.now()
-            logger.info(f"Campaign {campaign_id} completed: {campaign.messages_sent} sent, {campaign.messages_failed} failed")
-        
-        campaign.save()
+        result = dispatcher.dispatch(campaign, recipients)
+        result['remaining'] = dispatcher.complete_if_done(campaign)
         
-        return {'processed': processed, 'failed': failed, 'remaining': remaining}
+        return result
+    
+    def _send_to_recipient(
+        self,
+        message_service: MessageService,
+        campaign: Campaign,
+        recipient: CampaignRecipient,
+    ):
+        """Send the campaign message to one recipient."""
+        if campaign.template:
+            return message_service.send_template_message(
+                account_id=str(campaign.account.id),
+                to=recipient.phone_number,
+                template_name=campaign.template.name,
+                language_code=campaign.template.language,
+                components=self._build_template_components(
+                    campaign.message_content,
+                    recipient.variables
+                ),
+            )
+        text = self._personalize_message(
+            campaign.message_content.get('text', ''),
+            recipient.variables
+        )
+        return message_service.send_text_message(
+            account_id=str(campaign.account.id),
+            to=recipient.phone_number,
+            text=text,
+        )
     
     def _create_recipients(
         self,
         campaign: Campaign,
-        contacts: List[Dict[str, Any]],
+        contacts: Iterable[Dict[str, Any]],
+        on_progress: Optional[ImportProgressCallback] = None,
     ) -> int:
-        """Create campaign recipients from contact list."""
-        created = 0
-        for contact in contacts:
-            phone = contact.get('phone') or contact.get('phone_number')
-            if not phone:
-                continue
-            
-            _, was_created = CampaignRecipient.objects.get_or_create(
+        """Create campaign recipients from contacts in bulk; returns how many were new."""
+        summary = self._recipient_importer(campaign, on_progress).run(iter_contacts(contacts))
+        if summary.rejected:
+            logger.info(f"Campaign {campaign.id}: {summary.rejected} contacts rejected")
+        return summary.imported
+    
+    def _recipient_importer(
+        self,
+        campaign: Campaign,
+        on_progress: Optional[ImportProgressCallback] = None,
+    ) -> ContactImporter:
+        return ContactImporter(
+            CampaignRecipient,
+            build=lambda phone, name, variables: CampaignRecipient(
                 campaign=campaign,
                 phone_number=phone,
-                defaults={
-                    'contact_name': contact.get('name', ''),
-                    'variables': contact.get('variables', {}),
-                }
-            )
-            if was_created:
-                created += 1
-        
-        return created
+                contact_name=name,
+                variables=variables,
+            ),
+            existing=CampaignRecipient.objects.filter(campaign=campaign),
+            on_progress=on_progress,
+        )
     
     def _build_template_components(
         self,
@@ -397,16 +388,7 @@ class CampaignService:
         variables: Dict[str, Any],
     ) -> List[Dict[str, Any]]:
         """Build template components with personalization."""
-        components = content.get('components', [])
-        
-        for component in components:
-            if 'parameters' in component:
-                for param in component['parameters']:
-                    if param.get('type') == 'text' and 'variable' in param:
-                        var_name = param['variable']
-                        param['text'] = variables.get(var_name, param.get('text', ''))
-        
-        return components
+        return render_components(content.get('components', []), variables)
     
     def _personalize_message(
         self,
@@ -414,9 +396,7 @@ class CampaignService:
         variables: Dict[str, Any],
     ) -> str:
         """Personalize message text with variables."""
-        for key, value in variables.items():
-            text = text.replace(f'{{{{{key}}}}}', str(value))
-        return text
+        return render_template(text, variables)
     
     # Contact List methods
     def create_contact_list(
@@ -474,7 +454,7 @@ class CampaignService:
         # Use unified service to schedule
         scheduled_count = UnifiedMessagingService.schedule_campaign_messages(
             campaign=campaign,
-            recipients=list(recipients),
+            recipients=recipients.iterator(chunk_size=5000),
         )
         
         logger.info(f"Campaign {campaign_id}: {scheduled_count} messages scheduled via UnifiedMessagingService")
@@ -487,26 +467,106 @@ class CampaignService:
         csv_content: str,
         created_by: Optional[User] = None,
     ) -> ContactList:
-        """Import contacts from CSV content."""
-        import csv
-        from io import StringIO
-        
-        reader = csv.DictReader(StringIO(csv_content))
-        contacts = []
-        
-        for row in reader:
-            phone = row.get('phone') or row.get('phone_number') or row.get('telefone')
-            if phone:
-                contacts.append({
-                    'phone': phone,
-                    'name': row.get('name') or row.get('nome', ''),
-                    'variables': {k: v for k, v in row.items() if k not in ['phone', 'phone_number', 'telefone', 'name', 'nome']},
-                })
-        
-        return self.create_contact_list(
+        """Import contacts from CSV content (small files; see ``start_contact_import``)."""
+        contact_list = self.create_contact_list(
             account_id=account_id,
             name=name,
-            contacts=contacts,
+            contacts=[],
             source='csv',
             created_by=created_by,
         )
+        self.run_contact_import(contact_list, io.StringIO(csv_content))
+        return contact_list
+    
+    def start_contact_import(
+        self,
+        account_id: str,
+        name: str,
+        csv_file,
+        created_by: Optional[User] = None,
+    ) -> ContactList:
+        """
+        Store an uploaded CSV and import it in the background.
+        
+        The list is returned with ``import_status`` pending; the
+        ``import_contact_list`` task fills it and records progress and the
+        rejected rows in ``import_summary``.
+        """
+        from ..tasks import import_contact_list
+        
+        contact_list = self.create_contact_list(
+            account_id=account_id,
+            name=name,
+            contacts=[],
+            source='csv',
+            created_by=created_by,
+        )
+        file_path = default_storage.save(f'imports/contacts/{contact_list.id}.csv', csv_file)
+        contact_list.import_status = ContactList.ImportStatus.PENDING
+        contact_list.save(update_fields=['import_status', 'updated_at'])
+        
+        transaction.on_commit(lambda: import_contact_list.delay(str(contact_list.id), file_path))
+        return contact_list
+    
+    def run_contact_import(self, contact_list: ContactList, lines: Iterable[str]) -> ImportSummary:
+        """Stream CSV lines into the list's members, recording progress on the list."""
+        ContactList.objects.filter(pk=contact_list.pk).update(
+            import_status=ContactList.ImportStatus.PROCESSING,
+        )
+        
+        def on_progress(summary: ImportSummary):
+            ContactList.objects.filter(pk=contact_list.pk).update(import_summary=summary.as_dict())
+        
+        importer = ContactImporter(
+            ContactListMember,
+            build=lambda phone, name, variables: ContactListMember(
+                contact_list=contact_list,
+                phone_number=phone,
+                contact_name=name,
+                variables=variables,
+            ),
+            existing=ContactListMember.objects.filter(contact_list=contact_list),
+            on_progress=on_progress,
+        )
+        summary = importer.run(iter_csv_contacts(lines))
+        
+        contact_list.contact_count = contact_list.members.count() + len(contact_list.contacts)
+        contact_list.import_status = ContactList.ImportStatus.COMPLETED
+        contact_list.import_summary = summary.as_dict()
+        contact_list.imported_at = timezone.now()
+        contact_list.save(update_fields=[
+            'contact_count', 'import_status', 'import_summary', 'imported_at', 'updated_at'
+        ])
+        
+        logger.info(
+            f"Contact list {contact_list.id}: imported {summary.imported} of {summary.total_rows} rows, "
+            f"{summary.duplicates} duplicates, {summary.rejected} rejected"
+        )
+        return summary
+    
+    def add_recipients_from_contact_list(
+        self,
+        campaign_id: str,
+        contact_list_id: str,
+    ) -> ImportSummary:
+        """Materialize a contact list into campaign recipients, chunk by chunk."""
+        campaign = Campaign.objects.get(id=campaign_id)
+        
+        if campaign.status not in [Campaign.CampaignStatus.DRAFT, Campaign.CampaignStatus.SCHEDULED]:
+            raise ValueError("Cannot add recipients to running campaign")
+        
+        contact_list = ContactList.objects.get(id=contact_list_id, account_id=campaign.account_id)
+        members = (
+            {'phone': phone, 'name': name, 'variables': variables}
+            for phone, name, variables in contact_list.members.values_list(
+                'phone_number', 'contact_name', 'variables'
+            ).iterator(chunk_size=5000)
+        )
+        
+        summary = self._recipient_importer(campaign).run(
+            iter_contacts(itertools.chain(contact_list.contacts, members))
+        )
+        
+        campaign.total_recipients = campaign.recipients.count()
+        campaign.save(update_fields=['total_recipients'])
+        return summary
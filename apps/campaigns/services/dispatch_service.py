@@ -0,0 +1,201 @@
+"""
+Campaign dispatch engine.
+
+Recipients are claimed in batches with ``SELECT ... FOR UPDATE SKIP LOCKED``
+and moved to ``SENDING``, so several workers can drain the same campaign
+without sending twice. Each batch is sent through a bounded pool of threads
+(the per-number send scheduler paces the Graph API calls), then the outcomes
+are written with one ``bulk_update`` and the campaign counters are moved with
+``F()`` expressions, so a crash never loses counts already sent.
+
+Recipients left in ``SENDING`` by a worker that died are claimed again after
+``CAMPAIGN_CLAIM_TIMEOUT`` seconds.
+"""
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.core.exceptions import WhatsAppRateLimitError
+from apps.whatsapp.models import Message
+from apps.whatsapp.services.send_scheduler import BULK, send_priority
+from ..models import Campaign, CampaignRecipient
+
+logger = logging.getLogger(__name__)
+
+RECIPIENT_OUTCOME_FIELDS = [
+    'status', 'message_id', 'whatsapp_message_id', 'sent_at', 'failed_at',
+    'error_code', 'error_message', 'updated_at',
+]
+
+
+@dataclass
+class SendOutcome:
+    recipient: CampaignRecipient
+    message: Optional[Message] = None
+    error: Optional[Exception] = None
+
+
+class CampaignDispatcher:
+    """Claim, send and record campaign recipients in batches."""
+
+    def __init__(
+        self,
+        send: Callable[[Campaign, CampaignRecipient], Message],
+        max_workers: Optional[int] = None,
+        claim_timeout: Optional[int] = None,
+    ):
+        self.send = send
+        self.max_workers = max_workers or getattr(settings, 'CAMPAIGN_DISPATCH_WORKERS', 8)
+        self.claim_timeout = claim_timeout or getattr(settings, 'CAMPAIGN_CLAIM_TIMEOUT', 600)
+
+    def claimable(self, campaign: Campaign):
+        """Recipients still to send: pending, or abandoned mid-send by a dead worker."""
+        stale = timezone.now() - timedelta(seconds=self.claim_timeout)
+        return campaign.recipients.filter(
+            Q(status=CampaignRecipient.RecipientStatus.PENDING)
+            | Q(status=CampaignRecipient.RecipientStatus.SENDING, updated_at__lt=stale)
+        )
+
+    def remaining(self, campaign: Campaign) -> int:
+        """Recipients not yet sent, including those in flight on other workers."""
+        return campaign.recipients.filter(status__in=[
+            CampaignRecipient.RecipientStatus.PENDING,
+            CampaignRecipient.RecipientStatus.SENDING,
+        ]).count()
+
+    def claim_batch(self, campaign: Campaign, batch_size: int) -> List[CampaignRecipient]:
+        """Atomically take up to ``batch_size`` recipients for this worker."""
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                self.claimable(campaign)
+                .select_for_update(skip_locked=True)
+                .order_by('created_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+            CampaignRecipient.objects.filter(id__in=ids).update(
+                status=CampaignRecipient.RecipientStatus.SENDING,
+                updated_at=now,
+            )
+        return list(CampaignRecipient.objects.filter(id__in=ids).order_by('created_at'))
+
+    def dispatch(self, campaign: Campaign, recipients: List[CampaignRecipient]) -> Dict[str, int]:
+        """Send to claimed recipients and record the outcomes."""
+        if self.max_workers <= 1 or len(recipients) <= 1:
+            outcomes = [self._send_one(campaign, recipient) for recipient in recipients]
+        else:
+            outcomes = self._send_concurrently(campaign, recipients)
+        return self.record(campaign, outcomes)
+
+    def _send_one(self, campaign: Campaign, recipient: CampaignRecipient) -> SendOutcome:
+        try:
+            # Bulk lane so conversational replies on the same number go first
+            with send_priority(BULK):
+                return SendOutcome(recipient, message=self.send(campaign, recipient))
+        except Exception as e:
+            if not isinstance(e, WhatsAppRateLimitError):
+                logger.error(
+                    f"Campaign {campaign.id}: Error sending to {recipient.phone_number}: {e}",
+                    exc_info=True
+                )
+            return SendOutcome(recipient, error=e)
+
+    def _send_concurrently(self, campaign: Campaign, recipients: List[CampaignRecipient]) -> List[SendOutcome]:
+        """Send with a bounded set of threads, each closing its DB connection when done."""
+        work: "queue.Queue[CampaignRecipient]" = queue.Queue()
+        for recipient in recipients:
+            work.put(recipient)
+        outcomes: List[SendOutcome] = []
+        outcomes_lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        recipient = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    outcome = self._send_one(campaign, recipient)
+                    with outcomes_lock:
+                        outcomes.append(outcome)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, name=f'campaign-{campaign.id}-{i}', daemon=True)
+            for i in range(min(self.max_workers, len(recipients)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def record(self, campaign: Campaign, outcomes: List[SendOutcome]) -> Dict[str, int]:
+        """Write recipient outcomes in one bulk UPDATE and move the campaign counters."""
+        now = timezone.now()
+        sent = failed = throttled = 0
+        for outcome in outcomes:
+            recipient = outcome.recipient
+            recipient.updated_at = now
+            if outcome.message is not None:
+                recipient.status = CampaignRecipient.RecipientStatus.SENT
+                recipient.message_id = str(outcome.message.id)
+                recipient.whatsapp_message_id = outcome.message.whatsapp_message_id
+                recipient.sent_at = now
+                sent += 1
+            elif isinstance(outcome.error, WhatsAppRateLimitError):
+                # Number saturated: hand it back for a later batch
+                recipient.status = CampaignRecipient.RecipientStatus.PENDING
+                throttled += 1
+            else:
+                recipient.status = CampaignRecipient.RecipientStatus.FAILED
+                recipient.failed_at = now
+                recipient.error_code = str(getattr(outcome.error, 'code', '') or '')[:50]
+                recipient.error_message = str(outcome.error)
+                failed += 1
+
+        with transaction.atomic():
+            CampaignRecipient.objects.bulk_update(
+                [outcome.recipient for outcome in outcomes],
+                RECIPIENT_OUTCOME_FIELDS,
+            )
+            if sent or failed:
+                Campaign.objects.filter(pk=campaign.pk).update(
+                    messages_sent=F('messages_sent') + sent,
+                    messages_failed=F('messages_failed') + failed,
+                    updated_at=now,
+                )
+
+        if throttled:
+            logger.warning(f"Campaign {campaign.id}: {throttled} recipients throttled, returned to the queue")
+        return {'processed': sent, 'failed': failed, 'throttled': throttled}
+
+    def complete_if_done(self, campaign: Campaign) -> int:
+        """Mark the campaign completed once nothing is left; returns the remaining count."""
+        remaining = self.remaining(campaign)
+        if remaining == 0:
+            completed = Campaign.objects.filter(
+                pk=campaign.pk, status=Campaign.CampaignStatus.RUNNING
+            ).update(
+                status=Campaign.CampaignStatus.COMPLETED,
+                completed_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            if completed:
+                campaign.refresh_from_db()
+                logger.info(
+                    f"Campaign {campaign.id} completed: {campaign.messages_sent} sent, "
+                    f"{campaign.messages_failed} failed"
+                )
+        return remaining
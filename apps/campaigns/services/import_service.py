@@ -0,0 +1,147 @@
+"""
+Streaming contact import for contact lists and campaign recipients.
+
+Contacts are read one row at a time (CSV or any iterable of dicts),
+normalized with ``normalize_phone_number``, deduplicated and inserted with
+``bulk_create(ignore_conflicts=True)`` in chunks, so memory stays bounded by
+the chunk size plus the set of phones already seen. Rows that cannot be
+imported are counted and a sample of them is kept for the summary.
+"""
+import csv
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.db import models, transaction
+
+from apps.core.utils import normalize_phone_number
+
+logger = logging.getLogger(__name__)
+
+PHONE_COLUMNS = ('phone', 'phone_number', 'telefone')
+NAME_COLUMNS = ('name', 'nome')
+# Rejected rows kept in the summary; the rest are only counted
+MAX_REJECTED_SAMPLES = 100
+# E.164 allows up to 15 digits; 55 + DDD + 8 digits is the shortest valid BR number
+MIN_PHONE_DIGITS = 12
+MAX_PHONE_DIGITS = 15
+
+# Called with the summary after every chunk
+ImportProgressCallback = Callable[['ImportSummary'], None]
+
+# (row number, contact dict with 'phone', 'name' and 'variables')
+ContactRow = Tuple[int, Dict[str, Any]]
+
+
+@dataclass
+class ImportSummary:
+    total_rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    rejected_rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, row_number: int, phone: str, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejected_rows) < MAX_REJECTED_SAMPLES:
+            self.rejected_rows.append({'row': row_number, 'phone': phone, 'reason': reason})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def iter_csv_contacts(lines: Iterable[str]) -> Iterator[ContactRow]:
+    """Parse CSV lines into contact rows without reading the whole file."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items() if key}
+        phone = next((row[column] for column in PHONE_COLUMNS if row.get(column)), '')
+        name = next((row[column] for column in NAME_COLUMNS if row.get(column)), '')
+        variables = {
+            key: value for key, value in row.items()
+            if key not in PHONE_COLUMNS and key not in NAME_COLUMNS
+        }
+        # line_num is the physical line, so quoted multi-line cells still point at the right row
+        yield reader.line_num, {'phone': phone, 'name': name, 'variables': variables}
+
+
+def iter_contacts(contacts: Iterable[Dict[str, Any]]) -> Iterator[ContactRow]:
+    """Number contact dicts (``phone``/``phone_number``, ``name``, ``variables``)."""
+    for index, contact in enumerate(contacts, start=1):
+        yield index, {
+            'phone': contact.get('phone') or contact.get('phone_number') or '',
+            'name': contact.get('name') or contact.get('contact_name') or '',
+            'variables': contact.get('variables') or {},
+        }
+
+
+def clean_phone(phone: str) -> Tuple[Optional[str], str]:
+    """Return ``(normalized phone, '')`` or ``(None, reason)``."""
+    if not phone:
+        return None, 'missing phone'
+    normalized = normalize_phone_number(str(phone))
+    if not MIN_PHONE_DIGITS <= len(normalized) <= MAX_PHONE_DIGITS:
+        return None, 'invalid phone'
+    return normalized, ''
+
+
+class ContactImporter:
+    """
+    Insert contact rows into ``model`` in chunks.
+
+    ``build(phone, name, variables)`` returns an unsaved instance; ``existing``
+    is the queryset of rows the import adds to, used to tell new rows from
+    ones already in the database.
+    """
+
+    def __init__(
+        self,
+        model: Type[models.Model],
+        build: Callable[[str, str, Dict[str, Any]], models.Model],
+        existing: models.QuerySet,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[ImportProgressCallback] = None,
+    ):
+        self.model = model
+        self.build = build
+        self.existing = existing
+        self.chunk_size = chunk_size or getattr(settings, 'CONTACT_IMPORT_CHUNK_SIZE', 5000)
+        self.on_progress = on_progress
+
+    def run(self, rows: Iterable[ContactRow]) -> ImportSummary:
+        summary = ImportSummary()
+        seen = set()
+        before = self.existing.count()
+        chunk: List[models.Model] = []
+
+        for row_number, contact in rows:
+            summary.total_rows += 1
+            phone, reason = clean_phone(contact['phone'])
+            if phone is None:
+                summary.reject(row_number, contact['phone'], reason)
+                continue
+            if phone in seen:
+                summary.duplicates += 1
+                continue
+            seen.add(phone)
+            chunk.append(self.build(phone, contact['name'][:255], contact['variables']))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, summary)
+                chunk = []
+
+        if chunk:
+            self._flush(chunk, summary)
+
+        # Rows that already existed were skipped by ignore_conflicts
+        summary.imported = self.existing.count() - before
+        summary.duplicates += len(seen) - summary.imported
+        if self.on_progress:
+            self.on_progress(summary)
+        return summary
+
+    def _flush(self, chunk: List[models.Model], summary: ImportSummary) -> None:
+        with transaction.atomic():
+            self.model.objects.bulk_create(chunk, batch_size=self.chunk_size, ignore_conflicts=True)
+        if self.on_progress:
+            self.on_progress(summary)
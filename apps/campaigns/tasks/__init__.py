@@ -5,15 +5,27 @@ NOTE: process_scheduled_messages has been moved to apps.automation.tasks.schedul
 to avoid duplication. The unified ScheduledMessage model is in apps.automation.models.
 """
 from celery import shared_task
+from django.conf import settings
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
 
+def start_campaign_workers(campaign_id: str) -> None:
+    """Enqueue the parallel workers that drain a running campaign."""
+    for _ in range(max(1, getattr(settings, 'CAMPAIGN_DISPATCH_TASKS', 2))):
+        process_campaign.delay(campaign_id)
+
+
 @shared_task(bind=True, max_retries=3)
 def process_campaign(self, campaign_id: str):
-    """Process a campaign batch."""
+    """
+    Drain a running campaign batch by batch.
+
+    Several of these may run for the same campaign; each claims its own
+    recipients and stops once nothing is left to claim.
+    """
     from ..services import CampaignService
     from ..models import Campaign
     
@@ -32,27 +44,36 @@ def process_campaign(self, campaign_id: str):
             logger.error(f"Campaign {campaign_id} not found")
             return {'status': 'error', 'reason': 'Campaign not found'}
         
+        batch_size = getattr(settings, 'CAMPAIGN_DISPATCH_BATCH_SIZE', 100)
         total_processed = 0
         total_failed = 0
         
         while True:
-            result = service.process_campaign_batch(campaign_id, batch_size=50)
+            result = service.process_campaign_batch(campaign_id, batch_size=batch_size)
             
             total_processed += result.get('processed', 0)
+            total_failed += result.get('failed', 0)
             
             if result['remaining'] == 0:
                 logger.info(f"Campaign {campaign_id} completed. Total processed: {total_processed}")
                 break
             
+            if not (result.get('processed') or result.get('failed') or result.get('throttled')):
+                # The rest is in flight on other workers
+                logger.info(f"Campaign {campaign_id}: nothing left to claim, {result['remaining']} in flight")
+                break
+            
             logger.info(f"Campaign {campaign_id}: processed {result['processed']}, remaining {result['remaining']}")
             
-            # Small delay between batches to avoid rate limiting
-            time.sleep(1)
+            if result.get('throttled'):
+                # Number saturated, let the send scheduler's backoff run out
+                time.sleep(1)
         
         return {
             'status': 'completed',
             'campaign_id': campaign_id,
             'total_processed': total_processed,
+            'total_failed': total_failed,
         }
         
     except Exception as e:
@@ -63,8 +84,9 @@ def process_campaign(self, campaign_id: str):
 @shared_task
 def check_scheduled_campaigns():
     """Check and start scheduled campaigns."""
+    from datetime import timedelta
     from django.utils import timezone
-    from ..models import Campaign
+    from ..models import Campaign, CampaignRecipient
     
     campaigns = Campaign.objects.filter(
         status=Campaign.CampaignStatus.SCHEDULED,
@@ -77,5 +99,49 @@ def check_scheduled_campaigns():
         campaign.started_at = timezone.now()
         campaign.save()
         
-        process_campaign.delay(str(campaign.id))
+        start_campaign_workers(str(campaign.id))
         logger.info(f"Started scheduled campaign: {campaign.id}")
+    
+    # Pick up recipients abandoned mid-send by workers that died
+    stale = timezone.now() - timedelta(seconds=getattr(settings, 'CAMPAIGN_CLAIM_TIMEOUT', 600))
+    stalled = Campaign.objects.filter(
+        status=Campaign.CampaignStatus.RUNNING,
+        recipients__status=CampaignRecipient.RecipientStatus.SENDING,
+        recipients__updated_at__lt=stale,
+    ).values_list('id', flat=True).distinct()
+    for campaign_id in stalled:
+        process_campaign.delay(str(campaign_id))
+        logger.info(f"Resumed stalled campaign: {campaign_id}")
+
+
+@shared_task(bind=True, max_retries=2)
+def import_contact_list(self, contact_list_id: str, file_path: str):
+    """Stream an uploaded CSV into a contact list (see CampaignService.start_contact_import)."""
+    import io
+    from django.core.files.storage import default_storage
+    from ..services import CampaignService
+    from ..models import ContactList
+    
+    try:
+        contact_list = ContactList.objects.get(id=contact_list_id)
+    except ContactList.DoesNotExist:
+        logger.warning(f"Contact list not found for import: {contact_list_id}")
+        return None
+    
+    try:
+        with default_storage.open(file_path, 'rb') as raw:
+            # utf-8-sig drops the BOM spreadsheet exports often start with
+            lines = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+            summary = CampaignService().run_contact_import(contact_list, lines)
+    except Exception as e:
+        logger.error(f"Error importing contact list {contact_list_id}: {e}", exc_info=True)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        ContactList.objects.filter(id=contact_list_id).update(
+            import_status=ContactList.ImportStatus.FAILED,
+            import_summary={'error': str(e)},
+        )
+        return None
+    
+    default_storage.delete(file_path)
+    return summary.as_dict()
@@ -7,13 +7,14 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from django.http import HttpResponse
 from django.db.models import Sum, Count, Avg, F, Q
-from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.core.services.time_buckets import TimeBucketAggregator
+
 from .models import Store, Category, Product, Customer, Order
 
 
@@ -72,23 +73,28 @@ class DashboardStatsView(BaseReportView):
             return Response({'error': 'Store parameter required'}, status=400)
         
         today = timezone.now().date()
+        yesterday = today - timedelta(days=1)
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        paid = Q(payment_status='paid')
         
-        # Today's stats
-        today_orders = Order.objects.filter(
+        # Today / yesterday / week / month in a single conditional aggregate
+        totals = Order.objects.filter(
             store=store,
-            created_at__date=today
+            created_at__date__gte=min(yesterday, week_start, month_start)
+        ).aggregate(
+            today_orders=Count('id', filter=Q(created_at__date=today)),
+            today_revenue=Sum('total', filter=paid & Q(created_at__date=today)),
+            yesterday_revenue=Sum('total', filter=paid & Q(created_at__date=yesterday)),
+            week_orders=Count('id', filter=Q(created_at__date__gte=week_start)),
+            week_revenue=Sum('total', filter=paid & Q(created_at__date__gte=week_start)),
+            month_orders=Count('id', filter=Q(created_at__date__gte=month_start)),
+            month_revenue=Sum('total', filter=paid & Q(created_at__date__gte=month_start)),
         )
-        today_revenue = today_orders.filter(
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-        
-        # Yesterday for comparison
-        yesterday = today - timedelta(days=1)
-        yesterday_revenue = Order.objects.filter(
-            store=store,
-            created_at__date=yesterday,
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
+        today_revenue = totals['today_revenue'] or 0
+        yesterday_revenue = totals['yesterday_revenue'] or 0
+        week_revenue = totals['week_revenue'] or 0
+        month_revenue = totals['month_revenue'] or 0
         
         revenue_change = today_revenue - yesterday_revenue
         revenue_change_percent = (
@@ -96,26 +102,6 @@ class DashboardStatsView(BaseReportView):
             if yesterday_revenue > 0 else 0
         )
         
-        # Week stats
-        week_start = today - timedelta(days=today.weekday())
-        week_orders = Order.objects.filter(
-            store=store,
-            created_at__date__gte=week_start
-        )
-        week_revenue = week_orders.filter(
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-        
-        # Month stats
-        month_start = today.replace(day=1)
-        month_orders = Order.objects.filter(
-            store=store,
-            created_at__date__gte=month_start
-        )
-        month_revenue = month_orders.filter(
-            payment_status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-        
         # Alerts
         pending_orders = Order.objects.filter(
             store=store,
@@ -130,18 +116,18 @@ class DashboardStatsView(BaseReportView):
         
         return Response({
             'today': {
-                'orders': today_orders.count(),
+                'orders': totals['today_orders'],
                 'revenue': float(today_revenue),
                 'revenue_change': float(revenue_change),
                 'revenue_change_percent': round(revenue_change_percent, 2)
             },
             'week': {
-                'orders': week_orders.count(),
+                'orders': totals['week_orders'],
                 'revenue': float(week_revenue),
                 'avg_daily_revenue': float(week_revenue / (today.weekday() + 1)) if today.weekday() >= 0 else 0
             },
             'month': {
-                'orders': month_orders.count(),
+                'orders': totals['month_orders'],
                 'revenue': float(month_revenue),
                 'avg_daily_revenue': float(month_revenue / today.day) if today.day > 0 else 0
             },
@@ -171,24 +157,15 @@ class RevenueReportView(BaseReportView):
             payment_status='paid'
         )
         
-        # Aggregation function based on group_by
-        if group_by == 'week':
-            trunc_func = TruncWeek('created_at')
-        elif group_by == 'month':
-            trunc_func = TruncMonth('created_at')
-        else:
-            trunc_func = TruncDate('created_at')
-        
-        # Revenue by period
-        revenue_data = orders.annotate(
-            period=trunc_func
-        ).values('period').annotate(
-            total_revenue=Sum('total'),
-            order_count=Count('id'),
-            avg_order_value=Avg('total'),
-            total_delivery_fees=Sum('delivery_fee'),
-            total_discounts=Sum('discount')
-        ).order_by('period')
+        # Revenue by period (one grouped query, empty periods zero-filled)
+        window = TimeBucketAggregator(start_date, end_date, granularity=group_by)
+        revenue_data = window.series(orders, 'created_at', {
+            'total_revenue': Sum('total'),
+            'order_count': Count('id'),
+            'avg_order_value': Avg('total'),
+            'total_delivery_fees': Sum('delivery_fee'),
+            'total_discounts': Sum('discount'),
+        }, key='period')
         
         # Summary
         summary = orders.aggregate(
@@ -214,7 +191,7 @@ class RevenueReportView(BaseReportView):
             },
             'data': [
                 {
-                    'period': item['period'].isoformat() if item['period'] else None,
+                    'period': item['period'],
                     'total_revenue': float(item['total_revenue'] or 0),
                     'order_count': item['order_count'],
                     'avg_order_value': float(item['avg_order_value'] or 0),
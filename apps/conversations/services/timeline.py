@@ -0,0 +1,139 @@
+"""
+Omnichannel message timeline of a conversation.
+
+Only WhatsApp messages belong to a ``conversations.Conversation`` today;
+Instagram messages hang off ``InstagramConversation``, which has no link to
+it, so they are not part of this timeline. New channels are added as another
+entry in ``channels`` below.
+
+Each channel is read with a keyset query on ``(created_at, id)``, newest
+first, bounded to one page and backed by a ``(conversation, created_at,
+id)`` index, so the cost of a page does not depend on the length of the
+thread. The per-channel pages are k-way merged and the page is returned
+oldest first, as the inbox renders it, with an opaque cursor for loading
+older messages.
+"""
+import base64
+import heapq
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+
+from apps.core.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+WHATSAPP_FIELDS = (
+    'id', 'whatsapp_message_id', 'direction', 'message_type', 'status',
+    'from_number', 'to_number', 'text_body', 'content', 'media_url',
+    'media_mime_type', 'media_status', 'created_at', 'sent_at',
+    'delivered_at', 'read_at', 'error_message', 'account_id',
+)
+
+Cursor = Tuple[datetime, str]
+
+
+def encode_cursor(created_at: datetime, message_id) -> str:
+    raw = json.dumps([created_at.isoformat(), str(message_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, message_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(message_id)
+    except (ValueError, TypeError):
+        raise ValidationError('Invalid cursor')
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _whatsapp_message(row: Dict[str, Any], conversation_id: str) -> Dict[str, Any]:
+    return {
+        'id': str(row['id']),
+        'channel': 'whatsapp',
+        'whatsapp_message_id': row['whatsapp_message_id'],
+        'conversation_id': conversation_id,
+        'direction': row['direction'],
+        'message_type': row['message_type'],
+        'status': row['status'],
+        'from_number': row['from_number'],
+        'to_number': row['to_number'],
+        'text_body': row['text_body'],
+        'content': row['content'],
+        'media_url': row['media_url'],
+        'media_mime_type': row['media_mime_type'],
+        'media_status': row['media_status'],
+        'created_at': _isoformat(row['created_at']),
+        'sent_at': _isoformat(row['sent_at']),
+        'delivered_at': _isoformat(row['delivered_at']),
+        'read_at': _isoformat(row['read_at']),
+        'error_message': row['error_message'],
+        'timestamp': _isoformat(row['sent_at'] or row['created_at']),
+        'account': str(row['account_id']) if row['account_id'] else None,
+        'updated_at': _isoformat(row['created_at']),
+    }
+
+
+def _keyset_page(queryset: QuerySet, fields, before: Optional[Cursor], limit: int) -> List[Dict[str, Any]]:
+    """Up to ``limit`` rows older than ``before``, newest first."""
+    if before is not None:
+        created_at, message_id = before
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=message_id)
+        )
+    return list(queryset.order_by('-created_at', '-id').values(*fields)[:limit])
+
+
+def _sort_key(row: Dict[str, Any]) -> Cursor:
+    # UUIDs compare like their hex strings, which matches the database order of the id column
+    return row['created_at'], str(row['id'])
+
+
+def get_conversation_timeline(
+    conversation,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    One page of a conversation's messages across channels.
+
+    ``cursor`` is the ``next_cursor`` of the previous page; without it the
+    newest messages are returned. ``results`` are oldest first.
+    """
+    from apps.whatsapp.models import Message as WhatsAppMessage
+
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    before = decode_cursor(cursor) if cursor else None
+    conversation_id = str(conversation.id)
+
+    channels: List[Tuple[QuerySet, Tuple[str, ...], Callable]] = [
+        (WhatsAppMessage.objects.filter(conversation_id=conversation.id), WHATSAPP_FIELDS, _whatsapp_message),
+    ]
+
+    # One extra row per channel tells whether anything older is left
+    streams: List[List[Tuple[Dict[str, Any], Callable]]] = [
+        [(row, serialize) for row in _keyset_page(queryset, fields, before, limit + 1)]
+        for queryset, fields, serialize in channels
+    ]
+    merged = heapq.merge(*streams, key=lambda item: _sort_key(item[0]), reverse=True)
+    page = [item for _, item in zip(range(limit + 1), merged)]
+
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = None
+    if has_more:
+        oldest = page[-1][0]
+        next_cursor = encode_cursor(oldest['created_at'], oldest['id'])
+
+    return {
+        'results': [serialize(row, conversation_id) for row, serialize in reversed(page)],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    }
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    label = 'core'
+
+    def ready(self):
+        from .signals import connect_daily_metrics_signals
+
+        connect_daily_metrics_signals()
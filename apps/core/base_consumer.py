@@ -3,12 +3,14 @@ Base WebSocket consumer with common functionality, throttling, and caching.
 """
 import logging
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
-from django.core.cache import cache
 import hashlib
 
+from .services.rate_limiter import get_rate_limiter
+
 # Import cached utilities
 from .consumer_cache import (
     get_cached_user_async,
@@ -117,22 +119,6 @@ class ThrottledWebSocketConsumer(AsyncJsonWebsocketConsumer):
         Returns:
             True if within limit, False if exceeded
         """
-        cache_key = f"ws:ratelimit:{key}"
-        current = cache.get(cache_key, 0)
-        
-        if current >= limit:
-            return False
-        
-        # Use Redis INCR if available, otherwise get+set
-        try:
-            from django_redis import get_redis_connection
-            redis = get_redis_connection("default")
-            pipe = redis.pipeline()
-            pipe.incr(cache_key)
-            pipe.expire(cache_key, window)
-            pipe.execute()
-        except Exception:
-            # Fallback for LocMemCache
-            cache.set(cache_key, current + 1, window)
-        
-        return True
+        # Redis round-trip only, no ORM: keep it off the shared sync thread
+        result = await sync_to_async(get_rate_limiter().hit, thread_sensitive=False)(f"ws:{key}", limit, window)
+        return result.allowed
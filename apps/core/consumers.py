@@ -24,6 +24,7 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         """Handle WebSocket connection."""
         self.user = None
         self.user_group = None
+        self.broadcast_groups = []
         
         # Try to authenticate from query string
         token = self.scope.get('query_string', b'').decode()
@@ -34,6 +35,9 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         if self.user:
             self.user_group = f"user_{self.user.id}"
             await self.channel_layer.group_add(self.user_group, self.channel_name)
+            self.broadcast_groups = await self.get_broadcast_groups()
+            for group in self.broadcast_groups:
+                await self.channel_layer.group_add(group, self.channel_name)
             await self.accept()
             await self.send_json({
                 'type': 'connection_established',
@@ -49,6 +53,8 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         """Handle WebSocket disconnection."""
         if self.user_group:
             await self.channel_layer.group_discard(self.user_group, self.channel_name)
+        for group in self.broadcast_groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
     
     async def receive_json(self, content):
         """Handle incoming WebSocket messages."""
@@ -88,6 +94,16 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             'notification': event['notification']
         })
     
+    async def notification_broadcast(self, event):
+        """Send this user's copy of a broadcast notification to WebSocket."""
+        notification_id = event['ids'].get(str(self.user.id)) if self.user else None
+        if not notification_id:
+            return
+        await self.send_json({
+            'type': 'notification',
+            'notification': {**event['notification'], 'id': notification_id}
+        })
+    
     async def message_update(self, event):
         """Send message update to WebSocket."""
         await self.send_json({
@@ -112,6 +128,12 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
     async def get_user_from_token(self, token_key):
         """Get user from auth token with caching."""
         return await get_cached_user_async(token_key)
+    
+    @database_sync_to_async
+    def get_broadcast_groups(self):
+        """Broadcast groups this user receives (all users, plus each store they run)."""
+        from apps.notifications.services.notification_service import get_broadcast_groups
+        return get_broadcast_groups(self.user)
 
 
 class ChatConsumer(AsyncJsonWebsocketConsumer):
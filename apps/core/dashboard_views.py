@@ -5,6 +5,7 @@ import logging
 import uuid
 from datetime import timedelta
 from typing import Optional
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Count, Sum, Avg, Q
 from rest_framework import status
@@ -17,11 +18,30 @@ from apps.whatsapp.models import WhatsAppAccount, Message, WebhookEvent
 from apps.conversations.models import Conversation
 from apps.stores.models import StoreOrder, Store
 from apps.agents.models import Agent, AgentConversation, AgentMessage
+from apps.core.models import DailyMetrics
+from apps.core.services.daily_metrics import DailyMetricsReader
 from apps.core.services.dashboard_stats import DashboardStatsAggregator
+from apps.core.services.time_buckets import TimeBucketAggregator, merge_series, to_float
 
 logger = logging.getLogger(__name__)
 
 
+def _use_daily_metrics() -> bool:
+    """Serve date-bounded dashboard metrics from the DailyMetrics rollup."""
+    return getattr(settings, 'DASHBOARD_USE_DAILY_METRICS', False)
+
+
+def _store_ids(store_param: Optional[str]) -> list:
+    stores = Store.objects.all()
+    if store_param:
+        try:
+            uuid.UUID(store_param)
+            stores = stores.filter(id=store_param)
+        except (ValueError, AttributeError):
+            stores = stores.filter(slug=store_param)
+    return list(stores.values_list('id', flat=True))
+
+
 class DashboardOverviewView(APIView):
     """Dashboard overview with key metrics."""
     permission_classes = [IsAuthenticated]
@@ -58,35 +78,24 @@ class DashboardOverviewView(APIView):
             except (ValueError, AttributeError):
                 orders_qs = orders_qs.filter(store__slug=store_param)
         
-        # Messages metrics
-        messages_today = messages_qs.filter(created_at__gte=today_start).count()
-        messages_week = messages_qs.filter(created_at__gte=week_start).count()
-        messages_month = messages_qs.filter(created_at__gte=month_start).count()
-        
-        messages_by_status = dict(
-            messages_qs.filter(created_at__gte=today_start)
-            .values('status')
-            .annotate(count=Count('id'))
-            .values_list('status', 'count')
-        )
-        
-        messages_by_direction = dict(
-            messages_qs.filter(created_at__gte=today_start)
-            .values('direction')
-            .annotate(count=Count('id'))
-            .values_list('direction', 'count')
-        )
+        if _use_daily_metrics():
+            activity = self._activity_from_rollup(account_ids, store_param)
+        else:
+            activity = self._activity_from_raw(
+                messages_qs, conversations_qs, orders_qs, account_ids,
+                today_start, week_start, month_start,
+            )
 
-        # Conversations metrics
-        conversations_active = conversations_qs.filter(
-            status__in=['open', 'pending']
-        ).count()
-        
+        # Conversations metrics (current state)
         conversations_by_status = dict(
             conversations_qs.values('status')
             .annotate(count=Count('id'))
             .values_list('status', 'count')
         )
+        conversations_active = sum(
+            count for conv_status, count in conversations_by_status.items()
+            if conv_status in ('open', 'pending')
+        )
         
         conversations_by_mode = dict(
             conversations_qs.filter(status='open')
@@ -94,93 +103,161 @@ class DashboardOverviewView(APIView):
             .annotate(count=Count('id'))
             .values_list('mode', 'count')
         )
-        
-        conversations_resolved_today = conversations_qs.filter(
-            resolved_at__gte=today_start
-        ).count()
 
-        # Orders metrics
+        # Orders and payments metrics (current state)
         orders_by_status = dict(
             orders_qs.values('status')
             .annotate(count=Count('id'))
             .values_list('status', 'count')
         )
-        
-        orders_today = orders_qs.filter(created_at__gte=today_start).count()
-        
-        revenue_today = orders_qs.filter(
-            paid_at__gte=today_start
-        ).aggregate(total=Sum('total'))['total'] or 0
-        
-        revenue_month = orders_qs.filter(
-            paid_at__gte=month_start
-        ).aggregate(total=Sum('total'))['total'] or 0
-
-        # Payments metrics (derived from store orders)
         payments_pending = orders_qs.filter(
             payment_status__in=['pending', 'processing']
         ).count()
-        
-        payments_completed_today = orders_qs.filter(
-            payment_status='paid',
-            paid_at__gte=today_start
-        ).count()
-
-        # Agent metrics (replaces Langflow)
-        agent_messages_qs = AgentMessage.objects.filter(
-            conversation__agent__accounts__id__in=account_ids
-        ).distinct()
-        
-        agent_interactions_today = agent_messages_qs.filter(
-            created_at__gte=today_start,
-            role='assistant'
-        ).count()
-        
-        agent_avg_duration = agent_messages_qs.filter(
-            created_at__gte=today_start,
-            response_time_ms__isnull=False
-        ).aggregate(avg=Avg('response_time_ms'))['avg'] or 0
 
         # Accounts summary
-        accounts_summary = {
-            'total': accounts_qs.count(),
-            'active': accounts_qs.filter(status='active').count(),
-            'inactive': accounts_qs.filter(status='inactive').count(),
-        }
+        accounts_summary = accounts_qs.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            inactive=Count('id', filter=Q(status='inactive')),
+        )
 
         return Response({
             'accounts': accounts_summary,
             'messages': {
-                'today': messages_today,
-                'week': messages_week,
-                'month': messages_month,
-                'by_status': messages_by_status,
-                'by_direction': messages_by_direction,
+                'today': activity['messages_today'],
+                'week': activity['messages_week'],
+                'month': activity['messages_month'],
+                'by_status': activity['messages_by_status'],
+                'by_direction': activity['messages_by_direction'],
             },
             'conversations': {
                 'active': conversations_active,
                 'by_status': conversations_by_status,
                 'by_mode': conversations_by_mode,
-                'resolved_today': conversations_resolved_today,
+                'resolved_today': activity['conversations_resolved_today'],
             },
             'orders': {
-                'today': orders_today,
+                'today': activity['orders_today'],
                 'by_status': orders_by_status,
-                'revenue_today': float(revenue_today),
-                'revenue_month': float(revenue_month),
+                'revenue_today': activity['revenue_today'],
+                'revenue_month': activity['revenue_month'],
             },
             'payments': {
                 'pending': payments_pending,
-                'completed_today': payments_completed_today,
+                'completed_today': activity['payments_completed_today'],
             },
             'agents': {
-                'interactions_today': agent_interactions_today,
-                'avg_duration_ms': round(agent_avg_duration, 2),
+                'interactions_today': activity['agent_interactions_today'],
+                'avg_duration_ms': round(activity['agent_avg_duration'], 2),
             },
             'timestamp': now.isoformat(),
         })
 
 
+    @staticmethod
+    def _activity_from_raw(messages_qs, conversations_qs, orders_qs, account_ids,
+                           today_start, week_start, month_start):
+        """Date-bounded metrics computed from the raw tables."""
+        message_totals = messages_qs.filter(created_at__gte=month_start).aggregate(
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            week=Count('id', filter=Q(created_at__gte=week_start)),
+            month=Count('id'),
+        )
+        
+        messages_by_status = dict(
+            messages_qs.filter(created_at__gte=today_start)
+            .values('status')
+            .annotate(count=Count('id'))
+            .values_list('status', 'count')
+        )
+        
+        messages_by_direction = dict(
+            messages_qs.filter(created_at__gte=today_start)
+            .values('direction')
+            .annotate(count=Count('id'))
+            .values_list('direction', 'count')
+        )
+        
+        conversations_resolved_today = conversations_qs.filter(
+            resolved_at__gte=today_start
+        ).count()
+        
+        order_totals = orders_qs.aggregate(
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            revenue_today=Sum('total', filter=Q(paid_at__gte=today_start)),
+            revenue_month=Sum('total', filter=Q(paid_at__gte=month_start)),
+            payments_completed_today=Count(
+                'id', filter=Q(payment_status='paid', paid_at__gte=today_start)
+            ),
+        )
+
+        # Agent metrics (replaces Langflow)
+        agent_messages_qs = AgentMessage.objects.filter(
+            conversation__agent__accounts__id__in=account_ids
+        ).distinct()
+        
+        agent_interactions_today = agent_messages_qs.filter(
+            created_at__gte=today_start,
+            role='assistant'
+        ).count()
+        
+        agent_avg_duration = agent_messages_qs.filter(
+            created_at__gte=today_start,
+            response_time_ms__isnull=False
+        ).aggregate(avg=Avg('response_time_ms'))['avg'] or 0
+
+        return {
+            'messages_today': message_totals['today'],
+            'messages_week': message_totals['week'],
+            'messages_month': message_totals['month'],
+            'messages_by_status': messages_by_status,
+            'messages_by_direction': messages_by_direction,
+            'conversations_resolved_today': conversations_resolved_today,
+            'orders_today': order_totals['today'],
+            'revenue_today': to_float(order_totals['revenue_today']),
+            'revenue_month': to_float(order_totals['revenue_month']),
+            'payments_completed_today': order_totals['payments_completed_today'],
+            'agent_interactions_today': agent_interactions_today,
+            'agent_avg_duration': agent_avg_duration,
+        }
+
+    @staticmethod
+    def _activity_from_rollup(account_ids, store_param):
+        """Date-bounded metrics read from the daily rollup (three queries)."""
+        today = timezone.localdate()
+        week_start = today - timedelta(days=7)
+        month_start = today - timedelta(days=30)
+
+        account_rows = DailyMetricsReader(DailyMetrics.Scope.ACCOUNT, account_ids).load(
+            ['messages', 'messages_by_status', 'conversations_resolved'], month_start
+        )
+        store_rows = DailyMetricsReader(DailyMetrics.Scope.STORE, _store_ids(store_param)).load(
+            ['orders', 'paid_orders', 'revenue'], month_start
+        )
+        agent_ids = Agent.objects.filter(accounts__id__in=account_ids).values_list('id', flat=True)
+        agent_rows = DailyMetricsReader(DailyMetrics.Scope.AGENT, agent_ids.distinct()).load(
+            ['agent_messages', 'agent_response_ms', 'agent_timed_responses'], today
+        )
+
+        timed_responses = agent_rows.total('agent_timed_responses')
+        return {
+            'messages_today': int(account_rows.total('messages', today)),
+            'messages_week': int(account_rows.total('messages', week_start)),
+            'messages_month': int(account_rows.total('messages')),
+            'messages_by_status': account_rows.by_dimension('messages_by_status', today),
+            'messages_by_direction': account_rows.by_dimension('messages', today),
+            'conversations_resolved_today': int(account_rows.total('conversations_resolved', today)),
+            'orders_today': int(store_rows.total('orders', today)),
+            'revenue_today': to_float(store_rows.total('revenue', today)),
+            'revenue_month': to_float(store_rows.total('revenue')),
+            'payments_completed_today': int(store_rows.total('paid_orders', today, dimension='paid')),
+            'agent_interactions_today': int(agent_rows.total('agent_messages', dimension='assistant')),
+            'agent_avg_duration': (
+                float(agent_rows.total('agent_response_ms') / timed_responses) if timed_responses else 0
+            ),
+        }
+
+
 class DashboardStatsView(APIView):
     """Single-query dashboard summary (today/week/month)."""
     permission_classes = [IsAuthenticated]
@@ -338,91 +415,15 @@ class DashboardChartsView(APIView):
             except (ValueError, AttributeError):
                 orders_qs = orders_qs.filter(store__slug=store_param)
         
-        now = timezone.now()
-        start_date = now - timedelta(days=days)
-        
-        # Messages per day
-        messages_per_day = []
-        for i in range(days):
-            day_start = (now - timedelta(days=days-1-i)).replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-            
-            inbound = Message.objects.filter(
-                account_id__in=account_ids,
-                direction='inbound',
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
-            
-            outbound = Message.objects.filter(
-                account_id__in=account_ids,
-                direction='outbound',
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
-            
-            messages_per_day.append({
-                'date': day_start.strftime('%Y-%m-%d'),
-                'inbound': inbound,
-                'outbound': outbound,
-                'total': inbound + outbound,
-            })
-        
-        # Orders per day
-        orders_per_day = []
-        for i in range(days):
-            day_start = (now - timedelta(days=days-1-i)).replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-            
-            count = orders_qs.filter(
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
-            
-            revenue = orders_qs.filter(
-                paid_at__gte=day_start,
-                paid_at__lt=day_end
-            ).aggregate(total=Sum('total'))['total'] or 0
-            
-            orders_per_day.append({
-                'date': day_start.strftime('%Y-%m-%d'),
-                'count': count,
-                'revenue': float(revenue),
-            })
+        window = TimeBucketAggregator.last_days(days)
         
-        # Conversations per day
-        conversations_per_day = []
-        for i in range(days):
-            day_start = (now - timedelta(days=days-1-i)).replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-            
-            new_conversations = Conversation.objects.filter(
-                account_id__in=account_ids,
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
-            
-            resolved = Conversation.objects.filter(
-                account_id__in=account_ids,
-                resolved_at__gte=day_start,
-                resolved_at__lt=day_end
-            ).count()
-            
-            conversations_per_day.append({
-                'date': day_start.strftime('%Y-%m-%d'),
-                'new': new_conversations,
-                'resolved': resolved,
-            })
+        messages_qs = Message.objects.filter(account_id__in=account_ids)
+        conversations_qs = Conversation.objects.filter(account_id__in=account_ids)
         
-        # Message types distribution
-        message_types = dict(
-            Message.objects.filter(
-                account_id__in=account_ids,
-                created_at__gte=start_date
-            ).values('message_type')
-            .annotate(count=Count('id'))
-            .values_list('message_type', 'count')
-        )
+        if _use_daily_metrics():
+            charts = self._charts_from_rollup(window, account_ids, store_param)
+        else:
+            charts = self._charts_from_raw(window, messages_qs, conversations_qs, orders_qs)
         
         # Order status distribution
         order_statuses = dict(
@@ -432,9 +433,90 @@ class DashboardChartsView(APIView):
         )
         
         return Response({
+            **charts,
+            'order_statuses': order_statuses,
+        })
+
+    @staticmethod
+    def _charts_from_raw(window, messages_qs, conversations_qs, orders_qs):
+        """Per-day series computed from the raw tables."""
+        # Messages per day (one query for the whole window)
+        messages_per_day = window.series(messages_qs, 'created_at', {
+            'inbound': Count('id', filter=Q(direction='inbound')),
+            'outbound': Count('id', filter=Q(direction='outbound')),
+        })
+        for entry in messages_per_day:
+            entry['total'] = entry['inbound'] + entry['outbound']
+        
+        # Orders per day: created count and paid revenue bucket on different dates
+        orders_per_day = merge_series(
+            window.series(orders_qs, 'created_at', {'count': Count('id')}),
+            window.series(orders_qs, 'paid_at', {'revenue': Sum('total')}),
+        )
+        for entry in orders_per_day:
+            entry['revenue'] = to_float(entry['revenue'])
+        
+        # Conversations per day
+        conversations_per_day = merge_series(
+            window.series(conversations_qs, 'created_at', {'new': Count('id')}),
+            window.series(conversations_qs, 'resolved_at', {'resolved': Count('id')}),
+        )
+        
+        # Message types distribution
+        message_types = dict(
+            messages_qs.filter(
+                created_at__gte=window.start_datetime
+            ).values('message_type')
+            .annotate(count=Count('id'))
+            .values_list('message_type', 'count')
+        )
+
+        return {
             'messages_per_day': messages_per_day,
             'orders_per_day': orders_per_day,
             'conversations_per_day': conversations_per_day,
             'message_types': message_types,
-            'order_statuses': order_statuses,
+        }
+
+    @staticmethod
+    def _charts_from_rollup(window, account_ids, store_param):
+        """Per-day series read from the daily rollup (two queries)."""
+        account_rows = DailyMetricsReader(DailyMetrics.Scope.ACCOUNT, account_ids).load(
+            ['messages', 'messages_by_type', 'conversations', 'conversations_resolved'],
+            window.start_date, window.end_date,
+        )
+        store_rows = DailyMetricsReader(DailyMetrics.Scope.STORE, _store_ids(store_param)).load(
+            ['orders', 'revenue'], window.start_date, window.end_date,
+        )
+
+        messages_per_day = account_rows.series(window, {
+            'inbound': ('messages', 'inbound'),
+            'outbound': ('messages', 'outbound'),
         })
+        for entry in messages_per_day:
+            entry['inbound'] = int(entry['inbound'])
+            entry['outbound'] = int(entry['outbound'])
+            entry['total'] = entry['inbound'] + entry['outbound']
+
+        orders_per_day = store_rows.series(window, {
+            'count': ('orders', None),
+            'revenue': ('revenue', None),
+        })
+        for entry in orders_per_day:
+            entry['count'] = int(entry['count'])
+            entry['revenue'] = to_float(entry['revenue'])
+
+        conversations_per_day = account_rows.series(window, {
+            'new': ('conversations', None),
+            'resolved': ('conversations_resolved', None),
+        })
+        for entry in conversations_per_day:
+            entry['new'] = int(entry['new'])
+            entry['resolved'] = int(entry['resolved'])
+
+        return {
+            'messages_per_day': messages_per_day,
+            'orders_per_day': orders_per_day,
+            'conversations_per_day': conversations_per_day,
+            'message_types': account_rows.by_dimension('messages_by_type'),
+        }
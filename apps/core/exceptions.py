@@ -69,6 +69,12 @@ class WhatsAppAPIError(ExternalServiceError):
     default_code = "whatsapp_api_error"
 
 
+class WhatsAppRateLimitError(WhatsAppAPIError):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_message = "WhatsApp send rate limit reached"
+    default_code = "whatsapp_rate_limited"
+
+
 class LangflowAPIError(ExternalServiceError):
     default_message = "Langflow API error"
     default_code = "langflow_api_error"
@@ -1,22 +1,57 @@
 """
 Data Export Views - Export data to CSV/Excel formats.
+
+Small exports stream directly from the request. Large ones should go through
+export jobs: ``POST /export/jobs/`` enqueues a Celery task that writes the
+file to ``default_storage`` and reports progress over the automation
+WebSocket (``report_generated``); the finished file supports HTTP Range.
 """
 import csv
-import io
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import mimetypes
+import re
+import tempfile
+from typing import Any, Dict, Iterable, List, Sequence
 
-from django.http import HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from apps.core.services.exports import (
+    EXPORTS,
+    EXPORT_FORMATS,
+    ExportDefinition,
+    export_value,
+    start_export_job,
+    write_xlsx,
+    xlsx_available,
+)
+
 logger = logging.getLogger(__name__)
 
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+RANGE_HEADER_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_BLOCK_SIZE = 64 * 1024
+
+
+class CSVFormatRenderer(JSONRenderer):
+    """Accept ``?format=csv`` in content negotiation; errors still render as JSON."""
+    format = 'csv'
+
+
+class XLSXFormatRenderer(JSONRenderer):
+    """Accept ``?format=xlsx`` in content negotiation; errors still render as JSON."""
+    format = 'xlsx'
+
+
+EXPORT_RENDERERS = [JSONRenderer, CSVFormatRenderer, XLSXFormatRenderer]
+
 
 class Echo:
     """An object that implements just the write method of the file-like interface."""
@@ -24,85 +59,131 @@ class Echo:
         return value
 
 
-def generate_csv_response(data: List[Dict], filename: str, fieldnames: List[str] = None):
-    """Generate a streaming CSV response."""
-    if not data:
-        return HttpResponse(
-            content_type='text/csv',
-            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
-        )
-    
-    if not fieldnames:
-        fieldnames = list(data[0].keys())
-    
-    pseudo_buffer = Echo()
-    writer = csv.DictWriter(pseudo_buffer, fieldnames=fieldnames, extrasaction='ignore')
-    
+def stream_csv_response(rows: Iterable[Sequence[Any]], headers: Sequence[str], filename: str):
+    """Stream CSV lines as rows are produced."""
+    writer = csv.writer(Echo())
+
     def generate():
-        yield writer.writeheader()
-        for row in data:
+        yield writer.writerow(headers)
+        for row in rows:
             yield writer.writerow(row)
-    
-    response = StreamingHttpResponse(
+
+    return StreamingHttpResponse(
         generate(),
         content_type='text/csv',
         headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
-    return response
 
 
-def generate_excel_response(data: List[Dict], filename: str, sheet_name: str = 'Data'):
-    """Generate an Excel response using openpyxl."""
-    try:
-        from openpyxl import Workbook
-        from openpyxl.utils import get_column_letter
-    except ImportError:
-        # Fallback to CSV if openpyxl is not installed
-        return generate_csv_response(data, filename.replace('.xlsx', '.csv'))
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
-    
-    if not data:
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return HttpResponse(
-            output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
-        )
-    
-    # Write headers
-    headers = list(data[0].keys())
-    for col, header in enumerate(headers, 1):
-        ws.cell(row=1, column=col, value=header)
-    
-    # Write data
-    for row_idx, row_data in enumerate(data, 2):
-        for col_idx, header in enumerate(headers, 1):
-            value = row_data.get(header, '')
-            # Convert datetime objects to strings
-            if isinstance(value, datetime):
-                value = value.isoformat()
-            ws.cell(row=row_idx, column=col_idx, value=value)
-    
-    # Auto-adjust column widths
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 15
-    
-    output = io.BytesIO()
-    wb.save(output)
+def stream_excel_response(
+    rows: Iterable[Sequence[Any]],
+    headers: Sequence[str],
+    filename: str,
+    sheet_name: str = 'Data',
+):
+    """
+    Write an XLSX file with xlsxwriter in constant-memory mode.
+
+    The workbook is assembled in a spooled temporary file, which is then
+    streamed back.
+    """
+    if not xlsx_available():
+        # Fallback to CSV if xlsxwriter is not installed
+        return stream_csv_response(rows, headers, filename.replace('.xlsx', '.csv'))
+
+    output = tempfile.SpooledTemporaryFile(
+        max_size=getattr(settings, 'EXPORT_SPOOL_MAX_SIZE', 10 * 1024 * 1024)
+    )
+    write_xlsx(output, [(sheet_name, headers, rows)])
     output.seek(0)
-    
-    return HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE,
     )
 
 
+def export_response(definition: ExportDefinition, params, export_format: str):
+    """Stream an export as CSV or XLSX."""
+    source = definition.build(params)
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    if export_format == 'xlsx':
+        return stream_excel_response(
+            source.rows(), source.headers, f'{definition.name}_{timestamp}.xlsx', definition.sheet_name
+        )
+    return stream_csv_response(source.rows(), source.headers, f'{definition.name}_{timestamp}.csv')
+
+
+def generate_csv_response(data: List[Dict], filename: str, fieldnames: List[str] = None):
+    """Generate a streaming CSV response from a list of dicts."""
+    fieldnames = fieldnames or (list(data[0].keys()) if data else [])
+    rows = ([row.get(name, '') for name in fieldnames] for row in data)
+    return stream_csv_response(rows, fieldnames, filename)
+
+
+def generate_excel_response(data: List[Dict], filename: str, sheet_name: str = 'Data'):
+    """Generate an Excel response from a list of dicts."""
+    headers = list(data[0].keys()) if data else []
+    rows = ([export_value(row.get(name, '')) for name in headers] for row in data)
+    return stream_excel_response(rows, headers, filename, sheet_name)
+
+
+def ranged_file_response(request, fileobj, size: int, filename: str, content_type: str = None):
+    """
+    Serve a file with single-range ``Range`` support.
+
+    Without a (usable) ``Range`` header the whole file is returned; an
+    unsatisfiable range gets ``416``. Multi-range requests are answered with
+    the full file, which RFC 9110 allows.
+    """
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    match = RANGE_HEADER_RE.match(request.META.get('HTTP_RANGE', '').strip())
+
+    if not match or not any(match.groups()):
+        response = FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+
+    if start >= size or start > end:
+        fileobj.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    length = end - start + 1
+    fileobj.seek(start)
+
+    def read_range():
+        remaining = length
+        try:
+            while remaining > 0:
+                block = fileobj.read(min(RANGE_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield block
+        finally:
+            fileobj.close()
+
+    response = StreamingHttpResponse(read_range(), status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @extend_schema(
     parameters=[
         OpenApiParameter(name='account_id', type=str, required=False),
@@ -116,74 +197,11 @@ def generate_excel_response(data: List[Dict], filename: str, sheet_name: str = '
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
 def export_messages(request):
     """Export messages to CSV or Excel."""
-    from apps.whatsapp.models import Message
-    
-    # Get parameters
-    account_id = request.query_params.get('account_id')
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
     export_format = request.query_params.get('format', 'csv')
-    direction = request.query_params.get('direction')
-    message_status = request.query_params.get('status')
-    
-    # Build queryset
-    queryset = Message.objects.select_related('account').all()
-    
-    if account_id:
-        queryset = queryset.filter(account_id=account_id)
-    
-    if start_date:
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__gte=start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__lte=end)
-        except ValueError:
-            pass
-    
-    if direction:
-        queryset = queryset.filter(direction=direction)
-    
-    if message_status:
-        queryset = queryset.filter(status=message_status)
-    
-    # Limit to 10000 records
-    queryset = queryset.order_by('-created_at')[:10000]
-    
-    # Prepare data
-    data = []
-    for msg in queryset:
-        data.append({
-            'id': str(msg.id),
-            'account_name': msg.account.name if msg.account else '',
-            'whatsapp_message_id': msg.whatsapp_message_id,
-            'direction': msg.direction,
-            'message_type': msg.message_type,
-            'status': msg.status,
-            'from_number': msg.from_number,
-            'to_number': msg.to_number,
-            'text_body': msg.text_body or '',
-            'template_name': msg.template_name or '',
-            'error_code': msg.error_code or '',
-            'error_message': msg.error_message or '',
-            'sent_at': msg.sent_at.isoformat() if msg.sent_at else '',
-            'delivered_at': msg.delivered_at.isoformat() if msg.delivered_at else '',
-            'read_at': msg.read_at.isoformat() if msg.read_at else '',
-            'created_at': msg.created_at.isoformat(),
-        })
-    
-    # Generate response
-    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-    if export_format == 'xlsx':
-        return generate_excel_response(data, f'messages_{timestamp}.xlsx', 'Messages')
-    return generate_csv_response(data, f'messages_{timestamp}.csv')
+    return export_response(EXPORTS['messages'], request.query_params, export_format)
 
 
 @extend_schema(
@@ -199,82 +217,11 @@ def export_messages(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
 def export_orders(request):
     """Export orders to CSV or Excel."""
-    from apps.stores.models import StoreOrder
-    
-    # Get parameters
-    account_id = request.query_params.get('account_id')
-    store_param = request.query_params.get('store')
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
     export_format = request.query_params.get('format', 'csv')
-    order_status = request.query_params.get('status')
-    
-    # Build queryset
-    queryset = StoreOrder.objects.select_related('store').all()
-    if store_param:
-        try:
-            import uuid as uuid_module
-            uuid_module.UUID(store_param)
-            queryset = queryset.filter(store_id=store_param)
-        except (ValueError, AttributeError):
-            queryset = queryset.filter(store__slug=store_param)
-    
-    if start_date:
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__gte=start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__lte=end)
-        except ValueError:
-            pass
-    
-    if order_status:
-        queryset = queryset.filter(status=order_status)
-    
-    # Limit to 10000 records
-    queryset = queryset.order_by('-created_at')[:10000]
-    
-    # Prepare data
-    data = []
-    for order in queryset:
-        data.append({
-            'id': str(order.id),
-            'order_number': order.order_number,
-            'store_name': order.store.name if order.store else '',
-            'store_slug': order.store.slug if order.store else '',
-            'customer_phone': order.customer_phone,
-            'customer_name': order.customer_name,
-            'customer_email': order.customer_email,
-            'status': order.status,
-            'payment_status': order.payment_status,
-            'payment_method': order.payment_method,
-            'subtotal': float(order.subtotal),
-            'discount': float(order.discount),
-            'delivery_fee': float(order.delivery_fee),
-            'tax': float(order.tax),
-            'total': float(order.total),
-            'currency': order.store.currency if order.store else '',
-            'customer_notes': order.customer_notes or '',
-            'internal_notes': order.internal_notes or '',
-            'paid_at': order.paid_at.isoformat() if order.paid_at else '',
-            'shipped_at': order.shipped_at.isoformat() if order.shipped_at else '',
-            'delivered_at': order.delivered_at.isoformat() if order.delivered_at else '',
-            'cancelled_at': order.cancelled_at.isoformat() if order.cancelled_at else '',
-            'created_at': order.created_at.isoformat(),
-        })
-    
-    # Generate response
-    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-    if export_format == 'xlsx':
-        return generate_excel_response(data, f'orders_{timestamp}.xlsx', 'Orders')
-    return generate_csv_response(data, f'orders_{timestamp}.csv')
+    return export_response(EXPORTS['orders'], request.query_params, export_format)
 
 
 @extend_schema(
@@ -290,70 +237,11 @@ def export_orders(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
 def export_sessions(request):
     """Export customer sessions to CSV or Excel."""
-    from apps.automation.models import CustomerSession
-    
-    # Get parameters - store_id is preferred, company_id is legacy
-    store_id = request.query_params.get('store_id')
-    company_id = request.query_params.get('company_id')
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
     export_format = request.query_params.get('format', 'csv')
-    session_status = request.query_params.get('status')
-    
-    # Build queryset
-    queryset = CustomerSession.objects.select_related('company', 'company__store').all()
-    
-    if store_id:
-        queryset = queryset.filter(company__store_id=store_id)
-    elif company_id:
-        queryset = queryset.filter(company_id=company_id)
-    
-    if start_date:
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__gte=start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__lte=end)
-        except ValueError:
-            pass
-    
-    if session_status:
-        queryset = queryset.filter(status=session_status)
-    
-    # Limit to 10000 records
-    queryset = queryset.order_by('-created_at')[:10000]
-    
-    # Prepare data
-    data = []
-    for session in queryset:
-        data.append({
-            'id': str(session.id),
-            'store_name': session.company.store.name if session.company and session.company.store else '',
-            'company_name': session.company.company_name if session.company else '',
-            'phone_number': session.phone_number,
-            'customer_name': session.customer_name,
-            'customer_email': session.customer_email,
-            'session_id': session.session_id,
-            'status': session.status,
-            'cart_total': float(session.cart_total),
-            'cart_items_count': session.cart_items_count,
-            'external_order_id': session.external_order_id or '',
-            'last_activity_at': session.last_activity_at.isoformat() if session.last_activity_at else '',
-            'created_at': session.created_at.isoformat(),
-        })
-    
-    # Generate response
-    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-    if export_format == 'xlsx':
-        return generate_excel_response(data, f'sessions_{timestamp}.xlsx', 'Sessions')
-    return generate_csv_response(data, f'sessions_{timestamp}.csv')
+    return export_response(EXPORTS['sessions'], request.query_params, export_format)
 
 
 @extend_schema(
@@ -370,71 +258,11 @@ def export_sessions(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
 def export_automation_logs(request):
     """Export automation logs to CSV or Excel."""
-    from apps.automation.models import AutomationLog
-    
-    # Get parameters - store_id is preferred, company_id is legacy
-    store_id = request.query_params.get('store_id')
-    company_id = request.query_params.get('company_id')
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
     export_format = request.query_params.get('format', 'csv')
-    action_type = request.query_params.get('action_type')
-    is_error = request.query_params.get('is_error')
-    
-    # Build queryset
-    queryset = AutomationLog.objects.select_related('company', 'company__store').all()
-    
-    if store_id:
-        queryset = queryset.filter(company__store_id=store_id)
-    elif company_id:
-        queryset = queryset.filter(company_id=company_id)
-    
-    if start_date:
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__gte=start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__lte=end)
-        except ValueError:
-            pass
-    
-    if action_type:
-        queryset = queryset.filter(action_type=action_type)
-    
-    if is_error is not None:
-        queryset = queryset.filter(is_error=is_error.lower() == 'true')
-    
-    # Limit to 10000 records
-    queryset = queryset.order_by('-created_at')[:10000]
-    
-    # Prepare data
-    data = []
-    for log in queryset:
-        data.append({
-            'id': str(log.id),
-            'store_name': log.company.store.name if log.company and log.company.store else '',
-            'company_name': log.company.company_name if log.company else '',
-            'action_type': log.action_type,
-            'description': log.description,
-            'phone_number': log.phone_number,
-            'event_type': log.event_type,
-            'is_error': log.is_error,
-            'error_message': log.error_message or '',
-            'created_at': log.created_at.isoformat(),
-        })
-    
-    # Generate response
-    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-    if export_format == 'xlsx':
-        return generate_excel_response(data, f'automation_logs_{timestamp}.xlsx', 'Logs')
-    return generate_csv_response(data, f'automation_logs_{timestamp}.csv')
+    return export_response(EXPORTS['automation_logs'], request.query_params, export_format)
 
 
 @extend_schema(
@@ -450,68 +278,104 @@ def export_automation_logs(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
 def export_conversations(request):
     """Export conversations to CSV or Excel."""
-    from apps.conversations.models import Conversation
-    
-    # Get parameters
-    account_id = request.query_params.get('account_id')
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
     export_format = request.query_params.get('format', 'csv')
-    conv_status = request.query_params.get('status')
-    mode = request.query_params.get('mode')
-    
-    # Build queryset
-    queryset = Conversation.objects.select_related('account').all()
-    
-    if account_id:
-        queryset = queryset.filter(account_id=account_id)
-    
-    if start_date:
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__gte=start)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            queryset = queryset.filter(created_at__lte=end)
-        except ValueError:
-            pass
-    
-    if conv_status:
-        queryset = queryset.filter(status=conv_status)
-    
-    if mode:
-        queryset = queryset.filter(mode=mode)
-    
-    # Limit to 10000 records
-    queryset = queryset.order_by('-created_at')[:10000]
-    
-    # Prepare data
-    data = []
-    for conv in queryset:
-        data.append({
-            'id': str(conv.id),
-            'account_name': conv.account.name if conv.account else '',
-            'phone_number': conv.phone_number,
-            'contact_name': conv.contact_name,
-            'mode': conv.mode,
-            'status': conv.status,
-            'tags': ', '.join(conv.tags) if conv.tags else '',
-            'last_message_at': conv.last_message_at.isoformat() if conv.last_message_at else '',
-            'closed_at': conv.closed_at.isoformat() if conv.closed_at else '',
-            'resolved_at': conv.resolved_at.isoformat() if conv.resolved_at else '',
-            'created_at': conv.created_at.isoformat(),
-        })
-    
-    # Generate response
-    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-    if export_format == 'xlsx':
-        return generate_excel_response(data, f'conversations_{timestamp}.xlsx', 'Conversations')
-    return generate_csv_response(data, f'conversations_{timestamp}.csv')
+    return export_response(EXPORTS['conversations'], request.query_params, export_format)
+
+
+# ============================================
+# Export jobs
+# ============================================
+
+
+def _export_job_payload(report) -> Dict[str, Any]:
+    return {
+        'id': str(report.id),
+        'name': report.name,
+        'export_type': report.report_type,
+        'format': report.file_format,
+        'status': report.status,
+        'progress': report.progress,
+        'records_count': report.records_count,
+        'file_size': report.file_size,
+        'error_message': report.error_message,
+        'created_at': report.created_at.isoformat(),
+        'download_url': f'/api/v1/export/jobs/{report.id}/download/',
+    }
+
 
+def _get_export_job(request, job_id):
+    from apps.automation.models import GeneratedReport
+
+    queryset = GeneratedReport.objects.filter(id=job_id)
+    if not request.user.is_superuser:
+        queryset = queryset.filter(created_by=request.user)
+    return queryset.first()
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='export_type', type=str, required=True, enum=list(EXPORTS)),
+        OpenApiParameter(name='format', type=str, required=False, enum=list(EXPORT_FORMATS)),
+    ],
+    description='Enqueue an export job. Remaining fields are the filters of the matching export endpoint.',
+    tags=['Export']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_export_job(request):
+    """Start an asynchronous export and return the job."""
+    params = request.data.copy() if hasattr(request.data, 'copy') else dict(request.data)
+    export_type = params.pop('export_type', None)
+    if isinstance(export_type, list):
+        export_type = export_type[-1] if export_type else None
+    export_format = request.data.get('format', 'csv')
+
+    if export_type not in EXPORTS or export_type == 'store_orders':
+        return Response(
+            {'error': f"export_type must be one of: {', '.join(k for k in EXPORTS if k != 'store_orders')}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    report = start_export_job(export_type, params, export_format, request.user)
+    return Response(_export_job_payload(report), status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(tags=['Export'])
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_job_detail(request, job_id):
+    """Get export job status and progress."""
+    report = _get_export_job(request, job_id)
+    if report is None:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_export_job_payload(report))
+
+
+@extend_schema(tags=['Export'])
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_export_job(request, job_id):
+    """Download a finished export. Supports HTTP Range for resumable downloads."""
+    from apps.automation.models import GeneratedReport
+
+    report = _get_export_job(request, job_id)
+    if report is None:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if report.status != GeneratedReport.Status.COMPLETED:
+        return Response(
+            {'error': 'Export not ready for download', 'progress': report.progress},
+            status=status.HTTP_409_CONFLICT
+        )
+    if not report.file_exists():
+        return Response({'error': 'Export file not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    filename = report.file_path.rsplit('/', 1)[-1]
+    return ranged_file_response(request, report.open_file(), report.get_file_size(), filename)
@@ -3,16 +3,18 @@ Core middleware for logging, rate limiting, and WebSocket authentication.
 """
 import time
 import json
+import math
 import logging
 import hashlib
 from urllib.parse import parse_qs
 from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
 
+from apps.core.services.rate_limiter import get_policies, get_rate_limiter, request_identity
+
 logger = logging.getLogger(__name__)
 
 
@@ -155,13 +157,20 @@ class RequestLoggingMiddleware:
 
 
 class RateLimitMiddleware:
-    """Middleware for rate limiting requests."""
+    """
+    Middleware for rate limiting requests.
+    
+    Every policy from ``apps.core.services.rate_limiter.get_policies`` that
+    matches the path is checked in one atomic call; the default policy limits
+    each client IP, extra ones may count per user or per tenant.
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
         self.enabled = getattr(settings, 'RATE_LIMIT_ENABLED', True)
         self.max_requests = getattr(settings, 'RATE_LIMIT_REQUESTS', 100)
         self.window = getattr(settings, 'RATE_LIMIT_WINDOW', 60)
+        self.policies = get_policies()
 
     def __call__(self, request):
         if not self.enabled:
@@ -177,34 +186,40 @@ class RateLimitMiddleware:
         whitelist = getattr(settings, 'RATE_LIMIT_WHITELIST_PATHS', [])
         if any(request.path.startswith(path) for path in whitelist):
             return self.get_response(request)
-        cache_key = f"rate_limit:{client_ip}"
 
-        request_count = cache.get(cache_key, 0)
+        limits = [
+            (f"{policy.name}:{request_identity(request, policy.scope, client_ip)}", policy.limit, policy.window)
+            for policy in self.policies
+            if policy.matches(request.path, request.method)
+        ]
+        result = get_rate_limiter().check(limits)
 
-        if request_count >= self.max_requests:
+        if not result.allowed:
+            retry_after = max(1, math.ceil(result.retry_after))
             logger.warning(
                 f"Rate limit exceeded for IP: {client_ip}",
-                extra={'ip': client_ip, 'count': request_count}
+                extra={'ip': client_ip, 'policy': result.policy}
             )
-            return JsonResponse(
+            response = JsonResponse(
                 {
                     'error': {
                         'code': 'rate_limit_exceeded',
                         'message': 'Too many requests. Please try again later.',
                         'details': {
-                            'retry_after': self.window,
+                            'retry_after': retry_after,
                         }
                     }
                 },
                 status=429
             )
-
-        cache.set(cache_key, request_count + 1, self.window)
+            response['Retry-After'] = str(retry_after)
+            return response
 
         response = self.get_response(request)
-        response['X-RateLimit-Limit'] = str(self.max_requests)
-        response['X-RateLimit-Remaining'] = str(max(0, self.max_requests - request_count - 1))
-        response['X-RateLimit-Reset'] = str(self.window)
+        if result.limit:
+            response['X-RateLimit-Limit'] = str(result.limit)
+            response['X-RateLimit-Remaining'] = str(result.remaining)
+            response['X-RateLimit-Reset'] = str(math.ceil(result.reset_after))
 
         return response
 
@@ -235,10 +250,8 @@ class TenantMiddleware:
         self.get_response = get_response
     
     def __call__(self, request):
-        from apps.stores.models import Store
-        
         # Detect tenant
-        tenant = self._detect_tenant(request, Store)
+        tenant = self._detect_tenant(request)
         
         if tenant:
             request.tenant = tenant
@@ -257,35 +270,36 @@ class TenantMiddleware:
         
         return response
     
-    def _detect_tenant(self, request, Store):
+    def _detect_tenant(self, request):
         """Detect tenant from various sources."""
-        from django.core.exceptions import ObjectDoesNotExist
+        from apps.core.services.tenant_resolver import get_tenant_resolver
+        
+        resolver = get_tenant_resolver()
+        tried = set()
+        for slug in self._candidate_slugs(request):
+            if slug in tried:
+                continue
+            tried.add(slug)
+            tenant = resolver.resolve(slug)
+            if tenant:
+                return tenant
         
+        return None
+    
+    def _candidate_slugs(self, request):
+        """Yield tenant slugs in detection order."""
         # 1. Check subdomain
         host = request.get_host().split(':')[0]
         if '.' in host and not host.startswith(('localhost', '127.0.0.1', 'web-production')):
             subdomain = host.split('.')[0]
             if subdomain not in ['www', 'api', 'admin', 'app']:
-                try:
-                    return Store.objects.get(slug=subdomain, is_active=True)
-                except ObjectDoesNotExist:
-                    pass
+                yield subdomain
         
         # 2. Check header
-        tenant_slug = request.headers.get('X-Tenant-ID') or request.headers.get('X-Store-Slug')
-        if tenant_slug:
-            try:
-                return Store.objects.get(slug=tenant_slug, is_active=True)
-            except ObjectDoesNotExist:
-                pass
+        yield request.headers.get('X-Tenant-ID') or request.headers.get('X-Store-Slug')
         
         # 3. Check query parameter
-        tenant_slug = request.GET.get('tenant') or request.GET.get('store')
-        if tenant_slug:
-            try:
-                return Store.objects.get(slug=tenant_slug, is_active=True)
-            except ObjectDoesNotExist:
-                pass
+        yield request.GET.get('tenant') or request.GET.get('store')
         
         # 4. Check path (for store-scoped URLs)
         path_parts = request.path.strip('/').split('/')
@@ -294,13 +308,7 @@ class TenantMiddleware:
             if 'stores' in path_parts:
                 store_index = path_parts.index('stores')
                 if len(path_parts) > store_index + 1:
-                    tenant_slug = path_parts[store_index + 1]
-                    try:
-                        return Store.objects.get(slug=tenant_slug, is_active=True)
-                    except ObjectDoesNotExist:
-                        pass
-        
-        return None
+                    yield path_parts[store_index + 1]
 
 
 class TenantRequiredMiddleware:
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('account', 'WhatsApp Account'), ('store', 'Store'), ('agent', 'Agent')], max_length=20)),
+                ('scope_id', models.UUIDField()),
+                ('date', models.DateField()),
+                ('metric', models.CharField(max_length=50)),
+                ('dimension', models.CharField(blank=True, default='', max_length=50)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Metric',
+                'verbose_name_plural': 'Daily Metrics',
+                'db_table': 'daily_metrics',
+                'indexes': [models.Index(fields=['scope', 'metric', 'date'], name='daily_metrics_scope_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetrics',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'date', 'metric', 'dimension'), name='daily_metrics_unique_key'),
+        ),
+    ]
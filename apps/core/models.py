@@ -208,3 +208,49 @@ class TenantManager(models.Manager):
     
     def for_request(self, request):
         return self.get_queryset().for_request(request)
+
+
+# ============================================
+# Reporting Rollups
+# ============================================
+
+
+class DailyMetrics(models.Model):
+    """
+    Per-day rollup of dashboard counters.
+
+    One row per (scope, scope_id, date, metric, dimension). Rows are kept up
+    to date incrementally by signals (see ``apps.core.services.daily_metrics``)
+    and periodically reconciled against the raw tables by a Celery task, so
+    dashboards read a handful of rows instead of scanning message history.
+    """
+
+    class Scope(models.TextChoices):
+        ACCOUNT = 'account', 'WhatsApp Account'
+        STORE = 'store', 'Store'
+        AGENT = 'agent', 'Agent'
+
+    scope = models.CharField(max_length=20, choices=Scope.choices)
+    scope_id = models.UUIDField()
+    date = models.DateField()
+    metric = models.CharField(max_length=50)
+    dimension = models.CharField(max_length=50, blank=True, default='')
+    value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_metrics'
+        verbose_name = 'Daily Metric'
+        verbose_name_plural = 'Daily Metrics'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'date', 'metric', 'dimension'],
+                name='daily_metrics_unique_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['scope', 'metric', 'date'], name='daily_metrics_scope_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.scope_id} {self.date} {self.metric}[{self.dimension}]={self.value}"
@@ -0,0 +1,125 @@
+"""
+Realtime event publishing with a bounded replay backlog.
+
+Publishers call ``publish_to_group`` instead of ``channel_layer.group_send``.
+The event is appended to a capped Redis stream per group (so SSE clients can
+resume with ``Last-Event-ID``) and then fanned out through the channel layer
+to WebSocket consumers and SSE connections alike.
+
+Without ``REDIS_URL`` the backlog is disabled and events are only delivered
+live.
+"""
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+# Key of the backlog id inside published events
+SSE_ID_FIELD = 'sse_id'
+
+_redis_client = None
+
+
+def get_backlog_client():
+    """Get the Redis client used for the event backlog (None without Redis)."""
+    global _redis_client
+    if _redis_client is None:
+        redis_url = getattr(settings, 'REDIS_URL', '')
+        if not redis_url:
+            return None
+        try:
+            import redis
+            _redis_client = redis.from_url(redis_url, decode_responses=True)
+        except Exception as e:
+            logger.warning(f"Realtime backlog unavailable: {e}")
+            return None
+    return _redis_client
+
+
+def _stream_key(group_name: str) -> str:
+    return f"sse:backlog:{group_name}"
+
+
+def append_to_backlog(group_name: str, event: Dict[str, Any]) -> Optional[str]:
+    """Append an event to the group's capped stream and return its id."""
+    client = get_backlog_client()
+    if client is None:
+        return None
+    try:
+        return client.xadd(
+            _stream_key(group_name),
+            {'event': json.dumps(event, cls=DjangoJSONEncoder)},
+            maxlen=getattr(settings, 'SSE_BACKLOG_MAXLEN', 1000),
+            approximate=True,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to append event to backlog {group_name}: {e}")
+        return None
+
+
+def read_backlog(
+    group_names: Iterable[str],
+    last_event_id: str,
+    limit: Optional[int] = None,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Return backlog events newer than ``last_event_id`` across groups.
+
+    Stream ids are millisecond timestamps, so events from several groups are
+    merged in publication order.
+    """
+    client = get_backlog_client()
+    if client is None or not last_event_id:
+        return []
+    limit = limit or getattr(settings, 'SSE_BACKLOG_MAXLEN', 1000)
+    events = []
+    for group_name in group_names:
+        try:
+            entries = client.xrange(
+                _stream_key(group_name), min=f"({last_event_id}", count=limit
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read backlog {group_name}: {e}")
+            continue
+        for entry_id, fields in entries:
+            try:
+                event = json.loads(fields['event'])
+            except (KeyError, ValueError):
+                continue
+            event[SSE_ID_FIELD] = entry_id
+            events.append((entry_id, event))
+    events.sort(key=lambda item: stream_id_key(item[0]))
+    return events[:limit]
+
+
+def stream_id_key(stream_id: Optional[str]) -> Tuple[int, int]:
+    """Sortable key for a Redis stream id (``<ms>-<seq>``)."""
+    if not stream_id:
+        return (0, 0)
+    ms, _, seq = str(stream_id).partition('-')
+    try:
+        return (int(ms), int(seq or 0))
+    except ValueError:
+        return (0, 0)
+
+
+def publish_to_group(group_name: str, event: Dict[str, Any], channel_layer=None) -> bool:
+    """Record an event in the backlog and send it to a channel group."""
+    event = dict(event)
+    sse_id = append_to_backlog(group_name, event)
+    if sse_id:
+        event[SSE_ID_FIELD] = sse_id
+
+    channel_layer = channel_layer or get_channel_layer()
+    if not channel_layer:
+        logger.warning("Channel layer not available, skipping broadcast")
+        return False
+
+    async_to_sync(channel_layer.group_send)(group_name, event)
+    return True
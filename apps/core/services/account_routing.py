@@ -0,0 +1,218 @@
+"""
+Account routing cache for Meta webhooks.
+
+Webhook payloads identify the receiving account by ``phone_number_id``,
+display phone or WABA id (WhatsApp) and by business/page id (Instagram).
+Lookups go through a process-local LRU in front of the shared Django cache
+(Redis in production), so routing costs no database queries in steady state.
+
+Entries are namespaced by a routing version stored in the shared cache. Any
+save/delete of a ``WhatsAppAccount`` or ``InstagramAccount`` bumps the
+version once the transaction commits (see ``invalidate_account_routing``),
+which orphans every cached route across all processes at once.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'acct_route:version'
+
+# Marker stored for lookups that matched no account (negative cache)
+_MISSING = '__missing__'
+
+
+class AccountRoutingCache:
+    """Two-tier (local LRU + shared cache) resolver for webhook routing."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+        version_ttl: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max_entries or getattr(settings, 'ACCOUNT_ROUTING_LOCAL_MAX_ENTRIES', 1024)
+        self.ttl = ttl or getattr(settings, 'ACCOUNT_ROUTING_CACHE_TTL', 3600)
+        self.negative_ttl = negative_ttl or getattr(settings, 'ACCOUNT_ROUTING_NEGATIVE_TTL', 60)
+        self.version_ttl = version_ttl if version_ttl is not None else getattr(
+            settings, 'ACCOUNT_ROUTING_VERSION_TTL', 2.0
+        )
+        self._local: 'OrderedDict[str, Tuple[int, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def _current_version(self) -> int:
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.version_ttl:
+            return self._version
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, 1, None)
+            version = cache.get(VERSION_KEY) or 1
+        self._version = int(version)
+        self._version_checked_at = now
+        return self._version
+
+    def invalidate(self) -> None:
+        """Invalidate every cached route in all processes."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, 2, None)
+        except Exception as e:
+            logger.warning(f"Failed to bump account routing version: {e}")
+        with self._lock:
+            self._local.clear()
+            self._version = None
+
+    # ------------------------------------------------------------------
+    # Lookup core
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: str, loader: Callable[[], Any]) -> Any:
+        version = self._current_version()
+        full_key = f"acct_route:{version}:{key}"
+
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._local.move_to_end(full_key)
+                    return None if value == _MISSING else copy.copy(value)
+                del self._local[full_key]
+
+        value = cache.get(full_key)
+        ttl = self.ttl
+        if value is None:
+            value = loader()
+            if value is None:
+                value = _MISSING
+                ttl = self.negative_ttl
+            cache.set(full_key, value, ttl)
+        elif value == _MISSING:
+            ttl = self.negative_ttl
+
+        with self._lock:
+            self._local[full_key] = (time.monotonic() + ttl, value)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+        return None if value == _MISSING else copy.copy(value)
+
+    # ------------------------------------------------------------------
+    # WhatsApp
+    # ------------------------------------------------------------------
+
+    def get_whatsapp_by_phone_number_id(self, phone_number_id: str):
+        """Resolve an active WhatsApp account by phone_number_id."""
+        from apps.whatsapp.models import WhatsAppAccount
+
+        def load():
+            return WhatsAppAccount.objects.filter(
+                phone_number_id=phone_number_id,
+                is_active=True
+            ).first()
+
+        return self._lookup(f"wa:pnid:{phone_number_id}", load)
+
+    def get_whatsapp_by_display_phone(self, display_phone: str):
+        """Resolve an active WhatsApp account by its (normalized) phone number."""
+        from django.db.models import Q
+        from apps.core.utils import normalize_phone_number
+        from apps.whatsapp.models import WhatsAppAccount
+
+        normalized = normalize_phone_number(display_phone)
+        if not normalized:
+            return None
+
+        def load():
+            return WhatsAppAccount.objects.filter(
+                is_active=True
+            ).filter(
+                Q(display_phone_number__icontains=normalized) |
+                Q(phone_number__icontains=normalized)
+            ).first()
+
+        return self._lookup(f"wa:phone:{normalized}", load)
+
+    def get_whatsapp_by_waba_id(self, waba_id: str):
+        """Resolve an active WhatsApp account by WABA id."""
+        from apps.whatsapp.models import WhatsAppAccount
+
+        def load():
+            return WhatsAppAccount.objects.filter(
+                is_active=True,
+                waba_id=waba_id
+            ).first()
+
+        return self._lookup(f"wa:waba:{waba_id}", load)
+
+    def resolve_whatsapp(
+        self,
+        phone_number_id: Optional[str] = None,
+        display_phone: Optional[str] = None,
+        waba_id: Optional[str] = None,
+    ):
+        """Resolve a WhatsApp account using the webhook metadata fallbacks."""
+        account = None
+        if phone_number_id:
+            account = self.get_whatsapp_by_phone_number_id(phone_number_id)
+        if not account and display_phone:
+            account = self.get_whatsapp_by_display_phone(display_phone)
+        if not account and waba_id:
+            account = self.get_whatsapp_by_waba_id(waba_id)
+        return account
+
+    # ------------------------------------------------------------------
+    # Instagram
+    # ------------------------------------------------------------------
+
+    def get_instagram_account(self, account_id: str):
+        """Resolve an active Instagram account by business id or page id."""
+        from django.db.models import Q
+        from apps.instagram.models import InstagramAccount
+
+        def load():
+            return InstagramAccount.objects.filter(
+                is_active=True
+            ).filter(
+                Q(instagram_business_id=account_id) |
+                Q(facebook_page_id=account_id)
+            ).first()
+
+        return self._lookup(f"ig:{account_id}", load)
+
+
+# Singleton instance for convenience
+_account_router = None
+
+
+def get_account_router() -> AccountRoutingCache:
+    """Get the singleton account routing cache."""
+    global _account_router
+    if _account_router is None:
+        _account_router = AccountRoutingCache()
+    return _account_router
+
+
+def invalidate_account_routing(sender=None, **kwargs) -> None:
+    """Signal receiver: drop cached routes once the account change commits."""
+    transaction.on_commit(get_account_router().invalidate)
@@ -0,0 +1,379 @@
+"""
+Incrementally maintained daily rollups for dashboards and reports.
+
+Each ``MetricSpec`` describes how one counter is derived from a source model:
+the field that scopes it (account, store or agent), the timestamp that dates
+it, an optional dimension and an optional summed value. The same spec drives
+both write paths:
+
+* ``record_change`` diffs an instance's tracked fields before and after a
+  save and applies the resulting deltas once the transaction commits, so
+  status transitions move a row from one dimension to another;
+* ``rebuild_daily_metrics`` recomputes a date range from the raw tables and
+  replaces the rollup rows. Backfill and periodic reconciliation use it, which
+  also picks up bulk updates and deletes that bypass model signals.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import Aggregate, Count, F, QuerySet, Sum
+from django.utils import timezone
+
+from apps.core.models import DailyMetrics
+from apps.core.services.time_buckets import TimeBucketAggregator
+
+logger = logging.getLogger(__name__)
+
+Scope = DailyMetrics.Scope
+
+# (scope, scope_id, date, metric, dimension)
+DeltaKey = Tuple[str, str, date, str, str]
+
+# Attribute holding the tracked field values an instance was loaded with
+STATE_ATTR = '_daily_metrics_state'
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """How one rollup metric is derived from a source model."""
+    name: str
+    scope: str
+    model: str
+    scope_field: str
+    date_field: str
+    dimension_field: Optional[str] = None
+    value_field: Optional[str] = None
+    filters: Tuple[Tuple[str, Any], ...] = ()
+    required: Tuple[str, ...] = ()
+
+    @property
+    def tracked_fields(self) -> Tuple[str, ...]:
+        names = [self.date_field, *(name for name, _ in self.filters), *self.required]
+        if self.dimension_field:
+            names.append(self.dimension_field)
+        if self.value_field:
+            names.append(self.value_field)
+        return tuple(names)
+
+    def contribution(self, state: Mapping[str, Any], scope_id: Any) -> Optional[Tuple[DeltaKey, Decimal]]:
+        """Return the rollup key and amount an instance state counts towards."""
+        if scope_id is None:
+            return None
+        for name, expected in self.filters:
+            if state.get(name) != expected:
+                return None
+        if any(state.get(name) is None for name in self.required):
+            return None
+        moment = state.get(self.date_field)
+        if moment is None:
+            return None
+
+        if self.value_field:
+            raw = state.get(self.value_field)
+            if raw is None:
+                return None
+            amount = Decimal(str(raw))
+        else:
+            amount = Decimal('1')
+
+        dimension = str(state.get(self.dimension_field) or '') if self.dimension_field else ''
+        return (self.scope, str(scope_id), local_date(moment), self.name, dimension), amount
+
+    def queryset(self) -> QuerySet:
+        model = apps.get_model(self.model)
+        queryset = model._default_manager.filter(**dict(self.filters))
+        for name in self.required + ((self.value_field,) if self.value_field else ()):
+            queryset = queryset.filter(**{f'{name}__isnull': False})
+        return queryset
+
+    def aggregate(self) -> Aggregate:
+        return Sum(self.value_field) if self.value_field else Count('pk')
+
+
+_ACTIVE = (('is_active', True),)
+
+METRIC_SPECS: Tuple[MetricSpec, ...] = (
+    # WhatsApp messages, dated by creation
+    MetricSpec('messages', Scope.ACCOUNT, 'whatsapp.Message', 'account_id', 'created_at',
+               dimension_field='direction'),
+    MetricSpec('messages_by_type', Scope.ACCOUNT, 'whatsapp.Message', 'account_id', 'created_at',
+               dimension_field='message_type'),
+    MetricSpec('messages_by_status', Scope.ACCOUNT, 'whatsapp.Message', 'account_id', 'created_at',
+               dimension_field='status'),
+    # Conversations
+    MetricSpec('conversations', Scope.ACCOUNT, 'conversations.Conversation', 'account_id', 'created_at'),
+    MetricSpec('conversations_resolved', Scope.ACCOUNT, 'conversations.Conversation', 'account_id',
+               'resolved_at'),
+    # Store orders; paid metrics are split by payment status
+    MetricSpec('orders', Scope.STORE, 'stores.StoreOrder', 'store_id', 'created_at', filters=_ACTIVE),
+    MetricSpec('paid_orders', Scope.STORE, 'stores.StoreOrder', 'store_id', 'paid_at',
+               dimension_field='payment_status', filters=_ACTIVE),
+    MetricSpec('revenue', Scope.STORE, 'stores.StoreOrder', 'store_id', 'paid_at',
+               dimension_field='payment_status', value_field='total', filters=_ACTIVE),
+    # AI agent activity
+    MetricSpec('agent_messages', Scope.AGENT, 'agents.AgentMessage', 'conversation__agent_id', 'created_at',
+               dimension_field='role'),
+    MetricSpec('agent_response_ms', Scope.AGENT, 'agents.AgentMessage', 'conversation__agent_id', 'created_at',
+               value_field='response_time_ms'),
+    MetricSpec('agent_timed_responses', Scope.AGENT, 'agents.AgentMessage', 'conversation__agent_id',
+               'created_at', required=('response_time_ms',)),
+)
+
+_SPECS_BY_MODEL: Dict[str, List[MetricSpec]] = defaultdict(list)
+for _spec in METRIC_SPECS:
+    _SPECS_BY_MODEL[_spec.model].append(_spec)
+
+TRACKED_MODELS: Tuple[str, ...] = tuple(_SPECS_BY_MODEL)
+
+_TRACKED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    model: tuple(dict.fromkeys(name for spec in specs for name in spec.tracked_fields))
+    for model, specs in _SPECS_BY_MODEL.items()
+}
+
+
+def local_date(value: Any) -> date:
+    """Calendar date of a timestamp in the current timezone."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            return timezone.localtime(value).date()
+        return value.date()
+    return value
+
+
+# ----------------------------------------------------------------------
+# Incremental updates
+# ----------------------------------------------------------------------
+
+def snapshot(instance) -> Dict[str, Any]:
+    """Tracked field values currently loaded on ``instance``.
+
+    Reads ``__dict__`` directly so deferred fields are never fetched.
+    """
+    fields = _TRACKED_FIELDS.get(instance._meta.label, ())
+    return {name: instance.__dict__[name] for name in fields if name in instance.__dict__}
+
+
+def _resolve_scope(instance, path: str) -> Any:
+    value = instance
+    try:
+        for part in path.split('__'):
+            value = getattr(value, part)
+            if value is None:
+                return None
+    except ObjectDoesNotExist:
+        return None
+    return value
+
+
+def collect_deltas(
+    instance,
+    old_state: Mapping[str, Any],
+    new_state: Mapping[str, Any],
+) -> Dict[DeltaKey, Decimal]:
+    """Net rollup changes for moving ``instance`` from one state to another."""
+    deltas: Dict[DeltaKey, Decimal] = defaultdict(Decimal)
+    scopes: Dict[str, Any] = {}
+    for spec in _SPECS_BY_MODEL.get(instance._meta.label, ()):
+        if spec.scope_field not in scopes:
+            scopes[spec.scope_field] = _resolve_scope(instance, spec.scope_field)
+        scope_id = scopes[spec.scope_field]
+
+        before = spec.contribution(old_state, scope_id)
+        after = spec.contribution(new_state, scope_id)
+        if before == after:
+            continue
+        if before:
+            deltas[before[0]] -= before[1]
+        if after:
+            deltas[after[0]] += after[1]
+    return {key: amount for key, amount in deltas.items() if amount}
+
+
+def apply_deltas(deltas: Mapping[DeltaKey, Decimal]) -> None:
+    """Add deltas to their rollup rows, creating rows on first use."""
+    for (scope, scope_id, day, metric, dimension), amount in deltas.items():
+        lookup = {
+            'scope': scope,
+            'scope_id': scope_id,
+            'date': day,
+            'metric': metric,
+            'dimension': dimension,
+        }
+        try:
+            if _increment(lookup, amount):
+                continue
+            try:
+                with transaction.atomic():
+                    DailyMetrics.objects.create(value=amount, **lookup)
+            except IntegrityError:
+                # Created concurrently by another writer
+                _increment(lookup, amount)
+        except Exception as e:
+            logger.error(f"Failed to update daily metric {metric} for {scope}:{scope_id}: {e}")
+
+
+def _increment(lookup: Mapping[str, Any], amount: Decimal) -> int:
+    return DailyMetrics.objects.filter(**lookup).update(
+        value=F('value') + amount,
+        updated_at=timezone.now(),
+    )
+
+
+def record_change(
+    instance,
+    old_state: Mapping[str, Any],
+    new_state: Mapping[str, Any],
+) -> None:
+    """Apply the rollup deltas for a state change once the transaction commits."""
+    if old_state == new_state:
+        return
+    deltas = collect_deltas(instance, old_state, new_state)
+    if deltas:
+        transaction.on_commit(lambda: apply_deltas(deltas))
+
+
+# ----------------------------------------------------------------------
+# Backfill / reconciliation
+# ----------------------------------------------------------------------
+
+def rebuild_daily_metrics(
+    start_date: date,
+    end_date: date,
+    metrics: Optional[Iterable[str]] = None,
+) -> int:
+    """
+    Recompute rollup rows for ``start_date..end_date`` from the raw tables.
+
+    Each metric is replaced atomically with one grouped query over the source
+    model. Returns the number of rows written.
+    """
+    window = TimeBucketAggregator(start_date, end_date)
+    selected = set(metrics) if metrics else None
+    written = 0
+
+    for spec in METRIC_SPECS:
+        if selected is not None and spec.name not in selected:
+            continue
+
+        group_by = [spec.scope_field]
+        if spec.dimension_field:
+            group_by.append(spec.dimension_field)
+
+        totals: Dict[Tuple[Any, date, str], Decimal] = defaultdict(Decimal)
+        for row in window.rows(spec.queryset(), spec.date_field, {'total': spec.aggregate()}, group_by):
+            scope_id = row[spec.scope_field]
+            if scope_id is None or not row['total']:
+                continue
+            dimension = str(row.get(spec.dimension_field) or '') if spec.dimension_field else ''
+            totals[(scope_id, row['bucket'], dimension)] += Decimal(str(row['total']))
+
+        rows = [
+            DailyMetrics(
+                scope=spec.scope,
+                scope_id=scope_id,
+                date=day,
+                metric=spec.name,
+                dimension=dimension,
+                value=value,
+            )
+            for (scope_id, day, dimension), value in totals.items()
+        ]
+        with transaction.atomic():
+            DailyMetrics.objects.filter(
+                scope=spec.scope,
+                metric=spec.name,
+                date__gte=window.start_date,
+                date__lte=window.end_date,
+            ).delete()
+            DailyMetrics.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+
+    return written
+
+
+# ----------------------------------------------------------------------
+# Read path
+# ----------------------------------------------------------------------
+
+class MetricRows:
+    """Rollup values for a scope, summed across its ids, by day."""
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        self._values: Dict[Tuple[date, str, str], Decimal] = {}
+        for row in rows:
+            self._values[(row['date'], row['metric'], row['dimension'])] = row['total'] or Decimal('0')
+
+    def _matching(self, metric: str, since: Optional[date], dimension: Optional[str]):
+        for (day, name, dim), value in self._values.items():
+            if name != metric:
+                continue
+            if since is not None and day < since:
+                continue
+            if dimension is not None and dim != dimension:
+                continue
+            yield day, dim, value
+
+    def total(self, metric: str, since: Optional[date] = None, dimension: Optional[str] = None) -> Decimal:
+        """Sum of ``metric`` from ``since`` on, optionally for one dimension."""
+        return sum((value for _, _, value in self._matching(metric, since, dimension)), Decimal('0'))
+
+    def by_dimension(self, metric: str, since: Optional[date] = None) -> Dict[str, int]:
+        """``{dimension: count}`` for a counted metric."""
+        result: Dict[str, int] = defaultdict(int)
+        for _, dim, value in self._matching(metric, since, None):
+            result[dim] += int(value)
+        return {dim: count for dim, count in result.items() if count}
+
+    def series(
+        self,
+        window: TimeBucketAggregator,
+        columns: Mapping[str, Tuple[str, Optional[str]]],
+        key: str = 'date',
+    ) -> List[Dict[str, Any]]:
+        """Zero-filled series like ``TimeBucketAggregator.series``.
+
+        ``columns`` maps output names to ``(metric, dimension)``; a ``None``
+        dimension sums all dimensions of the metric.
+        """
+        buckets: Dict[date, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+        for name, (metric, dimension) in columns.items():
+            for day, _, value in self._matching(metric, window.start_date, dimension):
+                if day <= window.end_date:
+                    buckets[window.bucket_for(day)][name] += value
+        return [
+            {key: bucket.isoformat(), **{name: buckets[bucket][name] for name in columns}}
+            for bucket in window.buckets()
+        ]
+
+
+class DailyMetricsReader:
+    """Load rollup rows for one scope and a set of scope ids."""
+
+    def __init__(self, scope: str, scope_ids: Iterable[Any]) -> None:
+        self.scope = scope
+        self.scope_ids = list(scope_ids)
+
+    def load(self, metrics: Iterable[str], start_date: date, end_date: Optional[date] = None) -> MetricRows:
+        """Fetch the given metrics for a date range in a single query."""
+        if not self.scope_ids:
+            return MetricRows([])
+        queryset = DailyMetrics.objects.filter(
+            scope=self.scope,
+            scope_id__in=self.scope_ids,
+            metric__in=list(metrics),
+            date__gte=start_date,
+        )
+        if end_date is not None:
+            queryset = queryset.filter(date__lte=end_date)
+        return MetricRows(
+            queryset.values('date', 'metric', 'dimension').annotate(total=Sum('value')).order_by()
+        )
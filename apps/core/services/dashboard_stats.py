@@ -6,9 +6,12 @@ from datetime import timedelta
 from decimal import Decimal
 from typing import Any, Dict, Optional, Union
 
+from django.conf import settings
 from django.db.models import Count, Sum, Q, F
 from django.utils import timezone
 
+from apps.core.models import DailyMetrics
+from apps.core.services.daily_metrics import DailyMetricsReader
 from apps.stores.models import Store, StoreOrder, StoreProduct
 
 
@@ -90,6 +93,9 @@ class DashboardStatsAggregator:
         }
 
     def _aggregate_orders(self) -> Dict[str, Any]:
+        if getattr(settings, 'DASHBOARD_USE_DAILY_METRICS', False):
+            return self._aggregate_orders_from_rollup()
+
         queryset = StoreOrder.objects.filter(store=self.store, is_active=True)
         filter_q = Q(payment_status__in=self.PAID_STATUSES)
 
@@ -104,6 +110,28 @@ class DashboardStatsAggregator:
             pending_orders=Count('id', filter=Q(status__in=self.IN_PROGRESS_STATUSES)),
         )
 
+    def _aggregate_orders_from_rollup(self) -> Dict[str, Any]:
+        rows = DailyMetricsReader(DailyMetrics.Scope.STORE, [self.store.id]).load(
+            ['orders', 'revenue'], self.month_start
+        )
+        paid = StoreOrder.PaymentStatus.PAID
+        today_revenue = rows.total('revenue', self.today, dimension=paid)
+
+        return {
+            'today_orders': rows.total('orders', self.today),
+            'week_orders': rows.total('orders', self.week_start),
+            'month_orders': rows.total('orders'),
+            'today_revenue': today_revenue,
+            'week_revenue': rows.total('revenue', self.week_start, dimension=paid),
+            'month_revenue': rows.total('revenue', dimension=paid),
+            'yesterday_revenue': rows.total('revenue', self.yesterday, dimension=paid) - today_revenue,
+            'pending_orders': StoreOrder.objects.filter(
+                store=self.store,
+                is_active=True,
+                status__in=self.IN_PROGRESS_STATUSES,
+            ).count(),
+        }
+
     def _calculate_low_stock_count(self) -> int:
         return StoreProduct.objects.filter(
             store=self.store,
@@ -0,0 +1,471 @@
+"""
+Export definitions shared by the synchronous export views and export jobs.
+
+Each export type builds an ``ExportSource`` from request-style parameters:
+the column headers, the filtered queryset and a way to iterate rows from a
+server-side cursor. The HTTP views stream those rows straight to the client;
+the export-job task writes them to ``default_storage`` with progress updates.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Expression, QuerySet
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# (header, field lookup or expression)
+ExportColumn = Tuple[str, Union[str, Expression]]
+
+# (sheet name, headers, rows)
+Sheet = Tuple[str, Sequence[str], Iterable[Sequence[Any]]]
+
+# Called with the running row count while a file is written
+ProgressCallback = Callable[[int], None]
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+XLSX_MAX_ROWS = 1048576
+PROGRESS_EVERY = 1000
+
+
+def export_value(value: Any) -> Any:
+    """Convert a database value to something CSV/XLSX writers accept."""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return value
+
+
+def _chunk_size() -> int:
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+@dataclass
+class ExportSource:
+    """Headers and a lazily evaluated row iterator for one export."""
+    headers: List[str]
+    queryset: QuerySet
+    lookups: Sequence[str] = ()
+    row_factory: Optional[Callable[[Any], List[Any]]] = None
+
+    @classmethod
+    def from_columns(cls, queryset: QuerySet, columns: Sequence[ExportColumn]) -> 'ExportSource':
+        """
+        Read ``columns`` with ``values_list`` so no model instances are built;
+        related names are plain joined lookups instead of ``select_related``.
+        """
+        lookups = []
+        expressions = {}
+        for header, source in columns:
+            if isinstance(source, str):
+                lookups.append(source)
+            else:
+                alias = f'export_{header}'
+                expressions[alias] = source
+                lookups.append(alias)
+        if expressions:
+            queryset = queryset.annotate(**expressions)
+        return cls(headers=[header for header, _ in columns], queryset=queryset, lookups=lookups)
+
+    def count(self) -> int:
+        return self.queryset.order_by().count()
+
+    def rows(self) -> Iterator[List[Any]]:
+        """Yield export rows straight from a server-side cursor."""
+        if self.row_factory is not None:
+            for obj in self.queryset.iterator(chunk_size=_chunk_size()):
+                yield [export_value(value) for value in self.row_factory(obj)]
+            return
+        for row in self.queryset.values_list(*self.lookups).iterator(chunk_size=_chunk_size()):
+            yield [export_value(value) for value in row]
+
+
+@dataclass(frozen=True)
+class ExportDefinition:
+    """A named export: file basename, sheet name and source builder."""
+    name: str
+    sheet_name: str
+    build: Callable[[Mapping[str, Any]], ExportSource] = field(compare=False)
+
+
+# ----------------------------------------------------------------------
+# File writers
+# ----------------------------------------------------------------------
+
+def xlsx_available() -> bool:
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_xlsx(output: BinaryIO, sheets: Iterable[Sheet], on_progress: Optional[ProgressCallback] = None) -> int:
+    """
+    Write sheets to ``output`` with xlsxwriter in constant-memory mode.
+
+    Rows are flushed to temporary files as they are written, so memory stays
+    flat regardless of row count. Returns the number of data rows written;
+    ``on_progress`` is called every ``PROGRESS_EVERY`` rows and once at the end.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'tmpdir': tempfile.gettempdir(),
+    })
+    written = 0
+    for sheet_name, headers, rows in sheets:
+        worksheet = workbook.add_worksheet(sheet_name[:31])  # Excel limit
+        worksheet.set_column(0, max(len(headers) - 1, 0), 15)
+        worksheet.write_row(0, 0, headers)
+        for row_idx, row in enumerate(rows, 1):
+            if row_idx >= XLSX_MAX_ROWS:
+                logger.warning(f"Sheet {sheet_name} truncated at the XLSX row limit")
+                break
+            worksheet.write_row(row_idx, 0, row)
+            written += 1
+            if on_progress and written % PROGRESS_EVERY == 0:
+                on_progress(written)
+    workbook.close()
+    if on_progress:
+        on_progress(written)
+    return written
+
+
+def write_csv(
+    output: BinaryIO,
+    sheets: Iterable[Sheet],
+    on_progress: Optional[ProgressCallback] = None,
+    section_titles: bool = False,
+) -> int:
+    """Write sheets to ``output`` as UTF-8 CSV. Returns the data row count.
+
+    ``on_progress`` is called every ``PROGRESS_EVERY`` rows and once at the end.
+    """
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    written = 0
+    for sheet_name, headers, rows in sheets:
+        if section_titles:
+            text.write(f"\n=== {sheet_name.upper()} ===\n")
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+            if on_progress and written % PROGRESS_EVERY == 0:
+                on_progress(written)
+    text.flush()
+    text.detach()
+    if on_progress:
+        on_progress(written)
+    return written
+
+
+# ----------------------------------------------------------------------
+# Filters
+# ----------------------------------------------------------------------
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _filter_created_range(queryset: QuerySet, params: Mapping[str, Any]) -> QuerySet:
+    start = _parse_datetime(params.get('start_date'))
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    end = _parse_datetime(params.get('end_date'))
+    if end:
+        queryset = queryset.filter(created_at__lte=end)
+    return queryset
+
+
+def _filter_store(queryset: QuerySet, store_param: Optional[str]) -> QuerySet:
+    if not store_param:
+        return queryset
+    try:
+        uuid.UUID(str(store_param))
+        return queryset.filter(store_id=store_param)
+    except (ValueError, AttributeError):
+        return queryset.filter(store__slug=store_param)
+
+
+def _filter_company(queryset: QuerySet, params: Mapping[str, Any]) -> QuerySet:
+    # store_id is preferred, company_id is legacy
+    if params.get('store_id'):
+        return queryset.filter(company__store_id=params['store_id'])
+    if params.get('company_id'):
+        return queryset.filter(company_id=params['company_id'])
+    return queryset
+
+
+def _company_name_expression() -> Expression:
+    """Company name as ``CompanyProfile.company_name`` resolves it (store first)."""
+    return Coalesce('company__store__name', 'company___company_name')
+
+
+# ----------------------------------------------------------------------
+# Export types
+# ----------------------------------------------------------------------
+
+def build_messages_export(params: Mapping[str, Any]) -> ExportSource:
+    from apps.whatsapp.models import Message
+
+    queryset = _filter_created_range(Message.objects.all(), params)
+    if params.get('account_id'):
+        queryset = queryset.filter(account_id=params['account_id'])
+    if params.get('direction'):
+        queryset = queryset.filter(direction=params['direction'])
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+
+    return ExportSource.from_columns(queryset.order_by('-created_at'), [
+        ('id', 'id'),
+        ('account_name', 'account__name'),
+        ('whatsapp_message_id', 'whatsapp_message_id'),
+        ('direction', 'direction'),
+        ('message_type', 'message_type'),
+        ('status', 'status'),
+        ('from_number', 'from_number'),
+        ('to_number', 'to_number'),
+        ('text_body', 'text_body'),
+        ('template_name', 'template_name'),
+        ('error_code', 'error_code'),
+        ('error_message', 'error_message'),
+        ('sent_at', 'sent_at'),
+        ('delivered_at', 'delivered_at'),
+        ('read_at', 'read_at'),
+        ('created_at', 'created_at'),
+    ])
+
+
+def build_orders_export(params: Mapping[str, Any]) -> ExportSource:
+    from apps.stores.models import StoreOrder
+
+    queryset = _filter_store(StoreOrder.objects.all(), params.get('store'))
+    queryset = _filter_created_range(queryset, params)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+
+    return ExportSource.from_columns(queryset.order_by('-created_at'), [
+        ('id', 'id'),
+        ('order_number', 'order_number'),
+        ('store_name', 'store__name'),
+        ('store_slug', 'store__slug'),
+        ('customer_phone', 'customer_phone'),
+        ('customer_name', 'customer_name'),
+        ('customer_email', 'customer_email'),
+        ('status', 'status'),
+        ('payment_status', 'payment_status'),
+        ('payment_method', 'payment_method'),
+        ('subtotal', 'subtotal'),
+        ('discount', 'discount'),
+        ('delivery_fee', 'delivery_fee'),
+        ('tax', 'tax'),
+        ('total', 'total'),
+        ('currency', 'store__currency'),
+        ('customer_notes', 'customer_notes'),
+        ('internal_notes', 'internal_notes'),
+        ('paid_at', 'paid_at'),
+        ('shipped_at', 'shipped_at'),
+        ('delivered_at', 'delivered_at'),
+        ('cancelled_at', 'cancelled_at'),
+        ('created_at', 'created_at'),
+    ])
+
+
+def build_sessions_export(params: Mapping[str, Any]) -> ExportSource:
+    from apps.automation.models import CustomerSession
+
+    queryset = _filter_company(CustomerSession.objects.all(), params)
+    queryset = _filter_created_range(queryset, params)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+
+    return ExportSource.from_columns(queryset.order_by('-created_at'), [
+        ('id', 'id'),
+        ('store_name', 'company__store__name'),
+        ('company_name', _company_name_expression()),
+        ('phone_number', 'phone_number'),
+        ('customer_name', 'customer_name'),
+        ('customer_email', 'customer_email'),
+        ('session_id', 'session_id'),
+        ('status', 'status'),
+        ('cart_total', 'cart_total'),
+        ('cart_items_count', 'cart_items_count'),
+        ('external_order_id', 'external_order_id'),
+        ('last_activity_at', 'last_activity_at'),
+        ('created_at', 'created_at'),
+    ])
+
+
+def build_automation_logs_export(params: Mapping[str, Any]) -> ExportSource:
+    from apps.automation.models import AutomationLog
+
+    queryset = _filter_company(AutomationLog.objects.all(), params)
+    queryset = _filter_created_range(queryset, params)
+    if params.get('action_type'):
+        queryset = queryset.filter(action_type=params['action_type'])
+    is_error = params.get('is_error')
+    if is_error is not None:
+        queryset = queryset.filter(is_error=str(is_error).lower() == 'true')
+
+    return ExportSource.from_columns(queryset.order_by('-created_at'), [
+        ('id', 'id'),
+        ('store_name', 'company__store__name'),
+        ('company_name', _company_name_expression()),
+        ('action_type', 'action_type'),
+        ('description', 'description'),
+        ('phone_number', 'phone_number'),
+        ('event_type', 'event_type'),
+        ('is_error', 'is_error'),
+        ('error_message', 'error_message'),
+        ('created_at', 'created_at'),
+    ])
+
+
+def build_conversations_export(params: Mapping[str, Any]) -> ExportSource:
+    from apps.conversations.models import Conversation
+
+    queryset = _filter_created_range(Conversation.objects.all(), params)
+    if params.get('account_id'):
+        queryset = queryset.filter(account_id=params['account_id'])
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('mode'):
+        queryset = queryset.filter(mode=params['mode'])
+
+    return ExportSource.from_columns(queryset.order_by('-created_at'), [
+        ('id', 'id'),
+        ('account_name', 'account__name'),
+        ('phone_number', 'phone_number'),
+        ('contact_name', 'contact_name'),
+        ('mode', 'mode'),
+        ('status', 'status'),
+        ('tags', 'tags'),
+        ('last_message_at', 'last_message_at'),
+        ('closed_at', 'closed_at'),
+        ('resolved_at', 'resolved_at'),
+        ('created_at', 'created_at'),
+    ])
+
+
+def build_store_orders_export(params: Mapping[str, Any]) -> ExportSource:
+    """Per-store order sheet with item summaries (stores ``OrdersExportView``)."""
+    from apps.stores.models import StoreOrder
+
+    queryset = StoreOrder.objects.filter(store_id=params['store_id'])
+    if params.get('start_date'):
+        queryset = queryset.filter(created_at__date__gte=params['start_date'])
+    if params.get('end_date'):
+        queryset = queryset.filter(created_at__date__lte=params['end_date'])
+
+    def row(order) -> List[Any]:
+        items = ', '.join(
+            f"{item.product_name} x{item.quantity}"
+            for item in order.items.all()
+        )
+        return [
+            order.order_number,
+            order.created_at.strftime('%Y-%m-%d %H:%M'),
+            order.customer_name,
+            order.customer_email,
+            order.customer_phone,
+            order.get_status_display(),
+            order.get_payment_status_display(),
+            order.get_delivery_method_display(),
+            order.subtotal,
+            order.delivery_fee,
+            order.discount,
+            order.total,
+            items,
+        ]
+
+    return ExportSource(
+        headers=[
+            'Número do Pedido', 'Data', 'Cliente', 'Email', 'Telefone',
+            'Status', 'Status Pagamento', 'Método Entrega', 'Subtotal',
+            'Taxa Entrega', 'Desconto', 'Total', 'Itens'
+        ],
+        queryset=queryset.prefetch_related('items').order_by('-created_at'),
+        row_factory=row,
+    )
+
+
+EXPORTS: Dict[str, ExportDefinition] = {
+    'messages': ExportDefinition('messages', 'Messages', build_messages_export),
+    'orders': ExportDefinition('orders', 'Orders', build_orders_export),
+    'sessions': ExportDefinition('sessions', 'Sessions', build_sessions_export),
+    'automation_logs': ExportDefinition('automation_logs', 'Logs', build_automation_logs_export),
+    'conversations': ExportDefinition('conversations', 'Conversations', build_conversations_export),
+    'store_orders': ExportDefinition('pedidos', 'Pedidos', build_store_orders_export),
+}
+
+
+def get_export(export_type: str) -> Optional[ExportDefinition]:
+    return EXPORTS.get(export_type)
+
+
+# ----------------------------------------------------------------------
+# Export jobs
+# ----------------------------------------------------------------------
+
+def _period_bound(value: Optional[str], default: datetime) -> datetime:
+    parsed = _parse_datetime(value)
+    if parsed is None:
+        return default
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def start_export_job(export_type: str, params: Mapping[str, Any], export_format: str, user):
+    """
+    Record an export job and enqueue it once the transaction commits.
+
+    Jobs are ``GeneratedReport`` rows; ``report_type`` holds the export type
+    and ``parameters`` the filters handed to its builder.
+    """
+    from apps.automation.models import GeneratedReport
+    from apps.automation.tasks.scheduled import run_export_job
+
+    definition = EXPORTS[export_type]
+    now = timezone.now()
+    parameters = {key: str(value) for key, value in params.items() if key != 'format'}
+
+    report = GeneratedReport.objects.create(
+        name=f"Export_{definition.name}_{now.strftime('%Y%m%d_%H%M%S')}",
+        report_type=export_type,
+        period_start=_period_bound(parameters.get('start_date'), now),
+        period_end=_period_bound(parameters.get('end_date'), now),
+        file_format=export_format,
+        parameters=parameters,
+        created_by=user,
+    )
+    transaction.on_commit(lambda: run_export_job.delay(str(report.id)))
+    return report
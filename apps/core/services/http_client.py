@@ -0,0 +1,178 @@
+"""
+Shared, connection-pooled HTTP clients for outbound API calls.
+
+Calling module-level ``requests.get``/``requests.post`` builds a throwaway
+session per call, so every Graph API request pays a new TCP + TLS handshake.
+``get_http_client(name)`` returns a per-process client instead:
+
+* one ``HTTPAdapter`` (urllib3 pool) per client and process, shared by all
+  threads, so keep-alive connections are reused across requests;
+* a ``requests.Session`` per thread mounted on that adapter, since sessions
+  themselves are not guaranteed to be thread-safe;
+* after a fork (Celery prefork, gunicorn) the child builds its own pool
+  instead of sharing sockets with the parent.
+
+Every call records its latency per client and host; ``get_http_metrics``
+returns the per-process totals and each call is logged at DEBUG with
+``duration_ms``.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Clients used across the project, so pool sizes can be tuned per upstream
+GRAPH = 'graph'
+WEBHOOKS = 'webhooks'
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+
+
+@dataclass
+class CallStats:
+    """Latency totals for one client and host."""
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, duration_ms: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += int(failed)
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+
+_stats: Dict[Tuple[str, str], CallStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(client: str, host: str, duration_ms: float, failed: bool) -> None:
+    with _stats_lock:
+        _stats.setdefault((client, host), CallStats()).add(duration_ms, failed)
+
+
+def get_http_metrics() -> Dict[str, dict]:
+    """Per-process call counts and latencies, keyed by ``client:host``."""
+    with _stats_lock:
+        return {
+            f"{client}:{host}": {
+                **asdict(stats),
+                'avg_ms': round(stats.total_ms / stats.calls, 1) if stats.calls else 0.0,
+            }
+            for (client, host), stats in _stats.items()
+        }
+
+
+def reset_http_metrics() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+class HTTPClient:
+    """Pooled, keep-alive HTTP client; use ``get_http_client`` to share it."""
+
+    def __init__(self, name: str, pool_connections: int, pool_maxsize: int):
+        self.name = name
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapter: Optional[HTTPAdapter] = None
+        self._pid: Optional[int] = None
+
+    def _get_adapter(self) -> HTTPAdapter:
+        pid = os.getpid()
+        if self._adapter is None or self._pid != pid:
+            with self._lock:
+                if self._adapter is None or self._pid != pid:
+                    self._adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                    )
+                    self._pid = pid
+        return self._adapter
+
+    @property
+    def session(self) -> requests.Session:
+        """This thread's session, mounted on the process-wide pool."""
+        adapter = self._get_adapter()
+        session = getattr(self._local, 'session', None)
+        if session is None or getattr(self._local, 'adapter', None) is not adapter:
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._local.session = session
+            self._local.adapter = adapter
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the pool and record its latency."""
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        failed = True
+        status_code = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status_code = response.status_code
+            failed = status_code >= 500
+            return response
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            _record(self.name, host, duration_ms, failed)
+            logger.debug(
+                f"{self.name} {method} {host} -> {status_code} in {duration_ms:.0f}ms",
+                extra={
+                    'http_client': self.name,
+                    'host': host,
+                    'method': method,
+                    'status_code': status_code,
+                    'duration_ms': round(duration_ms, 1),
+                }
+            )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+
+_clients: Dict[str, HTTPClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name: str = GRAPH) -> HTTPClient:
+    """
+    Return the shared client called ``name``.
+
+    Pool sizes come from ``settings.HTTP_CLIENT_POOLS`` (``{name: {
+    'pool_connections': ..., 'pool_maxsize': ...}}``), falling back to the
+    module defaults.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                config = getattr(settings, 'HTTP_CLIENT_POOLS', {}).get(name, {})
+                client = HTTPClient(
+                    name,
+                    pool_connections=config.get('pool_connections', DEFAULT_POOL_CONNECTIONS),
+                    pool_maxsize=config.get('pool_maxsize', DEFAULT_POOL_MAXSIZE),
+                )
+                _clients[name] = client
+    return client
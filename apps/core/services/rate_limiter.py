@@ -0,0 +1,253 @@
+"""
+Rate limiting shared by the HTTP middleware and the WebSocket consumers.
+
+Limits use GCRA (generic cell rate algorithm): each key stores one
+timestamp, the theoretical arrival time of the next request, so a limit of
+``limit`` requests per ``window`` seconds behaves like a sliding window
+without keeping per-request history. All the keys that apply to a request
+(one per matching policy) are checked and updated by a single Lua script,
+so a check is one atomic Redis round-trip; a request is only counted when
+every policy allows it.
+
+Without ``REDIS_URL`` (development, tests) the same algorithm runs in
+process memory. A Redis error fails open: requests are let through and a
+warning is logged.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Identity a policy counts requests by
+SCOPE_IP = 'ip'
+SCOPE_USER = 'user'      # authenticated user, else the API token, else the IP
+SCOPE_TENANT = 'tenant'  # resolved store, else the IP
+SCOPES = (SCOPE_IP, SCOPE_USER, SCOPE_TENANT)
+
+KEY_PREFIX = 'rl'
+
+# KEYS: one per limit. ARGV: emission interval and tolerance (ms) per key.
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms, binding key index}.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local allowed = 1
+local remaining = -1
+local retry = 0
+local reset = 0
+local binding = 1
+local tats = {}
+for i = 1, #KEYS do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local tolerance = tonumber(ARGV[2 * i])
+    local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local diff = now - (new_tat - tolerance)
+    tats[i] = new_tat
+    if diff < 0 then
+        if allowed == 1 or -diff > retry then
+            binding = i
+            retry = -diff
+        end
+        allowed = 0
+    elseif allowed == 1 then
+        local left = math.floor(diff / interval)
+        if remaining < 0 or left < remaining then
+            remaining = left
+            binding = i
+        end
+    end
+    if new_tat - now > reset then
+        reset = new_tat - now
+    end
+end
+if allowed == 1 then
+    for i = 1, #KEYS do
+        redis.call('SET', KEYS[i], tats[i], 'PX', math.ceil(tats[i] - now))
+    end
+else
+    remaining = 0
+end
+return {allowed, remaining, retry, reset, binding}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    window: int
+    scope: str = SCOPE_IP
+    paths: Tuple[str, ...] = ()
+    methods: Tuple[str, ...] = ()
+
+    def matches(self, path: str, method: str) -> bool:
+        if self.paths and not any(path.startswith(prefix) for prefix in self.paths):
+            return False
+        return not self.methods or method.upper() in self.methods
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+    reset_after: float = 0.0
+    policy: Optional[str] = None
+
+
+def get_policies() -> List[RateLimitPolicy]:
+    """The default per-IP policy plus any extra ones from ``RATE_LIMIT_POLICIES``."""
+    policies = [RateLimitPolicy(
+        name='default',
+        limit=getattr(settings, 'RATE_LIMIT_REQUESTS', 100),
+        window=getattr(settings, 'RATE_LIMIT_WINDOW', 60),
+    )]
+    for config in getattr(settings, 'RATE_LIMIT_POLICIES', []):
+        scope = config.get('scope', SCOPE_IP)
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        policies.append(RateLimitPolicy(
+            name=config['name'],
+            limit=int(config['limit']),
+            window=int(config['window']),
+            scope=scope,
+            paths=tuple(config.get('paths', ())),
+            methods=tuple(method.upper() for method in config.get('methods', ())),
+        ))
+    return policies
+
+
+class RateLimiter:
+    """GCRA limiter backed by Redis, or by process memory without ``REDIS_URL``."""
+
+    def __init__(self, client=None):
+        self._client = client
+        self._script = None
+        self._local: Dict[str, float] = {}
+        self._local_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            redis_url = getattr(settings, 'REDIS_URL', '')
+            if not redis_url:
+                return None
+            try:
+                import redis
+                self._client = redis.from_url(redis_url)
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis unavailable, using process memory: {e}")
+                return None
+        return self._client
+
+    def check(self, limits: Sequence[Tuple[str, int, int]]) -> RateLimitResult:
+        """
+        Count one request against every ``(key, limit, window)``.
+
+        The request is allowed, and counted, only if all limits allow it.
+        """
+        if not limits:
+            return RateLimitResult(allowed=True, limit=0, remaining=0)
+
+        keys = [f"{KEY_PREFIX}:{key}" for key, _, _ in limits]
+        args: List[Any] = []
+        for _, limit, window in limits:
+            interval = window * 1000 / limit
+            args.extend([interval, interval * limit])
+
+        client = self.client
+        if client is None:
+            allowed, remaining, retry, reset, binding = self._check_local(keys, args)
+        else:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(GCRA_SCRIPT)
+                allowed, remaining, retry, reset, binding = self._script(keys=keys, args=args)
+            except Exception as e:
+                logger.warning(f"Rate limiter error, allowing request: {e}")
+                return RateLimitResult(allowed=True, limit=limits[0][1], remaining=limits[0][1])
+
+        key, limit, _ = limits[int(binding) - 1]
+        return RateLimitResult(
+            allowed=bool(int(allowed)),
+            limit=limit,
+            remaining=int(remaining),
+            retry_after=int(retry) / 1000,
+            reset_after=int(reset) / 1000,
+            policy=key,
+        )
+
+    def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Count one request against a single limit."""
+        return self.check([(key, limit, window)])
+
+    def _check_local(self, keys: List[str], args: List[float]) -> Tuple[int, int, int, int, int]:
+        """Same algorithm as ``GCRA_SCRIPT`` on a process-local dict."""
+        with self._local_lock:
+            now = time.monotonic() * 1000
+            allowed, remaining, retry, reset, binding = 1, -1, 0.0, 0.0, 1
+            tats = []
+            for i, key in enumerate(keys):
+                interval, tolerance = args[2 * i], args[2 * i + 1]
+                tat = max(self._local.get(key, now), now)
+                new_tat = tat + interval
+                diff = now - (new_tat - tolerance)
+                tats.append(new_tat)
+                if diff < 0:
+                    if allowed or -diff > retry:
+                        binding, retry = i + 1, -diff
+                    allowed = 0
+                elif allowed:
+                    left = math.floor(diff / interval)
+                    if remaining < 0 or left < remaining:
+                        remaining, binding = left, i + 1
+                reset = max(reset, new_tat - now)
+            if allowed:
+                for key, new_tat in zip(keys, tats):
+                    self._local[key] = new_tat
+                if len(self._local) > 10000:
+                    self._local = {k: v for k, v in self._local.items() if v > now}
+            else:
+                remaining = 0
+            return allowed, remaining, math.ceil(retry), math.ceil(reset), binding
+
+
+def request_identity(request, scope: str, client_ip: str) -> str:
+    """Identity an HTTP request is counted by for ``scope``."""
+    if scope == SCOPE_USER:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+        if auth_header:
+            # Token auth runs in the view; hash the credential instead of looking it up
+            return f"token:{hashlib.sha256(auth_header.encode()).hexdigest()[:32]}"
+    elif scope == SCOPE_TENANT:
+        tenant_id = getattr(request, 'tenant_id', None)
+        if tenant_id:
+            return f"tenant:{tenant_id}"
+    return f"ip:{client_ip}"
+
+
+# Singleton instance for convenience
+_rate_limiter = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
@@ -0,0 +1,157 @@
+"""
+Precompiled message templates.
+
+Campaign texts, email HTML, flow messages and ``AutoMessage`` bodies are
+rendered for many recipients with the same template. ``compile_template``
+splits a template into literals and placeholders once; the compiled form is
+kept in a process-local LRU keyed by a hash of the content, so rendering is a
+single ``''.join`` per recipient.
+
+Placeholders are ``{{name}}`` (whitespace inside the braces is allowed) and,
+depending on the syntax, ``{name}``. A single-brace placeholder with no value
+is always left as written, since the same shape appears in CSS and JSON.
+Rendering never mutates its input.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Placeholder syntaxes
+DOUBLE = 'double'  # {{name}}
+SINGLE = 'single'  # {name}
+ANY = 'any'        # both
+
+# What to do with a {{placeholder}} that has no value
+KEEP = 'keep'
+BLANK = 'blank'
+
+CACHE_SIZE = 1024
+
+_KEY = r'([\w.-]+)'
+_PATTERNS = {
+    DOUBLE: re.compile(r'\{\{\s*' + _KEY + r'\s*\}\}'),
+    SINGLE: re.compile(r'\{' + _KEY + r'\}'),
+    ANY: re.compile(r'\{\{\s*' + _KEY + r'\s*\}\}|\{' + _KEY + r'\}'),
+}
+
+
+def _to_text(value: Any) -> str:
+    return '' if value is None else str(value)
+
+
+class CompiledTemplate:
+    """A template split into literals and ``(name, raw text, double braces)`` slots."""
+
+    __slots__ = ('literals', 'slots')
+
+    def __init__(self, literals: List[str], slots: List[Tuple[str, str, bool]]):
+        self.literals = literals
+        self.slots = slots
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _, _ in self.slots]
+
+    def render(self, variables: Mapping[str, Any], missing: str = KEEP) -> str:
+        if not self.slots:
+            return self.literals[0]
+        parts = [self.literals[0]]
+        for (name, raw, double), literal in zip(self.slots, self.literals[1:]):
+            if name in variables:
+                parts.append(_to_text(variables[name]))
+            elif double and missing == BLANK:
+                parts.append('')
+            else:
+                parts.append(raw)
+            parts.append(literal)
+        return ''.join(parts)
+
+
+def _compile(text: str, syntax: str) -> CompiledTemplate:
+    literals: List[str] = []
+    slots: List[Tuple[str, str, bool]] = []
+    position = 0
+    for match in _PATTERNS[syntax].finditer(text):
+        if syntax == ANY:
+            double = match.group(1) is not None
+            name = match.group(1) if double else match.group(2)
+        else:
+            double = syntax == DOUBLE
+            name = match.group(1)
+        literals.append(text[position:match.start()])
+        slots.append((name, match.group(0), double))
+        position = match.end()
+    literals.append(text[position:])
+    return CompiledTemplate(literals, slots)
+
+
+class _TemplateCache:
+    """Thread-safe LRU of compiled templates keyed by content hash and syntax."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[bytes, str], CompiledTemplate]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, syntax: str) -> CompiledTemplate:
+        key = (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), syntax)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                return compiled
+        compiled = _compile(text, syntax)
+        with self._lock:
+            self._entries[key] = compiled
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _TemplateCache()
+
+
+def compile_template(text: Optional[str], syntax: str = DOUBLE) -> CompiledTemplate:
+    """Compiled form of ``text``, from the LRU when it was seen before."""
+    if syntax not in _PATTERNS:
+        raise ValueError(f'Unknown template syntax: {syntax}')
+    return _cache.get(text or '', syntax)
+
+
+def render_template(
+    text: Optional[str],
+    variables: Mapping[str, Any],
+    syntax: str = DOUBLE,
+    missing: str = KEEP,
+) -> str:
+    """Render ``text`` once; compile with ``compile_template`` to render many times."""
+    return compile_template(text, syntax).render(variables, missing)
+
+
+def render_components(components: List[Dict[str, Any]], variables: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Fill WhatsApp template component parameters that name a ``variable``.
+
+    Returns new component and parameter dicts; ``components`` is shared by all
+    recipients of a campaign and is left untouched.
+    """
+    rendered = []
+    for component in components or []:
+        if 'parameters' not in component:
+            rendered.append(component)
+            continue
+        parameters = []
+        for param in component['parameters']:
+            if param.get('type') == 'text' and 'variable' in param:
+                param = dict(param, text=variables.get(param['variable'], param.get('text', '')))
+            parameters.append(param)
+        rendered.append(dict(component, parameters=parameters))
+    return rendered
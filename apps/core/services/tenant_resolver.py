@@ -0,0 +1,148 @@
+"""
+Tenant (store) resolution cache for ``TenantMiddleware``.
+
+Every HTTP request may name a store by subdomain, header, query parameter
+or path. Slugs are resolved through a process-local TTL LRU in front of the
+shared Django cache (Redis in production), so steady-state traffic costs no
+database queries. Unknown slugs are cached too, for a shorter time, so
+probes for random subdomains never reach Postgres; strings that cannot be a
+slug are rejected without touching any cache.
+
+Entries are namespaced by a version stored in the shared cache. Any
+save/delete of a ``Store`` bumps it (see ``invalidate_tenant_cache``), which
+orphans every cached slug across all processes at once.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'tenant:version'
+
+# Store.slug is a SlugField(max_length=100)
+SLUG_RE = re.compile(r'^[-a-zA-Z0-9_]{1,100}$')
+
+# Marker stored for slugs that matched no active store (negative cache)
+_MISSING = '__missing__'
+
+
+class TenantResolver:
+    """Two-tier (local LRU + shared cache) slug to ``Store`` resolver."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+        version_ttl: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max_entries or getattr(settings, 'TENANT_CACHE_LOCAL_MAX_ENTRIES', 2048)
+        self.ttl = ttl or getattr(settings, 'TENANT_CACHE_TTL', 3600)
+        self.negative_ttl = negative_ttl or getattr(settings, 'TENANT_CACHE_NEGATIVE_TTL', 60)
+        self.version_ttl = version_ttl if version_ttl is not None else getattr(
+            settings, 'TENANT_CACHE_VERSION_TTL', 2.0
+        )
+        self._local: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def _current_version(self) -> int:
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.version_ttl:
+            return self._version
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, 1, None)
+            version = cache.get(VERSION_KEY) or 1
+        self._version = int(version)
+        self._version_checked_at = now
+        return self._version
+
+    def invalidate(self) -> None:
+        """Invalidate every cached slug in all processes."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, 2, None)
+        except Exception as e:
+            logger.warning(f"Failed to bump tenant cache version: {e}")
+        with self._lock:
+            self._local.clear()
+            self._version = None
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def resolve(self, slug: Optional[str]):
+        """Return the active ``Store`` with this slug, or ``None``."""
+        if not slug or not SLUG_RE.match(slug):
+            return None
+
+        full_key = f"tenant:{self._current_version()}:{slug}"
+
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._local.move_to_end(full_key)
+                    return None if value == _MISSING else copy.copy(value)
+                del self._local[full_key]
+
+        value = cache.get(full_key)
+        ttl = self.ttl
+        if value is None:
+            value = self._load(slug)
+            if value is None:
+                value = _MISSING
+                ttl = self.negative_ttl
+            cache.set(full_key, value, ttl)
+        elif value == _MISSING:
+            ttl = self.negative_ttl
+
+        with self._lock:
+            self._local[full_key] = (time.monotonic() + ttl, value)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+        return None if value == _MISSING else copy.copy(value)
+
+    def _load(self, slug: str):
+        from apps.stores.models import Store
+
+        return Store.objects.filter(slug=slug, is_active=True).first()
+
+
+# Singleton instance for convenience
+_tenant_resolver = None
+
+
+def get_tenant_resolver() -> TenantResolver:
+    """Get the singleton tenant resolver."""
+    global _tenant_resolver
+    if _tenant_resolver is None:
+        _tenant_resolver = TenantResolver()
+    return _tenant_resolver
+
+
+def invalidate_tenant_cache(sender=None, **kwargs) -> None:
+    """Signal receiver: drop cached slugs once the store change commits."""
+    transaction.on_commit(get_tenant_resolver().invalidate)
@@ -0,0 +1,155 @@
+"""Single-pass time-bucketed aggregation for dashboards and reports."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from django.db.models import Aggregate, DateField, QuerySet
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+class TimeBucketAggregator:
+    """
+    Aggregate a queryset into calendar buckets with one query per call.
+
+    Metrics are plain aggregates, usually conditional ones
+    (``Count('id', filter=Q(...))``), so several series for the same entity
+    come back from a single ``GROUP BY`` over the whole window. Buckets with
+    no rows are zero-filled in Python.
+    """
+
+    def __init__(
+        self,
+        start_date: date,
+        end_date: date,
+        granularity: str = 'day',
+        tzinfo=None,
+    ) -> None:
+        if granularity not in GRANULARITIES:
+            granularity = 'day'
+        self.granularity = granularity
+        self.tzinfo = tzinfo or timezone.get_current_timezone()
+        self.start_date = self.bucket_for(start_date)
+        self.end_date = end_date
+
+    @classmethod
+    def last_days(cls, days: int, granularity: str = 'day') -> 'TimeBucketAggregator':
+        """Window covering the last ``days`` calendar days, today included."""
+        today = timezone.localdate()
+        return cls(today - timedelta(days=max(days, 1) - 1), today, granularity)
+
+    # ------------------------------------------------------------------
+    # Buckets
+    # ------------------------------------------------------------------
+
+    def bucket_for(self, value: date) -> date:
+        """Return the bucket start date containing ``value``."""
+        if isinstance(value, datetime):
+            value = timezone.localtime(value, self.tzinfo).date() if timezone.is_aware(value) else value.date()
+        if self.granularity == 'week':
+            return value - timedelta(days=value.weekday())
+        if self.granularity == 'month':
+            return value.replace(day=1)
+        return value
+
+    def buckets(self) -> List[date]:
+        """All bucket start dates in the window, in order."""
+        result = []
+        current = self.start_date
+        while current <= self.end_date:
+            result.append(current)
+            if self.granularity == 'week':
+                current += timedelta(days=7)
+            elif self.granularity == 'month':
+                current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+            else:
+                current += timedelta(days=1)
+        return result
+
+    @property
+    def start_datetime(self) -> datetime:
+        return timezone.make_aware(datetime.combine(self.start_date, time.min), self.tzinfo)
+
+    @property
+    def end_datetime(self) -> datetime:
+        """Exclusive upper bound (start of the day after ``end_date``)."""
+        return timezone.make_aware(
+            datetime.combine(self.end_date + timedelta(days=1), time.min), self.tzinfo
+        )
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    def rows(
+        self,
+        queryset: QuerySet,
+        field: str,
+        metrics: Mapping[str, Aggregate],
+        group_by: Sequence[str] = (),
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield grouped rows with a ``bucket`` date plus ``group_by`` values."""
+        rows = (
+            queryset.filter(**{
+                f'{field}__gte': self.start_datetime,
+                f'{field}__lt': self.end_datetime,
+            })
+            .annotate(bucket=Trunc(field, self.granularity, output_field=DateField(), tzinfo=self.tzinfo))
+            .values('bucket', *group_by)
+            .annotate(**metrics)
+            .order_by('bucket')
+        )
+        for row in rows:
+            if isinstance(row['bucket'], datetime):
+                row['bucket'] = row['bucket'].date()
+            yield row
+
+    def aggregate(
+        self,
+        queryset: QuerySet,
+        field: str,
+        metrics: Mapping[str, Aggregate],
+    ) -> Dict[date, Dict[str, Any]]:
+        """Run one grouped query and return ``{bucket: {metric: value}}``."""
+        result = {}
+        for row in self.rows(queryset, field, metrics):
+            result[row.pop('bucket')] = row
+        return result
+
+    def series(
+        self,
+        queryset: QuerySet,
+        field: str,
+        metrics: Mapping[str, Aggregate],
+        key: str = 'date',
+    ) -> List[Dict[str, Any]]:
+        """Zero-filled list of ``{key: 'YYYY-MM-DD', metric: value, ...}``."""
+        data = self.aggregate(queryset, field, metrics)
+        series = []
+        for bucket in self.buckets():
+            row = data.get(bucket, {})
+            entry = {key: bucket.isoformat()}
+            for name in metrics:
+                entry[name] = _zero_if_none(row.get(name))
+            series.append(entry)
+        return series
+
+
+def merge_series(*series_list: Iterable[Dict[str, Any]], key: str = 'date') -> List[Dict[str, Any]]:
+    """Merge several zero-filled series that share the same buckets."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for series in series_list:
+        for entry in series:
+            merged.setdefault(entry[key], {}).update(entry)
+    return [merged[k] for k in sorted(merged)]
+
+
+def _zero_if_none(value: Optional[Any]) -> Any:
+    return 0 if value is None else value
+
+
+def to_float(value: Optional[Any]) -> float:
+    return float(value or 0)
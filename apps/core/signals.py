@@ -0,0 +1,38 @@
+"""
+Core signals - keep the daily metrics rollup in step with its source models.
+
+Deletes are not tracked here: a ``post_delete`` receiver would disable fast
+cascade deletes of message history. The reconcile task picks them up.
+"""
+from django.db.models.signals import post_init, post_save
+
+from apps.core.services.daily_metrics import STATE_ATTR, TRACKED_MODELS, record_change, snapshot
+
+
+def remember_metrics_state(sender, instance, **kwargs):
+    """Store the tracked values an instance was loaded (or built) with."""
+    setattr(instance, STATE_ATTR, snapshot(instance))
+
+
+def update_daily_metrics(sender, instance, created=False, raw=False, **kwargs):
+    """Apply rollup deltas for a created or changed instance."""
+    if raw:
+        return
+    previous = {} if created else getattr(instance, STATE_ATTR, {})
+    current = {**previous, **snapshot(instance)}
+    record_change(instance, previous, current)
+    setattr(instance, STATE_ATTR, current)
+
+
+def connect_daily_metrics_signals():
+    for model in TRACKED_MODELS:
+        post_init.connect(
+            remember_metrics_state,
+            sender=model,
+            dispatch_uid=f'daily_metrics_init_{model}',
+        )
+        post_save.connect(
+            update_daily_metrics,
+            sender=model,
+            dispatch_uid=f'daily_metrics_save_{model}',
+        )
@@ -3,21 +3,33 @@ Server-Sent Events (SSE) views for real-time updates fallback.
 
 Este módulo fornece endpoints SSE para quando WebSocket não está disponível.
 """
+import asyncio
 import json
 import time
 import logging
 import uuid as uuid_module
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
 from django.http import StreamingHttpResponse, JsonResponse
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from django.db.models import Q
 from rest_framework.authtoken.models import Token
 from django.core.cache import cache
-from django.db import connection
+from apps.core.realtime import SSE_ID_FIELD, read_backlog, stream_id_key
 
 logger = logging.getLogger(__name__)
 
 
+class SSESubscriptionError(Exception):
+    """Raised by ``get_groups`` to reject an SSE subscription."""
+    
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
 class SSEEvent:
     """Helper class to build SSE events."""
     
@@ -43,21 +55,25 @@ class SSEEvent:
 
 class BaseSSEView(View):
     """
-    Base view for Server-Sent Events.
+    Base view for push-based Server-Sent Events.
+    
+    Each connection subscribes to channel-layer groups (the same groups the
+    WebSocket consumers use) and streams events as they are published, so
+    open connections cost no database polling and no worker thread.
     
     Provides:
     - Token-based authentication
     - Heartbeat/keepalive
-    - Automatic reconnection support
+    - ``Last-Event-ID`` resumption from the realtime backlog
     - Error handling
     """
     
     # Intervalo de heartbeat em segundos
     heartbeat_interval = 30
-    # Intervalo de verificação de novos dados
-    poll_interval = 2
-    # Timeout máximo da conexão (0 = sem limite)
-    max_timeout = 0
+    # Tempo máximo da conexão; o cliente reconecta com Last-Event-ID
+    max_timeout = 15 * 60
+    # Intervalo sugerido ao cliente para reconexão (ms)
+    retry_ms = 3000
     
     def get_user_from_token(self, token_key: str):
         """Get user from authentication token with caching."""
@@ -94,59 +110,94 @@ class BaseSSEView(View):
         
         return None
     
-    def get_event_stream(self, request, user, last_event_id=None):
+    def get_groups(self, request, user):
         """
-        Generate SSE events.
+        Return the channel-layer groups this connection subscribes to.
         
-        Override this method in subclasses.
-        Should yield SSEEvent objects.
+        Override in subclasses. Runs in a worker thread, so it may query the
+        database. Raise ``SSESubscriptionError`` to reject the connection.
         """
-        raise NotImplementedError("Subclasses must implement get_event_stream")
+        raise NotImplementedError("Subclasses must implement get_groups")
     
-    def generate_stream(self, request, user, last_event_id=None):
-        """Generate the SSE stream with heartbeats."""
-        last_heartbeat = time.time()
-        start_time = time.time()
-        
-        # Send initial connection event
-        yield SSEEvent(
-            event_type='connected',
-            data={
-                'message': 'SSE connection established',
-                'timestamp': time.time(),
-                'heartbeat_interval': self.heartbeat_interval,
-                'poll_interval': self.poll_interval,
-            }
-        ).to_sse_format()
+    def format_event(self, event):
+        """
+        Convert a channel-layer event into an ``SSEEvent``.
+        
+        Override in subclasses. Return None to skip the event.
+        """
+        raise NotImplementedError("Subclasses must implement format_event")
+    
+    def _to_sse(self, event):
+        sse_event = self.format_event(event)
+        if sse_event is not None and not sse_event.id:
+            sse_event.id = event.get(SSE_ID_FIELD)
+        return sse_event
+    
+    async def generate_stream(self, groups, last_event_id=None):
+        """Subscribe to groups and stream events with heartbeats."""
+        channel_layer = get_channel_layer()
+        channel_name = await channel_layer.new_channel('sse.')
+        for group in groups:
+            await channel_layer.group_add(group, channel_name)
+        
+        start_time = time.monotonic()
         
         try:
-            for event in self.get_event_stream(request, user, last_event_id):
-                # Check timeout
-                if self.max_timeout > 0 and (time.time() - start_time) > self.max_timeout:
+            yield SSEEvent(
+                event_type='connected',
+                data={
+                    'message': 'SSE connection established',
+                    'timestamp': time.time(),
+                    'heartbeat_interval': self.heartbeat_interval,
+                },
+                retry=self.retry_ms
+            ).to_sse_format()
+            
+            # Replay what the client missed; subscription is already active,
+            # so live events already covered by the backlog are skipped below.
+            replayed_until = last_event_id
+            if last_event_id:
+                backlog = await sync_to_async(read_backlog, thread_sensitive=False)(
+                    groups, last_event_id
+                )
+                for entry_id, event in backlog:
+                    sse_event = self._to_sse(event)
+                    if sse_event:
+                        yield sse_event.to_sse_format()
+                    replayed_until = entry_id
+            
+            while True:
+                elapsed = time.monotonic() - start_time
+                if self.max_timeout > 0 and elapsed > self.max_timeout:
                     yield SSEEvent(
                         event_type='timeout',
                         data={'message': 'Connection timeout'}
                     ).to_sse_format()
                     break
                 
-                # Send event
-                if event:
-                    yield event.to_sse_format()
-                
-                # Send heartbeat
-                current_time = time.time()
-                if current_time - last_heartbeat >= self.heartbeat_interval:
+                try:
+                    event = await asyncio.wait_for(
+                        channel_layer.receive(channel_name),
+                        timeout=self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
                     yield SSEEvent(
                         event_type='heartbeat',
-                        data={'timestamp': current_time}
+                        data={'timestamp': time.time()}
                     ).to_sse_format()
-                    last_heartbeat = current_time
+                    continue
+                
+                sse_id = event.get(SSE_ID_FIELD)
+                if replayed_until and sse_id and stream_id_key(sse_id) <= stream_id_key(replayed_until):
+                    continue
                 
-                # Small delay to prevent CPU spinning
-                time.sleep(self.poll_interval)
+                sse_event = self._to_sse(event)
+                if sse_event:
+                    yield sse_event.to_sse_format()
                 
-        except GeneratorExit:
+        except (GeneratorExit, asyncio.CancelledError):
             logger.debug("SSE connection closed by client")
+            raise
         except Exception as e:
             logger.exception("Error in SSE stream")
             yield SSEEvent(
@@ -154,13 +205,24 @@ class BaseSSEView(View):
                 data={'message': str(e), 'type': 'stream_error'}
             ).to_sse_format()
         finally:
-            # Ensure connection is closed
-            connection.close()
+            for group in groups:
+                try:
+                    await channel_layer.group_discard(group, channel_name)
+                except Exception:
+                    logger.debug(f"Failed to discard SSE channel from {group}")
     
-    @method_decorator(csrf_exempt)
-    def get(self, request, *args, **kwargs):
-        """Handle GET request for SSE."""
+    def _subscribe(self, request):
         user = self.check_authentication(request)
+        if not user:
+            return None, None
+        return user, list(self.get_groups(request, user))
+    
+    async def get(self, request, *args, **kwargs):
+        """Handle GET request for SSE."""
+        try:
+            user, groups = await sync_to_async(self._subscribe)(request)
+        except SSESubscriptionError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
         
         if not user:
             return JsonResponse(
@@ -172,14 +234,13 @@ class BaseSSEView(View):
         last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
         
         response = StreamingHttpResponse(
-            self.generate_stream(request, user, last_event_id),
+            self.generate_stream(groups, last_event_id),
             content_type='text/event-stream'
         )
         
         # SSE headers
         response['Cache-Control'] = 'no-cache'
         response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
-        response['Connection'] = 'keep-alive'
         
         return response
 
@@ -193,129 +254,73 @@ class OrderSSEView(BaseSSEView):
     - token: Authentication token
     - store_id: Filter by store (optional)
     - order_id: Filter by specific order (optional)
+    - access_token: Order access token (public order tracking)
+    
+    Subscribes to the ``store_<slug>_orders`` group used by
+    ``StoreOrdersConsumer``.
     """
     
-    poll_interval = 3  # Check every 3 seconds
+    CREATED_TYPES = {'order_created', 'order.created'}
+    UPDATED_TYPES = {'order_update', 'order_updated', 'order.update', 'order.updated'}
     
-    def get_event_stream(self, request, user, last_event_id=None):
-        """Stream order updates."""
-        from apps.stores.models import StoreOrder
+    def get_groups(self, request, user):
+        from apps.stores.models import Store, StoreOrder
         
         store_id = request.GET.get('store_id')
-        order_id = request.GET.get('order_id')
+        self.order_id = request.GET.get('order_id')
         
-        # Track last check time
-        last_check = time.time()
+        tracked_order = getattr(user, 'order', None)
+        if tracked_order is not None:
+            self.order_id = str(tracked_order.id)
+            return [f"store_{tracked_order.store.slug}_orders"]
         
-        # Get initial state
-        if order_id:
-            # Single order tracking
-            try:
-                order = StoreOrder.objects.get(id=order_id)
-                last_status = order.status
-            except StoreOrder.DoesNotExist:
-                yield SSEEvent(
-                    event_type='error',
-                    data={'message': 'Order not found'}
-                )
-                return
-        elif store_id:
-            # Store orders
+        if self.order_id:
+            order = StoreOrder.objects.select_related('store').filter(id=self.order_id).first()
+            if not order:
+                raise SSESubscriptionError('Order not found', status=404)
+            return [f"store_{order.store.slug}_orders"]
+        
+        stores = Store.objects.all()
+        if store_id:
             try:
                 uuid_module.UUID(str(store_id))
-                last_count = StoreOrder.objects.filter(store_id=store_id).count()
+                stores = stores.filter(id=store_id)
             except (ValueError, AttributeError):
-                last_count = StoreOrder.objects.filter(store__slug=store_id).count()
-            last_order_id = None
-        else:
-            # All orders user has access to
-            last_count = 0
-            last_order_id = None
+                stores = stores.filter(slug=store_id)
+        elif not user.is_staff:
+            stores = stores.filter(Q(owner=user) | Q(staff=user)).distinct()
         
-        while True:
-            current_time = time.time()
-            
-            if order_id:
-                # Check single order status
-                try:
-                    order = StoreOrder.objects.get(id=order_id)
-                    if order.status != last_status:
-                        yield SSEEvent(
-                            event_type='order_updated',
-                            data={
-                                'order_id': str(order.id),
-                                'order_number': order.order_number,
-                                'old_status': last_status,
-                                'new_status': order.status,
-                                'payment_status': order.payment_status,
-                                'timestamp': current_time,
-                            },
-                            id=f"order_{order.id}_{int(current_time)}"
-                        )
-                        last_status = order.status
-                except StoreOrder.DoesNotExist:
-                    yield SSEEvent(
-                        event_type='order_deleted',
-                        data={'order_id': order_id, 'timestamp': current_time}
-                    )
-                    break
-            else:
-                # Check for new orders
-                query = StoreOrder.objects.all()
-                if store_id:
-                    try:
-                        uuid_module.UUID(str(store_id))
-                        query = query.filter(store_id=store_id)
-                    except (ValueError, AttributeError):
-                        query = query.filter(store__slug=store_id)
-                
-                current_count = query.count()
-                
-                if current_count > last_count:
-                    # New orders
-                    if last_order_id:
-                        new_orders = query.filter(id__gt=last_order_id).order_by('-created_at')[:10]
-                    else:
-                        new_orders = query.order_by('-created_at')[:10]
-                    
-                    for order in new_orders:
-                        yield SSEEvent(
-                            event_type='order_created',
-                            data={
-                                'order_id': str(order.id),
-                                'order_number': order.order_number,
-                                'status': order.status,
-                                'total': str(order.total),
-                                'customer_name': order.customer_name,
-                                'timestamp': current_time,
-                            },
-                            id=f"new_order_{order.id}_{int(current_time)}"
-                        )
-                    
-                    last_count = current_count
-                    if new_orders:
-                        last_order_id = str(new_orders[0].id)
-                
-                # Check for status changes in recent orders
-                recent_orders = query.filter(
-                    updated_at__gte=timezone.now() - timedelta(minutes=5)
-                ).order_by('-updated_at')[:20]
-                
-                for order in recent_orders:
-                    yield SSEEvent(
-                        event_type='order_updated',
-                        data={
-                            'order_id': str(order.id),
-                            'order_number': order.order_number,
-                            'status': order.status,
-                            'payment_status': order.payment_status,
-                            'timestamp': current_time,
-                        },
-                        id=f"update_{order.id}_{int(current_time)}"
-                    )
-            
-            last_check = current_time
-            yield None  # Signal to check heartbeat
+        return [f"store_{slug}_orders" for slug in stores.values_list('slug', flat=True)]
+    
+    def format_event(self, event):
+        if self.order_id and str(event.get('order_id')) != str(self.order_id):
+            return None
+        
+        event_type = event.get('type')
+        if event_type in self.CREATED_TYPES:
+            return SSEEvent(
+                event_type='order_created',
+                data={
+                    'order_id': event.get('order_id'),
+                    'order_number': event.get('order_number'),
+                    'status': event.get('status'),
+                    'total': str(event['total']) if event.get('total') is not None else None,
+                    'customer_name': event.get('customer_name'),
+                    'timestamp': event.get('created_at'),
+                }
+            )
+        if event_type in self.UPDATED_TYPES:
+            return SSEEvent(
+                event_type='order_updated',
+                data={
+                    'order_id': event.get('order_id'),
+                    'order_number': event.get('order_number'),
+                    'status': event.get('status'),
+                    'payment_status': event.get('payment_status'),
+                    'timestamp': event.get('updated_at'),
+                }
+            )
+        return None
     
     def check_authentication(self, request):
         """Allow public access with order token."""
@@ -329,7 +334,7 @@ class OrderSSEView(BaseSSEView):
         if access_token:
             try:
                 from apps.stores.models import StoreOrder
-                order = StoreOrder.objects.get(access_token=access_token)
+                order = StoreOrder.objects.select_related('store').get(access_token=access_token)
                 # Return a mock user or the order for tracking
                 return type('AnonymousUserWithOrder', (), {
                     'is_authenticated': True,
@@ -352,90 +357,81 @@ class WhatsAppSSEView(BaseSSEView):
     - token: Authentication token
     - account_id: WhatsApp account ID (optional)
     - conversation_id: Specific conversation (optional)
-    """
     
-    poll_interval = 2
+    Subscribes to the groups ``WhatsAppBroadcastService`` publishes to.
+    """
     
-    def get_event_stream(self, request, user, last_event_id=None):
-        """Stream WhatsApp updates."""
-        from apps.whatsapp.models import Message, Conversation
-        from django.utils import timezone
-        from datetime import timedelta
+    def get_groups(self, request, user):
+        from apps.whatsapp.models import WhatsAppAccount
         
         account_id = request.GET.get('account_id')
         conversation_id = request.GET.get('conversation_id')
         
-        last_check = timezone.now()
-        last_message_id = None
-        
-        # Get initial state
         if conversation_id:
-            try:
-                conversation = Conversation.objects.get(id=conversation_id)
-                last_message = conversation.messages.order_by('-created_at').first()
-                if last_message:
-                    last_message_id = str(last_message.id)
-            except Conversation.DoesNotExist:
-                yield SSEEvent(
-                    event_type='error',
-                    data={'message': 'Conversation not found'}
-                )
-                return
+            return [f"whatsapp_conv_{conversation_id}"]
         
-        while True:
-            current_time = timezone.now()
-            
-            # Query for new messages
-            query = Message.objects.filter(created_at__gt=last_check)
-            
-            if account_id:
-                query = query.filter(account_id=account_id)
-            if conversation_id:
-                query = query.filter(conversation_id=conversation_id)
-            
-            new_messages = query.order_by('created_at')[:50]
-            
-            for message in new_messages:
-                yield SSEEvent(
-                    event_type='message',
-                    data={
-                        'message_id': str(message.id),
-                        'conversation_id': str(message.conversation_id) if message.conversation_id else None,
-                        'direction': message.direction,
-                        'text': message.text_body,
-                        'status': message.status,
-                        'from_number': message.from_number,
-                        'to_number': message.to_number,
-                        'timestamp': message.created_at.isoformat(),
-                    },
-                    id=f"msg_{message.id}_{int(time.time())}"
-                )
-                last_message_id = str(message.id)
-            
-            # Query for status updates
-            status_updates = Message.objects.filter(
-                updated_at__gt=last_check,
-                created_at__lt=last_check  # Only existing messages
-            ).exclude(status='pending')[:50]
-            
-            if account_id:
-                status_updates = status_updates.filter(account_id=account_id)
-            if conversation_id:
-                status_updates = status_updates.filter(conversation_id=conversation_id)
-            
-            for message in status_updates:
-                yield SSEEvent(
-                    event_type='status_update',
-                    data={
-                        'message_id': str(message.id),
-                        'status': message.status,
-                        'timestamp': message.updated_at.isoformat(),
-                    },
-                    id=f"status_{message.id}_{int(time.time())}"
-                )
-            
-            last_check = current_time
-            yield None
+        accounts = WhatsAppAccount.objects.filter(is_active=True)
+        if account_id:
+            accounts = accounts.filter(id=account_id)
+        if not user.is_staff:
+            accounts = accounts.filter(owner=user)
+        
+        return [f"whatsapp_{pk}" for pk in accounts.values_list('id', flat=True)]
+    
+    def format_event(self, event):
+        event_type = event.get('type')
+        
+        if event_type in ('whatsapp_message_received', 'whatsapp_message_sent'):
+            message = event.get('message') or {}
+            return SSEEvent(
+                event_type='message',
+                data={
+                    'message_id': message.get('id'),
+                    'conversation_id': event.get('conversation_id'),
+                    'direction': message.get('direction'),
+                    'text': message.get('text_body'),
+                    'status': message.get('status'),
+                    'from_number': message.get('from_number'),
+                    'to_number': message.get('to_number'),
+                    'timestamp': message.get('created_at'),
+                }
+            )
+        
+        if event_type == 'whatsapp_status_updated':
+            return SSEEvent(
+                event_type='status_update',
+                data={
+                    'message_id': event.get('message_id'),
+                    'status': event.get('status'),
+                    'timestamp': event.get('timestamp'),
+                }
+            )
+        
+        if event_type == 'whatsapp_status_batch':
+            return SSEEvent(
+                event_type='status_updates',
+                data={'updates': [
+                    {
+                        'message_id': update.get('message_id'),
+                        'status': update.get('status'),
+                        'timestamp': update.get('timestamp'),
+                    }
+                    for update in event.get('updates', [])
+                ]}
+            )
+        
+        if event_type == 'whatsapp_media_ready':
+            return SSEEvent(
+                event_type='media_ready',
+                data={
+                    'message_id': event.get('message_id'),
+                    'conversation_id': event.get('conversation_id'),
+                    'media_url': event.get('media_url'),
+                    'media_mime_type': event.get('media_mime_type'),
+                }
+            )
+        
+        return None
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -496,7 +492,3 @@ class WebSocketHealthCheckView(View):
         except Exception:
             return False
 
-
-# Import necessário
-from django.utils import timezone
-from datetime import timedelta
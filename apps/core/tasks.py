@@ -0,0 +1,49 @@
+"""
+Celery tasks for core reporting rollups.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=300)
+def reconcile_daily_metrics(self, days: Optional[int] = None):
+    """Rebuild the most recent days of the rollup from the raw tables."""
+    from apps.core.services.daily_metrics import rebuild_daily_metrics
+
+    days = days or getattr(settings, 'DAILY_METRICS_RECONCILE_DAYS', 2)
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
+
+    try:
+        written = rebuild_daily_metrics(start_date, end_date)
+    except Exception as e:
+        logger.error(f"Daily metrics reconcile failed: {e}")
+        raise self.retry(exc=e)
+
+    logger.info(f"Reconciled daily metrics {start_date}..{end_date}: {written} rows")
+    return {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(), 'rows': written}
+
+
+@shared_task
+def backfill_daily_metrics(start_date: str, end_date: Optional[str] = None, chunk_days: int = 31):
+    """Rebuild the rollup for a historical range, one chunk at a time."""
+    from apps.core.services.daily_metrics import rebuild_daily_metrics
+
+    current = date.fromisoformat(start_date)
+    last = date.fromisoformat(end_date) if end_date else timezone.localdate()
+    written = 0
+
+    while current <= last:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), last)
+        written += rebuild_daily_metrics(current, chunk_end)
+        logger.info(f"Backfilled daily metrics {current}..{chunk_end}")
+        current = chunk_end + timedelta(days=1)
+
+    return {'rows': written}
@@ -15,7 +15,8 @@ from .auth_views import (
 )
 from .export_views import (
     export_messages, export_orders, export_sessions,
-    export_automation_logs, export_conversations
+    export_automation_logs, export_conversations,
+    create_export_job, export_job_detail, download_export_job,
 )
 
 urlpatterns = [
@@ -48,4 +49,7 @@ urlpatterns = [
     path('export/sessions/', export_sessions, name='export-sessions'),
     path('export/automation-logs/', export_automation_logs, name='export-automation-logs'),
     path('export/conversations/', export_conversations, name='export-conversations'),
+    path('export/jobs/', create_export_job, name='export-job-create'),
+    path('export/jobs/<uuid:job_id>/', export_job_detail, name='export-job-detail'),
+    path('export/jobs/<uuid:job_id>/download/', download_export_job, name='export-job-download'),
 ]
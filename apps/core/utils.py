@@ -4,6 +4,7 @@ Core utilities and helper functions.
 import hmac
 import hashlib
 import secrets
+from functools import lru_cache
 from typing import Optional
 from django.conf import settings
 from cryptography.fernet import Fernet
@@ -37,13 +38,22 @@ class TokenEncryption:
         key = settings.SECRET_KEY[:32].encode()
         key = base64.urlsafe_b64encode(key.ljust(32)[:32])
         self.cipher = Fernet(key)
+        self._decrypt_cached = lru_cache(maxsize=1024)(self._decrypt)
 
     def encrypt(self, token: str) -> str:
         """Encrypt a token."""
         return self.cipher.encrypt(token.encode()).decode()
 
     def decrypt(self, encrypted_token: str) -> str:
-        """Decrypt a token."""
+        """
+        Decrypt a token.
+
+        Results are cached by ciphertext: rotating a token stores a new
+        ciphertext, so stale plaintext is never returned.
+        """
+        return self._decrypt_cached(encrypted_token)
+
+    def _decrypt(self, encrypted_token: str) -> str:
         return self.cipher.decrypt(encrypted_token.encode()).decode()
 
 
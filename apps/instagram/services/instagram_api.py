@@ -3,6 +3,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 from django.conf import settings
+from apps.core.services.http_client import get_http_client
 from ..models import InstagramAccount
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ class InstagramAPI:
     def __init__(self, account: InstagramAccount):
         self.account = account
         self.access_token = account.access_token
-        self.session = requests.Session()
+        self.http = get_http_client()
     
     def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None, files: Dict = None) -> Dict:
         """Faz requisição para a Graph API"""
@@ -27,11 +28,11 @@ class InstagramAPI:
         
         try:
             if files:
-                response = self.session.request(method, url, params=params, data=data, files=files, timeout=120)
+                response = self.http.request(method, url, params=params, data=data, files=files, timeout=120)
             elif method == 'GET':
-                response = self.session.get(url, params=params, timeout=30)
+                response = self.http.get(url, params=params, timeout=30)
             else:
-                response = self.session.request(method, url, params=params, json=data, timeout=30)
+                response = self.http.request(method, url, params=params, json=data, timeout=30)
             
             response.raise_for_status()
             return response.json()
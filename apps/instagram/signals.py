@@ -2,5 +2,15 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from apps.core.services.account_routing import invalidate_account_routing
+from .models import InstagramAccount
 
-# Signals para processamento assíncrono podem ser adicionados aqui
\ No newline at end of file
+
+@receiver(post_save, sender=InstagramAccount)
+@receiver(post_delete, sender=InstagramAccount)
+def invalidate_instagram_account_routing(sender, instance, **kwargs):
+    """Drop cached webhook routes when an Instagram account changes."""
+    invalidate_account_routing(sender=sender)
+
+
+# Signals para processamento assíncrono podem ser adicionados aqui
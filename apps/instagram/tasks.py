@@ -3,6 +3,7 @@ import logging
 from datetime import datetime, timedelta
 from django.utils import timezone
 
+from apps.core.services.account_routing import get_account_router
 from .models import InstagramScheduledPost, InstagramMedia, InstagramAccount
 from .services import InstagramAPI, InstagramGraphService
 
@@ -155,9 +156,9 @@ def process_instagram_webhook(payload: dict):
                     
                     # Encontra a conta
                     try:
-                        account = InstagramAccount.objects.get(
-                            instagram_business_id=recipient_id
-                        )
+                        account = get_account_router().get_instagram_account(recipient_id)
+                        if account is None:
+                            raise InstagramAccount.DoesNotExist
                         
                         # Cria ou obtém conversa
                         api = InstagramAPI(account)
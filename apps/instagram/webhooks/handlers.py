@@ -7,6 +7,7 @@ import hashlib
 from typing import Dict, Any, Optional
 from django.conf import settings
 
+from apps.core.services.account_routing import get_account_router
 from apps.instagram.models import InstagramAccount, InstagramWebhookEvent
 from apps.instagram.services.message_service import InstagramMessageService
 
@@ -110,14 +111,10 @@ class InstagramWebhookHandler:
         return results
     
     def _get_account(self, account_id: str) -> Optional[InstagramAccount]:
-        """Get Instagram account by ID."""
-        try:
-            return InstagramAccount.objects.get(
-                instagram_account_id=account_id,
-                status=InstagramAccount.AccountStatus.ACTIVE
-            )
-        except InstagramAccount.DoesNotExist:
+        """Get Instagram account by business/page ID (cached routing)."""
+        if not account_id:
             return None
+        return get_account_router().get_instagram_account(account_id)
     
     def _process_messaging_event(
         self, 
@@ -113,17 +113,17 @@ class EmailCampaignViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def send(self, request, pk=None):
-        """Send a campaign."""
+        """Queue a campaign for sending."""
         import logging
         logger = logging.getLogger(__name__)
         
         try:
-            logger.info(f"Sending campaign {pk}")
-            result = email_marketing_service.send_campaign(pk)
-            logger.info(f"Campaign {pk} send result: {result}")
+            logger.info(f"Queueing campaign {pk}")
+            result = email_marketing_service.queue_campaign(pk)
+            logger.info(f"Campaign {pk} queue result: {result}")
             
             if result['success']:
-                return Response(result)
+                return Response(result, status=status.HTTP_202_ACCEPTED)
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(f"Error sending campaign {pk}: {e}")
@@ -13,6 +13,8 @@ from typing import Dict, Any, Optional
 from django.utils import timezone
 from django.db import transaction
 
+from apps.core.services.templating import render_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -121,9 +123,8 @@ class EmailAutomationService:
             }
             
             # Personalize content
-            for key, value in personalization.items():
-                subject = subject.replace(f'{{{{{key}}}}}', str(value or ''))
-                html_content = html_content.replace(f'{{{{{key}}}}}', str(value or ''))
+            subject = render_template(subject, personalization)
+            html_content = render_template(html_content, personalization)
             
             # Send via email service
             result = self.email_service.send_single_email(
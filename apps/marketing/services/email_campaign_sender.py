@@ -0,0 +1,326 @@
+"""
+Batched email campaign sender.
+
+The audience is streamed from the database with ``.iterator()`` and written
+as ``EmailRecipient`` rows with ``bulk_create(ignore_conflicts=True)``. The
+subject and HTML are compiled once per campaign, then pending recipients are
+sent in chunks through Resend's batch endpoint (or a bounded thread pool of
+single sends when batching is off), and each chunk's outcome is written with
+one ``bulk_update`` plus an ``F()`` counter on the campaign.
+
+The recipient status is the checkpoint: a send that crashes is picked up
+again by ``resume_stalled_email_campaigns`` and only sends the recipients
+still pending. At most the chunk in flight when the worker died can be sent
+twice.
+
+Transient errors (rate limits, timeouts, 5xx) leave their recipients pending
+and end the pass with ``SendResult.deferred`` set; the ``send_campaign`` task
+retries the campaign with backoff. Only permanent errors mark recipients
+failed.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.services.templating import ANY, BLANK, compile_template
+
+logger = logging.getLogger(__name__)
+
+# Resend accepts at most 100 emails per batch call
+MAX_BATCH_SIZE = 100
+LOCK_KEY = 'marketing:email_campaign:{campaign_id}:lock'
+
+RECIPIENT_OUTCOME_FIELDS = ['status', 'resend_id', 'sent_at', 'error_message', 'updated_at']
+
+# HTTP statuses worth retrying later: timeout, conflict, rate limit and server errors
+RETRYABLE_STATUSES = {408, 409, 429}
+
+# (email, name)
+AudienceRow = Tuple[str, str]
+# Sends a list of Resend payloads and returns the Resend ids in the same order
+BatchSender = Callable[[List[Dict[str, Any]]], List[str]]
+# Sends one Resend payload and returns its id
+SingleSender = Callable[[Dict[str, Any]], str]
+
+
+def _resend_batch_send(payloads: List[Dict[str, Any]]) -> List[str]:
+    import resend
+
+    response = resend.Batch.send(payloads)
+    data = response.get('data', []) if isinstance(response, dict) else response
+    return [(item or {}).get('id', '') for item in data]
+
+
+def _resend_single_send(payload: Dict[str, Any]) -> str:
+    import resend
+
+    return resend.Emails.send(payload).get('id', '')
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a send error is transient, so its recipients should stay pending."""
+    code = getattr(error, 'code', None)
+    if code is not None:
+        # Resend SDK errors carry the HTTP status
+        try:
+            status = int(code)
+        except (TypeError, ValueError):
+            return False
+        return status in RETRYABLE_STATUSES or status >= 500
+    # The SDK wraps transport failures (timeouts, resets) in a RuntimeError
+    return any(
+        isinstance(exc, (requests.RequestException, TimeoutError, ConnectionError))
+        for exc in (error, error.__cause__)
+    )
+
+
+@dataclass
+class SendResult:
+    sent: int = 0
+    failed: int = 0
+    # Recipients left pending after a transient error
+    deferred: int = 0
+
+
+class EmailCampaignSender:
+    """Materialize, render and send an email campaign in chunks."""
+
+    def __init__(
+        self,
+        send_batch: Optional[BatchSender] = None,
+        send_one: Optional[SingleSender] = None,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        use_batch: Optional[bool] = None,
+    ):
+        self.send_batch = send_batch or _resend_batch_send
+        self.send_one = send_one or _resend_single_send
+        self.batch_size = min(batch_size or getattr(settings, 'EMAIL_CAMPAIGN_BATCH_SIZE', 100), MAX_BATCH_SIZE)
+        self.max_workers = max_workers or getattr(settings, 'EMAIL_CAMPAIGN_SEND_WORKERS', 8)
+        self.use_batch = getattr(settings, 'RESEND_BATCH_ENABLED', True) if use_batch is None else use_batch
+        self.lock_timeout = getattr(settings, 'EMAIL_CAMPAIGN_LOCK_TIMEOUT', 600)
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    def acquire(self, campaign) -> bool:
+        """Take the per-campaign send lock; it expires if the worker dies."""
+        return cache.add(LOCK_KEY.format(campaign_id=campaign.id), 1, self.lock_timeout)
+
+    def release(self, campaign) -> None:
+        cache.delete(LOCK_KEY.format(campaign_id=campaign.id))
+
+    def _heartbeat(self, campaign) -> None:
+        cache.touch(LOCK_KEY.format(campaign_id=campaign.id), self.lock_timeout)
+
+    # ------------------------------------------------------------------
+    # Audience
+    # ------------------------------------------------------------------
+
+    def iter_audience(self, campaign) -> Iterator[AudienceRow]:
+        """Stream the campaign audience, deduplicated by lowercased email."""
+        from apps.marketing.models import EmailCampaign, Subscriber
+        from apps.stores.models import StoreOrder
+
+        audience = EmailCampaign.AudienceType
+        chunk_size = self.batch_size * 10
+        sources: List[Iterable[AudienceRow]] = []
+
+        subscribers = Subscriber.objects.filter(
+            store=campaign.store,
+            status=Subscriber.SubscriberStatus.ACTIVE,
+            accepts_marketing=True,
+        )
+        orders = StoreOrder.objects.filter(
+            store=campaign.store,
+            customer_email__isnull=False,
+        ).exclude(customer_email='').values_list('customer_email', 'customer_name').distinct()
+
+        if campaign.audience_type in (audience.ALL, audience.SUBSCRIBERS):
+            sources.append(subscribers.values_list('email', 'name').iterator(chunk_size=chunk_size))
+        if campaign.audience_type in (audience.ALL, audience.CUSTOMERS):
+            sources.append(orders.iterator(chunk_size=chunk_size))
+        if campaign.audience_type == audience.CUSTOM:
+            sources.append(
+                (recipient.get('email'), recipient.get('name', ''))
+                for recipient in (campaign.recipient_list or [])
+            )
+        if campaign.audience_type == audience.SEGMENT:
+            filters = campaign.audience_filters or {}
+            if filters.get('tags'):
+                subscribers = subscribers.filter(tags__contains=filters['tags'])
+            if filters.get('min_orders'):
+                subscribers = subscribers.filter(total_orders__gte=filters['min_orders'])
+            sources.append(subscribers.values_list('email', 'name').iterator(chunk_size=chunk_size))
+
+        seen = set()
+        for source in sources:
+            for email, name in source:
+                if not email:
+                    continue
+                key = email.strip().lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield email.strip(), (name or '')[:255]
+
+    def materialize(self, campaign) -> int:
+        """Create the pending recipients in chunks; returns the recipient count."""
+        from apps.marketing.models import EmailRecipient
+
+        chunk: List[EmailRecipient] = []
+        for email, name in self.iter_audience(campaign):
+            chunk.append(EmailRecipient(campaign=campaign, email=email, name=name))
+            if len(chunk) >= self.batch_size * 10:
+                EmailRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+                chunk = []
+        if chunk:
+            EmailRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+        return campaign.recipients.count()
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def campaign_variables(self, campaign) -> Dict[str, str]:
+        """Variables shared by every recipient of the campaign."""
+        filters = campaign.audience_filters or {}
+        return {
+            'store_name': campaign.store.name if campaign.store else 'Loja',
+            'year': str(timezone.now().year),
+            'store_url': 'https://pastita.com.br',
+            'store_domain': 'pastita.com.br',
+            # Common discount placeholders
+            'discount_value': str(filters.get('discount_value', '10')),
+            'discount_code': str(filters.get('discount_code', 'DESCONTO10')),
+            'coupon_code': str(filters.get('coupon_code', '') or ''),
+        }
+
+    def build_renderer(self, campaign, default_from_name: str, default_from_email: str):
+        """Compile subject and HTML once; returns ``recipient -> Resend payload``."""
+        shared = self.campaign_variables(campaign)
+        subject = compile_template(campaign.subject, ANY)
+        html = compile_template(campaign.html_content, ANY)
+        sender = f'{campaign.from_name or default_from_name} <{campaign.from_email or default_from_email}>'
+
+        def build(recipient) -> Dict[str, Any]:
+            name = recipient.name or ''
+            variables = dict(
+                shared,
+                name=name,
+                customer_name=name,
+                first_name=name.split()[0] if name else '',
+                email=recipient.email,
+            )
+            payload = {
+                'from': sender,
+                'to': [recipient.email],
+                'subject': subject.render(variables, missing=BLANK),
+                'html': html.render(variables, missing=BLANK),
+            }
+            if campaign.reply_to:
+                payload['reply_to'] = campaign.reply_to
+            return payload
+
+        return build
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+
+    def pending_chunks(self, campaign) -> Iterator[list]:
+        """Yield pending recipients in id order, one chunk at a time."""
+        from apps.marketing.models import EmailRecipient
+
+        last_id = None
+        while True:
+            queryset = campaign.recipients.filter(
+                status=EmailRecipient.RecipientStatus.PENDING
+            ).only('id', 'email', 'name', *RECIPIENT_OUTCOME_FIELDS).order_by('id')
+            if last_id is not None:
+                queryset = queryset.filter(id__gt=last_id)
+            chunk = list(queryset[:self.batch_size])
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1].id
+
+    def send(self, campaign, build: Callable[[Any], Dict[str, Any]]) -> SendResult:
+        """Send every pending recipient, checkpointing after each chunk."""
+        result = SendResult()
+        for recipients in self.pending_chunks(campaign):
+            payloads = [build(recipient) for recipient in recipients]
+            outcomes = self._send_chunk(campaign, payloads)
+            chunk_result = self.record(campaign, recipients, outcomes)
+            result.sent += chunk_result.sent
+            result.failed += chunk_result.failed
+            result.deferred += chunk_result.deferred
+            self._heartbeat(campaign)
+            if chunk_result.deferred:
+                # Rate limited or the provider is down: stop here and let the task back off
+                logger.warning(f"Campaign {campaign.id}: {chunk_result.deferred} emails deferred after a transient error")
+                break
+        return result
+
+    def _send_chunk(self, campaign, payloads: List[Dict[str, Any]]) -> List[Tuple[str, Optional[Exception]]]:
+        """Returns ``(resend_id, error)`` per payload."""
+        if self.use_batch:
+            try:
+                ids = self.send_batch(payloads)
+                if len(ids) != len(payloads):
+                    raise ValueError(f'Batch returned {len(ids)} ids for {len(payloads)} emails')
+                return [(resend_id, None) for resend_id in ids]
+            except Exception as e:
+                logger.error(f"Campaign {campaign.id}: batch of {len(payloads)} emails failed: {e}")
+                return [('', e)] * len(payloads)
+
+        def send_one(payload):
+            try:
+                return self.send_one(payload), None
+            except Exception as e:
+                logger.error(f"Campaign {campaign.id}: failed to send email to {payload['to'][0]}: {e}")
+                return '', e
+
+        if self.max_workers <= 1 or len(payloads) <= 1:
+            return [send_one(payload) for payload in payloads]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(payloads))) as pool:
+            return list(pool.map(send_one, payloads))
+
+    def record(self, campaign, recipients: list, outcomes: List[Tuple[str, Optional[Exception]]]) -> SendResult:
+        """Write the chunk outcome in one bulk UPDATE and move the sent counter."""
+        from apps.marketing.models import EmailCampaign, EmailRecipient
+
+        now = timezone.now()
+        result = SendResult()
+        for recipient, (resend_id, error) in zip(recipients, outcomes):
+            recipient.updated_at = now
+            if error is None:
+                recipient.status = EmailRecipient.RecipientStatus.SENT
+                recipient.resend_id = (resend_id or '')[:100]
+                recipient.sent_at = now
+                result.sent += 1
+            elif is_retryable(error):
+                # Stays pending for the next pass
+                recipient.error_message = str(error)
+                result.deferred += 1
+            else:
+                recipient.status = EmailRecipient.RecipientStatus.FAILED
+                recipient.error_message = str(error)
+                result.failed += 1
+
+        with transaction.atomic():
+            EmailRecipient.objects.bulk_update(recipients, RECIPIENT_OUTCOME_FIELDS)
+            EmailCampaign.objects.filter(pk=campaign.pk).update(
+                emails_sent=F('emails_sent') + result.sent,
+                updated_at=now,
+            )
+        return result
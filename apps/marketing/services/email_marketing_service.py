@@ -6,8 +6,13 @@ import os
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Count, Sum, Q
 
+from apps.core.services.templating import ANY, BLANK, render_template
+
+from .email_campaign_sender import EmailCampaignSender
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -93,263 +98,115 @@ class EmailMarketingService:
             return 0
         return round((numerator / denominator) * 100, 2)
     
-    def send_campaign(self, campaign_id: str) -> Dict[str, Any]:
-        """Send an email campaign."""
-        from apps.marketing.models import EmailCampaign, EmailRecipient, Subscriber
-        from apps.stores.models import StoreOrder
-        
-        logger.info(f"[send_campaign] Starting campaign {campaign_id}")
-        
+    def _load_sendable_campaign(self, campaign_id: str):
+        """Return ``(campaign, error)`` for a campaign that may be sent now."""
+        from apps.marketing.models import EmailCampaign
+
         if not self.enabled:
             logger.warning(f"[send_campaign] Email service not enabled. API Key: {'set' if self.api_key else 'not set'}, Resend: {RESEND_AVAILABLE}")
-            return {'success': False, 'error': 'Email service not configured. Please configure RESEND_API_KEY.'}
-        
+            return None, 'Email service not configured. Please configure RESEND_API_KEY.'
+
         try:
-            campaign = EmailCampaign.objects.get(id=campaign_id)
-            logger.info(f"[send_campaign] Found campaign: {campaign.name}, store={campaign.store_id}, status={campaign.status}")
+            campaign = EmailCampaign.objects.select_related('store').get(id=campaign_id)
         except EmailCampaign.DoesNotExist:
             logger.error(f"[send_campaign] Campaign {campaign_id} not found")
-            return {'success': False, 'error': 'Campaign not found'}
-        
-        logger.info(f"Sending campaign {campaign_id}: store={campaign.store_id}, audience={campaign.audience_type}, status={campaign.status}")
-        
-        if campaign.status not in ['draft', 'scheduled']:
-            return {'success': False, 'error': f'Campaign cannot be sent (status: {campaign.status})'}
-        
+            return None, 'Campaign not found'
+
+        # 'sending' resumes a send interrupted by a crash; the send lock keeps it single
+        if campaign.status not in ['draft', 'scheduled', 'sending']:
+            return None, f'Campaign cannot be sent (status: {campaign.status})'
+
         if not campaign.store_id:
-            return {'success': False, 'error': 'Campaign has no store associated'}
-        
-        # Update status
-        campaign.status = 'sending'
-        campaign.started_at = timezone.now()
-        campaign.save()
-        
-        # Get recipients
-        recipients_list = []
-        
-        if campaign.audience_type == 'all':
-            # First get subscribers
-            subscribers = Subscriber.objects.filter(
-                store=campaign.store,
-                status='active',
-                accepts_marketing=True
-            )
-            for sub in subscribers:
-                recipients_list.append({
-                    'email': sub.email,
-                    'name': sub.name or '',
-                })
-            
-            # Also get customers from orders (unique emails)
-            orders = StoreOrder.objects.filter(
-                store=campaign.store,
-                customer_email__isnull=False
-            ).exclude(customer_email='').values('customer_email', 'customer_name').distinct()
-            
-            existing_emails = {r['email'].lower() for r in recipients_list}
-            for order in orders:
-                email = order['customer_email'].lower()
-                if email not in existing_emails:
-                    recipients_list.append({
-                        'email': order['customer_email'],
-                        'name': order['customer_name'] or '',
-                    })
-                    existing_emails.add(email)
-                    
-        elif campaign.audience_type == 'customers':
-            # Only customers who made orders
-            orders = StoreOrder.objects.filter(
-                store=campaign.store,
-                customer_email__isnull=False
-            ).exclude(customer_email='').values('customer_email', 'customer_name').distinct()
-            
-            seen_emails = set()
-            for order in orders:
-                email = order['customer_email'].lower()
-                if email not in seen_emails:
-                    recipients_list.append({
-                        'email': order['customer_email'],
-                        'name': order['customer_name'] or '',
-                    })
-                    seen_emails.add(email)
-                    
-        elif campaign.audience_type == 'subscribers':
-            # Only subscribers
-            subscribers = Subscriber.objects.filter(
-                store=campaign.store,
-                status='active',
-                accepts_marketing=True
-            )
-            for sub in subscribers:
-                recipients_list.append({
-                    'email': sub.email,
-                    'name': sub.name or '',
-                })
-                    
-        elif campaign.audience_type == 'custom':
-            for recipient in (campaign.recipient_list or []):
-                if recipient.get('email'):
-                    recipients_list.append({
-                        'email': recipient.get('email'),
-                        'name': recipient.get('name', ''),
-                    })
-        else:
-            # Segment filtering from subscribers
-            subscribers = Subscriber.objects.filter(
-                store=campaign.store,
-                status='active',
-                accepts_marketing=True
-            )
-            # Apply filters from audience_filters
-            filters = campaign.audience_filters or {}
-            if filters.get('tags'):
-                subscribers = subscribers.filter(tags__contains=filters['tags'])
-            if filters.get('min_orders'):
-                subscribers = subscribers.filter(total_orders__gte=filters['min_orders'])
-            
-            for sub in subscribers:
-                recipients_list.append({
-                    'email': sub.email,
-                    'name': sub.name or '',
-                })
-        
-        # Use recipients_list instead of subscribers
-        subscribers = recipients_list
-        
-        logger.info(f"Campaign {campaign.id}: Found {len(subscribers)} recipients (audience_type: {campaign.audience_type})")
-        
-        if not subscribers:
-            campaign.status = 'sent'
-            campaign.completed_at = timezone.now()
-            campaign.emails_sent = 0
-            campaign.total_recipients = 0
-            campaign.save()
-            return {
-                'success': True,
-                'sent': 0,
-                'failed': 0,
-                'campaign_id': str(campaign.id),
-                'message': 'No recipients found for this campaign'
-            }
-        
-        # Create recipients and send
-        sent_count = 0
-        failed_count = 0
-        
-        from_email = campaign.from_email or self.default_from_email
-        from_name = campaign.from_name or self.default_from_name
-        
-        # Get store name for personalization
-        store_name = campaign.store.name if campaign.store else 'Loja'
-        
-        for subscriber in subscribers:
-            if isinstance(subscriber, dict):
-                email = subscriber['email']
-                name = subscriber.get('name', '')
-                first_name = name.split()[0] if name else ''
-            else:
-                email = subscriber.email
-                name = subscriber.name or ''
-                first_name = name.split()[0] if name else ''
-            
-            # Create recipient record
-            recipient, created = EmailRecipient.objects.get_or_create(
-                campaign=campaign,
-                email=email,
-                defaults={'name': name}
-            )
-            
-            if recipient.status != 'pending':
-                continue
-            
-            # Get store URL
-            store_url = 'https://pastita.com.br'
-            store_domain = 'pastita.com.br'
-            
-            # Personalize content with multiple variables
-            personalization_vars = {
-                'name': name,
-                'customer_name': name,
-                'first_name': first_name,
-                'email': email,
-                'store_name': store_name,
-                'year': str(timezone.now().year),
-                'store_url': store_url,
-                'store_domain': store_domain,
-                # Common discount placeholders - get from campaign metadata if available
-                'discount_value': str(campaign.audience_filters.get('discount_value', '10')) if campaign.audience_filters else '10',
-                'discount_code': campaign.audience_filters.get('discount_code', 'DESCONTO10') if campaign.audience_filters else 'DESCONTO10',
-                'coupon_code': campaign.audience_filters.get('coupon_code', '') if campaign.audience_filters else '',
-            }
-            html_content = self._personalize_content(
-                campaign.html_content,
-                personalization_vars
-            )
-            
-            # Also personalize subject
-            personalized_subject = self._personalize_content(
-                campaign.subject,
-                personalization_vars
-            )
-            
-            # Send via Resend
-            try:
-                response = resend.Emails.send({
-                    'from': f'{from_name} <{from_email}>',
-                    'to': [email],
-                    'subject': personalized_subject,
-                    'html': html_content,
-                })
-                
-                recipient.status = 'sent'
-                recipient.resend_id = response.get('id', '')
-                recipient.sent_at = timezone.now()
-                sent_count += 1
-                
-            except Exception as e:
-                recipient.status = 'failed'
-                recipient.error_message = str(e)
-                failed_count += 1
-                logger.error(f"Failed to send email to {email}: {e}")
-            
-            recipient.save()
-        
-        # Update campaign stats
-        campaign.emails_sent = sent_count
-        campaign.total_recipients = sent_count + failed_count
-        
-        if failed_count == 0:
-            campaign.status = 'sent'
-            campaign.completed_at = timezone.now()
-        else:
-            campaign.status = 'sent'  # Still mark as sent even with some failures
-            campaign.completed_at = timezone.now()
-        
-        campaign.save()
-        
-        return {
+            return None, 'Campaign has no store associated'
+
+        return campaign, None
+
+    def queue_campaign(self, campaign_id: str) -> Dict[str, Any]:
+        """Validate a campaign and hand it to the send task."""
+        from apps.marketing.tasks import send_campaign
+
+        campaign, error = self._load_sendable_campaign(campaign_id)
+        if error:
+            return {'success': False, 'error': error}
+
+        transaction.on_commit(lambda: send_campaign.delay(str(campaign.id)))
+        return {'success': True, 'queued': True, 'campaign_id': str(campaign.id)}
+
+    def send_campaign(self, campaign_id: str) -> Dict[str, Any]:
+        """
+        Send an email campaign.
+
+        Recipients are materialized once, then sent in chunks by
+        ``EmailCampaignSender``. Calling this again for a campaign left in
+        'sending' resumes with the recipients still pending; ``deferred`` in
+        the result counts recipients left pending after a transient error.
+        """
+        from apps.marketing.models import EmailCampaign
+
+        logger.info(f"[send_campaign] Starting campaign {campaign_id}")
+
+        campaign, error = self._load_sendable_campaign(campaign_id)
+        if error:
+            return {'success': False, 'error': error}
+
+        logger.info(f"Sending campaign {campaign_id}: store={campaign.store_id}, audience={campaign.audience_type}, status={campaign.status}")
+
+        sender = EmailCampaignSender()
+        if not sender.acquire(campaign):
+            return {'success': False, 'error': 'Campaign is already being sent'}
+
+        try:
+            campaigns = EmailCampaign.objects.filter(pk=campaign.pk)
+            if campaign.status != EmailCampaign.CampaignStatus.SENDING:
+                claimed = campaigns.filter(status=campaign.status).update(
+                    status=EmailCampaign.CampaignStatus.SENDING,
+                    started_at=timezone.now(),
+                    updated_at=timezone.now(),
+                )
+                if not claimed:
+                    return {'success': False, 'error': 'Campaign status changed, not sent'}
+                campaign.refresh_from_db()
+
+            if not (campaign.metadata or {}).get('recipients_materialized'):
+                campaign.total_recipients = sender.materialize(campaign)
+                campaign.metadata = dict(campaign.metadata or {}, recipients_materialized=True)
+                campaigns.update(
+                    total_recipients=campaign.total_recipients,
+                    metadata=campaign.metadata,
+                    updated_at=timezone.now(),
+                )
+
+            logger.info(f"Campaign {campaign.id}: {campaign.total_recipients} recipients (audience_type: {campaign.audience_type})")
+
+            build = sender.build_renderer(campaign, self.default_from_name, self.default_from_email)
+            result = sender.send(campaign, build)
+
+            # Deferred recipients are still pending: stay in 'sending' until a retry sends them
+            if not result.deferred:
+                campaigns.filter(status=EmailCampaign.CampaignStatus.SENDING).update(
+                    status=EmailCampaign.CampaignStatus.SENT,
+                    completed_at=timezone.now(),
+                    updated_at=timezone.now(),
+                )
+        finally:
+            sender.release(campaign)
+
+        response = {
             'success': True,
-            'sent': sent_count,
-            'failed': failed_count,
-            'campaign_id': str(campaign.id)
+            'sent': result.sent,
+            'failed': result.failed,
+            'deferred': result.deferred,
+            'total_recipients': campaign.total_recipients,
+            'campaign_id': str(campaign.id),
         }
+        if not campaign.total_recipients:
+            response['message'] = 'No recipients found for this campaign'
+        return response
     
     def _personalize_content(self, content: str, variables: Dict[str, str]) -> str:
-        """Replace variables in content."""
-        import re
-        
-        for key, value in variables.items():
-            val = str(value) if value else ''
-            # Handle different formats: {{key}}, {{ key }}, {key}
-            content = content.replace(f'{{{{{key}}}}}', val)  # {{key}}
-            content = content.replace(f'{{{{ {key} }}}}', val)  # {{ key }}
-            content = content.replace(f'{{{key}}}', val)  # {key}
-        
-        # Also handle any remaining {{variable}} patterns with regex
-        # Replace any unmatched {{...}} with empty string
-        content = re.sub(r'\{\{\s*\w+\s*\}\}', '', content)
-        
-        return content
+        """Replace {{key}}, {{ key }} and {key} variables in content."""
+        values = {key: value or '' for key, value in variables.items()}
+        return render_template(content, values, syntax=ANY, missing=BLANK)
     
     def send_single_email(
         self,
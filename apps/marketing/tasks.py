@@ -24,20 +24,54 @@ def process_scheduled_automations():
         raise
 
 
-@shared_task(name='apps.marketing.tasks.send_campaign')
-def send_campaign(campaign_id: str):
+@shared_task(name='apps.marketing.tasks.send_campaign', bind=True, acks_late=True, reject_on_worker_lost=True)
+def send_campaign(self, campaign_id: str):
     """
     Send an email campaign asynchronously.
+    Acked late so a worker lost mid-send hands the campaign to another worker,
+    which resumes with the recipients still pending. Recipients deferred by a
+    transient provider error are retried with exponential backoff; once the
+    retries run out, resume_stalled_email_campaigns picks the campaign up.
     """
+    from django.conf import settings
     from apps.marketing.services import email_marketing_service
     
     try:
         result = email_marketing_service.send_campaign(campaign_id)
-        logger.info(f"Campaign {campaign_id} sent: {result}")
-        return result
     except Exception as e:
         logger.error(f"Error sending campaign {campaign_id}: {e}")
         raise
+    
+    if result.get('deferred') and self.request.retries < getattr(settings, 'EMAIL_CAMPAIGN_MAX_RETRIES', 5):
+        countdown = getattr(settings, 'EMAIL_CAMPAIGN_RETRY_BASE', 30) * 2 ** self.request.retries
+        logger.warning(f"Campaign {campaign_id}: {result['deferred']} emails deferred, retrying in {countdown}s")
+        raise self.retry(countdown=countdown, max_retries=None)
+    
+    logger.info(f"Campaign {campaign_id} sent: {result}")
+    return result
+
+
+@shared_task(name='apps.marketing.tasks.resume_stalled_email_campaigns')
+def resume_stalled_email_campaigns():
+    """
+    Re-enqueue campaigns stuck in 'sending' whose worker stopped reporting progress.
+    Runs every 5 minutes via Celery Beat.
+    """
+    from django.conf import settings
+    from django.utils import timezone
+    from apps.marketing.models import EmailCampaign
+    
+    stale = timezone.now() - timezone.timedelta(seconds=getattr(settings, 'EMAIL_CAMPAIGN_LOCK_TIMEOUT', 600))
+    campaign_ids = list(
+        EmailCampaign.objects.filter(
+            status=EmailCampaign.CampaignStatus.SENDING,
+            updated_at__lt=stale,
+        ).values_list('id', flat=True)
+    )
+    for campaign_id in campaign_ids:
+        logger.warning(f"Resuming stalled email campaign {campaign_id}")
+        send_campaign.delay(str(campaign_id))
+    return {'resumed': len(campaign_ids)}
 
 
 @shared_task(name='apps.marketing.tasks.send_automation_email')
@@ -2,6 +2,7 @@ import requests
 import logging
 from typing import Optional, Dict, List, Any
 from django.conf import settings
+from apps.core.services.http_client import get_http_client
 from ..models import MessengerAccount, MessengerConversation, MessengerMessage
 
 logger = logging.getLogger(__name__)
@@ -15,7 +16,7 @@ class MessengerService:
     def __init__(self, account: MessengerAccount):
         self.account = account
         self.access_token = account.page_access_token
-        self.session = requests.Session()
+        self.http = get_http_client()
     
     def _make_request(self, method: str, endpoint: str, 
                       params: Dict = None, data: Dict = None,
@@ -32,9 +33,9 @@ class MessengerService:
         
         try:
             if method == 'GET':
-                response = self.session.get(url, params=params, timeout=30)
+                response = self.http.get(url, params=params, timeout=30)
             elif method == 'POST':
-                response = self.session.post(
+                response = self.http.post(
                     url, 
                     params=params,
                     json=data,
@@ -42,9 +43,9 @@ class MessengerService:
                     timeout=30
                 )
             elif method == 'DELETE':
-                response = self.session.delete(url, params=params, timeout=30)
+                response = self.http.delete(url, params=params, timeout=30)
             else:
-                response = self.session.request(method, url, params=params, timeout=30)
+                response = self.http.request(method, url, params=params, timeout=30)
             
             response.raise_for_status()
             return response.json()
@@ -1,12 +1,13 @@
 """
 Celery tasks para messaging_v2 - Processamento assíncrono.
 """
-import requests
 import json
 from celery import shared_task
 from celery.exceptions import MaxRetriesExceededError
 from django.conf import settings
 from django.utils import timezone
+from apps.core.services.http_client import get_http_client
+from apps.whatsapp.services.send_scheduler import get_send_scheduler, is_rate_limit_error
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
@@ -48,7 +49,8 @@ def send_whatsapp_message(self, message_id):
         phone_number_id = account.external_id or account.phone_number
         url = f'https://graph.facebook.com/v18.0/{phone_number_id}/messages'
         
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        get_send_scheduler().acquire(phone_number_id)
+        response = get_http_client().post(url, headers=headers, json=payload, timeout=30)
         response_data = response.json()
         
         if response.status_code == 200:
@@ -62,7 +64,10 @@ def send_whatsapp_message(self, message_id):
             
             return {'success': True, 'message_id': message.external_id}
         else:
-            error_msg = response_data.get('error', {}).get('message', 'Unknown error')
+            error = response_data.get('error', {})
+            if is_rate_limit_error(error.get('code')):
+                get_send_scheduler().record_rate_limit(phone_number_id)
+            error_msg = error.get('message', 'Unknown error')
             raise self.retry(exc=Exception(error_msg))
             
     except UnifiedMessage.DoesNotExist:
@@ -238,7 +243,7 @@ def sync_whatsapp_templates(account_id):
         business_id = account.external_id
         url = f'https://graph.facebook.com/v18.0/{business_id}/message_templates'
         
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_http_client().get(url, headers=headers, timeout=30)
         data = response.json()
         
         if response.status_code == 200:
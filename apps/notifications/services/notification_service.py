@@ -1,10 +1,22 @@
 """
 Notification service for creating and managing notifications.
+
+Broadcasts are written with one ``bulk_create`` and announced with a single
+channel-layer message per group (``notification.broadcast``, carrying the
+notification id of every recipient), instead of one send per user. Web pushes
+are sent by the ``send_push_notifications`` Celery task from a bounded thread
+pool. Unread counts are served from a cache counter per user that is bumped
+on create and dropped or decremented when notifications are read.
 """
 import logging
-from typing import Optional, List, Dict, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import QuerySet
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
@@ -14,6 +26,35 @@ from ..models import Notification, NotificationPreference, PushSubscription
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+UNREAD_KEY = 'notifications:unread:{user_id}'
+
+# Channel-layer groups for broadcasts; NotificationConsumer joins the ones of its user
+BROADCAST_GROUP = 'notifications_broadcast'
+STORE_GROUP = 'store_{slug}_notifications'
+
+PUSH_TYPE_PREFERENCES = {
+    Notification.NotificationType.MESSAGE: 'push_messages',
+    Notification.NotificationType.ORDER: 'push_orders',
+    Notification.NotificationType.PAYMENT: 'push_payments',
+    Notification.NotificationType.SYSTEM: 'push_system',
+}
+
+
+def get_broadcast_groups(user) -> List[str]:
+    """Broadcast groups a user's notification socket subscribes to."""
+    from apps.stores.models import Store
+
+    slugs = Store.objects.filter(Q(owner=user) | Q(staff=user)).values_list('slug', flat=True).distinct()
+    return [BROADCAST_GROUP] + [STORE_GROUP.format(slug=slug) for slug in slugs]
+
+
+def _enqueue_push(notification_ids: List[str]) -> None:
+    from apps.notifications.tasks import send_push_notifications
+
+    chunk_size = getattr(settings, 'NOTIFICATION_BULK_BATCH_SIZE', 500)
+    for start in range(0, len(notification_ids), chunk_size):
+        send_push_notifications.delay(notification_ids[start:start + chunk_size])
+
 
 class NotificationService:
     """Service for notification operations."""
@@ -43,11 +84,14 @@ class NotificationService:
             related_object_id=related_object_id,
         )
         
+        if user:
+            transaction.on_commit(lambda: self._increment_unread(user.id))
+        
         if send_realtime and user:
             self._send_realtime_notification(notification)
         
         if send_push and user:
-            self._send_push_notification(notification)
+            transaction.on_commit(lambda: _enqueue_push([str(notification.id)]))
         
         return notification
     
@@ -59,24 +103,54 @@ class NotificationService:
         priority: str = Notification.Priority.NORMAL,
         data: Optional[Dict[str, Any]] = None,
         user_ids: Optional[List[int]] = None,
+        store=None,
+        send_push: bool = True,
+        send_realtime: bool = True,
     ) -> List[Notification]:
-        """Create notifications for multiple users."""
+        """
+        Create the same notification for many users.
+        
+        Recipients are ``user_ids``, else the owner and staff of ``store``,
+        else every active user. Rows are bulk inserted; the realtime message
+        and the push task go out once the transaction commits.
+        """
         if user_ids:
             users = User.objects.filter(id__in=user_ids)
+        elif store is not None:
+            users = User.objects.filter(
+                Q(owned_stores=store) | Q(managed_stores=store), is_active=True
+            ).distinct()
         else:
             users = User.objects.filter(is_active=True)
         
-        notifications = []
-        for user in users:
-            notification = self.create_notification(
-                title=title,
-                message=message,
+        batch_size = getattr(settings, 'NOTIFICATION_BULK_BATCH_SIZE', 500)
+        notifications = [
+            Notification(
+                user_id=user_id,
                 notification_type=notification_type,
                 priority=priority,
-                user=user,
-                data=data,
+                title=title,
+                message=message,
+                data=data or {},
             )
-            notifications.append(notification)
+            for user_id in users.values_list('id', flat=True).iterator(chunk_size=batch_size)
+        ]
+        if not notifications:
+            return []
+        
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+            
+            # Recount on next read rather than one INCR per recipient, once the
+            # rows are visible so a read in between cannot cache a stale count
+            unread_keys = [UNREAD_KEY.format(user_id=n.user_id) for n in notifications]
+            transaction.on_commit(lambda: cache.delete_many(unread_keys))
+            
+            group = STORE_GROUP.format(slug=store.slug) if store is not None and not user_ids else BROADCAST_GROUP
+            if send_realtime:
+                transaction.on_commit(lambda: self._send_realtime_broadcast(notifications, group))
+            if send_push:
+                transaction.on_commit(lambda: _enqueue_push([str(n.id) for n in notifications]))
         
         return notifications
     
@@ -99,14 +173,22 @@ class NotificationService:
         return queryset[:limit]
     
     def get_unread_count(self, user: User) -> int:
-        """Get count of unread notifications."""
-        return Notification.objects.filter(user=user, is_read=False).count()
+        """Get count of unread notifications, from the cache counter when present."""
+        key = UNREAD_KEY.format(user_id=user.id)
+        count = cache.get(key)
+        if count is None:
+            count = Notification.objects.filter(user=user, is_read=False).count()
+            cache.add(key, count, getattr(settings, 'NOTIFICATION_UNREAD_TTL', 300))
+        return max(int(count), 0)
     
     def mark_as_read(self, notification_id: str, user: User) -> Optional[Notification]:
         """Mark a notification as read."""
         try:
             notification = Notification.objects.get(id=notification_id, user=user)
+            was_unread = not notification.is_read
             notification.mark_as_read()
+            if was_unread:
+                self._decrement_unread(user.id)
             return notification
         except Notification.DoesNotExist:
             return None
@@ -117,6 +199,7 @@ class NotificationService:
             is_read=True,
             read_at=timezone.now()
         )
+        cache.delete(UNREAD_KEY.format(user_id=user.id))
         return count
     
     def delete_notification(self, notification_id: str, user: User) -> bool:
@@ -124,6 +207,8 @@ class NotificationService:
         try:
             notification = Notification.objects.get(id=notification_id, user=user)
             notification.delete()
+            if not notification.is_read:
+                self._decrement_unread(user.id)
             return True
         except Notification.DoesNotExist:
             return False
@@ -131,7 +216,10 @@ class NotificationService:
     def delete_old_notifications(self, days: int = 30) -> int:
         """Delete notifications older than specified days."""
         cutoff_date = timezone.now() - timezone.timedelta(days=days)
-        count, _ = Notification.objects.filter(created_at__lt=cutoff_date).delete()
+        old = Notification.objects.filter(created_at__lt=cutoff_date)
+        user_ids = set(old.filter(is_read=False, user__isnull=False).values_list('user_id', flat=True))
+        count, _ = old.delete()
+        cache.delete_many([UNREAD_KEY.format(user_id=user_id) for user_id in user_ids])
         return count
     
     def get_or_create_preferences(self, user: User) -> NotificationPreference:
@@ -212,41 +300,100 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error sending realtime notification: {e}")
     
-    def _send_push_notification(self, notification: Notification):
-        """Send push notification to user's devices."""
-        if not notification.user:
-            return
-        
+    def _send_realtime_broadcast(self, notifications: List[Notification], group: str):
+        """Announce a broadcast with one message; each socket picks its own notification id."""
+        first = notifications[0]
         try:
-            preferences = self.get_or_create_preferences(notification.user)
-            
-            if not preferences.push_enabled:
-                return
-            
-            type_enabled = {
-                Notification.NotificationType.MESSAGE: preferences.push_messages,
-                Notification.NotificationType.ORDER: preferences.push_orders,
-                Notification.NotificationType.PAYMENT: preferences.push_payments,
-                Notification.NotificationType.SYSTEM: preferences.push_system,
-            }
-            
-            if not type_enabled.get(notification.notification_type, True):
+            channel_layer = get_channel_layer()
+            if not channel_layer:
                 return
-            
-            subscriptions = PushSubscription.objects.filter(
-                user=notification.user,
-                is_active=True
+            async_to_sync(channel_layer.group_send)(
+                group,
+                {
+                    "type": "notification.broadcast",
+                    "notification": {
+                        "type": first.notification_type,
+                        "notification_type": first.notification_type,
+                        "priority": first.priority,
+                        "title": first.title,
+                        "message": first.message,
+                        "data": first.data,
+                        "created_at": first.created_at.isoformat(),
+                    },
+                    "ids": {str(n.user_id): str(n.id) for n in notifications},
+                }
+            )
+            Notification.objects.filter(id__in=[n.id for n in notifications]).update(
+                is_sent=True,
+                sent_at=timezone.now(),
             )
-            
-            for subscription in subscriptions:
-                self._send_web_push(subscription, notification)
-            
-            notification.push_sent = True
-            notification.push_sent_at = timezone.now()
-            notification.save(update_fields=['push_sent', 'push_sent_at'])
-            
         except Exception as e:
-            logger.error(f"Error sending push notification: {e}")
+            logger.error(f"Error sending realtime broadcast to {group}: {e}")
+    
+    def send_push_notifications(self, notification_ids: Iterable[str]) -> int:
+        """
+        Send web pushes for notifications to their users' devices.
+        
+        Preferences and subscriptions are loaded in bulk and the pushes run on
+        at most ``NOTIFICATION_PUSH_WORKERS`` threads. Returns the number of
+        notifications pushed.
+        """
+        notifications = list(Notification.objects.filter(
+            id__in=list(notification_ids),
+            user__isnull=False,
+            push_sent=False,
+        ))
+        if not notifications:
+            return 0
+        
+        user_ids = {n.user_id for n in notifications}
+        preferences = {
+            p.user_id: p for p in NotificationPreference.objects.filter(user_id__in=user_ids)
+        }
+        subscriptions = defaultdict(list)
+        for subscription in PushSubscription.objects.filter(user_id__in=user_ids, is_active=True):
+            subscriptions[subscription.user_id].append(subscription)
+        
+        pushed = []
+        jobs = []
+        for notification in notifications:
+            # Users without saved preferences get the defaults, which allow everything
+            preference = preferences.get(notification.user_id)
+            if preference is not None:
+                field = PUSH_TYPE_PREFERENCES.get(notification.notification_type)
+                if not preference.push_enabled or (field and not getattr(preference, field)):
+                    continue
+            pushed.append(notification.id)
+            jobs.extend((subscription, notification) for subscription in subscriptions[notification.user_id])
+        
+        def send(job):
+            try:
+                self._send_web_push(*job)
+            except Exception as e:
+                logger.error(f"Error sending push notification: {e}")
+        
+        if jobs:
+            workers = min(getattr(settings, 'NOTIFICATION_PUSH_WORKERS', 8), len(jobs))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(send, jobs))
+        
+        Notification.objects.filter(id__in=pushed).update(push_sent=True, push_sent_at=timezone.now())
+        return len(pushed)
+    
+    def _increment_unread(self, user_id) -> None:
+        try:
+            cache.incr(UNREAD_KEY.format(user_id=user_id))
+        except ValueError:
+            # Not cached; the next read counts from the database
+            pass
+    
+    def _decrement_unread(self, user_id) -> None:
+        key = UNREAD_KEY.format(user_id=user_id)
+        try:
+            if cache.decr(key) < 0:
+                cache.delete(key)
+        except ValueError:
+            pass
     
     def _send_web_push(self, subscription: PushSubscription, notification: Notification):
         """Send web push notification."""
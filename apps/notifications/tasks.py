@@ -0,0 +1,21 @@
+"""
+Celery tasks for Notifications app.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='apps.notifications.tasks.send_push_notifications', acks_late=True, reject_on_worker_lost=True)
+def send_push_notifications(notification_ids):
+    """
+    Send web pushes for a batch of notifications.
+    Queued after the notifications commit; rows already marked ``push_sent``
+    are skipped, so a redelivered task does not push twice.
+    """
+    from apps.notifications.services import NotificationService
+
+    pushed = NotificationService().send_push_notifications(notification_ids)
+    logger.info(f"Pushed {pushed} of {len(notification_ids)} notifications")
+    return {'pushed': pushed}
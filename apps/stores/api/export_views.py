@@ -7,13 +7,15 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from django.http import HttpResponse
 from django.db.models import Sum, Count, Avg, F, Q
-from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.core.services.exports import EXPORT_FORMATS, start_export_job
+from apps.core.services.time_buckets import TimeBucketAggregator
+
 from ..models import Store, StoreOrder, StoreProduct, StoreCustomer
 from .views import IsStoreOwnerOrStaff
 
@@ -65,7 +67,7 @@ class BaseExportView(APIView):
 
 
 class OrdersExportView(BaseExportView):
-    """Export orders as CSV."""
+    """Export orders as CSV (GET) or enqueue an asynchronous export job (POST)."""
     
     def get(self, request):
         store = self.get_store(request)
@@ -116,6 +118,30 @@ class OrdersExportView(BaseExportView):
         response = HttpResponse(output.read(), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="pedidos_{store.slug}_{start_date}_{end_date}.csv"'
         return response
+    
+    def post(self, request):
+        """Enqueue the same export as a background job; progress arrives over the WebSocket."""
+        store = self.get_store(request)
+        if not store:
+            return Response({'error': 'Store parameter required'}, status=400)
+        
+        export_format = request.data.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+        
+        start_date, end_date = self.get_date_range(request)
+        report = start_export_job('store_orders', {
+            'store_id': store.id,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        }, export_format, request.user)
+        
+        return Response({
+            'id': str(report.id),
+            'status': report.status,
+            'progress': report.progress,
+            'download_url': f'/api/v1/export/jobs/{report.id}/download/',
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class RevenueReportView(BaseExportView):
@@ -136,24 +162,15 @@ class RevenueReportView(BaseExportView):
             payment_status='paid'
         )
         
-        # Aggregation function based on group_by
-        if group_by == 'week':
-            trunc_func = TruncWeek('created_at')
-        elif group_by == 'month':
-            trunc_func = TruncMonth('created_at')
-        else:
-            trunc_func = TruncDate('created_at')
-        
-        # Revenue by period
-        revenue_data = orders.annotate(
-            period=trunc_func
-        ).values('period').annotate(
-            total_revenue=Sum('total'),
-            order_count=Count('id'),
-            avg_order_value=Avg('total'),
-            total_delivery_fees=Sum('delivery_fee'),
-            total_discounts=Sum('discount')
-        ).order_by('period')
+        # Revenue by period (one grouped query, empty periods zero-filled)
+        window = TimeBucketAggregator(start_date, end_date, granularity=group_by)
+        revenue_data = window.series(orders, 'created_at', {
+            'total_revenue': Sum('total'),
+            'order_count': Count('id'),
+            'avg_order_value': Avg('total'),
+            'total_delivery_fees': Sum('delivery_fee'),
+            'total_discounts': Sum('discount'),
+        }, key='period')
         
         # Summary
         summary = orders.aggregate(
@@ -179,7 +196,7 @@ class RevenueReportView(BaseExportView):
             },
             'data': [
                 {
-                    'period': item['period'].isoformat() if item['period'] else None,
+                    'period': item['period'],
                     'total_revenue': float(item['total_revenue'] or 0),
                     'order_count': item['order_count'],
                     'avg_order_value': float(item['avg_order_value'] or 0),
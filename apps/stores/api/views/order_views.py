@@ -10,7 +10,7 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
 from datetime import timedelta
-from asgiref.sync import async_to_sync
+from apps.core.realtime import publish_to_group
 from channels.layers import get_channel_layer
 
 from apps.stores.models import Store, StoreOrder, StoreOrderItem, StoreCustomer
@@ -115,7 +115,7 @@ class StoreOrderViewSet(viewsets.ModelViewSet):
         try:
             channel_layer = get_channel_layer()
             if channel_layer:
-                async_to_sync(channel_layer.group_send)(
+                publish_to_group(
                     f"store_{order.store.slug}_orders",
                     {
                         'type': event_type,
@@ -124,7 +124,8 @@ class StoreOrderViewSet(viewsets.ModelViewSet):
                         'status': order.status,
                         'payment_status': order.payment_status,
                         'updated_at': order.updated_at.isoformat(),
-                    }
+                    },
+                    channel_layer=channel_layer
                 )
                 logger.info(f"WebSocket notification sent: {event_type} for order {order.order_number}")
         except Exception as e:
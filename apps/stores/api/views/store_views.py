@@ -171,3 +171,15 @@ class StoreWebhookViewSet(viewsets.ModelViewSet):
         webhook = self.get_object()
         result = webhook_service.test_webhook(webhook)
         return Response(result)
+    
+    @action(detail=True, methods=['get'])
+    def deliveries(self, request, pk=None):
+        """Delivery attempts, failures and latency over the last 24 hours."""
+        webhook = self.get_object()
+        return Response({
+            'total_calls': webhook.total_calls,
+            'successful_calls': webhook.successful_calls,
+            'failed_calls': webhook.failed_calls,
+            'last_error': webhook.last_error,
+            'endpoints': webhook_service.delivery_metrics(webhook),
+        })
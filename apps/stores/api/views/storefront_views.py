@@ -11,18 +11,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch
+from django.http import Http404
+from django.utils.http import parse_etags
 
 from apps.stores.models import (
-    Store, StoreProduct, StoreCategory, StoreCart, StoreCartItem,
-    StoreCombo, StoreProductType, StoreCoupon, StoreDeliveryZone,
+    Store, StoreProduct, StoreCart, StoreCartItem,
+    StoreCombo, StoreCoupon, StoreDeliveryZone,
     StoreWishlist
 )
-from apps.stores.services import cart_service, checkout_service, here_maps_service
+from apps.stores.services import cart_service, catalog_service, checkout_service, here_maps_service
 from ..serializers import (
-    StoreSerializer, StoreCategorySerializer, StoreProductSerializer,
-    StoreCartSerializer, StoreCartItemSerializer, StoreComboSerializer,
-    StoreProductTypeSerializer, StoreWishlistSerializer, WishlistAddRemoveSerializer
+    StoreSerializer, StoreProductSerializer,
+    StoreCartSerializer, StoreCartItemSerializer,
+    StoreWishlistSerializer, WishlistAddRemoveSerializer
 )
 
 logger = logging.getLogger(__name__)
@@ -40,64 +41,33 @@ class StorePublicView(APIView):
 
 
 class StoreCatalogView(APIView):
-    """Public catalog endpoint for a store."""
+    """
+    Public catalog endpoint for a store.
+
+    Served from the precomputed catalog document (see ``catalog_service``)
+    with an ETag, so unchanged catalogs cost no queries and revalidate with
+    ``304 Not Modified``.
+    """
     permission_classes = [permissions.AllowAny]
     
     def get(self, request, store_slug):
         """Get store catalog with categories, products, and combos."""
-        store = get_object_or_404(Store, slug=store_slug, status='active')
-        
-        # Get all active products for the store
-        products = StoreProduct.objects.filter(
-            store=store, status='active'
-        ).order_by('sort_order', 'name')
-        
-        # Get featured products
-        featured_products = products.filter(featured=True)
-        
-        # Get active categories with their products
-        categories = StoreCategory.objects.filter(
-            store=store, is_active=True
-        ).prefetch_related(
-            Prefetch(
-                'products',
-                queryset=StoreProduct.objects.filter(status='active').order_by('sort_order', 'name')
-            )
-        ).order_by('sort_order', 'name')
-        
-        # Build products_by_category
-        products_by_category = []
-        for category in categories:
-            category_products = products.filter(category=category)
-            if category_products.exists():
-                products_by_category.append({
-                    'category': StoreCategorySerializer(category).data,
-                    'products': StoreProductSerializer(category_products, many=True).data
-                })
-        
-        # Get combos
-        combos = StoreCombo.objects.filter(
-            store=store, is_active=True
-        ).prefetch_related('items__product').order_by('sort_order', 'name')
-        
-        # Get featured combos (combos_destaque)
-        combos_destaque = combos.filter(featured=True)
-        
-        # Get product types
-        product_types = StoreProductType.objects.filter(
-            store=store, is_active=True
-        ).order_by('sort_order', 'name')
-        
-        return Response({
-            'store': StoreSerializer(store).data,
-            'categories': StoreCategorySerializer(categories, many=True).data,
-            'products': StoreProductSerializer(products, many=True).data,
-            'featured_products': StoreProductSerializer(featured_products, many=True).data,
-            'combos': StoreComboSerializer(combos, many=True).data,
-            'combos_destaque': StoreComboSerializer(combos_destaque, many=True).data,
-            'product_types': StoreProductTypeSerializer(product_types, many=True).data,
-            'products_by_category': products_by_category,
-        })
+        cached = catalog_service.get_catalog(store_slug)
+        if cached is None:
+            raise Http404('Store not found')
+        document, digest = cached
+        
+        # Opening hours depend on the clock, not on the catalog version
+        store_data = document['store']
+        is_open = Store(operating_hours=store_data.get('operating_hours') or {}).is_open()
+        etag = f'"{digest}-{int(is_open)}"'
+        
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        return Response({**document, 'store': {**store_data, 'is_open': is_open}}, headers=headers)
 
 
 class StoreCartViewSet(viewsets.ViewSet):
@@ -162,7 +132,6 @@ class StoreCartViewSet(viewsets.ViewSet):
             if combo_id:
                 # Add combo to cart
                 customizations = request.data.get('customizations', {})
-                from apps.stores.models import StoreCombo
                 combo = StoreCombo.objects.get(id=combo_id, store=store, is_active=True)
                 cart_service.add_combo(cart, combo, quantity, customizations, notes)
             else:
@@ -182,11 +182,11 @@ class MercadoPagoWebhookView(APIView):
         """Send WebSocket notification for order update."""
         try:
             from channels.layers import get_channel_layer
-            from asgiref.sync import async_to_sync
+            from apps.core.realtime import publish_to_group
             
             channel_layer = get_channel_layer()
             if channel_layer:
-                async_to_sync(channel_layer.group_send)(
+                publish_to_group(
                     f"store_{order.store.slug}_orders",
                     {
                         'type': 'order_update',
@@ -195,7 +195,8 @@ class MercadoPagoWebhookView(APIView):
                         'status': order.status,
                         'payment_status': order.payment_status,
                         'updated_at': order.updated_at.isoformat(),
-                    }
+                    },
+                    channel_layer=channel_layer
                 )
         except Exception as e:
             logger.warning(f"Failed to send WebSocket notification: {e}")
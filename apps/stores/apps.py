@@ -1,4 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
+
+# Models whose changes alter the public catalog document
+CATALOG_MODELS = (
+    'stores.Store',
+    'stores.StoreProduct',
+    'stores.StoreProductVariant',
+    'stores.StoreCategory',
+    'stores.StoreCombo',
+    'stores.StoreComboItem',
+    'stores.StoreProductType',
+)
 
 
 class StoresConfig(AppConfig):
@@ -7,4 +19,27 @@ class StoresConfig(AppConfig):
     verbose_name = 'Stores'
 
     def ready(self):
-        pass
+        from apps.core.services.tenant_resolver import invalidate_tenant_cache
+        from .services.catalog_service import invalidate_store_catalog
+
+        for model in CATALOG_MODELS:
+            post_save.connect(
+                invalidate_store_catalog,
+                sender=model,
+                dispatch_uid=f'store_catalog_save_{model}',
+            )
+            post_delete.connect(
+                invalidate_store_catalog,
+                sender=model,
+                dispatch_uid=f'store_catalog_delete_{model}',
+            )
+        post_save.connect(
+            invalidate_tenant_cache,
+            sender='stores.Store',
+            dispatch_uid='store_tenant_cache_save',
+        )
+        post_delete.connect(
+            invalidate_tenant_cache,
+            sender='stores.Store',
+            dispatch_uid='store_tenant_cache_delete',
+        )
@@ -0,0 +1,119 @@
+"""
+Management command to benchmark concurrent checkouts.
+
+Creates a throwaway store whose carts all share the same products (the
+lunch-rush worst case for row locks), checks them out concurrently through
+``CheckoutService.create_order`` and reports latency, throughput and whether
+stock stayed consistent. Everything it creates is deleted afterwards.
+
+Run it against PostgreSQL; SQLite serializes writers and will mostly report
+"database is locked".
+"""
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.stores.models import Store, StoreCart, StoreCartItem, StoreOrder, StoreProduct
+from apps.stores.services.checkout_service import CheckoutService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent checkouts of multi-line carts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carts', type=int, default=40, help='Number of carts to check out')
+        parser.add_argument('--lines', type=int, default=50, help='Cart lines (distinct products) per cart')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent checkouts')
+        parser.add_argument('--stock', type=int, default=None,
+                            help='Initial stock per product (default: enough for every cart)')
+
+    def handle(self, *args, **options):
+        carts_count = options['carts']
+        lines = options['lines']
+        workers = options['workers']
+        stock = options['stock'] if options['stock'] is not None else carts_count
+
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite serializes writers; results are not representative.'))
+
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        store = Store.objects.create(
+            name=f'Benchmark {suffix}',
+            slug=f'benchmark-{suffix}',
+            status=Store.StoreStatus.ACTIVE,
+            owner=owner,
+        )
+
+        try:
+            products = StoreProduct.objects.bulk_create([
+                StoreProduct(
+                    store=store,
+                    name=f'Produto {i}',
+                    slug=f'produto-{i}',
+                    price=Decimal('10.00'),
+                    track_stock=True,
+                    stock_quantity=stock,
+                )
+                for i in range(lines)
+            ])
+            carts = [StoreCart.objects.create(store=store, session_key=f'bench-{suffix}-{i}') for i in range(carts_count)]
+            StoreCartItem.objects.bulk_create([
+                StoreCartItem(cart=cart, product=product, quantity=1)
+                for cart in carts
+                for product in products
+            ])
+
+            customer = {'name': 'Benchmark', 'email': 'bench@example.com', 'phone': '63999999999'}
+
+            def checkout(cart):
+                started = time.perf_counter()
+                try:
+                    CheckoutService.create_order(cart, customer)
+                    return True, time.perf_counter() - started
+                except Exception:
+                    return False, time.perf_counter() - started
+                finally:
+                    connection.close()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(checkout, carts))
+            elapsed = time.perf_counter() - started
+
+            self._report(results, elapsed, store, stock, lines)
+        finally:
+            StoreOrder.objects.filter(store=store).delete()
+            store.delete()
+            owner.delete()
+
+    def _report(self, results, elapsed, store, stock, lines):
+        latencies = sorted(duration * 1000 for ok, duration in results if ok)
+        succeeded = len(latencies)
+        failed = len(results) - succeeded
+
+        self.stdout.write(f'Checkouts: {succeeded} ok, {failed} failed, {lines} lines each')
+        self.stdout.write(f'Wall time: {elapsed:.2f}s ({succeeded / elapsed:.1f} checkouts/s)')
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f'Latency ms: p50={statistics.median(latencies):.1f} '
+                f'p95={p95:.1f} max={latencies[-1]:.1f}'
+            )
+
+        expected = stock - succeeded
+        remaining = set(
+            StoreProduct.objects.filter(store=store).values_list('stock_quantity', flat=True)
+        )
+        if remaining == {expected} and expected >= 0:
+            self.stdout.write(self.style.SUCCESS(f'Stock consistent: {expected} left per product'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Stock mismatch: expected {expected}, found {sorted(remaining)}'))
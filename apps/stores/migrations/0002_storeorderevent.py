@@ -0,0 +1,62 @@
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stores", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoreOrderEvent",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(db_index=True, default=True)),
+                ("event_type", models.CharField(default="status_changed", max_length=50)),
+                ("old_status", models.CharField(blank=True, max_length=20)),
+                ("new_status", models.CharField(blank=True, max_length=20)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("channels", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(blank=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="stores.storeorder",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Store Order Event",
+                "verbose_name_plural": "Store Order Events",
+                "db_table": "store_order_events",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(fields=["status", "next_attempt_at"], name="store_order_status_cac037_idx"),
+                ],
+            },
+        ),
+    ]
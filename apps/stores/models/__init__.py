@@ -22,7 +22,7 @@ from .product import (
 from .customer import StoreCustomer
 
 # Order models
-from .order import StoreOrder, StoreOrderItem, StoreOrderComboItem
+from .order import StoreOrder, StoreOrderItem, StoreOrderComboItem, StoreOrderEvent
 
 # Cart models
 from .cart import StoreCart, StoreCartItem, StoreCartComboItem
@@ -62,6 +62,7 @@ __all__ = [
     'StoreOrder',
     'StoreOrderItem',
     'StoreOrderComboItem',
+    'StoreOrderEvent',
     # Cart
     'StoreCart',
     'StoreCartItem',
@@ -412,20 +412,16 @@ class StoreWebhook(BaseModel):
         return f"{self.store.name} - {self.name}"
 
     def record_call(self, success: bool, error: str = ''):
-        """Record a webhook call result."""
-        self.total_calls += 1
-        self.last_called_at = timezone.now()
-
+        """Record a webhook call result; counters are incremented in the database."""
+        now = timezone.now()
+        update = {
+            'total_calls': models.F('total_calls') + 1,
+            'last_called_at': now,
+            'updated_at': now,
+        }
         if success:
-            self.successful_calls += 1
-            self.last_success_at = timezone.now()
+            update.update(successful_calls=models.F('successful_calls') + 1, last_success_at=now)
         else:
-            self.failed_calls += 1
-            self.last_failure_at = timezone.now()
-            self.last_error = error
-
-        self.save(update_fields=[
-            'total_calls', 'successful_calls', 'failed_calls',
-            'last_called_at', 'last_success_at', 'last_failure_at',
-            'last_error', 'updated_at'
-        ])
+            update.update(failed_calls=models.F('failed_calls') + 1, last_failure_at=now, last_error=error)
+
+        StoreWebhook.objects.filter(pk=self.pk).update(**update)
@@ -4,7 +4,7 @@ Store order models - StoreOrder, StoreOrderItem, StoreOrderComboItem.
 import uuid
 import logging
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from apps.core.models import BaseModel
@@ -189,44 +189,55 @@ class StoreOrder(BaseModel):
         elif new_status == self.OrderStatus.CANCELLED:
             self.cancelled_at = timezone.now()
 
-        self.save()
+        with transaction.atomic():
+            self.save()
 
-        if notify:
-            self.send_status_webhook(old_status, new_status)
-            self._trigger_status_email_automation(new_status)
-            self._trigger_status_whatsapp_notification(new_status)
+            if notify:
+                # Fanned out to webhooks, email and WhatsApp after commit
+                from apps.stores.services.order_events import (
+                    CHANNEL_EMAIL, CHANNEL_WEBHOOK, CHANNEL_WHATSAPP, record_order_event,
+                )
+
+                email_trigger, email_context = self.status_email_trigger(new_status)
+                record_order_event(
+                    self,
+                    old_status,
+                    new_status,
+                    channels=[CHANNEL_WEBHOOK, CHANNEL_EMAIL, CHANNEL_WHATSAPP],
+                    email_trigger=email_trigger,
+                    email_context=email_context,
+                )
 
         return self
 
-    def _trigger_status_email_automation(self, new_status: str):
-        """Trigger email automation based on status change."""
-        try:
-            from apps.stores.services.checkout_service import trigger_order_email_automation
-
-            status_trigger_map = {
-                self.OrderStatus.CONFIRMED: 'order_confirmed',
-                self.OrderStatus.PAID: 'payment_confirmed',
-                self.OrderStatus.SHIPPED: 'order_shipped',
-                self.OrderStatus.OUT_FOR_DELIVERY: 'order_shipped',
-                self.OrderStatus.DELIVERED: 'order_delivered',
-                self.OrderStatus.CANCELLED: 'order_cancelled',
-            }
+    def status_email_trigger(self, new_status: str):
+        """Email automation trigger and extra context for a status, or ``(None, {})``."""
+        status_trigger_map = {
+            self.OrderStatus.CONFIRMED: 'order_confirmed',
+            self.OrderStatus.PAID: 'payment_confirmed',
+            self.OrderStatus.SHIPPED: 'order_shipped',
+            self.OrderStatus.OUT_FOR_DELIVERY: 'order_shipped',
+            self.OrderStatus.DELIVERED: 'order_delivered',
+            self.OrderStatus.CANCELLED: 'order_cancelled',
+        }
 
-            trigger_type = status_trigger_map.get(new_status)
-            if trigger_type:
-                extra_context = {}
-                if new_status in [self.OrderStatus.SHIPPED, self.OrderStatus.OUT_FOR_DELIVERY]:
-                    extra_context = {
-                        'tracking_code': self.tracking_code or '',
-                        'tracking_url': self.tracking_url or '',
-                        'carrier': self.carrier or '',
-                    }
-                trigger_order_email_automation(self, trigger_type, extra_context)
-        except Exception as e:
-            logger.error(f"Failed to trigger email automation for order {self.order_number}: {e}")
+        trigger_type = status_trigger_map.get(new_status)
+        extra_context = {}
+        if trigger_type and new_status in [self.OrderStatus.SHIPPED, self.OrderStatus.OUT_FOR_DELIVERY]:
+            extra_context = {
+                'tracking_code': self.tracking_code or '',
+                'tracking_url': self.tracking_url or '',
+                'carrier': self.carrier or '',
+            }
+        return trigger_type, extra_context
 
     def _trigger_status_whatsapp_notification(self, new_status: str):
-        """Trigger WhatsApp notification based on status change."""
+        """
+        Trigger WhatsApp notification based on status change.
+
+        Send errors propagate so the order event dispatcher can retry; a sent
+        notification is recorded in ``metadata`` and never sent twice.
+        """
         if not self.customer_phone:
             return
 
@@ -248,79 +259,72 @@ class StoreOrder(BaseModel):
         if self.metadata.get(notification_key):
             return
 
-        try:
-            message_text = message_template.format(
-                customer_name=self.customer_name or 'Cliente',
-                order_number=self.order_number,
-            )
+        message_text = message_template.format(
+            customer_name=self.customer_name or 'Cliente',
+            order_number=self.order_number,
+        )
 
-            phone = self._normalize_phone_number(self.customer_phone)
-            if not phone:
-                logger.warning(
-                    f"Invalid phone number for WhatsApp notification (order {self.order_number})"
-                )
-                return
-
-            from apps.whatsapp.services import MessageService
-
-            # Use the new centralized method to get WhatsApp account
-            account = None
-            if self.store:
-                account = self.store.get_whatsapp_account()
-            
-            # Fallback to default account only if no store-linked account found
-            if not account:
-                account = get_default_whatsapp_account(create_if_missing=False)
-
-            if not account:
-                logger.warning(f"No WhatsApp account found to notify order {self.order_number}")
-                return
-            if not account.phone_number_id:
-                logger.warning(
-                    f"WhatsApp account {account.id} missing phone_number_id for order {self.order_number}"
-                )
-                return
-
-            message_service = MessageService()
-            message_service.send_text_message(
-                account_id=str(account.id),
-                to=phone,
-                text=message_text,
-                metadata={
-                    'source': 'store_order_notification',
-                    'order_id': str(self.id),
-                    'customer_name': self.customer_name or ''
-                }
+        phone = self._normalize_phone_number(self.customer_phone)
+        if not phone:
+            logger.warning(
+                f"Invalid phone number for WhatsApp notification (order {self.order_number})"
             )
+            return
 
-            self.metadata[notification_key] = timezone.now().isoformat()
-            self.save(update_fields=['metadata'])
+        from apps.whatsapp.services import MessageService
 
-        except Exception as e:
-            logger.error(f"Failed to send WhatsApp notification for order {self.order_number}: {e}")
+        # Use the new centralized method to get WhatsApp account
+        account = None
+        if self.store:
+            account = self.store.get_whatsapp_account()
+        
+        # Fallback to default account only if no store-linked account found
+        if not account:
+            account = get_default_whatsapp_account(create_if_missing=False)
 
-    def send_status_webhook(self, old_status: str, new_status: str):
-        """Send webhook notification for status change."""
-        try:
-            from apps.stores.services import webhook_service
+        if not account:
+            logger.warning(f"No WhatsApp account found to notify order {self.order_number}")
+            return
+        if not account.phone_number_id:
+            logger.warning(
+                f"WhatsApp account {account.id} missing phone_number_id for order {self.order_number}"
+            )
+            return
 
-            event_map = {
-                self.OrderStatus.CONFIRMED: 'order.updated',
-                self.OrderStatus.PAID: 'order.paid',
-                self.OrderStatus.SHIPPED: 'order.shipped',
-                self.OrderStatus.DELIVERED: 'order.delivered',
-                self.OrderStatus.CANCELLED: 'order.cancelled',
+        message_service = MessageService()
+        message_service.send_text_message(
+            account_id=str(account.id),
+            to=phone,
+            text=message_text,
+            metadata={
+                'source': 'store_order_notification',
+                'order_id': str(self.id),
+                'customer_name': self.customer_name or ''
             }
+        )
 
-            event = event_map.get(new_status, 'order.updated')
-            webhook_service.trigger_webhooks(self.store, event, {
-                'order_id': str(self.id),
-                'order_number': self.order_number,
-                'old_status': old_status,
-                'new_status': new_status,
-            })
-        except Exception as e:
-            logger.error(f"Failed to send webhook for order {self.order_number}: {e}")
+        self.metadata[notification_key] = timezone.now().isoformat()
+        self.save(update_fields=['metadata'])
+
+    def send_status_webhook(self, old_status: str, new_status: str, idempotency_key: str = None):
+        """Queue the store webhooks for a status change."""
+        from apps.stores.services import webhook_service
+
+        event_map = {
+            self.OrderStatus.CONFIRMED: 'order.updated',
+            self.OrderStatus.PAID: 'order.paid',
+            self.OrderStatus.SHIPPED: 'order.shipped',
+            self.OrderStatus.DELIVERED: 'order.delivered',
+            self.OrderStatus.CANCELLED: 'order.cancelled',
+        }
+
+        event = event_map.get(new_status, 'order.updated')
+        webhook_service.trigger_webhooks(self.store, event, {
+            'order_id': str(self.id),
+            'order_number': self.order_number,
+            'old_status': old_status,
+            'new_status': new_status,
+        }, idempotency_key=idempotency_key)
 
     def _normalize_phone_number(self, raw_phone: str) -> str:
         """Ensure the phone number is digits-only and has the Brazil prefix."""
@@ -423,3 +427,53 @@ class StoreOrderComboItem(models.Model):
     def save(self, *args, **kwargs):
         self.subtotal = self.unit_price * self.quantity
         super().save(*args, **kwargs)
+
+
+class StoreOrderEvent(BaseModel):
+    """
+    Outbox row for the side effects of an order status change.
+
+    Written in the same transaction as the status change and fanned out to
+    each channel (email, WhatsApp, store webhooks, Meta CAPI) after commit by
+    ``apps.stores.services.order_events``.
+    """
+
+    class EventStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    order = models.ForeignKey(
+        StoreOrder,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    event_type = models.CharField(max_length=50, default='status_changed')
+    old_status = models.CharField(max_length=20, blank=True)
+    new_status = models.CharField(max_length=20, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    # Channel name -> 'pending' | 'done' | 'failed'
+    channels = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=EventStatus.choices,
+        default=EventStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'store_order_events'
+        verbose_name = 'Store Order Event'
+        verbose_name_plural = 'Store Order Events'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} {self.old_status} -> {self.new_status} ({self.status})"
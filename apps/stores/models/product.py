@@ -196,6 +196,9 @@ class StoreProduct(BaseModel):
             )
             self.refresh_from_db()
 
+            from apps.stores.services.catalog_service import catalog_service
+            catalog_service.invalidate_on_commit(self.store_id)
+
 
 class StoreProductVariant(models.Model):
     """Product variants (size, color, etc.)"""
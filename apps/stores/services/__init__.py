@@ -1,6 +1,7 @@
 from .webhook_service import webhook_service
 from .store_service import store_service
 from .cart_service import cart_service, CartService
+from .catalog_service import catalog_service, CatalogService
 from .checkout_service import checkout_service, CheckoutService
 from .here_maps_service import here_maps_service, HereMapsService
 from .payment_service import PaymentService, get_payment_service
@@ -11,6 +12,8 @@ __all__ = [
     'store_service',
     'cart_service',
     'CartService',
+    'catalog_service',
+    'CatalogService',
     'checkout_service',
     'CheckoutService',
     'here_maps_service',
@@ -0,0 +1,191 @@
+"""
+Catalog service - precomputed storefront catalog documents.
+
+The public catalog (``StoreCatalogView``) is rendered once per store and
+catalog version and kept in the shared Django cache (Redis in production):
+
+* ``store_catalog:slug:<slug>`` maps a storefront slug to its store id;
+* ``store_catalog:version:<store_id>`` holds the store's catalog version;
+* ``store_catalog:<store_id>:<version>`` holds the rendered document and its
+  content hash, which is served as the ETag.
+
+Saving or deleting a store, product, variant, category, combo, combo item or
+product type bumps the store's version once the transaction commits (see
+``invalidate_store_catalog``), so a cache hit never touches the database.
+Entries also expire after ``STORE_CATALOG_CACHE_TTL`` seconds to pick up
+bulk updates that bypass model signals.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+SLUG_KEY = 'store_catalog:slug:{slug}'
+VERSION_KEY = 'store_catalog:version:{store_id}'
+DOCUMENT_KEY = 'store_catalog:{store_id}:{version}'
+
+
+class CatalogService:
+    """Build, cache and invalidate storefront catalog documents."""
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, 'STORE_CATALOG_CACHE_TTL', 900)
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def get_version(self, store_id) -> int:
+        """Current catalog version of a store."""
+        key = VERSION_KEY.format(store_id=store_id)
+        version = cache.get(key)
+        if version is None:
+            # Seed from the clock so an evicted counter never reuses the
+            # version of a document that is still cached.
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key) or 0
+        return int(version)
+
+    def invalidate(self, store_id) -> None:
+        """Orphan the cached catalog of a store."""
+        key = VERSION_KEY.format(store_id=store_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"Failed to bump catalog version for store {store_id}: {e}")
+
+    def invalidate_on_commit(self, store_id) -> None:
+        """Bump the catalog version once the current transaction commits."""
+        if store_id:
+            transaction.on_commit(lambda: self.invalidate(store_id))
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def get_catalog(self, store_slug: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Return ``(document, etag)`` for an active store, or ``None``.
+
+        The document is shared between requests; callers must not mutate it.
+        """
+        slug_key = SLUG_KEY.format(slug=store_slug)
+        store_id = cache.get(slug_key)
+        if store_id is not None:
+            entry = cache.get(DOCUMENT_KEY.format(store_id=store_id, version=self.get_version(store_id)))
+            if entry is not None and entry['data']['store'].get('slug') == store_slug:
+                return entry['data'], entry['etag']
+
+        from apps.stores.models import Store
+
+        store = Store.objects.filter(slug=store_slug, status='active').first()
+        if store is None:
+            cache.delete(slug_key)
+            return None
+
+        # Read the version before building so a concurrent change can only
+        # orphan this document, never be hidden by it.
+        version = self.get_version(store.id)
+        data = self.build_catalog(store)
+        etag = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+        cache.set(DOCUMENT_KEY.format(store_id=store.id, version=version), {'data': data, 'etag': etag}, self.ttl)
+        cache.set(slug_key, str(store.id), self.ttl)
+        return data, etag
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def build_catalog(self, store) -> Dict[str, Any]:
+        """Render the catalog document of a store as plain JSON types."""
+        from apps.stores.models import (
+            StoreCategory, StoreCombo, StoreComboItem, StoreProduct, StoreProductType,
+        )
+        from apps.stores.api.serializers import (
+            StoreCategorySerializer, StoreComboSerializer, StoreProductSerializer,
+            StoreProductTypeSerializer, StoreSerializer,
+        )
+
+        products = StoreProduct.objects.filter(
+            store=store, status='active'
+        ).select_related('category', 'product_type').prefetch_related('variants').order_by('sort_order', 'name')
+
+        categories = StoreCategory.objects.filter(
+            store=store, is_active=True
+        ).order_by('sort_order', 'name')
+
+        combos = StoreCombo.objects.filter(
+            store=store, is_active=True
+        ).prefetch_related(
+            Prefetch('items', queryset=StoreComboItem.objects.select_related('product'))
+        ).order_by('sort_order', 'name')
+
+        product_types = StoreProductType.objects.filter(
+            store=store, is_active=True
+        ).order_by('sort_order', 'name')
+
+        products_data = StoreProductSerializer(products, many=True).data
+        categories_data = StoreCategorySerializer(categories, many=True).data
+        combos_data = StoreComboSerializer(combos, many=True).data
+
+        # Group the serialized products once instead of re-querying per category
+        products_by_category_id: Dict[str, list] = {}
+        for product in products_data:
+            if product['category']:
+                products_by_category_id.setdefault(str(product['category']), []).append(product)
+
+        products_by_category = [
+            {'category': category, 'products': products_by_category_id[str(category['id'])]}
+            for category in categories_data
+            if str(category['id']) in products_by_category_id
+        ]
+
+        document = {
+            'store': StoreSerializer(store).data,
+            'categories': categories_data,
+            'products': products_data,
+            'featured_products': [product for product in products_data if product['featured']],
+            'combos': combos_data,
+            'combos_destaque': [combo for combo in combos_data if combo['featured']],
+            'product_types': StoreProductTypeSerializer(product_types, many=True).data,
+            'products_by_category': products_by_category,
+        }
+        # Round-trip through the API encoder so the cached value is plain JSON
+        return json.loads(json.dumps(document, cls=JSONEncoder))
+
+
+def _store_id_for(instance) -> Any:
+    """Store id a catalog-related instance belongs to."""
+    from apps.stores.models import (
+        Store, StoreCombo, StoreComboItem, StoreProduct, StoreProductVariant,
+    )
+
+    if isinstance(instance, Store):
+        return instance.pk
+    if isinstance(instance, StoreProductVariant):
+        return StoreProduct.objects.filter(pk=instance.product_id).values_list('store_id', flat=True).first()
+    if isinstance(instance, StoreComboItem):
+        return StoreCombo.objects.filter(pk=instance.combo_id).values_list('store_id', flat=True).first()
+    return getattr(instance, 'store_id', None)
+
+
+def invalidate_store_catalog(sender, instance, **kwargs) -> None:
+    """Signal receiver: bump the store's catalog version after a change commits."""
+    catalog_service.invalidate_on_commit(_store_id_for(instance))
+
+
+# Singleton instance
+catalog_service = CatalogService()
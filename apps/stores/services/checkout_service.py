@@ -5,9 +5,10 @@ Handles order creation, payment processing, and stock management.
 import logging
 import re
 import uuid
+from collections import defaultdict
 from decimal import Decimal
 from django.db import models, transaction
-from django.db.models import F, Q
+from django.db.models import Case, F, Q, Value, When
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import validate_email
@@ -15,10 +16,13 @@ from django.core.exceptions import ValidationError
 
 from apps.stores.models import (
     Store, StoreCart, StoreOrder, StoreOrderItem,
-    StoreProduct, StoreProductVariant, StoreIntegration,
+    StoreProduct, StoreProductVariant, StoreCombo, StoreIntegration,
     StoreDeliveryZone, StoreCoupon
 )
-from .cart_service import cart_service
+from .catalog_service import catalog_service
+from .order_events import (
+    CHANNEL_CAPI, CHANNEL_EMAIL, CHANNEL_WEBHOOK, CHANNEL_WHATSAPP, record_order_event,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -49,37 +53,42 @@ def _strip_trailing_slash(url: str) -> str:
     return (url or '').rstrip('/')
 
 
+def send_order_email_automation(order: StoreOrder, trigger_type: str, extra_context: dict = None):
+    """Trigger email automation for order events; errors propagate to the caller."""
+    from apps.marketing.services.email_automation_service import email_automation_service
+
+    if not order.customer_email:
+        logger.debug(f"No customer email for order {order.order_number}, skipping automation")
+        return None
+
+    store_id = str(order.store.id) if order.store else None
+    if not store_id:
+        logger.debug(f"No store for order {order.order_number}, skipping automation")
+        return None
+
+    context = {
+        'order_number': order.order_number,
+        'order_total': f'{order.total:.2f}',
+        'order_status': order.status,
+        'delivery_method': order.delivery_method,
+        **(extra_context or {})
+    }
+
+    result = email_automation_service.trigger(
+        store_id=store_id,
+        trigger_type=trigger_type,
+        recipient_email=order.customer_email,
+        recipient_name=order.customer_name or '',
+        context=context
+    )
+    logger.info(f"Email automation triggered for order {order.order_number}: {trigger_type} -> {result}")
+    return result
+
+
 def trigger_order_email_automation(order: StoreOrder, trigger_type: str, extra_context: dict = None):
     """Trigger email automation for order events."""
     try:
-        from apps.marketing.services.email_automation_service import email_automation_service
-        
-        if not order.customer_email:
-            logger.debug(f"No customer email for order {order.order_number}, skipping automation")
-            return
-        
-        store_id = str(order.store.id) if order.store else None
-        if not store_id:
-            logger.debug(f"No store for order {order.order_number}, skipping automation")
-            return
-        
-        context = {
-            'order_number': order.order_number,
-            'order_total': f'{order.total:.2f}',
-            'order_status': order.status,
-            'delivery_method': order.delivery_method,
-            **(extra_context or {})
-        }
-        
-        result = email_automation_service.trigger(
-            store_id=store_id,
-            trigger_type=trigger_type,
-            recipient_email=order.customer_email,
-            recipient_name=order.customer_name or '',
-            context=context
-        )
-        logger.info(f"Email automation triggered for order {order.order_number}: {trigger_type} -> {result}")
-        
+        send_order_email_automation(order, trigger_type, extra_context)
     except Exception as e:
         logger.error(f"Failed to trigger email automation for order {order.order_number}: {e}")
 
@@ -265,11 +274,28 @@ class CheckoutService:
     ) -> StoreOrder:
         """
         Create an order from a cart with atomic stock decrement.
+        
+        Cart lines are fetched (and locked) once. Order items are written with
+        a single ``bulk_create`` and stock is reserved with one conditional
+        ``UPDATE`` per model right before commit, so product rows stay locked
+        only for the tail of the transaction.
         """
         store = cart.store
         
-        # Validate stock
-        stock_errors = cart_service.validate_stock_for_checkout(cart)
+        # Single locked fetch of the cart lines
+        lines = list(
+            cart.items.select_for_update(of=('self',))
+            .select_related('product', 'variant')
+            .order_by('created_at')
+        )
+        combo_lines = list(
+            cart.combo_items.select_for_update(of=('self',))
+            .select_related('combo')
+            .order_by('created_at')
+        )
+        
+        # Fail fast on stock read with the lines; the reservation below is authoritative
+        stock_errors = CheckoutService._stock_errors(lines, combo_lines)
         if stock_errors:
             raise ValueError(f"Erros de estoque: {stock_errors}")
         
@@ -287,11 +313,8 @@ class CheckoutService:
         delivery_fee = Decimal(str(delivery_info['fee']))
         
         # Calculate subtotal
-        subtotal = Decimal('0')
-        for item in cart.items.all():
-            subtotal += item.subtotal
-        for combo_item in cart.combo_items.all():
-            subtotal += combo_item.subtotal
+        subtotal = sum((item.subtotal for item in lines), Decimal('0'))
+        subtotal += sum((combo_item.subtotal for combo_item in combo_lines), Decimal('0'))
         
         # Validate and apply coupon using unified StoreCoupon model
         discount = Decimal('0')
@@ -344,9 +367,9 @@ class CheckoutService:
                     cart.user.last_name = name_parts[1]
                 cart.user.save(update_fields=['first_name', 'last_name'])
         
-        # Create order items and decrement stock
-        for item in cart.items.select_related('product', 'variant').all():
-            StoreOrderItem.objects.create(
+        # Create order items (combos become a single line each)
+        order_items = [
+            StoreOrderItem(
                 order=order,
                 product=item.product,
                 variant=item.variant,
@@ -359,23 +382,10 @@ class CheckoutService:
                 options=item.options,
                 notes=item.notes,
             )
-            
-            # Atomic stock decrement
-            if item.product.track_stock:
-                if item.variant:
-                    StoreProductVariant.objects.filter(id=item.variant.id).update(
-                        stock_quantity=F('stock_quantity') - item.quantity
-                    )
-                else:
-                    StoreProduct.objects.filter(id=item.product.id).update(
-                        stock_quantity=F('stock_quantity') - item.quantity,
-                        sold_count=F('sold_count') + item.quantity
-                    )
-        
-        # Handle combo items
-        for combo_item in cart.combo_items.select_related('combo').all():
-            # Create a single order item for the combo
-            StoreOrderItem.objects.create(
+            for item in lines
+        ]
+        order_items += [
+            StoreOrderItem(
                 order=order,
                 product=None,
                 variant=None,
@@ -388,13 +398,9 @@ class CheckoutService:
                 options=combo_item.customizations,
                 notes=combo_item.notes,
             )
-            
-            # Decrement combo stock if tracked
-            if combo_item.combo.track_stock:
-                from apps.stores.models import StoreCombo
-                StoreCombo.objects.filter(id=combo_item.combo.id).update(
-                    stock_quantity=F('stock_quantity') - combo_item.quantity
-                )
+            for combo_item in combo_lines
+        ]
+        StoreOrderItem.objects.bulk_create(order_items)
         
         # Mark coupon as used (atomic)
         if coupon:
@@ -405,15 +411,139 @@ class CheckoutService:
         cart.is_active = False
         cart.save()
         
+        # Reserve stock last: the conditional UPDATEs take the product row
+        # locks, which are held until commit.
+        CheckoutService._reserve_stock(lines, combo_lines)
+        # Stock moved through bulk updates, which skip the catalog signals
+        catalog_service.invalidate_on_commit(store.id)
+        
         logger.info(f"Order {order.order_number} created for store {store.slug}")
         
         # Trigger order received email automation (NOT confirmed - payment pending)
         # The 'order_confirmed' / 'payment_confirmed' email will ONLY be sent
         # after payment is confirmed via webhook
-        trigger_order_email_automation(order, 'order_received')
+        transaction.on_commit(lambda: trigger_order_email_automation(order, 'order_received'))
         
         return order
     
+    @staticmethod
+    def _stock_errors(lines, combo_lines) -> list:
+        """Stock problems of the cart lines, using the rows fetched with them."""
+        errors = []
+        requested = defaultdict(int)
+        
+        for item in lines:
+            product = item.product
+            if not product.is_in_stock:
+                errors.append({
+                    'item_id': str(item.id),
+                    'product_name': product.name,
+                    'error': 'Produto fora de estoque'
+                })
+                continue
+            if not product.track_stock:
+                continue
+            
+            if item.variant and item.variant.stock_quantity is not None:
+                key, available = ('variant', item.variant_id), item.variant.stock_quantity
+            else:
+                key, available = ('product', item.product_id), product.stock_quantity
+            requested[key] += item.quantity
+            
+            if requested[key] > available:
+                errors.append({
+                    'item_id': str(item.id),
+                    'product_name': product.name,
+                    'error': f'Estoque insuficiente. Disponível: {available}',
+                    'available': available,
+                    'requested': requested[key]
+                })
+        
+        for item in combo_lines:
+            combo = item.combo
+            if not combo.track_stock:
+                continue
+            requested[('combo', item.combo_id)] += item.quantity
+            if requested[('combo', item.combo_id)] > combo.stock_quantity:
+                errors.append({
+                    'item_id': str(item.id),
+                    'combo_name': combo.name,
+                    'error': f'Estoque insuficiente. Disponível: {combo.stock_quantity}',
+                    'available': combo.stock_quantity,
+                    'requested': requested[('combo', item.combo_id)]
+                })
+        
+        return errors
+    
+    @staticmethod
+    def _reserve_stock(lines, combo_lines) -> None:
+        """
+        Decrement stock for the cart lines with one conditional UPDATE per model.
+        
+        Each UPDATE only touches rows that still hold enough stock; if any row
+        is short (a concurrent checkout got there first) a ``ValueError`` is
+        raised and the surrounding transaction rolls back.
+        """
+        products = defaultdict(int)
+        variants = defaultdict(int)
+        combos = defaultdict(int)
+        for item in lines:
+            if not item.product.track_stock:
+                continue
+            if item.variant:
+                if item.variant.stock_quantity is not None:
+                    variants[item.variant_id] += item.quantity
+            else:
+                products[item.product_id] += item.quantity
+        for item in combo_lines:
+            if item.combo.track_stock:
+                combos[item.combo_id] += item.quantity
+        
+        shortages = []
+        for model, quantities, counts_sales in (
+            (StoreProduct, products, True),
+            (StoreProductVariant, variants, False),
+            (StoreCombo, combos, False),
+        ):
+            if not quantities:
+                continue
+            amount = Case(
+                *(When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()),
+                output_field=models.IntegerField(),
+            )
+            updates = {'stock_quantity': F('stock_quantity') - amount}
+            if counts_sales:
+                updates['sold_count'] = F('sold_count') + amount
+            updated = model.objects.filter(
+                pk__in=list(quantities), stock_quantity__gte=amount
+            ).update(**updates)
+            if updated == len(quantities):
+                continue
+            # The UPDATE count decides; the re-read only describes the shortage,
+            # since stock may have changed again since the UPDATE.
+            short = [
+                {
+                    'name': name,
+                    'error': f'Estoque insuficiente. Disponível: {available}',
+                    'available': available,
+                    'requested': quantities[pk],
+                }
+                for pk, name, available in model.objects.filter(pk__in=list(quantities))
+                .values_list('pk', 'name', 'stock_quantity')
+                if available < quantities[pk]
+            ]
+            if len(short) < len(quantities) - updated:
+                short.append({
+                    'name': str(model._meta.verbose_name),
+                    'error': 'Estoque insuficiente',
+                    'available': None,
+                    'requested': None,
+                })
+            shortages += short
+        
+        if shortages:
+            raise ValueError(f"Erros de estoque: {shortages}")
+    
     @staticmethod
     def get_payment_credentials(store: Store) -> dict:
         """Get payment credentials for a store."""
@@ -645,33 +775,31 @@ class CheckoutService:
             order.status = order_status
             order.payment_status = payment_status
             
+            email_trigger = None
             if status == 'approved':
                 order.paid_at = timezone.now()
-                # Trigger payment confirmed email automation
-                trigger_order_email_automation(order, 'payment_confirmed')
+                email_trigger = 'payment_confirmed'
             elif status in ['cancelled', 'rejected', 'refunded']:
                 order.cancelled_at = timezone.now()
                 # Restore stock
                 CheckoutService._restore_stock(order)
-                # Trigger order cancelled email automation
                 if status in ['cancelled', 'rejected']:
-                    trigger_order_email_automation(order, 'order_cancelled')
-            
+                    email_trigger = 'order_cancelled'
+
             order.save()
 
+            # Email, CAPI, WhatsApp and store webhooks run after commit, outside the row lock
+            channels = [CHANNEL_WEBHOOK, CHANNEL_EMAIL, CHANNEL_WHATSAPP]
             if status == 'approved':
-                try:
-                    from apps.stores.services.meta_pixel_service import send_purchase_event
-                    send_purchase_event(order)
-                except Exception as exc:
-                    logger.warning(f"Meta Pixel CAPI failed for {order.order_number}: {exc}")
+                channels.append(CHANNEL_CAPI)
+            record_order_event(
+                order,
+                old_status,
+                order.status,
+                channels=channels,
+                email_trigger=email_trigger,
+            )
 
-            # Trigger WhatsApp notification for status changes
-            try:
-                order._trigger_status_whatsapp_notification(order.status)
-            except Exception as exc:
-                logger.warning(f"WhatsApp notification failed for {order.order_number}: {exc}")
-            
             logger.info(f"Order {order.order_number} status updated: {old_status} -> {order_status}")
         
         return order
@@ -691,6 +819,7 @@ class CheckoutService:
                         stock_quantity=F('stock_quantity') + item.quantity,
                         sold_count=F('sold_count') - item.quantity
                     )
+        catalog_service.invalidate_on_commit(order.store_id)
 
 
 # Singleton instance
@@ -5,6 +5,8 @@ import time
 import requests
 from django.conf import settings
 
+from apps.core.services.http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,6 +68,13 @@ def _build_contents(order):
     return contents, num_items
 
 
+def capi_configured():
+    return bool(
+        getattr(settings, 'META_PIXEL_ID', '').strip()
+        and getattr(settings, 'META_CAPI_ACCESS_TOKEN', '').strip()
+    )
+
+
 def send_purchase_event(order):
     pixel_id = getattr(settings, 'META_PIXEL_ID', '').strip()
     access_token = getattr(settings, 'META_CAPI_ACCESS_TOKEN', '').strip()
@@ -104,7 +113,7 @@ def send_purchase_event(order):
     url = f'https://graph.facebook.com/{api_version}/{pixel_id}/events'
 
     try:
-        response = requests.post(
+        response = get_http_client().post(
             url,
             params={'access_token': access_token},
             json=payload,
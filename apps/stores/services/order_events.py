@@ -0,0 +1,201 @@
+"""
+Order event outbox.
+
+Status changes write one ``StoreOrderEvent`` row in the same transaction as
+the order update (``record_order_event``); nothing talks to a third party
+while the order row is locked. After commit a Celery task claims the event
+and fans it out to each of its channels (store webhooks, email automation,
+WhatsApp, Meta CAPI).
+
+Every channel is checkpointed in ``StoreOrderEvent.channels`` as soon as it
+succeeds, so a retry only runs the channels that failed. Failed events are
+retried with exponential backoff up to ``ORDER_EVENT_MAX_ATTEMPTS``; events
+whose task was never queued or whose worker died are picked up again by
+``process_pending_order_events``.
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.stores.models import StoreOrder, StoreOrderEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_WEBHOOK = 'webhook'
+CHANNEL_EMAIL = 'email'
+CHANNEL_WHATSAPP = 'whatsapp'
+CHANNEL_CAPI = 'capi'
+
+# Per-channel state stored in StoreOrderEvent.channels
+CHANNEL_PENDING = 'pending'
+CHANNEL_DONE = 'done'
+CHANNEL_FAILED = 'failed'
+
+
+def _send_webhook(order: StoreOrder, event: StoreOrderEvent) -> None:
+    order.send_status_webhook(event.old_status, event.new_status, idempotency_key=f'order-event:{event.id}')
+
+
+def _send_email(order: StoreOrder, event: StoreOrderEvent) -> None:
+    from .checkout_service import send_order_email_automation
+
+    trigger_type = event.payload.get('email_trigger')
+    if not trigger_type:
+        return
+    context = {'order_status': event.new_status, **event.payload.get('email_context', {})}
+    send_order_email_automation(order, trigger_type, context)
+
+
+def _send_whatsapp(order: StoreOrder, event: StoreOrderEvent) -> None:
+    order._trigger_status_whatsapp_notification(event.new_status)
+
+
+def _send_capi(order: StoreOrder, event: StoreOrderEvent) -> None:
+    from .meta_pixel_service import capi_configured, send_purchase_event
+
+    if not capi_configured():
+        return
+    # Meta deduplicates on the order number, so a retry after a lost response is safe
+    if not send_purchase_event(order):
+        raise RuntimeError('Meta CAPI purchase event was not accepted')
+
+
+CHANNEL_HANDLERS: Dict[str, Callable[[StoreOrder, StoreOrderEvent], None]] = {
+    CHANNEL_WEBHOOK: _send_webhook,
+    CHANNEL_EMAIL: _send_email,
+    CHANNEL_WHATSAPP: _send_whatsapp,
+    CHANNEL_CAPI: _send_capi,
+}
+
+
+def _enqueue(event_id, countdown: Optional[int] = None) -> None:
+    from apps.stores.tasks import dispatch_order_event
+
+    dispatch_order_event.apply_async(args=[str(event_id)], countdown=countdown)
+
+
+def record_order_event(
+    order: StoreOrder,
+    old_status: str,
+    new_status: str,
+    channels: Iterable[str],
+    email_trigger: Optional[str] = None,
+    email_context: Optional[dict] = None,
+) -> StoreOrderEvent:
+    """
+    Write the outbox row for a status change and dispatch it after commit.
+
+    Call inside the transaction that changes the order so both commit, or
+    roll back, together. The email channel is dropped when there is no
+    trigger for the new status.
+    """
+    channels = [
+        channel for channel in dict.fromkeys(channels)
+        if channel != CHANNEL_EMAIL or email_trigger
+    ]
+    unknown = set(channels) - set(CHANNEL_HANDLERS)
+    if unknown:
+        raise ValueError(f"Unknown order event channels: {', '.join(sorted(unknown))}")
+
+    event = StoreOrderEvent.objects.create(
+        order=order,
+        old_status=old_status or '',
+        new_status=new_status or '',
+        payload={
+            'email_trigger': email_trigger or '',
+            'email_context': email_context or {},
+        },
+        channels={channel: CHANNEL_PENDING for channel in channels},
+    )
+    transaction.on_commit(lambda: _enqueue(event.id))
+    return event
+
+
+def _claimable(now) -> Q:
+    stale = now - timezone.timedelta(seconds=getattr(settings, 'ORDER_EVENT_CLAIM_TIMEOUT', 300))
+    return (
+        Q(status=StoreOrderEvent.EventStatus.PENDING, next_attempt_at__lte=now)
+        | Q(status=StoreOrderEvent.EventStatus.PROCESSING, updated_at__lt=stale)
+    )
+
+
+def claim_order_event(event_id) -> Optional[StoreOrderEvent]:
+    """Atomically take an event for processing; ``None`` if it is not due or already taken."""
+    now = timezone.now()
+    claimed = StoreOrderEvent.objects.filter(_claimable(now), pk=event_id).update(
+        status=StoreOrderEvent.EventStatus.PROCESSING,
+        attempts=F('attempts') + 1,
+        updated_at=now,
+    )
+    if not claimed:
+        return None
+    return StoreOrderEvent.objects.select_related('order', 'order__store').get(pk=event_id)
+
+
+def process_order_event(event_id) -> dict:
+    """Run the pending channels of one event and schedule a retry for the ones that fail."""
+    event = claim_order_event(event_id)
+    if event is None:
+        return {'success': False, 'error': 'Event not claimable'}
+
+    order = event.order
+    errors: Dict[str, str] = {}
+    for channel, state in event.channels.items():
+        if state == CHANNEL_DONE:
+            continue
+        try:
+            CHANNEL_HANDLERS[channel](order, event)
+        except Exception as e:
+            logger.error(f"Order {order.order_number}: {channel} delivery for event {event.id} failed: {e}")
+            errors[channel] = str(e)
+            continue
+        event.channels[channel] = CHANNEL_DONE
+        # Checkpoint each channel so a crash never repeats one that already went out
+        StoreOrderEvent.objects.filter(pk=event.pk).update(
+            channels=event.channels,
+            updated_at=timezone.now(),
+        )
+
+    now = timezone.now()
+    update = {'channels': event.channels, 'updated_at': now}
+    retry_in = None
+    if not errors:
+        update.update(status=StoreOrderEvent.EventStatus.DONE, processed_at=now, last_error='')
+    else:
+        update['last_error'] = '\n'.join(f'{channel}: {error}' for channel, error in errors.items())
+        if event.attempts >= getattr(settings, 'ORDER_EVENT_MAX_ATTEMPTS', 6):
+            for channel in errors:
+                event.channels[channel] = CHANNEL_FAILED
+            update.update(status=StoreOrderEvent.EventStatus.FAILED, processed_at=now)
+            logger.error(f"Order {order.order_number}: giving up on event {event.id} after {event.attempts} attempts")
+        else:
+            retry_in = getattr(settings, 'ORDER_EVENT_RETRY_BASE', 30) * 2 ** (event.attempts - 1)
+            update.update(
+                status=StoreOrderEvent.EventStatus.PENDING,
+                next_attempt_at=now + timezone.timedelta(seconds=retry_in),
+            )
+    StoreOrderEvent.objects.filter(pk=event.pk).update(**update)
+
+    if retry_in is not None:
+        _enqueue(event.id, countdown=retry_in)
+
+    return {
+        'success': not errors,
+        'event_id': str(event.id),
+        'failed_channels': sorted(errors),
+        'retry_in': retry_in,
+    }
+
+
+def due_order_event_ids(limit: int = 500) -> List[str]:
+    """Events that are due for a retry or whose worker stopped reporting."""
+    return [
+        str(event_id) for event_id in
+        StoreOrderEvent.objects.filter(_claimable(timezone.now()))
+        .order_by('next_attempt_at')
+        .values_list('id', flat=True)[:limit]
+    ]
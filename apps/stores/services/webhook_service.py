@@ -1,14 +1,20 @@
 """
 Webhook service for triggering store webhooks.
+
+Deliveries are written to the ``WebhookOutbox`` and sent by Celery workers
+(``apps.webhooks.services.delivery``), with retries, per-host concurrency
+limits and a dead letter queue; nothing is sent from the request thread.
 """
 import logging
 import hashlib
 import hmac
 import json
 import requests
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from django.db import transaction
 from django.utils import timezone
-from concurrent.futures import ThreadPoolExecutor
+
+from apps.core.services.http_client import WEBHOOKS, get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,88 +23,79 @@ class WebhookService:
     """Service for managing and triggering store webhooks."""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=5)
-        self.timeout = 30
+        self.timeout = 10
     
-    def trigger_webhooks(self, store, event: str, payload: Dict[str, Any]):
+    def trigger_webhooks(self, store, event: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None):
         """
-        Trigger all webhooks for a store that are subscribed to the given event.
-        Runs asynchronously to not block the main thread.
+        Queue a delivery for every webhook of the store subscribed to the event.
+        
+        Entries are written in the caller's transaction and dispatched after
+        commit. ``idempotency_key`` (per event) keeps a repeated trigger from
+        queueing the same delivery twice.
         """
         from apps.stores.models import StoreWebhook
+        from apps.webhooks.models import WebhookOutbox
+        from apps.webhooks.services.delivery import STORE_WEBHOOK_SOURCE
         
-        webhooks = StoreWebhook.objects.filter(
-            store=store,
-            is_active=True
-        )
+        webhooks = [
+            webhook for webhook in StoreWebhook.objects.filter(store=store, is_active=True)
+            if event in webhook.events or '*' in webhook.events
+        ]
+        if not webhooks:
+            return []
         
-        for webhook in webhooks:
-            if event in webhook.events or '*' in webhook.events:
-                self.executor.submit(self._send_webhook, webhook, event, payload)
-    
-    def _send_webhook(self, webhook, event: str, payload: Dict[str, Any]):
-        """Send a single webhook request."""
-        from apps.stores.models import StoreWebhook
+        timestamp = timezone.now().isoformat()
+        # Round-trip through JSON so the stored payload serializes exactly as signed
+        body = json.loads(json.dumps({
+            'event': event,
+            'timestamp': timestamp,
+            'store_id': str(store.id),
+            'store_name': store.name,
+            'data': payload
+        }, default=str))
         
-        try:
-            # Prepare the request body
-            body = {
-                'event': event,
-                'timestamp': timezone.now().isoformat(),
-                'store_id': str(webhook.store.id),
-                'store_name': webhook.store.name,
-                'data': payload
-            }
-            
-            body_json = json.dumps(body, default=str)
-            
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Webhook-Event': event,
-                'X-Webhook-Timestamp': body['timestamp'],
-                **webhook.headers
-            }
-            
-            # Add signature if secret is configured
-            if webhook.secret:
-                signature = self._generate_signature(body_json, webhook.secret)
-                headers['X-Webhook-Signature'] = signature
-            
-            # Send the request
-            response = requests.post(
-                webhook.url,
-                data=body_json,
-                headers=headers,
-                timeout=self.timeout
+        existing = set()
+        if idempotency_key:
+            existing = set(WebhookOutbox.objects.filter(
+                idempotency_key__in=[f"{idempotency_key}:{webhook.id}" for webhook in webhooks]
+            ).values_list('idempotency_key', flat=True))
+        
+        entries = []
+        for webhook in webhooks:
+            key = f"{idempotency_key}:{webhook.id}" if idempotency_key else ''
+            if key and key in existing:
+                continue
+            entry = WebhookOutbox(
+                event_type=event,
+                payload=body,
+                endpoint_url=webhook.url,
+                store=store,
+                max_retries=webhook.max_retries + 1,
+                source_model=STORE_WEBHOOK_SOURCE,
+                source_id=str(webhook.id),
+                idempotency_key=key,
             )
-            
-            success = 200 <= response.status_code < 300
-            error = '' if success else f"HTTP {response.status_code}: {response.text[:500]}"
-            
-            webhook.record_call(success=success, error=error)
-            
-            if success:
-                logger.info(f"Webhook sent successfully: {webhook.name} -> {event}")
-            else:
-                logger.warning(f"Webhook failed: {webhook.name} -> {event}: {error}")
-                
-                # Retry if configured
-                if webhook.max_retries > 0:
-                    self._schedule_retry(webhook, event, payload, attempt=1)
+            headers = {'X-Webhook-Timestamp': timestamp}
+            if webhook.secret:
+                headers['X-Webhook-Signature'] = self._generate_signature(entry.serialize_payload(), webhook.secret)
+            entry.headers = {**headers, **webhook.headers}
+            entries.append(entry)
         
-        except requests.Timeout:
-            error = f"Timeout after {self.timeout}s"
-            webhook.record_call(success=False, error=error)
-            logger.error(f"Webhook timeout: {webhook.name} -> {event}")
+        WebhookOutbox.objects.bulk_create(entries)
+        transaction.on_commit(lambda: self._enqueue(entries))
+        return entries
+    
+    def _enqueue(self, entries):
+        from apps.webhooks.tasks import process_outbox_entry
         
-        except requests.RequestException as e:
-            error = str(e)
-            webhook.record_call(success=False, error=error)
-            logger.error(f"Webhook error: {webhook.name} -> {event}: {error}")
+        for entry in entries:
+            process_outbox_entry.delay(str(entry.id))
+    
+    def delivery_metrics(self, webhook, since=None) -> List[Dict[str, Any]]:
+        """Delivery attempts, failures and latency of a webhook's endpoint."""
+        from apps.webhooks.services.delivery import endpoint_metrics
         
-        except Exception as e:
-            logger.exception(f"Unexpected error sending webhook: {webhook.name}")
+        return endpoint_metrics(since=since, source_id=str(webhook.id))
     
     def _generate_signature(self, body: str, secret: str) -> str:
         """Generate HMAC-SHA256 signature for webhook payload."""
@@ -108,22 +105,6 @@ class WebhookService:
             hashlib.sha256
         ).hexdigest()
     
-    def _schedule_retry(self, webhook, event: str, payload: Dict[str, Any], attempt: int):
-        """Schedule a retry for a failed webhook."""
-        if attempt >= webhook.max_retries:
-            logger.warning(f"Webhook max retries reached: {webhook.name}")
-            return
-        
-        # Use Celery for delayed retry if available
-        try:
-            from apps.stores.tasks import retry_webhook
-            retry_webhook.apply_async(
-                args=[str(webhook.id), event, payload, attempt + 1],
-                countdown=webhook.retry_delay * attempt
-            )
-        except ImportError:
-            logger.warning("Celery not available for webhook retry")
-    
     def verify_signature(self, body: str, signature: str, secret: str) -> bool:
         """Verify incoming webhook signature."""
         expected = self._generate_signature(body, secret)
@@ -154,11 +135,11 @@ class WebhookService:
             if webhook.secret:
                 headers['X-Webhook-Signature'] = self._generate_signature(body, webhook.secret)
             
-            response = requests.post(
+            response = get_http_client(WEBHOOKS).post(
                 webhook.url,
                 data=body,
                 headers=headers,
-                timeout=10
+                timeout=self.timeout
             )
             
             return {
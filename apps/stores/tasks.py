@@ -0,0 +1,39 @@
+"""
+Celery tasks for Stores app.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='apps.stores.tasks.dispatch_order_event', acks_late=True, reject_on_worker_lost=True)
+def dispatch_order_event(event_id: str):
+    """
+    Fan an order event out to its channels (webhooks, email, WhatsApp, CAPI).
+    Queued after the order transaction commits; failed channels are retried
+    with backoff by the dispatcher itself.
+    """
+    from apps.stores.services.order_events import process_order_event
+
+    result = process_order_event(event_id)
+    if result.get('failed_channels'):
+        logger.warning(f"Order event {event_id} failed on {result['failed_channels']}, retry in {result['retry_in']}s")
+    return result
+
+
+@shared_task(name='apps.stores.tasks.process_pending_order_events')
+def process_pending_order_events():
+    """
+    Re-enqueue order events that are due but not in flight (task never queued,
+    worker lost mid-dispatch, retry countdown missed).
+    Runs every minute via Celery Beat.
+    """
+    from apps.stores.services.order_events import due_order_event_ids
+
+    event_ids = due_order_event_ids()
+    for event_id in event_ids:
+        dispatch_order_event.delay(event_id)
+    if event_ids:
+        logger.info(f"Re-enqueued {len(event_ids)} pending order events")
+    return {'enqueued': len(event_ids)}
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("webhooks", "0003_webhookdeliveryattempt_webhookendpoint_webhookevent_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="webhookdeliveryattempt",
+            name="duration_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="webhookdeliveryattempt",
+            name="outbox",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="attempts",
+                to="webhooks.webhookoutbox",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="webhookdeliveryattempt",
+            index=models.Index(fields=["endpoint_url", "created_at"], name="webhook_del_endpoin_2a3eae_idx"),
+        ),
+    ]
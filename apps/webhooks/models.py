@@ -173,14 +173,28 @@ class WebhookDeliveryAttempt(BaseModel):
     attempt_number = models.PositiveIntegerField(default=1)
     next_retry_at = models.DateTimeField(null=True, blank=True)
     
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    
     # Error
     error_message = models.TextField(blank=True)
     
+    # Outbox entry this attempt delivered (null for ad-hoc sends)
+    outbox = models.ForeignKey(
+        'webhooks.WebhookOutbox',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attempts'
+    )
+    
     class Meta:
         db_table = 'webhook_delivery_attempts'
         verbose_name = 'Webhook Delivery Attempt'
         verbose_name_plural = 'Webhook Delivery Attempts'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['endpoint_url', 'created_at']),
+        ]
 
 
 class WebhookDeadLetter(BaseModel):
@@ -429,15 +443,20 @@ class WebhookOutbox(BaseModel):
     def __str__(self):
         return f"Outbox: {self.event_type} -> {self.endpoint_url[:50]}... ({self.status})"
     
+    def serialize_payload(self) -> str:
+        """Request body exactly as it is sent and signed."""
+        import json
+        
+        return json.dumps(self.payload, sort_keys=True, default=str)
+    
     def generate_signature(self) -> str:
         """Generate HMAC signature for the payload."""
         if not self.secret:
             return ''
         import hmac
         import hashlib
-        import json
         
-        payload_bytes = json.dumps(self.payload, sort_keys=True).encode()
+        payload_bytes = self.serialize_payload().encode()
         signature = hmac.new(
             self.secret.encode(),
             payload_bytes,
@@ -0,0 +1,244 @@
+"""
+Outgoing webhook delivery from the ``WebhookOutbox``.
+
+Entries are written by the code that raises the event (store webhooks go
+through ``apps.stores.services.webhook_service``) and delivered by the
+``process_outbox_entry`` Celery task, never from a web request thread:
+
+* an entry is claimed with a conditional UPDATE, so the on-commit task, a
+  retry and the ``process_outbox`` sweep can race without double sends;
+* at most ``WEBHOOK_HOST_CONCURRENCY`` deliveries run against the same host
+  at once, across all workers. An entry that finds its host busy is handed
+  back and retried shortly, without using up an attempt;
+* failures back off exponentially (``WebhookOutbox.mark_failed``) and land in
+  the ``WebhookDeadLetter`` queue once the retries are exhausted;
+* every attempt is logged as a ``WebhookDeliveryAttempt`` with its latency,
+  which ``endpoint_metrics`` aggregates per endpoint.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+
+from apps.core.services.http_client import WEBHOOKS, get_http_client
+
+logger = logging.getLogger(__name__)
+
+HOST_SLOT_KEY = 'webhooks:host:{host}:slot:{slot}'
+
+# Set on entries created for a StoreWebhook, so results feed its stats
+STORE_WEBHOOK_SOURCE = 'stores.StoreWebhook'
+
+
+@contextmanager
+def host_slot(url: str) -> Iterator[bool]:
+    """
+    Hold one of the ``WEBHOOK_HOST_CONCURRENCY`` delivery slots of ``url``'s host.
+
+    Yields ``False`` when every slot is taken. Slots expire on their own if
+    the worker dies mid-request.
+    """
+    host = urlsplit(url).netloc.lower()
+    limit = getattr(settings, 'WEBHOOK_HOST_CONCURRENCY', 4)
+    timeout = getattr(settings, 'WEBHOOK_DELIVERY_TIMEOUT', 10) + 30
+    acquired = None
+    for slot in range(limit):
+        key = HOST_SLOT_KEY.format(host=host, slot=slot)
+        if cache.add(key, 1, timeout):
+            acquired = key
+            break
+    try:
+        yield acquired is not None
+    finally:
+        if acquired:
+            cache.delete(acquired)
+
+
+def claim_outbox_entry(entry_id):
+    """Atomically take a due entry for delivery; ``None`` if it is not due or already taken."""
+    from apps.webhooks.models import WebhookOutbox
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'WEBHOOK_CLAIM_TIMEOUT', 300))
+    due = Q(
+        status__in=[WebhookOutbox.Status.PENDING, WebhookOutbox.Status.SCHEDULED],
+    ) & (Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=now))
+    claimed = WebhookOutbox.objects.filter(
+        due | Q(status=WebhookOutbox.Status.PROCESSING, processing_started_at__lt=stale),
+        Q(scheduled_at__isnull=True) | Q(scheduled_at__lte=now),
+        pk=entry_id,
+    ).update(
+        status=WebhookOutbox.Status.PROCESSING,
+        processing_started_at=now,
+        updated_at=now,
+    )
+    if not claimed:
+        return None
+    return WebhookOutbox.objects.get(pk=entry_id)
+
+
+def deliver_outbox_entry(entry_id) -> Dict[str, Any]:
+    """
+    Send one outbox entry.
+
+    Returns the outcome; ``retry_in`` is set when the entry should be
+    delivered again after that many seconds.
+    """
+    from apps.webhooks.models import (
+        WebhookDeadLetter, WebhookDeliveryAttempt, WebhookEvent, WebhookOutbox,
+    )
+
+    entry = claim_outbox_entry(entry_id)
+    if entry is None:
+        return {'status': 'not_claimed'}
+
+    if entry.idempotency_key:
+        existing = WebhookOutbox.objects.filter(
+            idempotency_key=entry.idempotency_key,
+            status=WebhookOutbox.Status.SENT,
+        ).exclude(pk=entry.pk).first()
+        if existing:
+            entry.mark_sent(existing.http_status, existing.response_body)
+            return {'status': 'deduplicated'}
+
+    timeout = getattr(settings, 'WEBHOOK_DELIVERY_TIMEOUT', 10)
+    with host_slot(entry.endpoint_url) as acquired:
+        if not acquired:
+            # Host is saturated: hand the entry back without spending an attempt
+            retry_in = getattr(settings, 'WEBHOOK_HOST_BUSY_DELAY', 5)
+            WebhookOutbox.objects.filter(pk=entry.pk).update(
+                status=WebhookOutbox.Status.PENDING,
+                next_retry_at=timezone.now() + timedelta(seconds=retry_in),
+                updated_at=timezone.now(),
+            )
+            return {'status': 'throttled', 'retry_in': retry_in}
+
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Pastita-Webhook/1.0',
+            'X-Webhook-ID': str(entry.id),
+            'X-Webhook-Event': entry.event_type,
+            'X-Webhook-Attempt': str(entry.retry_count + 1),
+        }
+        if entry.secret:
+            headers['X-Webhook-Signature'] = entry.generate_signature()
+        headers.update(entry.headers)
+
+        http_status = None
+        response_body = ''
+        error = ''
+        failure_reason = WebhookDeadLetter.FailureReason.EXTERNAL_SERVICE_ERROR
+        started = time.perf_counter()
+        try:
+            response = get_http_client(WEBHOOKS).post(
+                entry.endpoint_url,
+                data=entry.serialize_payload().encode('utf-8'),
+                headers=headers,
+                timeout=timeout,
+            )
+            http_status = response.status_code
+            response_body = response.text[:1000]
+            if not 200 <= http_status < 300:
+                error = f"HTTP {http_status}: {response.text[:200]}"
+        except requests.Timeout:
+            error = f"Timeout after {timeout}s"
+            failure_reason = WebhookDeadLetter.FailureReason.TIMEOUT
+        except requests.RequestException as e:
+            error = f"Request error: {e}"
+            failure_reason = WebhookDeadLetter.FailureReason.NETWORK_ERROR
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+    attempt_number = entry.retry_count + 1
+    if not error:
+        entry.mark_sent(http_status, response_body)
+    else:
+        entry.mark_failed(error)
+    retrying = entry.status == WebhookOutbox.Status.SCHEDULED
+
+    WebhookDeliveryAttempt.objects.create(
+        outbox=entry,
+        endpoint_url=entry.endpoint_url,
+        event_type=entry.event_type,
+        payload={},
+        status=(
+            WebhookDeliveryAttempt.Status.SUCCESS if not error
+            else WebhookDeliveryAttempt.Status.RETRYING if retrying
+            else WebhookDeliveryAttempt.Status.FAILED
+        ),
+        http_status=http_status,
+        response_body=response_body,
+        attempt_number=attempt_number,
+        next_retry_at=entry.next_retry_at if retrying else None,
+        duration_ms=duration_ms,
+        error_message=error,
+    )
+    _record_source_call(entry, success=not error, error=error)
+
+    if not error:
+        logger.info(f"Webhook {entry.id} sent to {entry.endpoint_url} in {duration_ms}ms")
+        return {'status': 'sent', 'http_status': http_status, 'duration_ms': duration_ms}
+
+    if retrying:
+        retry_in = max(0, int((entry.next_retry_at - timezone.now()).total_seconds()))
+        logger.warning(f"Webhook {entry.id} to {entry.endpoint_url} failed, retry in {retry_in}s: {error}")
+        return {'status': 'retrying', 'error': error, 'retry_in': retry_in}
+
+    WebhookDeadLetter.objects.create(
+        original_event_id=str(entry.id),
+        provider=WebhookEvent.Provider.CUSTOM,
+        event_type=entry.event_type,
+        event_id=entry.idempotency_key or '',
+        payload=entry.payload,
+        headers=entry.headers,
+        failure_reason=failure_reason,
+        error_message=error,
+        retry_count=entry.retry_count,
+        max_retries_reached=True,
+        last_retry_at=timezone.now(),
+        store_id=entry.store_id,
+    )
+    logger.error(f"Webhook {entry.id} to {entry.endpoint_url} failed after {entry.retry_count} attempts: {error}")
+    return {'status': 'failed', 'error': error, 'retries_exhausted': True}
+
+
+def _record_source_call(entry, success: bool, error: str) -> None:
+    if entry.source_model != STORE_WEBHOOK_SOURCE or not entry.source_id:
+        return
+    from apps.stores.models import StoreWebhook
+
+    webhook = StoreWebhook.objects.filter(pk=entry.source_id).first()
+    if webhook:
+        webhook.record_call(success=success, error=error)
+
+
+def endpoint_metrics(
+    since=None,
+    store=None,
+    source_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Attempts, failures and latency per endpoint URL since ``since`` (default: 24h)."""
+    from apps.webhooks.models import WebhookDeliveryAttempt
+
+    attempts = WebhookDeliveryAttempt.objects.filter(
+        created_at__gte=since or timezone.now() - timedelta(hours=24),
+    )
+    if store is not None:
+        attempts = attempts.filter(outbox__store=store)
+    if source_id is not None:
+        attempts = attempts.filter(outbox__source_id=str(source_id))
+    return list(
+        attempts.values('endpoint_url').annotate(
+            attempts=Count('id'),
+            failures=Count('id', filter=~Q(status=WebhookDeliveryAttempt.Status.SUCCESS)),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+        ).order_by('-failures', 'endpoint_url')
+    )
@@ -7,10 +7,6 @@ Includes:
 - Webhook delivery with retries
 """
 import logging
-import json
-import requests
-import hmac
-import hashlib
 from datetime import timedelta
 from celery import shared_task
 from django.db import transaction
@@ -27,141 +23,57 @@ logger = logging.getLogger(__name__)
 @shared_task(name='apps.webhooks.tasks.process_outbox')
 def process_outbox(batch_size: int = 100):
     """
-    Process pending webhook outbox entries.
+    Enqueue due webhook outbox entries.
     
-    This task should be run periodically (e.g., every 10 seconds)
-    to ensure timely delivery of webhooks.
+    Fallback for entries whose delivery task was lost (never queued,
+    worker died mid-delivery, retry countdown missed); runs via Celery Beat.
     """
     from .models import WebhookOutbox
     
-    # Get pending entries, ordered by priority
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'WEBHOOK_CLAIM_TIMEOUT', 300))
     pending = WebhookOutbox.objects.filter(
-        status__in=[WebhookOutbox.Status.PENDING, WebhookOutbox.Status.SCHEDULED],
-    ).filter(
-        models.Q(scheduled_at__isnull=True) | models.Q(scheduled_at__lte=timezone.now()),
-        models.Q(next_retry_at__isnull=True) | models.Q(next_retry_at__lte=timezone.now())
-    ).order_by('-priority', 'created_at')[:batch_size]
+        models.Q(
+            status__in=[WebhookOutbox.Status.PENDING, WebhookOutbox.Status.SCHEDULED],
+        ) & (models.Q(next_retry_at__isnull=True) | models.Q(next_retry_at__lte=now))
+        | models.Q(status=WebhookOutbox.Status.PROCESSING, processing_started_at__lt=stale),
+        models.Q(scheduled_at__isnull=True) | models.Q(scheduled_at__lte=now),
+    ).order_by('-priority', 'created_at').values_list('id', flat=True)[:batch_size]
     
     processed = 0
     failed = 0
     
-    for entry in pending:
+    for entry_id in pending:
         try:
-            process_outbox_entry.delay(entry.id)
+            process_outbox_entry.delay(str(entry_id))
             processed += 1
         except Exception as e:
-            logger.error(f"Failed to schedule outbox entry {entry.id}: {e}")
+            logger.error(f"Failed to schedule outbox entry {entry_id}: {e}")
             failed += 1
     
-    logger.info(f"Outbox processing: {processed} scheduled, {failed} failed")
+    if processed or failed:
+        logger.info(f"Outbox processing: {processed} scheduled, {failed} failed")
     return {'scheduled': processed, 'failed': failed}
 
 
 @shared_task(
     name='apps.webhooks.tasks.process_outbox_entry',
-    bind=True,
-    max_retries=3,
-    default_retry_delay=60,
-    autoretry_for=(requests.RequestException,),
+    acks_late=True,
+    reject_on_worker_lost=True,
 )
-def process_outbox_entry(self, entry_id: str):
+def process_outbox_entry(entry_id: str):
     """
-    Process a single outbox entry.
+    Deliver a single outbox entry.
     
-    Sends the webhook and updates the entry status.
+    Failed and throttled deliveries re-enqueue themselves with the backoff
+    computed by the delivery service.
     """
-    from .models import WebhookOutbox
-    
-    try:
-        entry = WebhookOutbox.objects.select_for_update().get(id=entry_id)
-    except WebhookOutbox.DoesNotExist:
-        logger.warning(f"Outbox entry not found: {entry_id}")
-        return {'status': 'not_found'}
-    
-    # Check if already processed
-    if entry.status == WebhookOutbox.Status.SENT:
-        return {'status': 'already_sent'}
+    from .services.delivery import deliver_outbox_entry
     
-    # Check idempotency
-    if entry.idempotency_key:
-        existing = WebhookOutbox.objects.filter(
-            idempotency_key=entry.idempotency_key,
-            status=WebhookOutbox.Status.SENT
-        ).exclude(id=entry_id).first()
-        
-        if existing:
-            entry.mark_sent(existing.http_status, existing.response_body)
-            return {'status': 'deduplicated'}
-    
-    entry.mark_processing()
-    
-    try:
-        # Prepare headers
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'Pastita-Webhook/1.0',
-            'X-Webhook-ID': str(entry.id),
-            'X-Webhook-Event': entry.event_type,
-            'X-Webhook-Attempt': str(entry.retry_count + 1),
-        }
-        
-        # Add signature if secret is configured
-        if entry.secret:
-            headers['X-Webhook-Signature'] = entry.generate_signature()
-        
-        # Merge with custom headers
-        headers.update(entry.headers)
-        
-        # Send webhook
-        response = requests.post(
-            entry.endpoint_url,
-            json=entry.payload,
-            headers=headers,
-            timeout=30,
-        )
-        
-        # Check response
-        if response.status_code >= 200 and response.status_code < 300:
-            entry.mark_sent(response.status_code, response.text[:1000])
-            logger.info(f"Webhook sent successfully: {entry.id} -> {entry.endpoint_url}")
-            return {
-                'status': 'sent',
-                'http_status': response.status_code,
-            }
-        else:
-            error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-            entry.mark_failed(error_msg, schedule_retry=True)
-            
-            # Retry if not exceeded max retries
-            if entry.retry_count < entry.max_retries:
-                raise self.retry(countdown=5 ** entry.retry_count)
-            
-            logger.warning(f"Webhook failed after retries: {entry.id}")
-            return {
-                'status': 'failed',
-                'error': error_msg,
-                'retries_exhausted': True,
-            }
-            
-    except requests.Timeout:
-        entry.mark_failed("Request timeout", schedule_retry=True)
-        if entry.retry_count < entry.max_retries:
-            raise self.retry(countdown=5 ** entry.retry_count)
-        raise
-        
-    except requests.RequestException as e:
-        entry.mark_failed(f"Request error: {str(e)}", schedule_retry=True)
-        if entry.retry_count < entry.max_retries:
-            raise self.retry(countdown=5 ** entry.retry_count)
-        raise
-        
-    except Exception as e:
-        logger.exception(f"Unexpected error processing outbox entry {entry_id}")
-        entry.mark_failed(f"Unexpected error: {str(e)}", schedule_retry=False)
-        return {
-            'status': 'error',
-            'error': str(e),
-        }
+    result = deliver_outbox_entry(entry_id)
+    if result.get('retry_in') is not None:
+        process_outbox_entry.apply_async(args=[str(entry_id)], countdown=result['retry_in'])
+    return result
 
 
 @shared_task(name='apps.webhooks.tasks.schedule_webhook')
@@ -217,14 +129,14 @@ def schedule_webhook(
             store=store,
             priority=priority,
             scheduled_at=scheduled_at,
-            idempotency_key=idempotency_key,
+            idempotency_key=idempotency_key or '',
             headers=headers or {},
-            secret=secret,
+            secret=secret or '',
         )
-    
-    # Trigger immediate processing if no delay
-    if not scheduled_at:
-        process_outbox_entry.delay(str(entry.id))
+        
+        # Trigger immediate processing if no delay
+        if not scheduled_at:
+            transaction.on_commit(lambda: process_outbox_entry.delay(str(entry.id)))
     
     logger.info(f"Webhook scheduled: {entry.id} ({event_type})")
     return {
@@ -81,14 +81,14 @@ class MessageSerializer(serializers.ModelSerializer):
             'id', 'account', 'account_name', 'conversation',
             'whatsapp_message_id', 'direction', 'message_type', 'status',
             'from_number', 'to_number', 'content', 'text_body',
-            'media_id', 'media_url', 'media_mime_type',
+            'media_id', 'media_url', 'media_mime_type', 'media_status',
             'template_name', 'template_language', 'context_message_id',
             'sent_at', 'delivered_at', 'read_at', 'failed_at',
             'error_code', 'error_message', 'metadata',
             'processed_by_agent', 'created_at', 'updated_at'
         ]
         read_only_fields = [
-            'id', 'whatsapp_message_id', 'sent_at', 'delivered_at',
+            'id', 'whatsapp_message_id', 'media_status', 'sent_at', 'delivered_at',
             'read_at', 'failed_at', 'created_at', 'updated_at'
         ]
 
@@ -10,6 +10,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from ..models import WhatsAppAccount, Message, MessageTemplate
 from ..services import MessageService, WhatsAppAPIService
+from ..services.send_scheduler import get_send_scheduler
 
 from .serializers import (
     WhatsAppAccountSerializer,
@@ -250,6 +251,17 @@ class WhatsAppAccountViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_502_BAD_GATEWAY
             )
 
+    @extend_schema(summary="Get send scheduler metrics")
+    @action(detail=True, methods=['get'])
+    def send_metrics(self, request, pk=None):
+        """Queue depth per priority lane, tokens left and send rate for an account."""
+        account = self.get_object()
+        metrics = get_send_scheduler().get_metrics(
+            account.phone_number_id,
+            rate=(account.metadata or {}).get('send_rate'),
+        )
+        return Response(metrics)
+
     @extend_schema(summary="Sync message templates")
     @action(detail=True, methods=['post'])
     def sync_templates(self, request, pk=None):
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 
 
 class WhatsAppConfig(AppConfig):
@@ -8,6 +8,7 @@ class WhatsAppConfig(AppConfig):
     label = 'whatsapp'
 
     def ready(self):
+        from apps.core.services.account_routing import invalidate_account_routing
         from .startup import ensure_default_whatsapp_account
 
         post_migrate.connect(
@@ -15,3 +16,13 @@ class WhatsAppConfig(AppConfig):
             sender=self,
             weak=False,
         )
+        post_save.connect(
+            invalidate_account_routing,
+            sender='whatsapp.WhatsAppAccount',
+            dispatch_uid='whatsapp_account_routing_save',
+        )
+        post_delete.connect(
+            invalidate_account_routing,
+            sender='whatsapp.WhatsAppAccount',
+            dispatch_uid='whatsapp_account_routing_delete',
+        )
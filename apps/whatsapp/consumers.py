@@ -166,6 +166,28 @@ class WhatsAppConsumer(ThrottledWebSocketConsumer):
             'timestamp': event.get('timestamp')
         })
     
+    async def whatsapp_status_batch(self, event):
+        """Handle coalesced status updates; clients still get one frame per message."""
+        for update in event['updates']:
+            await self.send_json({
+                'type': 'status_updated',
+                'message_id': update['message_id'],
+                'whatsapp_message_id': update.get('whatsapp_message_id'),
+                'status': update['status'],
+                'timestamp': update.get('timestamp')
+            })
+    
+    async def whatsapp_media_ready(self, event):
+        """Handle inbound media download completion."""
+        await self.send_json({
+            'type': 'media_ready',
+            'message_id': event['message_id'],
+            'media_url': event['media_url'],
+            'media_mime_type': event.get('media_mime_type'),
+            'media_sha256': event.get('media_sha256'),
+            'conversation_id': event.get('conversation_id')
+        })
+    
     async def whatsapp_typing(self, event):
         """Handle typing indicator."""
         # Don't send typing indicator to the user who is typing
@@ -347,6 +369,25 @@ class WhatsAppDashboardConsumer(ThrottledWebSocketConsumer):
             'account_id': event.get('account_id')
         })
     
+    async def whatsapp_status_batch(self, event):
+        for update in event['updates']:
+            await self.send_json({
+                'type': 'status_updated',
+                'message_id': update['message_id'],
+                'status': update['status'],
+                'account_id': event.get('account_id')
+            })
+    
+    async def whatsapp_media_ready(self, event):
+        await self.send_json({
+            'type': 'media_ready',
+            'message_id': event['message_id'],
+            'media_url': event['media_url'],
+            'media_mime_type': event.get('media_mime_type'),
+            'account_id': event.get('account_id'),
+            'conversation_id': event.get('conversation_id')
+        })
+    
     async def whatsapp_conversation_updated(self, event):
         await self.send_json({
             'type': 'conversation_updated',
@@ -12,6 +12,8 @@ from typing import Optional, Dict, Any, List
 import re
 import logging
 
+from .matcher import PriorityMatcher, any_pattern
+
 logger = logging.getLogger(__name__)
 
 # Type alias for intent data
@@ -152,6 +154,27 @@ class IntentDetector:
         ],
     }
     
+    # Ordem de prioridade (mais específicos primeiro)
+    PRIORITY_ORDER = [
+        IntentType.CREATE_ORDER,
+        IntentType.CANCEL_ORDER,
+        IntentType.TRACK_ORDER,
+        IntentType.PAYMENT_STATUS,
+        IntentType.HUMAN_HANDOFF,
+        IntentType.ADD_TO_CART,
+        IntentType.PRODUCT_MENTION,
+        IntentType.CONFIRM_PAYMENT,
+        IntentType.REQUEST_PIX,
+        IntentType.PRICE_CHECK,
+        IntentType.MENU_REQUEST,
+        IntentType.BUSINESS_HOURS,
+        IntentType.DELIVERY_INFO,
+        IntentType.LOCATION,
+        IntentType.CONTACT,
+        IntentType.FAQ,
+        IntentType.GREETING,
+    ]
+    
     # ===== PALAVRAS QUE INDICAM NECESSIDADE DE LLM =====
     LLM_TRIGGERS = [
         r'(qual [ée] (melhor|a diferen[çc]a)|compare|versus|vs|melhor que|pior que)',
@@ -177,49 +200,26 @@ class IntentDetector:
         """
         Detecta intenção usando regex (rápido, sem custo)
         
+        Todos os padrões são avaliados numa única chamada ao regex compilado
+        (ver ``matcher.PriorityMatcher``), respeitando ``PRIORITY_ORDER``.
+        
         Returns:
             IntentType ou None se não encontrar match
         """
         message_lower = message.lower().strip()
         
-        # Ordena por prioridade (mais específicos primeiro)
-        priority_order = [
-            IntentType.CREATE_ORDER,
-            IntentType.CANCEL_ORDER,
-            IntentType.TRACK_ORDER,
-            IntentType.PAYMENT_STATUS,
-            IntentType.HUMAN_HANDOFF,
-            IntentType.ADD_TO_CART,
-            IntentType.PRODUCT_MENTION,
-            IntentType.CONFIRM_PAYMENT,
-            IntentType.REQUEST_PIX,
-            IntentType.PRICE_CHECK,
-            IntentType.MENU_REQUEST,
-            IntentType.BUSINESS_HOURS,
-            IntentType.DELIVERY_INFO,
-            IntentType.LOCATION,
-            IntentType.CONTACT,
-            IntentType.FAQ,
-            IntentType.GREETING,
-        ]
-        
-        for intent in priority_order:
-            patterns = self.PATTERNS.get(intent, [])
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    logger.debug(f"Regex match: {intent.value} for message: {message[:30]}...")
-                    return intent
+        intent = _INTENT_MATCHER.match(message_lower)
+        if intent:
+            logger.debug(f"Regex match: {intent.value} for message: {message[:30]}...")
+            return intent
         
         return None
     
     def needs_llm(self, message: str) -> bool:
         """Verifica se mensagem precisa de LLM para análise"""
-        message_lower = message.lower()
-        
-        for pattern in self.LLM_TRIGGERS:
-            if re.search(pattern, message_lower):
-                logger.debug(f"LLM trigger detected in: {message[:30]}...")
-                return True
+        if _LLM_TRIGGER_RE.search(message.lower()):
+            logger.debug(f"LLM trigger detected in: {message[:30]}...")
+            return True
         
         return False
     
@@ -308,7 +308,7 @@ Responda APENAS com o nome da intenção em inglês minúsculo."""),
         
         # Quantidade (para add_to_cart)
         if intent == IntentType.ADD_TO_CART:
-            qty_match = re.search(self.ENTITY_PATTERNS['quantity'], message)
+            qty_match = _ENTITY_RES['quantity'].search(message)
             if qty_match:
                 entities['quantity'] = int(qty_match.group(1))
             else:
@@ -326,19 +326,15 @@ Responda APENAS com o nome da intenção em inglês minúsculo."""),
         
         # Número do pedido (para track_order)
         if intent == IntentType.TRACK_ORDER:
-            order_match = re.search(self.ENTITY_PATTERNS['order_number'], message)
+            order_match = _ENTITY_RES['order_number'].search(message)
             if order_match:
                 entities['order_number'] = order_match.group(1)
         
         # Nome do produto (para price_check)
         if intent == IntentType.PRICE_CHECK:
             # Pega tudo após "preço de" ou "quanto custa"
-            price_patterns = [
-                r'(?:pre[çc]o|valor|custa)(?:\s+(?:de|do|da))?\s+([^?]+)',
-                r'quanto [ée]\s+([^?]+)',
-            ]
-            for pattern in price_patterns:
-                match = re.search(pattern, message_lower)
+            for pattern in _PRICE_PRODUCT_RES:
+                match = pattern.search(message_lower)
                 if match:
                     entities['product_name'] = match.group(1).strip()
                     break
@@ -410,5 +406,17 @@ Responda APENAS com o nome da intenção em inglês minúsculo."""),
         }
 
 
+# Padrões compilados uma única vez, na importação
+_INTENT_MATCHER = PriorityMatcher(
+    (intent, IntentDetector.PATTERNS.get(intent, []))
+    for intent in IntentDetector.PRIORITY_ORDER
+)
+_LLM_TRIGGER_RE = any_pattern(IntentDetector.LLM_TRIGGERS)
+_ENTITY_RES = {name: re.compile(pattern) for name, pattern in IntentDetector.ENTITY_PATTERNS.items()}
+_PRICE_PRODUCT_RES = [
+    re.compile(r'(?:pre[çc]o|valor|custa)(?:\s+(?:de|do|da))?\s+([^?]+)'),
+    re.compile(r'quanto [ée]\s+([^?]+)'),
+]
+
 # Instância global para uso
 intent_detector = IntentDetector(use_llm_fallback=True)
@@ -0,0 +1,137 @@
+"""
+Compiled intent matcher.
+
+Intent tables are ordered lists of ``(intent, [regex, ...])``: the first
+intent with any pattern found in the message wins. ``PriorityMatcher``
+prepares a whole table once, at import time:
+
+* every intent's patterns are compiled into a single regex, so matching no
+  longer goes through the ``re`` module cache for each pattern;
+* from each pattern we derive the literal keywords one of which must occur
+  in any text it matches (``"quanto custa"``, ``"rastre"``, ...). At match
+  time intents whose keywords are all absent are skipped with plain
+  substring checks, and only the remaining intents run their regex.
+
+The result is identical to calling ``re.search`` pattern by pattern in
+priority order. A single alternation of all patterns was measured slower:
+``sre`` tries every branch at every position and gains nothing from it.
+"""
+import re
+from typing import Generic, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+try:
+    from re import _parser as sre_parse
+    from re._constants import BRANCH, IN, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import BRANCH, IN, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+
+K = TypeVar('K', bound=Hashable)
+
+# Largest number of keyword spellings a character class like [çc] may expand to
+MAX_KEYWORD_VARIANTS = 16
+
+
+def _sequence_keywords(items) -> Optional[Set[str]]:
+    """Keywords required by a parsed sequence: its most selective literal run."""
+    best: Optional[Set[str]] = None
+    run = {''}
+
+    def consider(candidates: Optional[Set[str]]) -> None:
+        nonlocal best
+        if not candidates or '' in candidates:
+            return
+        if best is None or min(map(len, candidates)) > min(map(len, best)):
+            best = candidates
+
+    for op, av in items:
+        if op is LITERAL:
+            run = {prefix + chr(av) for prefix in run}
+            continue
+        if op is IN and all(kind is LITERAL for kind, _ in av):
+            expanded = {prefix + chr(code) for prefix in run for _, code in av}
+            if len(expanded) <= MAX_KEYWORD_VARIANTS:
+                run = expanded
+                continue
+        consider(run)
+        run = {''}
+        if op is SUBPATTERN:
+            _, add_flags, del_flags, body = av
+            if not add_flags and not del_flags:
+                consider(_sequence_keywords(body))
+        elif op is BRANCH:
+            consider(_branch_keywords(av[1]))
+        elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+            consider(_sequence_keywords(av[2]))
+    consider(run)
+    return best
+
+
+def _branch_keywords(branches) -> Optional[Set[str]]:
+    keywords: Set[str] = set()
+    for branch in branches:
+        required = _sequence_keywords(branch)
+        if required is None:
+            return None
+        keywords |= required
+    return keywords
+
+
+def required_keywords(pattern: str) -> Optional[Set[str]]:
+    """
+    Literal strings one of which occurs in every text ``pattern`` matches.
+
+    Returns ``None`` when no such set can be derived (e.g. ``^\\d+$``).
+    """
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & ~re.UNICODE:
+        # Inline flags such as (?i) or (?x) change literal semantics
+        return None
+    return _sequence_keywords(parsed)
+
+
+def _minimal(keywords: Iterable[str]) -> Tuple[str, ...]:
+    """Drop keywords that contain another keyword; the shorter one suffices."""
+    kept: List[str] = []
+    for keyword in sorted(set(keywords), key=len):
+        if not any(shorter in keyword for shorter in kept):
+            kept.append(keyword)
+    return tuple(kept)
+
+
+class PriorityMatcher(Generic[K]):
+    """Match text against prioritized groups of regexes."""
+
+    def __init__(self, table: Iterable[Tuple[K, Sequence[str]]], flags: int = 0) -> None:
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.entries: List[Tuple[K, Optional[Tuple[str, ...]], 're.Pattern[str]']] = []
+        for key, patterns in table:
+            if not patterns:
+                continue
+            keywords: Optional[List[str]] = []
+            for pattern in patterns:
+                required = required_keywords(pattern)
+                if required is None:
+                    keywords = None
+                    break
+                keywords.extend(required)
+            if keywords is not None:
+                if self.ignore_case:
+                    keywords = [keyword.casefold() for keyword in keywords]
+                keywords = _minimal(keywords)
+            self.entries.append((key, keywords, any_pattern(patterns, flags)))
+
+    def match(self, text: str) -> Optional[K]:
+        """Return the highest-priority key with a pattern found in ``text``."""
+        haystack = text.casefold() if self.ignore_case else text
+        for key, keywords, regex in self.entries:
+            if keywords is not None and not any(keyword in haystack for keyword in keywords):
+                continue
+            if regex.search(text):
+                return key
+        return None
+
+
+def any_pattern(patterns: Iterable[str], flags: int = 0) -> 're.Pattern[str]':
+    """Compile patterns into one regex that searches for any of them."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
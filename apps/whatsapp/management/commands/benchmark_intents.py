@@ -0,0 +1,69 @@
+"""
+Management command to micro-benchmark regex intent detection.
+
+Times the compiled ``PriorityMatcher`` against the previous behaviour
+(``re.search`` pattern by pattern) over recent inbound text messages, and
+reports any message where the two disagree.
+"""
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.whatsapp.intents.detector import IntentDetector
+from apps.whatsapp.models import Message
+
+SAMPLE_MESSAGES = [
+    'oi', 'bom dia', 'quanto custa o rondelli?', 'tem entrega?', 'cardápio',
+    'onde está meu pedido', 'quero 2 rondelli de frango', 'paguei', 'gerar pix',
+    'quero falar com atendente', 'obrigado!',
+]
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark compiled intent matching against per-pattern re.search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=5000, help='Inbound messages to sample')
+        parser.add_argument('--repeat', type=int, default=5, help='Passes over the sample')
+
+    def handle(self, *args, **options):
+        messages = [
+            body for body in Message.objects.filter(
+                direction='inbound', message_type='text'
+            ).exclude(text_body='').order_by('-created_at').values_list('text_body', flat=True)[:options['limit']]
+        ] or SAMPLE_MESSAGES
+        texts = [message.lower().strip() for message in messages]
+        table = [(intent, IntentDetector.PATTERNS.get(intent, [])) for intent in IntentDetector.PRIORITY_ORDER]
+        detector = IntentDetector(use_llm_fallback=False)
+
+        def per_pattern(text):
+            for intent, patterns in table:
+                for pattern in patterns:
+                    if re.search(pattern, text):
+                        return intent
+            return None
+
+        mismatches = [
+            message for message, text in zip(messages, texts)
+            if detector.detect_regex(message) != per_pattern(text)
+        ]
+
+        baseline = self._time(per_pattern, texts, options['repeat'])
+        compiled = self._time(detector.detect_regex, messages, options['repeat'])
+
+        self.stdout.write(f'Messages: {len(messages)} x {options["repeat"]} passes')
+        self.stdout.write(f'Per-pattern re.search: {baseline:.1f} µs/message')
+        self.stdout.write(f'Compiled matcher:      {compiled:.1f} µs/message ({baseline / compiled:.1f}x)')
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{len(mismatches)} mismatches, e.g. {mismatches[:5]}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Results identical'))
+
+    @staticmethod
+    def _time(func, items, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                func(item)
+        return (time.perf_counter() - started) * 1e6 / (len(items) * repeat)
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("whatsapp", "0004_remove_advancedtemplate_account_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="media_status",
+            field=models.CharField(
+                blank=True,
+                choices=[("pending", "Pending"), ("ready", "Ready"), ("failed", "Failed")],
+                db_index=True,
+                help_text="Inbound media ingest state; blank for messages without media",
+                max_length=10,
+            ),
+        ),
+    ]
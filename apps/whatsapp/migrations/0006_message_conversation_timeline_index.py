@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("whatsapp", "0005_message_media_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["conversation", "created_at", "id"],
+                name="whatsapp_me_convers_d63773_idx",
+            ),
+        ),
+    ]
@@ -119,6 +119,11 @@ class Message(BaseModel):
         READ = 'read', 'Read'
         FAILED = 'failed', 'Failed'
 
+    class MediaStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+
     account = models.ForeignKey(
         WhatsAppAccount,
         on_delete=models.CASCADE,
@@ -151,6 +156,13 @@ class Message(BaseModel):
     media_url = models.URLField(blank=True)
     media_mime_type = models.CharField(max_length=100, blank=True)
     media_sha256 = models.CharField(max_length=64, blank=True)
+    media_status = models.CharField(
+        max_length=10,
+        choices=MediaStatus.choices,
+        blank=True,
+        db_index=True,
+        help_text='Inbound media ingest state; blank for messages without media'
+    )
     
     template_name = models.CharField(max_length=255, blank=True)
     template_language = models.CharField(max_length=10, blank=True)
@@ -177,6 +189,8 @@ class Message(BaseModel):
             models.Index(fields=['account', 'from_number', '-created_at']),
             models.Index(fields=['account', 'to_number', '-created_at']),
             models.Index(fields=['status', '-created_at']),
+            # Conversation timeline keyset pagination
+            models.Index(fields=['conversation', 'created_at', 'id']),
         ]
 
     def __str__(self):
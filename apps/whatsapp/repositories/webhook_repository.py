@@ -1,7 +1,7 @@
 """
 Webhook Event Repository.
 """
-from typing import Optional, List
+from typing import Optional, List, Iterable, Set
 from uuid import UUID
 from datetime import datetime, timedelta
 from django.db.models import QuerySet
@@ -30,10 +30,36 @@ class WebhookEventRepository:
         """Check if event exists by external event ID."""
         return WebhookEvent.objects.filter(event_id=event_id).exists()
 
+    def existing_event_ids(self, event_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of external event IDs that are already stored."""
+        event_ids = list(event_ids)
+        if not event_ids:
+            return set()
+        return set(
+            WebhookEvent.objects.filter(event_id__in=event_ids).values_list('event_id', flat=True)
+        )
+
     def create(self, **kwargs) -> WebhookEvent:
         """Create a new webhook event."""
         return WebhookEvent.objects.create(**kwargs)
 
+    def bulk_create(self, events: List[WebhookEvent]) -> List[WebhookEvent]:
+        """
+        Insert events in a single statement, skipping event_id conflicts.
+
+        Returns only the events that were actually inserted, so a concurrent
+        delivery of the same payload never gets processed twice.
+        """
+        if not events:
+            return []
+        WebhookEvent.objects.bulk_create(events, ignore_conflicts=True)
+        inserted_ids = set(
+            WebhookEvent.objects.filter(
+                id__in=[event.id for event in events]
+            ).values_list('id', flat=True)
+        )
+        return [event for event in events if event.id in inserted_ids]
+
     def update_status(
         self,
         event: WebhookEvent,
@@ -2,11 +2,11 @@
 WhatsApp Broadcast Service - Send real-time updates via Django Channels.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.utils import timezone
+from apps.core.realtime import publish_to_group
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +39,7 @@ class WhatsAppBroadcastService:
             return False
         
         try:
-            async_to_sync(self.channel_layer.group_send)(group_name, event)
+            publish_to_group(group_name, event, channel_layer=self.channel_layer)
             logger.debug(f"Broadcast sent to {group_name}: {event.get('type')}")
             return True
         except Exception as e:
@@ -157,6 +157,80 @@ class WhatsAppBroadcastService:
         logger.info(f"Broadcast status update for message {message_id}: {status}")
         return success
     
+    def broadcast_status_updates(
+        self,
+        account_id: str,
+        updates: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Broadcast several message status updates in a single group message.
+        
+        Args:
+            account_id: WhatsApp account ID
+            updates: Dicts with message_id, whatsapp_message_id, status and timestamp
+        
+        Returns:
+            True if broadcast was successful
+        """
+        if not updates:
+            return True
+        
+        group_name = self._get_account_group(account_id)
+        
+        event = {
+            'type': 'whatsapp_status_batch',
+            'updates': updates,
+            'account_id': str(account_id),
+        }
+        
+        success = self._send_to_group(group_name, event)
+        
+        logger.info(f"Broadcast {len(updates)} status updates for account {account_id}")
+        return success
+    
+    def broadcast_media_ready(
+        self,
+        account_id: str,
+        message_id: str,
+        media_url: str,
+        conversation_id: Optional[str] = None,
+        media_mime_type: str = '',
+        media_sha256: str = ''
+    ) -> bool:
+        """
+        Broadcast that an inbound message's media has been downloaded and stored.
+        
+        Args:
+            account_id: WhatsApp account ID
+            message_id: Internal message ID
+            media_url: Public URL of the stored media
+            conversation_id: Optional conversation ID
+            media_mime_type: Media MIME type
+            media_sha256: Hex sha256 of the stored file
+        
+        Returns:
+            True if broadcast was successful
+        """
+        group_name = self._get_account_group(account_id)
+        
+        event = {
+            'type': 'whatsapp_media_ready',
+            'message_id': str(message_id),
+            'media_url': media_url,
+            'media_mime_type': media_mime_type,
+            'media_sha256': media_sha256,
+            'account_id': str(account_id),
+            'conversation_id': str(conversation_id) if conversation_id else None
+        }
+        
+        success = self._send_to_group(group_name, event)
+        
+        if conversation_id:
+            conv_group = self._get_conversation_group(conversation_id)
+            self._send_to_group(conv_group, event)
+        
+        return success
+    
     def broadcast_conversation_update(
         self,
         account_id: str,
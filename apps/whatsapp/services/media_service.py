@@ -0,0 +1,101 @@
+"""
+Media Ingest Service - Download inbound WhatsApp media outside the webhook transaction.
+
+Inbound media messages are committed with ``media_status=pending``; the
+``ingest_inbound_media`` task then streams the file from Meta in chunks,
+hashing as it goes, and stores it under a content-addressed path so the
+same file received twice is only stored once.
+"""
+import hashlib
+import logging
+import mimetypes
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from ..models import Message
+from .broadcast_service import get_broadcast_service
+from .whatsapp_api_service import WhatsAppAPIService
+
+logger = logging.getLogger(__name__)
+
+
+class MediaIngestService:
+    """Fetch, hash and store the media of inbound messages."""
+
+    CHUNK_SIZE = 64 * 1024
+    # Files up to this size stay in memory while downloading; larger ones spill to disk
+    SPOOL_MAX_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self.broadcast = get_broadcast_service()
+
+    def ingest(self, message: Message) -> Message:
+        """
+        Download and store the media of ``message`` and mark it ready.
+
+        Messages that are not pending are returned untouched, so the task is
+        safe to run more than once. Download errors propagate to the caller.
+        """
+        if message.media_status != Message.MediaStatus.PENDING or not message.media_id:
+            return message
+
+        api_service = WhatsAppAPIService(message.account)
+        url = api_service.get_media_url(message.media_id)
+        if not url:
+            self.mark_failed(message, 'Media URL not available')
+            return message
+
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as buffer:
+            digest = hashlib.sha256()
+            for chunk in api_service.stream_media(url, chunk_size=self.CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+            sha256 = digest.hexdigest()
+            buffer.seek(0)
+            media_url = self._store(message, sha256, buffer)
+
+        updated = Message.objects.filter(
+            pk=message.pk,
+            media_status=Message.MediaStatus.PENDING
+        ).update(
+            media_url=media_url,
+            media_sha256=sha256,
+            media_status=Message.MediaStatus.READY
+        )
+        message.media_url = media_url
+        message.media_sha256 = sha256
+        message.media_status = Message.MediaStatus.READY
+
+        if updated:
+            self.broadcast.broadcast_media_ready(
+                account_id=str(message.account_id),
+                message_id=str(message.id),
+                conversation_id=str(message.conversation_id) if message.conversation_id else None,
+                media_url=media_url,
+                media_mime_type=message.media_mime_type,
+                media_sha256=sha256
+            )
+            logger.info(f"Media ready for message {message.id}: {sha256}")
+        return message
+
+    def mark_failed(self, message: Message, reason: str) -> None:
+        """Give up on a message's media after the last retry."""
+        Message.objects.filter(
+            pk=message.pk,
+            media_status=Message.MediaStatus.PENDING
+        ).update(media_status=Message.MediaStatus.FAILED)
+        message.media_status = Message.MediaStatus.FAILED
+        logger.warning(f"Media ingest failed for message {message.id}: {reason}")
+
+    def _store(self, message: Message, sha256: str, content) -> str:
+        """Save ``content`` under its sha256 unless the same file is already stored."""
+        extension = mimetypes.guess_extension(message.media_mime_type or '') or ''
+        filename = f"whatsapp/{message.account_id}/{sha256}{extension}"
+
+        if default_storage.exists(filename):
+            return default_storage.url(filename)
+
+        saved_path = default_storage.save(filename, File(content, name=filename))
+        return default_storage.url(saved_path)
@@ -7,7 +7,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from django.utils import timezone
 from django.db import transaction
-from apps.core.exceptions import ValidationError, NotFoundError
+from apps.core.exceptions import ValidationError, NotFoundError, WhatsAppRateLimitError
 from ..models import WhatsAppAccount, Message
 from ..repositories import MessageRepository, WhatsAppAccountRepository
 from .whatsapp_api_service import WhatsAppAPIService
@@ -58,6 +58,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Text message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -102,6 +105,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Template message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -152,6 +158,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Interactive button message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -205,6 +214,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Interactive list message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -253,6 +265,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Image message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -304,6 +319,9 @@ class MessageService:
             self._update_message_sent(message, response)
             logger.info(f"Document message sent: {message.id}")
             
+        except WhatsAppRateLimitError:
+            self._discard_unsent_message(message)
+            raise
         except Exception as e:
             self._update_message_failed(message, str(e))
             raise
@@ -669,6 +687,13 @@ class MessageService:
         except Exception as e:
             logger.warning(f"Failed to broadcast message failure: {e}")
 
+    def _discard_unsent_message(self, message: Message) -> None:
+        """Drop the pending record of a send throttled before reaching Meta; the caller retries it later."""
+        try:
+            message.delete()
+        except Exception as e:
+            logger.warning(f"Could not discard throttled message {message.id}: {e}")
+
     def _map_message_type(self, type_str: str) -> str:
         """Map WhatsApp message type to model type."""
         type_map = {
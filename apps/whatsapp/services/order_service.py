@@ -12,7 +12,7 @@ from datetime import datetime
 from django.utils import timezone
 from django.db import transaction
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from apps.core.realtime import publish_to_group
 
 from apps.stores.models import Store, StoreOrder, StoreOrderItem, StoreProduct
 from apps.stores.services.checkout_service import CheckoutService
@@ -284,10 +284,7 @@ class WhatsAppOrderService:
             logger.info(f"[_broadcast_order_created] Enviando para grupo: {group_name}")
             logger.info(f"[_broadcast_order_created] Dados: {event_data}")
             
-            async_to_sync(self.channel_layer.group_send)(
-                group_name,
-                event_data
-            )
+            publish_to_group(group_name, event_data, channel_layer=self.channel_layer)
             
             logger.info(f"[_broadcast_order_created] Evento enviado com sucesso para {group_name}")
             
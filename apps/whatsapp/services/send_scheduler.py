@@ -0,0 +1,279 @@
+"""
+Send Scheduler - Per-number token bucket in front of the Cloud API messages endpoint.
+
+Meta limits throughput per business phone number (80 msgs/sec by default,
+higher tiers on request) and answers bursts above it with error 130429.
+Every outbound send takes a token from a Redis bucket keyed by
+``phone_number_id`` first, so campaigns, scheduled messages, reminders and
+agent replies running in different workers share one budget.
+
+Sends run in one of two lanes, chosen with ``send_priority``:
+
+* ``TRANSACTIONAL`` (default) - agent replies, order updates; may take any
+  token.
+* ``BULK`` - campaigns and other marketing traffic; leaves a reserve of
+  tokens untouched and yields entirely while a transactional send waits.
+
+A rate-limit error from Meta empties the bucket and pauses the number with an
+exponential backoff. Without Redis the scheduler fails open and sends are not
+throttled.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from apps.core.exceptions import WhatsAppRateLimitError
+
+logger = logging.getLogger(__name__)
+
+TRANSACTIONAL = 'transactional'
+BULK = 'bulk'
+LANES = (TRANSACTIONAL, BULK)
+
+# Graph API error codes that mean the number (or WABA) is being throttled
+RATE_LIMIT_CODES = frozenset({'130429', '80007'})
+
+DEFAULTS = {
+    'RATE': 80,               # tokens per second, Meta's default Cloud API throughput
+    'BURST': 80,              # bucket size
+    'BULK_RESERVE': 0.2,      # share of the bucket bulk sends may not use
+    'TRANSACTIONAL_MAX_WAIT': 10,
+    'BULK_MAX_WAIT': 60,
+    'BACKOFF_BASE': 1,
+    'BACKOFF_MAX': 60,
+}
+
+_priority: ContextVar[str] = ContextVar('whatsapp_send_priority', default=TRANSACTIONAL)
+
+# Refill the bucket, then take a token if the lane allows it. Returns 0 when a
+# token was taken, otherwise the milliseconds to wait before trying again.
+# KEYS: bucket, backoff, transactional waiters, per-second sent counter
+# ARGV: rate, burst, lane, bulk reserve
+TAKE_TOKEN_SCRIPT = """
+local paused = redis.call('PTTL', KEYS[2])
+if paused > 0 then
+    return paused
+end
+
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+
+local floor = 0
+if ARGV[3] == 'bulk' then
+    floor = tonumber(ARGV[4])
+    if tonumber(redis.call('GET', KEYS[3]) or '0') > 0 then
+        floor = burst
+    end
+end
+
+local wait = 0
+if tokens - 1 >= floor then
+    tokens = tokens - 1
+    redis.call('INCR', KEYS[4])
+    redis.call('EXPIRE', KEYS[4], 120)
+else
+    wait = math.max(1, math.ceil((floor + 1 - tokens) * 1000 / rate))
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 60000)
+return wait
+"""
+
+
+def get_scheduler_settings() -> Dict[str, Any]:
+    return {**DEFAULTS, **getattr(settings, 'WHATSAPP_SEND_SCHEDULER', {})}
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def send_priority(lane: str):
+    """Run the sends inside the block in ``lane`` (``TRANSACTIONAL`` or ``BULK``)."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown send priority: {lane}")
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_rate_limit_error(code: Optional[str]) -> bool:
+    return str(code) in RATE_LIMIT_CODES
+
+
+class SendScheduler:
+    """Token bucket per ``phone_number_id`` shared by all workers through Redis."""
+
+    def __init__(self, client=None):
+        self._client = client
+        self._script = None
+        self.config = get_scheduler_settings()
+
+    @property
+    def client(self):
+        if self._client is None:
+            redis_url = getattr(settings, 'REDIS_URL', '') or getattr(settings, 'CELERY_BROKER_URL', '')
+            if not redis_url:
+                return None
+            try:
+                import redis
+                self._client = redis.from_url(redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Send scheduler unavailable: {e}")
+                return None
+        return self._client
+
+    def _key(self, phone_number_id: str, suffix: str) -> str:
+        return f"wa:send:{phone_number_id}:{suffix}"
+
+    def _rate(self, rate: Optional[float]) -> float:
+        return float(rate or self.config['RATE'])
+
+    def _take(self, phone_number_id: str, lane: str, rate: float) -> int:
+        if self._script is None:
+            self._script = self.client.register_script(TAKE_TOKEN_SCRIPT)
+        # Numbers on a higher tier get a proportionally larger bucket
+        burst = max(1.0, float(self.config['BURST']) * rate / float(self.config['RATE']))
+        return int(self._script(
+            keys=[
+                self._key(phone_number_id, 'bucket'),
+                self._key(phone_number_id, 'backoff'),
+                self._key(phone_number_id, f'waiting:{TRANSACTIONAL}'),
+                self._key(phone_number_id, f'sent:{int(time.time())}'),
+            ],
+            args=[rate, burst, lane, burst * float(self.config['BULK_RESERVE'])],
+        ))
+
+    def acquire(self, phone_number_id: str, lane: Optional[str] = None, rate: Optional[float] = None) -> float:
+        """
+        Block until a send token for ``phone_number_id`` is available.
+
+        Returns the seconds spent waiting. Raises ``WhatsAppRateLimitError``
+        when the lane's max wait is exceeded, so the caller can retry later
+        instead of holding the worker.
+        """
+        lane = lane or current_priority()
+        rate = self._rate(rate)
+        if self.client is None:
+            return 0.0
+
+        max_wait = float(self.config[f'{lane.upper()}_MAX_WAIT'])
+        started = time.monotonic()
+        waiting_key = None
+        try:
+            while True:
+                wait_ms = self._take(phone_number_id, lane, rate)
+                if wait_ms == 0:
+                    return time.monotonic() - started
+                waited = time.monotonic() - started
+                if waited + wait_ms / 1000 > max_wait:
+                    raise WhatsAppRateLimitError(
+                        message=f"Send rate limit reached for {phone_number_id}, waited {waited:.1f}s",
+                        details={'phone_number_id': phone_number_id, 'priority': lane},
+                    )
+                if waiting_key is None:
+                    waiting_key = self._key(phone_number_id, f'waiting:{lane}')
+                    pipe = self.client.pipeline()
+                    pipe.incr(waiting_key)
+                    pipe.expire(waiting_key, int(max_wait) + 5)
+                    pipe.execute()
+                time.sleep(min(wait_ms, 1000) / 1000)
+        except WhatsAppRateLimitError:
+            raise
+        except Exception as e:
+            # Never block sends on a scheduler outage
+            logger.warning(f"Send scheduler error for {phone_number_id}, sending unthrottled: {e}")
+            return time.monotonic() - started
+        finally:
+            if waiting_key is not None:
+                try:
+                    self.client.decr(waiting_key)
+                except Exception:
+                    pass
+
+    def record_rate_limit(self, phone_number_id: str) -> float:
+        """Pause ``phone_number_id`` after Meta throttled it; returns the pause in seconds."""
+        if self.client is None:
+            return 0.0
+        try:
+            strikes_key = self._key(phone_number_id, 'strikes')
+            pipe = self.client.pipeline()
+            pipe.incr(strikes_key)
+            pipe.expire(strikes_key, int(self.config['BACKOFF_MAX']) * 2)
+            strikes = pipe.execute()[0]
+            delay = min(
+                float(self.config['BACKOFF_MAX']),
+                float(self.config['BACKOFF_BASE']) * 2 ** (strikes - 1),
+            )
+            pipe = self.client.pipeline()
+            pipe.set(self._key(phone_number_id, 'backoff'), '1', px=int(delay * 1000))
+            pipe.hset(self._key(phone_number_id, 'bucket'), 'tokens', '0')
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not record rate limit for {phone_number_id}: {e}")
+            return 0.0
+        logger.warning(
+            f"Meta throttled {phone_number_id}, pausing sends for {delay:.0f}s",
+            extra={'phone_number_id': phone_number_id, 'strikes': strikes, 'backoff_seconds': delay}
+        )
+        return delay
+
+    def get_metrics(self, phone_number_id: str, rate: Optional[float] = None) -> Dict[str, Any]:
+        """Queue depth per lane, tokens left, backoff and sends over the last minute."""
+        rate = self._rate(rate)
+        metrics = {
+            'phone_number_id': phone_number_id,
+            'rate_limit': rate,
+            'tokens': None,
+            'waiting': {lane: 0 for lane in LANES},
+            'backoff_seconds': 0.0,
+            'sent_last_minute': 0,
+            'send_rate': 0.0,
+        }
+        if self.client is None:
+            return metrics
+
+        now = int(time.time())
+        pipe = self.client.pipeline()
+        pipe.hget(self._key(phone_number_id, 'bucket'), 'tokens')
+        pipe.pttl(self._key(phone_number_id, 'backoff'))
+        for lane in LANES:
+            pipe.get(self._key(phone_number_id, f'waiting:{lane}'))
+        pipe.mget([self._key(phone_number_id, f'sent:{second}') for second in range(now - 60, now)])
+        tokens, backoff_ms, *waiting, sent = pipe.execute()
+
+        sent_last_minute = sum(int(count) for count in sent if count)
+        metrics.update({
+            'tokens': float(tokens) if tokens is not None else None,
+            'waiting': {lane: max(0, int(count or 0)) for lane, count in zip(LANES, waiting)},
+            'backoff_seconds': max(0, backoff_ms) / 1000,
+            'sent_last_minute': sent_last_minute,
+            'send_rate': round(sent_last_minute / 60, 2),
+        })
+        return metrics
+
+
+_scheduler: Optional[SendScheduler] = None
+
+
+def get_send_scheduler() -> SendScheduler:
+    """Get the process-wide send scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SendScheduler()
+    return _scheduler
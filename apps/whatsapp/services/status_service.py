@@ -0,0 +1,231 @@
+"""
+Message Status Service - Apply batches of Meta status webhooks with set-based updates.
+
+Meta sends a sent/delivered/read burst for every outbound message. Instead of
+one read-modify-write per event, a batch is applied with a single conditional
+UPDATE that only moves a message forward (pending < sent < delivered < read <
+failed). The prior state is read once beforehand, one SELECT returns the rows
+the UPDATE changed and one more UPDATE links and completes the events.
+Because the bulk UPDATE skips model signals, the daily status rollup is moved
+here through ``record_change``. Broadcasts are coalesced per account.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from apps.core.services.daily_metrics import record_change, snapshot
+from ..models import Message, WebhookEvent
+from .broadcast_service import get_broadcast_service
+
+logger = logging.getLogger(__name__)
+
+# Meta status -> MessageStatus
+STATUS_MAP = {
+    'sent': Message.MessageStatus.SENT,
+    'delivered': Message.MessageStatus.DELIVERED,
+    'read': Message.MessageStatus.READ,
+    'failed': Message.MessageStatus.FAILED,
+}
+
+# Statuses only move to a higher rank
+STATUS_RANK = {
+    Message.MessageStatus.PENDING: 0,
+    Message.MessageStatus.SENT: 1,
+    Message.MessageStatus.DELIVERED: 2,
+    Message.MessageStatus.READ: 3,
+    Message.MessageStatus.FAILED: 4,
+}
+
+# Columns read to link events and to diff the daily metrics rollup
+ROLLUP_FIELDS = (
+    'id', 'account_id', 'whatsapp_message_id', 'direction', 'message_type',
+    'status', 'created_at', 'updated_at',
+)
+
+TIMESTAMP_FIELDS = {
+    Message.MessageStatus.SENT: 'sent_at',
+    Message.MessageStatus.DELIVERED: 'delivered_at',
+    Message.MessageStatus.READ: 'read_at',
+    Message.MessageStatus.FAILED: 'failed_at',
+}
+
+
+def statuses_below(status: str) -> List[str]:
+    """Statuses a message may be in for ``status`` to still apply."""
+    rank = STATUS_RANK[status]
+    return [candidate for candidate, candidate_rank in STATUS_RANK.items() if candidate_rank < rank]
+
+
+def _parse_timestamp(value) -> datetime:
+    if value:
+        try:
+            return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+        except (ValueError, TypeError):
+            pass
+    return timezone.now()
+
+
+class MessageStatusService:
+    """Apply status webhook events to messages in bulk."""
+
+    def __init__(self):
+        self.broadcast = get_broadcast_service()
+
+    @transaction.atomic
+    def apply_status_events(self, events: Iterable[WebhookEvent]) -> List[Message]:
+        """
+        Apply a batch of STATUS events and mark them completed.
+
+        Returns the messages whose status changed, loaded with the columns
+        needed for broadcasting. Stale or repeated statuses are no-ops.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        # whatsapp_message_id -> {status: timestamp}, latest event wins per status
+        proposed: Dict[str, Dict[str, datetime]] = defaultdict(dict)
+        errors: Dict[str, dict] = {}
+        for event in events:
+            payload = event.payload
+            whatsapp_message_id = payload.get('id')
+            status = STATUS_MAP.get(payload.get('status'))
+            if not whatsapp_message_id or not status:
+                logger.warning(f"Invalid status update in event {event.id}: {payload.get('status')}")
+                continue
+            proposed[whatsapp_message_id][status] = _parse_timestamp(payload.get('timestamp'))
+            if status == Message.MessageStatus.FAILED and payload.get('errors'):
+                errors[whatsapp_message_id] = payload['errors'][0]
+
+        changed: List[Message] = []
+        message_ids: Dict[str, UUID] = {}
+        if proposed:
+            # Prior state, for linking events and moving the daily status rollup
+            before = {
+                message.id: message
+                for message in Message.objects.filter(
+                    whatsapp_message_id__in=list(proposed)
+                ).only(*ROLLUP_FIELDS)
+            }
+            message_ids = {message.whatsapp_message_id: pk for pk, message in before.items()}
+            missing = set(proposed) - set(message_ids)
+            if missing:
+                logger.warning(f"Messages not found for {len(missing)} status updates")
+
+            batch_marker = timezone.now()
+            if self._update_messages(proposed, errors, batch_marker):
+                changed = list(
+                    Message.objects.filter(
+                        pk__in=list(before), updated_at=batch_marker
+                    ).only(*ROLLUP_FIELDS, 'conversation_id', *TIMESTAMP_FIELDS.values())
+                )
+                for message in changed:
+                    record_change(message, snapshot(before[message.pk]), snapshot(message))
+
+        self._complete_events(events, message_ids)
+        transaction.on_commit(lambda: self._broadcast(changed))
+
+        logger.info(f"Applied {len(events)} status events, {len(changed)} messages changed")
+        return changed
+
+    def _update_messages(
+        self,
+        proposed: Dict[str, Dict[str, datetime]],
+        errors: Dict[str, dict],
+        batch_marker: datetime
+    ) -> int:
+        """Move each message to its highest proposed status with one UPDATE."""
+        targets = {
+            whatsapp_message_id: max(statuses, key=STATUS_RANK.__getitem__)
+            for whatsapp_message_id, statuses in proposed.items()
+        }
+        by_target: Dict[str, List[str]] = defaultdict(list)
+        for whatsapp_message_id, target in targets.items():
+            by_target[target].append(whatsapp_message_id)
+
+        advances = Q()
+        for target, whatsapp_message_ids in by_target.items():
+            advances |= Q(whatsapp_message_id__in=whatsapp_message_ids, status__in=statuses_below(target))
+
+        updates = {
+            'status': Case(
+                *(When(whatsapp_message_id=whatsapp_message_id, then=Value(target))
+                  for whatsapp_message_id, target in targets.items()),
+                default=F('status'),
+                output_field=models.CharField(),
+            ),
+            'updated_at': Value(batch_marker),
+        }
+
+        # Each timestamp is only written if the message had not reached that status yet
+        for status, field in TIMESTAMP_FIELDS.items():
+            whens = [
+                When(
+                    whatsapp_message_id=whatsapp_message_id,
+                    status__in=statuses_below(status),
+                    then=Value(statuses[status]),
+                )
+                for whatsapp_message_id, statuses in proposed.items()
+                if status in statuses
+            ]
+            if whens:
+                updates[field] = Case(*whens, default=F(field), output_field=models.DateTimeField())
+
+        if errors:
+            for field, key in (('error_code', 'code'), ('error_message', 'title')):
+                updates[field] = Case(
+                    *(When(whatsapp_message_id=whatsapp_message_id, then=Value(str(error.get(key, ''))))
+                      for whatsapp_message_id, error in errors.items()),
+                    default=F(field),
+                    output_field=models.CharField(),
+                )
+
+        return Message.objects.filter(advances).update(**updates)
+
+    def _complete_events(self, events: List[WebhookEvent], message_ids: Dict[str, UUID]) -> None:
+        """Link events to their messages and mark them completed in one UPDATE."""
+        links = [
+            When(pk=event.pk, then=Value(message_ids[event.payload.get('id')]))
+            for event in events
+            if event.payload.get('id') in message_ids
+        ]
+        processed_at = timezone.now()
+        for event in events:
+            event.processing_status = WebhookEvent.ProcessingStatus.COMPLETED
+            event.processed_at = processed_at
+            event.error_message = ''
+            if event.payload.get('id') in message_ids:
+                event.related_message_id = message_ids[event.payload['id']]
+
+        updates = {
+            'processing_status': WebhookEvent.ProcessingStatus.COMPLETED,
+            'processed_at': processed_at,
+            'error_message': '',
+        }
+        if links:
+            updates['related_message_id'] = Case(
+                *links,
+                default=F('related_message_id'),
+                output_field=models.UUIDField(),
+            )
+        WebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(**updates)
+
+    def _broadcast(self, messages: List[Message]) -> None:
+        """Send one status broadcast per account."""
+        by_account: Dict[str, List[dict]] = defaultdict(list)
+        for message in messages:
+            timestamp: Optional[datetime] = getattr(message, TIMESTAMP_FIELDS.get(message.status, ''), None)
+            by_account[str(message.account_id)].append({
+                'message_id': str(message.id),
+                'whatsapp_message_id': message.whatsapp_message_id,
+                'status': message.status,
+                'timestamp': timestamp.isoformat() if timestamp else None,
+            })
+        for account_id, updates in by_account.items():
+            self.broadcast.broadcast_status_updates(account_id=account_id, updates=updates)
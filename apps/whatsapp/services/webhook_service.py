@@ -2,29 +2,22 @@
 Webhook Service - Process incoming webhooks from Meta.
 """
 import logging
-import hashlib
-import mimetypes
 from typing import Dict, Any, Optional, List, Tuple
-from datetime import datetime
 from django.db import IntegrityError
-from django.db.models import Q
 from django.conf import settings
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 from django.utils import timezone
 from django.db import transaction
 from celery import current_app
 from apps.core.utils import (
     verify_webhook_signature,
     generate_idempotency_key,
-    normalize_phone_number,
     build_absolute_media_url
 )
 from apps.core.exceptions import WebhookValidationError
+from apps.core.services.account_routing import get_account_router
 from ..models import WhatsAppAccount, WebhookEvent, Message
 from ..repositories import WebhookEventRepository, WhatsAppAccountRepository
 from .broadcast_service import get_broadcast_service
-from .whatsapp_api_service import WhatsAppAPIService
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +25,9 @@ logger = logging.getLogger(__name__)
 class WebhookService:
     """Service for processing Meta webhooks."""
 
+    # Status events applied per UPDATE statement
+    STATUS_BATCH_SIZE = 500
+
     def __init__(self):
         self.webhook_repo = WebhookEventRepository()
         self.account_repo = WhatsAppAccountRepository()
@@ -72,8 +68,16 @@ class WebhookService:
         payload: Dict[str, Any],
         headers: Dict[str, str]
     ) -> List[WebhookEvent]:
-        """Process incoming webhook payload."""
-        events = []
+        """
+        Process incoming webhook payload.
+
+        Events are ingested in batch: every idempotency key in the payload is
+        computed up front, existing keys are filtered with a single
+        ``event_id__in`` query, each phone_number_id is resolved once and the
+        new rows are written with one ``bulk_create``.
+        """
+        candidates: Dict[str, WebhookEvent] = {}
+        resolved_accounts: Dict[Tuple, Optional[WhatsAppAccount]] = {}
         
         entries = payload.get('entry', [])
         
@@ -90,11 +94,14 @@ class WebhookService:
                 phone_number_id = metadata.get('phone_number_id')
                 display_phone = metadata.get('display_phone_number')
                 
-                account = self._resolve_account(
-                    phone_number_id=phone_number_id,
-                    display_phone=display_phone,
-                    waba_id=waba_id
-                )
+                account_key = (phone_number_id, display_phone, waba_id)
+                if account_key not in resolved_accounts:
+                    resolved_accounts[account_key] = self._resolve_account(
+                        phone_number_id=phone_number_id,
+                        display_phone=display_phone,
+                        waba_id=waba_id
+                    )
+                account = resolved_accounts[account_key]
                 
                 if not account:
                     logger.warning(
@@ -107,39 +114,109 @@ class WebhookService:
                     )
                     continue
                 
-                messages = value.get('messages', [])
-                for message_data in messages:
-                    event = self._process_message_event(
+                built = []
+                for message_data in value.get('messages', []):
+                    built.append(self._build_message_event(
                         account=account,
                         message_data=message_data,
                         contacts=value.get('contacts', []),
                         headers=headers
-                    )
-                    if event:
-                        events.append(event)
+                    ))
                 
-                statuses = value.get('statuses', [])
-                for status_data in statuses:
-                    event = self._process_status_event(
+                for status_data in value.get('statuses', []):
+                    built.append(self._build_status_event(
                         account=account,
                         status_data=status_data,
                         headers=headers
-                    )
-                    if event:
-                        events.append(event)
+                    ))
                 
-                errors = value.get('errors', [])
-                for error_data in errors:
-                    event = self._process_error_event(
+                for error_data in value.get('errors', []):
+                    built.append(self._build_error_event(
                         account=account,
                         error_data=error_data,
                         headers=headers
-                    )
-                    if event:
-                        events.append(event)
+                    ))
+                
+                for event in built:
+                    candidates.setdefault(event.event_id, event)
+        
+        if not candidates:
+            return []
         
+        existing = self.webhook_repo.existing_event_ids(candidates.keys())
+        for event_id in existing:
+            logger.info(f"Duplicate webhook event: {event_id}")
+        
+        new_events = [
+            event for event_id, event in candidates.items()
+            if event_id not in existing
+        ]
+        events = self.webhook_repo.bulk_create(new_events)
+        
+        logger.info(
+            f"Webhook batch ingested: {len(events)} created, "
+            f"{len(candidates) - len(events)} duplicates"
+        )
         return events
 
+    def dispatch_events(self, events: List[WebhookEvent]) -> Dict[str, int]:
+        """
+        Enqueue processing for ingested events as a single Celery group.
+
+        Falls back to synchronous processing when the broker is unavailable,
+        so events are never left pending without a worker.
+        """
+        results = {'async': 0, 'sync': 0, 'error': 0}
+        if not events:
+            return results
+        
+        from celery import group
+        from ..tasks import process_status_events, process_webhook_event
+        
+        # Status events are applied in set-based batches, everything else per event
+        status_events = [e for e in events if e.event_type == WebhookEvent.EventType.STATUS]
+        other_events = [e for e in events if e.event_type != WebhookEvent.EventType.STATUS]
+        status_batches = [
+            status_events[i:i + self.STATUS_BATCH_SIZE]
+            for i in range(0, len(status_events), self.STATUS_BATCH_SIZE)
+        ]
+        
+        try:
+            group(
+                [process_status_events.s([str(e.id) for e in batch]) for batch in status_batches]
+                + [process_webhook_event.s(str(event.id)) for event in other_events]
+            ).apply_async()
+            results['async'] = len(events)
+            logger.info(f"Dispatched {len(events)} webhook events to Celery")
+            return results
+        except Exception as e:
+            logger.warning(f"Celery not available for webhook batch: {e}")
+        
+        for batch in status_batches:
+            try:
+                self.process_status_events(batch)
+                results['sync'] += len(batch)
+            except Exception as sync_error:
+                logger.error(
+                    f"Error processing status batch synchronously: {sync_error}",
+                    exc_info=True
+                )
+                for event in batch:
+                    self.mark_event_failed(event, str(sync_error))
+                results['error'] += len(batch)
+        
+        for event in other_events:
+            try:
+                self.process_event(event, post_process_inbound=True)
+                results['sync'] += 1
+            except Exception as sync_error:
+                logger.error(
+                    f"Error processing event {event.id} synchronously: {sync_error}",
+                    exc_info=True
+                )
+                results['error'] += 1
+        return results
+
     def _resolve_account(
         self,
         phone_number_id: Optional[str],
@@ -147,26 +224,11 @@ class WebhookService:
         waba_id: Optional[str]
     ) -> Optional[WhatsAppAccount]:
         """Resolve WhatsApp account from webhook metadata with fallbacks."""
-        account = None
-        
-        if phone_number_id:
-            account = self.account_repo.get_by_phone_number_id(phone_number_id)
-        
-        if not account and display_phone:
-            normalized = normalize_phone_number(display_phone)
-            if normalized:
-                account = WhatsAppAccount.objects.filter(
-                    is_active=True
-                ).filter(
-                    Q(display_phone_number__icontains=normalized) |
-                    Q(phone_number__icontains=normalized)
-                ).first()
-        
-        if not account and waba_id:
-            account = WhatsAppAccount.objects.filter(
-                is_active=True,
-                waba_id=waba_id
-            ).first()
+        account = get_account_router().resolve_whatsapp(
+            phone_number_id=phone_number_id,
+            display_phone=display_phone,
+            waba_id=waba_id
+        )
         
         # If we found an account but phone_number_id has changed, update it
         if account and phone_number_id and account.phone_number_id != phone_number_id:
@@ -186,21 +248,17 @@ class WebhookService:
         
         return account
 
-    def _process_message_event(
+    def _build_message_event(
         self,
         account: WhatsAppAccount,
         message_data: Dict[str, Any],
         contacts: List[Dict],
         headers: Dict[str, str]
-    ) -> Optional[WebhookEvent]:
-        """Process a message event."""
+    ) -> WebhookEvent:
+        """Build an unsaved message event."""
         message_id = message_data.get('id')
         event_id = generate_idempotency_key('message', message_id)
         
-        if self.webhook_repo.exists_by_event_id(event_id):
-            logger.info(f"Duplicate message event: {event_id}")
-            return None
-        
         contact_info = {}
         if contacts:
             contact = contacts[0]
@@ -209,7 +267,7 @@ class WebhookService:
                 'profile': contact.get('profile', {})
             }
         
-        event = self.webhook_repo.create(
+        return WebhookEvent(
             account=account,
             event_id=event_id,
             event_type=WebhookEvent.EventType.MESSAGE,
@@ -219,61 +277,49 @@ class WebhookService:
             },
             headers=headers
         )
-        
-        logger.info(f"Message event created: {event.id}")
-        return event
 
-    def _process_status_event(
+    def _build_status_event(
         self,
         account: WhatsAppAccount,
         status_data: Dict[str, Any],
         headers: Dict[str, str]
-    ) -> Optional[WebhookEvent]:
-        """Process a status update event."""
+    ) -> WebhookEvent:
+        """Build an unsaved status update event."""
         message_id = status_data.get('id')
         status = status_data.get('status')
         timestamp = status_data.get('timestamp')
         
         event_id = generate_idempotency_key('status', message_id, status, timestamp)
         
-        if self.webhook_repo.exists_by_event_id(event_id):
-            logger.info(f"Duplicate status event: {event_id}")
-            return None
-        
-        event = self.webhook_repo.create(
+        return WebhookEvent(
             account=account,
             event_id=event_id,
             event_type=WebhookEvent.EventType.STATUS,
             payload=status_data,
             headers=headers
         )
-        
-        logger.info(f"Status event created: {event.id}")
-        return event
 
-    def _process_error_event(
+    def _build_error_event(
         self,
         account: WhatsAppAccount,
         error_data: Dict[str, Any],
         headers: Dict[str, str]
-    ) -> Optional[WebhookEvent]:
-        """Process an error event."""
+    ) -> WebhookEvent:
+        """Build an unsaved error event."""
         error_code = error_data.get('code')
         error_title = error_data.get('title')
         timestamp = str(timezone.now().timestamp())
         
-        event_id = generate_idempotency_key('error', error_code, timestamp)
+        event_id = generate_idempotency_key('error', error_code, error_title, timestamp)
+        logger.warning(f"Error event received: {error_code}: {error_title}")
         
-        event = self.webhook_repo.create(
+        return WebhookEvent(
             account=account,
             event_id=event_id,
             event_type=WebhookEvent.EventType.ERROR,
             payload=error_data,
             headers=headers
         )
-        
-        logger.warning(f"Error event created: {event.id} - {error_code}: {error_title}")
-        return event
 
     def get_pending_events(self, limit: int = 100) -> List[WebhookEvent]:
         """Get pending events for processing."""
@@ -761,9 +807,8 @@ class WebhookService:
         text_body = ''
         content = {}
         media_id = ''
-        media_url = ''
         media_mime_type = ''
-        media_sha256 = ''
+        media_status = ''
         
         if message_type == 'text':
             text_body = message_data.get('text', {}).get('body', '')
@@ -774,7 +819,9 @@ class WebhookService:
             media_mime_type = media_data.get('mime_type', '')
             text_body = media_data.get('caption', '')
             content = {message_type: media_data}
-            media_url, media_sha256 = self._fetch_and_store_media(event.account, media_id, media_mime_type)
+            if media_id:
+                # Downloaded by ingest_inbound_media once this row commits
+                media_status = Message.MediaStatus.PENDING
         elif message_type == 'location':
             location = message_data.get('location', {})
             content = {'location': location}
@@ -826,9 +873,8 @@ class WebhookService:
             content=content,
             text_body=text_body,
             media_id=media_id,
-            media_url=media_url,
             media_mime_type=media_mime_type,
-            media_sha256=media_sha256,
+            media_status=media_status,
             context_message_id=message_data.get('context', {}).get('id', ''),
             delivered_at=timezone.now(),
             metadata={
@@ -849,99 +895,30 @@ class WebhookService:
         # Broadcast to connected clients
         self._broadcast_new_message(event.account, message, conversation, contact_data)
         
+        if media_status:
+            transaction.on_commit(lambda: self._enqueue_media_ingest(message))
+        
         logger.info(f"Processed inbound message: {message.id} from {from_number}")
         return message
 
     def _process_status_update(self, event: WebhookEvent) -> Optional[Message]:
-        """Process a message status update event."""
-        payload = event.payload
-        
-        whatsapp_message_id = payload.get('id')
-        status = payload.get('status')
-        timestamp = payload.get('timestamp')
-        recipient_id = payload.get('recipient_id')
-        
-        if not whatsapp_message_id or not status:
-            logger.warning(f"Invalid status update in event {event.id}")
-            return None
-        
-        # Find the message
-        message = Message.objects.filter(whatsapp_message_id=whatsapp_message_id).first()
-        
-        if not message:
-            logger.warning(f"Message not found for status update: {whatsapp_message_id}")
-            return None
-        
-        # Map Meta status to our status
-        status_map = {
-            'sent': Message.MessageStatus.SENT,
-            'delivered': Message.MessageStatus.DELIVERED,
-            'read': Message.MessageStatus.READ,
-            'failed': Message.MessageStatus.FAILED,
-        }
-        
-        new_status = status_map.get(status)
-        if not new_status:
-            logger.warning(f"Unknown status: {status}")
-            return message
-        
-        # Only update if status is "higher" (sent < delivered < read)
-        status_order = ['pending', 'sent', 'delivered', 'read', 'failed']
-        current_idx = status_order.index(message.status) if message.status in status_order else 0
-        new_idx = status_order.index(new_status) if new_status in status_order else 0
-        
-        if new_idx <= current_idx and new_status != 'failed':
-            logger.debug(f"Ignoring status update {status} for message {message.id} (current: {message.status})")
-            return message
-        
-        # Update message status
-        message.status = new_status
-        update_fields = ['status', 'updated_at']
-        
-        # Set timestamp fields
-        status_time = timezone.now()
-        if timestamp:
-            try:
-                status_time = datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
-            except (ValueError, TypeError):
-                pass
-        
-        if new_status == Message.MessageStatus.SENT:
-            message.sent_at = status_time
-            update_fields.append('sent_at')
-        elif new_status == Message.MessageStatus.DELIVERED:
-            message.delivered_at = status_time
-            update_fields.append('delivered_at')
-        elif new_status == Message.MessageStatus.READ:
-            message.read_at = status_time
-            update_fields.append('read_at')
-        elif new_status == Message.MessageStatus.FAILED:
-            message.failed_at = status_time
-            update_fields.append('failed_at')
-            # Extract error info if available
-            errors = payload.get('errors', [])
-            if errors:
-                message.error_code = str(errors[0].get('code', ''))
-                message.error_message = errors[0].get('title', '')
-                update_fields.extend(['error_code', 'error_message'])
-        
-        message.save(update_fields=update_fields)
-        
-        # Link event to message
-        event.related_message = message
-        event.save(update_fields=['related_message'])
+        """Process a single message status update event."""
+        changed = self.process_status_events([event])
+        if changed:
+            return changed[0]
+        return event.related_message if event.related_message_id else None
+
+    def process_status_events(self, events: List[WebhookEvent]) -> List[Message]:
+        """
+        Apply STATUS events as one batch; see ``MessageStatusService``.
         
-        # Broadcast status update
-        self.broadcast.broadcast_status_update(
-            account_id=str(event.account.id),
-            message_id=str(message.id),
-            status=new_status,
-            whatsapp_message_id=whatsapp_message_id,
-            timestamp=status_time
-        )
+        Events are marked completed and the messages whose status changed are
+        returned. On error the whole batch rolls back and the caller decides
+        whether to retry or mark the events failed.
+        """
+        from .status_service import MessageStatusService
         
-        logger.info(f"Updated message {message.id} status to {new_status}")
-        return message
+        return MessageStatusService().apply_status_events(events)
 
     def _process_error(self, event: WebhookEvent) -> None:
         """Process an error event."""
@@ -1044,6 +1021,7 @@ class WebhookService:
             'media_url': message.media_url,
             'media_mime_type': message.media_mime_type,
             'media_sha256': message.media_sha256,
+            'media_status': message.media_status,
             'created_at': message.created_at.isoformat(),
             'delivered_at': message.delivered_at.isoformat() if message.delivered_at else None,
         }
@@ -1080,35 +1058,11 @@ class WebhookService:
         }
         return type_map.get(meta_type, Message.MessageType.UNKNOWN)
 
-    def _fetch_and_store_media(
-        self,
-        account: WhatsAppAccount,
-        media_id: str,
-        mime_type: str
-    ) -> Tuple[str, str]:
-        """Download media from WhatsApp and store it locally or on the configured storage."""
-        if not media_id:
-            return '', ''
-
+    def _enqueue_media_ingest(self, message: Message) -> None:
+        """Queue the media download; the periodic sweep retries if the broker is down."""
+        from ..tasks import ingest_inbound_media
+        
         try:
-            api_service = WhatsAppAPIService(account)
-            url = api_service.get_media_url(media_id)
-            if not url:
-                return '', ''
-
-            media_bytes = api_service.download_media(url)
-            sha256 = hashlib.sha256(media_bytes).hexdigest()
-            extension = mimetypes.guess_extension(mime_type or '') or ''
-            filename = f"whatsapp/{account.id}/{media_id}{extension}"
-
-            if default_storage.exists(filename):
-                # Use default_storage.url() to get correct URL (works with S3 and local)
-                return default_storage.url(filename), sha256
-
-            saved_path = default_storage.save(filename, ContentFile(media_bytes))
-            # Use default_storage.url() to get correct URL (works with S3 and local)
-            return default_storage.url(saved_path), sha256
-
-        except Exception as exc:
-            logger.warning(f"Failed to persist media {media_id}: {exc}")
-            return '', ''
+            ingest_inbound_media.delay(str(message.id))
+        except Exception as e:
+            logger.warning(f"Could not enqueue media ingest for message {message.id}: {e}")
@@ -3,13 +3,18 @@ WhatsApp Business API Service.
 """
 import logging
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 from django.conf import settings
 from apps.core.exceptions import WhatsAppAPIError
+from apps.core.services.http_client import get_http_client
 from ..models import WhatsAppAccount
+from .send_scheduler import get_send_scheduler, is_rate_limit_error
 
 logger = logging.getLogger(__name__)
 
+# Sends retried after Meta throttled the number (the scheduler backs off first)
+RATE_LIMIT_RETRIES = 2
+
 
 class WhatsAppAPIService:
     """Service for interacting with WhatsApp Business API."""
@@ -19,6 +24,8 @@ class WhatsAppAPIService:
         self.base_url = settings.WHATSAPP_API_BASE_URL
         self.phone_number_id = account.phone_number_id
         self.access_token = account.access_token
+        # Throughput tier of the number, msgs/sec (defaults to WHATSAPP_SEND_SCHEDULER['RATE'])
+        self.send_rate = (account.metadata or {}).get('send_rate')
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers."""
@@ -27,12 +34,39 @@ class WhatsAppAPIService:
             'Content-Type': 'application/json',
         }
 
+    def _is_outbound_send(self, method: str, endpoint: str, data: Optional[Dict]) -> bool:
+        """Message sends count against the number's throughput; read receipts do not."""
+        return method == 'POST' and endpoint.endswith('/messages') and bool(data and data.get('to'))
+
     def _make_request(
         self,
         method: str,
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Make HTTP request to WhatsApp API, pacing message sends per phone number."""
+        if not self._is_outbound_send(method, endpoint, data):
+            return self._request(method, endpoint, data=data, params=params)
+
+        scheduler = get_send_scheduler()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            scheduler.acquire(self.phone_number_id, rate=self.send_rate)
+            try:
+                return self._request(method, endpoint, data=data, params=params)
+            except WhatsAppAPIError as e:
+                if not is_rate_limit_error(e.code):
+                    raise
+                scheduler.record_rate_limit(self.phone_number_id)
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Make HTTP request to WhatsApp API."""
         url = f"{self.base_url}/{endpoint}"
@@ -42,7 +76,7 @@ class WhatsAppAPIService:
             extra={'endpoint': endpoint, 'payload': data, 'params': params}
         )
         try:
-            response = requests.request(
+            response = get_http_client().request(
                 method=method,
                 url=url,
                 headers=self._get_headers(),
@@ -404,7 +438,7 @@ class WhatsAppAPIService:
     def download_media(self, media_url: str) -> bytes:
         """Download media from URL."""
         try:
-            response = requests.get(
+            response = get_http_client().get(
                 media_url,
                 headers={'Authorization': f'Bearer {self.access_token}'},
                 timeout=60
@@ -418,6 +452,31 @@ class WhatsAppAPIService:
                 code='media_download_failed'
             )
 
+    def stream_media(self, media_url: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Stream media from URL in chunks without buffering the whole file.
+
+        The read timeout applies between chunks, so large files are not cut
+        off by a fixed total deadline.
+        """
+        try:
+            with get_http_client().get(
+                media_url,
+                headers={'Authorization': f'Bearer {self.access_token}'},
+                stream=True,
+                timeout=(10, 60)
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        yield chunk
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to stream media: {str(e)}")
+            raise WhatsAppAPIError(
+                message=f"Failed to download media: {str(e)}",
+                code='media_download_failed'
+            )
+
     def upload_media(
         self,
         file_data: bytes,
@@ -436,7 +495,7 @@ class WhatsAppAPIService:
         }
         
         try:
-            response = requests.post(
+            response = get_http_client().post(
                 url,
                 headers={'Authorization': f'Bearer {self.access_token}'},
                 files=files,
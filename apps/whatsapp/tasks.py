@@ -8,6 +8,8 @@ from datetime import timedelta
 import logging
 import time
 
+from apps.core.services.templating import render_components, render_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -499,20 +501,9 @@ def schedule_campaign_messages(campaign_id: str, messages_per_minute: int = 60):
 
 def _build_template_components(content: dict, variables: dict) -> list:
     """Build template components with personalization."""
-    components = content.get('components', [])
-    
-    for component in components:
-        if 'parameters' in component:
-            for param in component['parameters']:
-                if param.get('type') == 'text' and 'variable' in param:
-                    var_name = param['variable']
-                    param['text'] = variables.get(var_name, param.get('text', ''))
-    
-    return components
+    return render_components(content.get('components', []), variables)
 
 
 def _personalize_message(text: str, variables: dict) -> str:
     """Personalize message text with variables."""
-    for key, value in variables.items():
-        text = text.replace(f'{{{{{key}}}}}', str(value))
-    return text
+    return render_template(text, variables)
@@ -8,6 +8,8 @@ from django.utils import timezone
 from django.conf import settings
 import redis
 
+from apps.core.exceptions import WhatsAppRateLimitError
+
 logger = logging.getLogger(__name__)
 
 # Redis client for distributed locking
@@ -75,6 +77,33 @@ def process_webhook_event(self, event_id: str):
         raise self.retry(exc=e)
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_status_events(self, event_ids: list):
+    """Apply a batch of status webhook events with set-based updates."""
+    from ..models import WebhookEvent
+    from ..services import WebhookService
+    
+    events = list(
+        WebhookEvent.objects.filter(
+            id__in=event_ids,
+            event_type=WebhookEvent.EventType.STATUS,
+            processing_status__in=[
+                WebhookEvent.ProcessingStatus.PENDING,
+                WebhookEvent.ProcessingStatus.FAILED,
+            ]
+        )
+    )
+    if not events:
+        logger.info(f"Status batch already processed: {len(event_ids)} events")
+        return
+    
+    try:
+        WebhookService().process_status_events(events)
+    except Exception as e:
+        logger.error(f"Error processing status batch of {len(events)} events: {str(e)}")
+        raise self.retry(exc=e)
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def process_message_with_agent(self, message_id: str):
     """Process a message with AI Agent (Langchain)."""
@@ -218,6 +247,10 @@ def send_agent_response(self, account_id: str, to: str, response_text: str, repl
         )
         logger.info(f"AI Agent response sent to {to}")
         
+    except WhatsAppRateLimitError as e:
+        # Number is saturated or paused by Meta: retry soon, replies are time sensitive
+        logger.warning(f"AI Agent response to {to} throttled: {e.message}")
+        raise self.retry(exc=e, countdown=5)
     except Exception as e:
         logger.error(f"Error sending AI Agent response: {str(e)}")
         raise self.retry(exc=e)
@@ -390,6 +423,52 @@ def try_create_order_from_conversation(conversation, phone_number: str) -> dict:
         return {}
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def ingest_inbound_media(self, message_id: str):
+    """Stream an inbound message's media to storage (runs on the whatsapp_media queue)."""
+    from ..models import Message
+    from ..repositories import MessageRepository
+    from ..services.media_service import MediaIngestService
+    
+    message = MessageRepository().get_by_id(message_id)
+    if not message:
+        logger.error(f"Message not found for media ingest: {message_id}")
+        return
+    
+    if message.media_status != Message.MediaStatus.PENDING:
+        logger.info(f"Media already ingested for message: {message_id}")
+        return
+    
+    service = MediaIngestService()
+    try:
+        service.ingest(message)
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            service.mark_failed(message, str(e))
+            return
+        logger.warning(f"Media ingest error for message {message_id}, retrying: {str(e)}")
+        raise self.retry(exc=e)
+
+
+@shared_task
+def process_pending_media():
+    """Re-enqueue media ingest for messages whose task was never queued."""
+    from datetime import timedelta
+    from ..models import Message
+    
+    cutoff = timezone.now() - timedelta(minutes=10)
+    message_ids = Message.objects.filter(
+        media_status=Message.MediaStatus.PENDING,
+        created_at__lt=cutoff
+    ).order_by('created_at').values_list('id', flat=True)[:100]
+    
+    for message_id in message_ids:
+        ingest_inbound_media.delay(str(message_id))
+    
+    if message_ids:
+        logger.info(f"Re-enqueued media ingest for {len(message_ids)} messages")
+
+
 @shared_task
 def cleanup_old_webhook_events():
     """Cleanup old webhook events."""
@@ -12,6 +12,8 @@ from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from apps.whatsapp.services.send_scheduler import BULK, send_priority
+
 logger = logging.getLogger(__name__)
 
 
@@ -227,15 +229,16 @@ def send_cart_reminder(self, cart_id: str, reminder_type: str):
             if account:
                 service = WhatsAppAPIService(account)
                 
-                # Envia mensagem com botões
-                service.send_interactive_buttons(
-                    to=cart.customer_phone,
-                    body_text=message,
-                    buttons=[
-                        {'id': f'checkout_{cart.id}', 'title': '✅ Finalizar Pedido'},
-                        {'id': f'view_cart_{cart.id}', 'title': '🛒 Ver Carrinho'},
-                    ]
-                )
+                # Envia mensagem com botões (lembrete de marketing: fila de baixa prioridade)
+                with send_priority(BULK):
+                    service.send_interactive_buttons(
+                        to=cart.customer_phone,
+                        body_text=message,
+                        buttons=[
+                            {'id': f'checkout_{cart.id}', 'title': '✅ Finalizar Pedido'},
+                            {'id': f'view_cart_{cart.id}', 'title': '🛒 Ver Carrinho'},
+                        ]
+                    )
                 
                 logger.info(f"Cart reminder sent to {cart.customer_phone} for cart {cart_id}")
                 
@@ -427,16 +430,17 @@ def request_feedback(order_id: str):
             if account:
                 service = WhatsAppAPIService(account)
                 
-                # Envia com botões de avaliação
-                service.send_interactive_buttons(
-                    to=order.customer_phone,
-                    body_text=message,
-                    buttons=[
-                        {'id': f'rating_5_{order.id}', 'title': '⭐⭐⭐⭐⭐'},
-                        {'id': f'rating_3_{order.id}', 'title': '⭐⭐⭐'},
-                        {'id': f'rating_1_{order.id}', 'title': '⭐'},
-                    ]
-                )
+                # Envia com botões de avaliação (fila de baixa prioridade)
+                with send_priority(BULK):
+                    service.send_interactive_buttons(
+                        to=order.customer_phone,
+                        body_text=message,
+                        buttons=[
+                            {'id': f'rating_5_{order.id}', 'title': '⭐⭐⭐⭐⭐'},
+                            {'id': f'rating_3_{order.id}', 'title': '⭐⭐⭐'},
+                            {'id': f'rating_1_{order.id}', 'title': '⭐'},
+                        ]
+                    )
                 
                 logger.info(f"Feedback request sent for order {order_id}")
                 
@@ -17,37 +17,6 @@ from ..models import WebhookEvent, Message
 logger = logging.getLogger(__name__)
 
 
-def process_event_sync_or_async(event):
-    """
-    Process webhook event - prefer async, fall back to sync.
-    
-    This ensures events are processed even if Celery is not running.
-    """
-    celery_available = False
-    
-    # Try to dispatch to Celery first
-    try:
-        from ..tasks import process_webhook_event
-        process_webhook_event.delay(str(event.id))
-        logger.info(f"Event {event.id} dispatched to Celery")
-        celery_available = True
-    except Exception as e:
-        logger.warning(f"Celery not available for event {event.id}: {e}")
-    
-    # Only process synchronously if Celery is not available
-    if not celery_available:
-        try:
-            service = WebhookService()
-            service.process_event(event, post_process_inbound=True)
-            logger.info(f"Event {event.id} processed synchronously (Celery unavailable)")
-            return 'sync'
-        except Exception as sync_error:
-            logger.error(f"Error processing event {event.id} synchronously: {sync_error}", exc_info=True)
-            return 'error'
-    
-    return 'async'
-
-
 class WhatsAppWebhookView(APIView):
     """Webhook endpoint for Meta WhatsApp Business API."""
     permission_classes = [AllowAny]
@@ -119,10 +88,7 @@ class WhatsAppWebhookView(APIView):
                 
                 logger.info(f"Created {len(events)} webhook events, processing...")
                 
-                for event in events:
-                    result = process_event_sync_or_async(event)
-                    processed_results[result] += 1
-                    logger.info(f"  - Event {event.id} (type: {event.event_type}) -> {result}")
+                processed_results = service.dispatch_events(events)
                 
                 logger.info(f"Processing complete: {processed_results}")
                 
@@ -14,10 +14,20 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 app.conf.task_routes = {
+    # Media downloads are slow and sized by the sender; keep them off the webhook queue
+    'apps.whatsapp.tasks.ingest_inbound_media': {'queue': 'whatsapp_media'},
     'apps.whatsapp.tasks.*': {'queue': 'whatsapp'},
     'apps.agents.tasks.*': {'queue': 'agents'},
     'apps.automation.tasks.*': {'queue': 'automation'},
     'apps.campaigns.tasks.*': {'queue': 'campaigns'},
+    # Email campaign sends and the stalled-campaign resume sweep
+    'apps.marketing.tasks.*': {'queue': 'marketing'},
+    # Order event outbox dispatch and its sweep
+    'apps.stores.tasks.*': {'queue': 'orders'},
+    # Outgoing webhook delivery: slow endpoints tie up workers, not web processes
+    'apps.webhooks.tasks.*': {'queue': 'default'},
+    'apps.core.tasks.*': {'queue': 'default'},
+    'apps.notifications.tasks.*': {'queue': 'default'},
 }
 
 app.conf.beat_schedule = {
@@ -34,6 +44,11 @@ app.conf.beat_schedule = {
         'task': 'apps.whatsapp.tasks.process_pending_webhook_events',
         'schedule': 30.0,  # Every 30 seconds
     },
+    # Re-enqueue inbound media whose ingest task was never queued
+    'process-pending-media': {
+        'task': 'apps.whatsapp.tasks.process_pending_media',
+        'schedule': 300.0,  # Every 5 minutes
+    },
     # Retry failed webhook events
     'retry-failed-webhook-events': {
         'task': 'apps.whatsapp.tasks.retry_failed_webhook_events',
@@ -80,11 +95,31 @@ app.conf.beat_schedule = {
         'task': 'apps.marketing.tasks.process_scheduled_automations',
         'schedule': 60.0,  # Every minute
     },
+    # Resume email campaigns whose send worker died
+    'resume-stalled-email-campaigns': {
+        'task': 'apps.marketing.tasks.resume_stalled_email_campaigns',
+        'schedule': 300.0,  # Every 5 minutes
+    },
+    # Dispatch order events whose task was lost or whose retry is due
+    'process-pending-order-events': {
+        'task': 'apps.stores.tasks.process_pending_order_events',
+        'schedule': 60.0,  # Every minute
+    },
+    # Deliver webhook outbox entries whose task was lost or whose retry is due
+    'process-webhook-outbox': {
+        'task': 'apps.webhooks.tasks.process_outbox',
+        'schedule': 30.0,  # Every 30 seconds
+    },
     # Campaign tasks
     'check-scheduled-campaigns': {
         'task': 'apps.campaigns.tasks.check_scheduled_campaigns',
         'schedule': 60.0,  # Every minute
     },
+    # Daily metrics rollup: rebuild recent days from the raw tables
+    'reconcile-daily-metrics': {
+        'task': 'apps.core.tasks.reconcile_daily_metrics',
+        'schedule': 3600.0,  # Every hour
+    },
     # Instagram token refresh (daily at 3 AM)
     'refresh-instagram-tokens': {
         'task': 'apps.instagram.tasks.refresh_access_tokens',
@@ -1,6 +1,7 @@
 """
 Django base settings for WhatsApp Business Platform.
 """
+import json
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -284,6 +285,102 @@ else:
         }
     }
 
+# Realtime replay backlog for SSE Last-Event-ID resumption (capped Redis stream per group)
+SSE_BACKLOG_MAXLEN = int(os.environ.get('SSE_BACKLOG_MAXLEN', '1000'))
+
+# Webhook account routing cache (process-local LRU in front of CACHES['default'])
+ACCOUNT_ROUTING_CACHE_TTL = int(os.environ.get('ACCOUNT_ROUTING_CACHE_TTL', '3600'))
+ACCOUNT_ROUTING_NEGATIVE_TTL = int(os.environ.get('ACCOUNT_ROUTING_NEGATIVE_TTL', '60'))
+ACCOUNT_ROUTING_LOCAL_MAX_ENTRIES = int(os.environ.get('ACCOUNT_ROUTING_LOCAL_MAX_ENTRIES', '1024'))
+
+# Tenant slug resolution cache for TenantMiddleware (same layout as account routing)
+TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL', '3600'))
+TENANT_CACHE_NEGATIVE_TTL = int(os.environ.get('TENANT_CACHE_NEGATIVE_TTL', '60'))
+TENANT_CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get('TENANT_CACHE_LOCAL_MAX_ENTRIES', '2048'))
+
+# Daily metrics rollup (apps.core.models.DailyMetrics). Backfill before enabling the read path.
+DASHBOARD_USE_DAILY_METRICS = os.environ.get('DASHBOARD_USE_DAILY_METRICS', 'False').lower() == 'true'
+DAILY_METRICS_RECONCILE_DAYS = int(os.environ.get('DAILY_METRICS_RECONCILE_DAYS', '2'))
+
+# Data exports: server-side cursor batch size and in-memory limit of the XLSX spool file
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+EXPORT_SPOOL_MAX_SIZE = int(os.environ.get('EXPORT_SPOOL_MAX_SIZE', str(10 * 1024 * 1024)))
+
+# Public storefront catalog cache; versions are bumped on catalog changes, the TTL covers bulk updates
+STORE_CATALOG_CACHE_TTL = int(os.environ.get('STORE_CATALOG_CACHE_TTL', '900'))
+
+# Outbound HTTP connection pools (apps.core.services.http_client), per client and process
+HTTP_CLIENT_POOLS = {
+    'graph': {
+        'pool_connections': int(os.environ.get('GRAPH_API_POOL_CONNECTIONS', '10')),
+        'pool_maxsize': int(os.environ.get('GRAPH_API_POOL_MAXSIZE', '32')),
+    },
+    'webhooks': {
+        'pool_connections': int(os.environ.get('WEBHOOK_POOL_CONNECTIONS', '50')),
+        'pool_maxsize': int(os.environ.get('WEBHOOK_POOL_MAXSIZE', '4')),
+    },
+}
+
+# Per-number send token bucket (apps.whatsapp.services.send_scheduler). RATE is the
+# Meta throughput tier in msgs/sec; override per account with metadata['send_rate'].
+WHATSAPP_SEND_SCHEDULER = {
+    'RATE': float(os.environ.get('WHATSAPP_SEND_RATE', '80')),
+    'BURST': float(os.environ.get('WHATSAPP_SEND_BURST', '80')),
+    'BULK_RESERVE': float(os.environ.get('WHATSAPP_SEND_BULK_RESERVE', '0.2')),
+    'TRANSACTIONAL_MAX_WAIT': float(os.environ.get('WHATSAPP_SEND_TRANSACTIONAL_MAX_WAIT', '10')),
+    'BULK_MAX_WAIT': float(os.environ.get('WHATSAPP_SEND_BULK_MAX_WAIT', '60')),
+    'BACKOFF_BASE': float(os.environ.get('WHATSAPP_SEND_BACKOFF_BASE', '1')),
+    'BACKOFF_MAX': float(os.environ.get('WHATSAPP_SEND_BACKOFF_MAX', '60')),
+}
+
+# Campaign dispatch (apps.campaigns.services.dispatch_service): parallel Celery tasks per
+# campaign, send threads per task, recipients claimed per batch, and how long a claimed
+# recipient may stay in 'sending' before another worker takes it over.
+CAMPAIGN_DISPATCH_TASKS = int(os.environ.get('CAMPAIGN_DISPATCH_TASKS', '2'))
+CAMPAIGN_DISPATCH_WORKERS = int(os.environ.get('CAMPAIGN_DISPATCH_WORKERS', '8'))
+CAMPAIGN_DISPATCH_BATCH_SIZE = int(os.environ.get('CAMPAIGN_DISPATCH_BATCH_SIZE', '100'))
+CAMPAIGN_CLAIM_TIMEOUT = int(os.environ.get('CAMPAIGN_CLAIM_TIMEOUT', '600'))
+# Contacts inserted per bulk_create chunk by CSV and recipient imports
+CONTACT_IMPORT_CHUNK_SIZE = int(os.environ.get('CONTACT_IMPORT_CHUNK_SIZE', '5000'))
+
+# Email campaigns (apps.marketing.services.email_campaign_sender): emails per Resend batch
+# call (max 100), threads for single sends when the batch endpoint is off (e.g. a local
+# stub), and how long a send may go without progress before it is resumed elsewhere.
+EMAIL_CAMPAIGN_BATCH_SIZE = int(os.environ.get('EMAIL_CAMPAIGN_BATCH_SIZE', '100'))
+EMAIL_CAMPAIGN_SEND_WORKERS = int(os.environ.get('EMAIL_CAMPAIGN_SEND_WORKERS', '8'))
+RESEND_BATCH_ENABLED = os.environ.get('RESEND_BATCH_ENABLED', 'True').lower() == 'true'
+EMAIL_CAMPAIGN_LOCK_TIMEOUT = int(os.environ.get('EMAIL_CAMPAIGN_LOCK_TIMEOUT', '600'))
+# Retries of a campaign whose emails were deferred by rate limits or provider errors, with
+# exponential backoff starting at EMAIL_CAMPAIGN_RETRY_BASE seconds.
+EMAIL_CAMPAIGN_MAX_RETRIES = int(os.environ.get('EMAIL_CAMPAIGN_MAX_RETRIES', '5'))
+EMAIL_CAMPAIGN_RETRY_BASE = int(os.environ.get('EMAIL_CAMPAIGN_RETRY_BASE', '30'))
+
+# Order event outbox (apps.stores.services.order_events): delivery attempts per event,
+# base delay in seconds of the exponential retry backoff, and how long an event may stay
+# claimed before another worker takes it over.
+ORDER_EVENT_MAX_ATTEMPTS = int(os.environ.get('ORDER_EVENT_MAX_ATTEMPTS', '6'))
+ORDER_EVENT_RETRY_BASE = int(os.environ.get('ORDER_EVENT_RETRY_BASE', '30'))
+ORDER_EVENT_CLAIM_TIMEOUT = int(os.environ.get('ORDER_EVENT_CLAIM_TIMEOUT', '300'))
+
+# Outgoing webhooks (apps.webhooks.services.delivery): request timeout in seconds, concurrent
+# deliveries per destination host across all workers, delay before retrying an entry whose
+# host was saturated, and how long a delivery may stay claimed before it is retried.
+WEBHOOK_DELIVERY_TIMEOUT = int(os.environ.get('WEBHOOK_DELIVERY_TIMEOUT', '10'))
+WEBHOOK_HOST_CONCURRENCY = int(os.environ.get('WEBHOOK_HOST_CONCURRENCY', '4'))
+WEBHOOK_HOST_BUSY_DELAY = int(os.environ.get('WEBHOOK_HOST_BUSY_DELAY', '5'))
+WEBHOOK_CLAIM_TIMEOUT = int(os.environ.get('WEBHOOK_CLAIM_TIMEOUT', '300'))
+
+# Notifications (apps.notifications.services.notification_service): lifetime in seconds of the
+# cached unread counter, rows per bulk insert and per push task, and web push sender threads
+# per task.
+NOTIFICATION_UNREAD_TTL = int(os.environ.get('NOTIFICATION_UNREAD_TTL', '300'))
+NOTIFICATION_BULK_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BULK_BATCH_SIZE', '500'))
+NOTIFICATION_PUSH_WORKERS = int(os.environ.get('NOTIFICATION_PUSH_WORKERS', '8'))
+
+# AI agents (apps.agents.context_service): lifetime in seconds of the cached store and customer
+# prompt fragments; model signals invalidate them earlier.
+AGENT_CONTEXT_CACHE_TTL = int(os.environ.get('AGENT_CONTEXT_CACHE_TTL', '600'))
+
 # WhatsApp Business API
 WHATSAPP_API_VERSION = os.environ.get('WHATSAPP_API_VERSION', 'v18.0')
 WHATSAPP_API_BASE_URL = f"https://graph.facebook.com/{WHATSAPP_API_VERSION}"
@@ -434,6 +531,9 @@ _RATE_LIMIT_WHITELIST = os.environ.get('RATE_LIMIT_WHITELIST_PATHS', '/api/v1/st
 RATE_LIMIT_WHITELIST_PATHS = [
     path.strip() for path in _RATE_LIMIT_WHITELIST.split(',') if path.strip()
 ]
+# Extra policies on top of the per-IP default (apps.core.services.rate_limiter), as a JSON
+# list of {"name", "limit", "window", "scope": "ip"|"user"|"tenant", "paths": [...], "methods": [...]}
+RATE_LIMIT_POLICIES = json.loads(os.environ.get('RATE_LIMIT_POLICIES', '[]'))
 
 # Logging
 LOGGING = {
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.agents.context_service import agent_context_service
+from apps.agents.models import Agent
+from apps.stores.models import Store, StoreCategory, StoreOrder, StoreOrderItem, StoreProduct
+
+User = get_user_model()
+
+
+class AgentContextSnapshotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='agent', email='agent@example.com', password='testpass123')
+        self.store = Store.objects.create(
+            name='Pastita',
+            slug='pastita',
+            owner=self.user,
+            operating_hours={'segunda': {'open': '11:00', 'close': '15:00'}},
+        )
+        self.category = StoreCategory.objects.create(store=self.store, name='Massas', slug='massas')
+        self.product = StoreProduct.objects.create(
+            store=self.store,
+            category=self.category,
+            name='Rondelli',
+            slug='rondelli',
+            sku='SKU-1',
+            price=Decimal('30.00'),
+        )
+        self.agent = Agent.objects.create(name='Atendente', context_prompt='Seja cordial.')
+        self.phone = '5563911111111'
+
+    def _order(self, **kwargs):
+        order = StoreOrder.objects.create(
+            store=self.store,
+            customer_name='Ana',
+            customer_phone=self.phone,
+            subtotal=Decimal('30'),
+            total=Decimal('30'),
+            **kwargs,
+        )
+        StoreOrderItem.objects.create(
+            order=order, product_name='Rondelli', unit_price=Decimal('30'), quantity=1, subtotal=Decimal('30'),
+        )
+        return order
+
+    def test_warm_context_is_served_without_queries(self):
+        self._order(status=StoreOrder.OrderStatus.PAID)
+
+        first = agent_context_service.build_context(self.agent, self.phone)
+        with self.assertNumQueries(0):
+            second = agent_context_service.build_context(self.agent, self.phone)
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('Seja cordial.'))
+        self.assertIn('Rondelli - R$ 30.00', first)
+        self.assertIn('segunda: 11:00 - 15:00', first)
+        self.assertIn('PRODUTOS FAVORITOS DO CLIENTE: Rondelli', first)
+        self.assertLess(first.index('CARDÁPIO'), first.index('HISTÓRICO DE PEDIDOS'))
+
+    def test_model_changes_invalidate_their_fragments(self):
+        agent_context_service.build_context(self.agent, self.phone)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Canelone'
+            self.product.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._order(status=StoreOrder.OrderStatus.DELIVERED)
+
+        context = agent_context_service.build_context(self.agent, self.phone)
+        self.assertIn('Canelone - R$ 30.00', context)
+        self.assertNotIn('Rondelli - R$', context)
+        self.assertIn('HISTÓRICO DE PEDIDOS RECENTES', context)
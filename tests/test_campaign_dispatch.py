@@ -0,0 +1,112 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.campaigns.models import Campaign, CampaignRecipient
+from apps.campaigns.services import CampaignService
+from apps.campaigns.services.dispatch_service import CampaignDispatcher
+from apps.core.exceptions import WhatsAppAPIError, WhatsAppRateLimitError
+from apps.whatsapp.models import WhatsAppAccount
+
+
+def _message(index):
+    return mock.Mock(id=f'00000000-0000-0000-0000-{index:012d}', whatsapp_message_id=f'wamid.{index}')
+
+
+@override_settings(CAMPAIGN_DISPATCH_WORKERS=1)
+class CampaignDispatchTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.campaign = Campaign.objects.create(
+            account=self.account,
+            name='Promo',
+            status=Campaign.CampaignStatus.RUNNING,
+            message_content={'text': 'Oi {{name}}'},
+        )
+        CampaignRecipient.objects.bulk_create([
+            CampaignRecipient(campaign=self.campaign, phone_number=f'55639{i:08d}', variables={'name': f'C{i}'})
+            for i in range(6)
+        ])
+        self.sent = iter(range(100))
+
+    def _dispatcher(self, send=None):
+        return CampaignDispatcher(send=send or (lambda campaign, recipient: _message(next(self.sent))))
+
+    def test_claims_do_not_overlap(self):
+        dispatcher = self._dispatcher()
+
+        first = dispatcher.claim_batch(self.campaign, 4)
+        second = dispatcher.claim_batch(self.campaign, 4)
+
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({r.id for r in first} & {r.id for r in second})
+        self.assertEqual(
+            CampaignRecipient.objects.filter(status=CampaignRecipient.RecipientStatus.SENDING).count(), 6
+        )
+
+    def test_stale_claims_are_taken_over(self):
+        dispatcher = self._dispatcher()
+        dispatcher.claim_batch(self.campaign, 6)
+        CampaignRecipient.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(len(dispatcher.claim_batch(self.campaign, 6)), 6)
+
+    def test_outcomes_are_bulk_written_and_counters_added(self):
+        def send(campaign, recipient):
+            if recipient.phone_number.endswith('1'):
+                raise WhatsAppAPIError(message='Message undeliverable', code='131026')
+            if recipient.phone_number.endswith('2'):
+                raise WhatsAppRateLimitError()
+            return _message(next(self.sent))
+
+        dispatcher = self._dispatcher(send)
+        recipients = dispatcher.claim_batch(self.campaign, 6)
+        # Another worker moved the counters meanwhile
+        Campaign.objects.filter(pk=self.campaign.pk).update(messages_sent=10)
+
+        with self.assertNumQueries(4):  # savepoint + bulk_update + counters + release
+            result = dispatcher.dispatch(self.campaign, recipients)
+
+        self.assertEqual(result, {'processed': 4, 'failed': 1, 'throttled': 1})
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.messages_sent, 14)
+        self.assertEqual(self.campaign.messages_failed, 1)
+        failed = CampaignRecipient.objects.get(status=CampaignRecipient.RecipientStatus.FAILED)
+        self.assertEqual(failed.error_code, '131026')
+        self.assertEqual(
+            CampaignRecipient.objects.filter(status=CampaignRecipient.RecipientStatus.PENDING).count(), 1
+        )
+
+    def test_process_campaign_batch_completes_campaign(self):
+        service = CampaignService()
+        with mock.patch.object(service, '_send_to_recipient', side_effect=lambda *args: _message(next(self.sent))):
+            first = service.process_campaign_batch(str(self.campaign.id), batch_size=4)
+            second = service.process_campaign_batch(str(self.campaign.id), batch_size=4)
+
+        self.assertEqual(first['remaining'], 2)
+        self.assertEqual(second['remaining'], 0)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, Campaign.CampaignStatus.COMPLETED)
+        self.assertEqual(self.campaign.messages_sent, 6)
+
+    def test_template_components_are_not_shared_between_recipients(self):
+        content = {'components': [{'type': 'body', 'parameters': [{'type': 'text', 'variable': 'name'}]}]}
+        service = CampaignService()
+
+        first = service._build_template_components(content, {'name': 'Ana'})
+        second = service._build_template_components(content, {'name': 'Bia'})
+
+        self.assertEqual(first[0]['parameters'][0]['text'], 'Ana')
+        self.assertEqual(second[0]['parameters'][0]['text'], 'Bia')
+        self.assertNotIn('text', content['components'][0]['parameters'][0])
@@ -3,9 +3,14 @@ from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import QuerySet
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-from apps.stores.models import Store, StoreIntegration, StoreOrder
+from apps.stores.models import (
+    Store, StoreCart, StoreCartItem, StoreIntegration, StoreOrder, StoreProduct,
+)
 from apps.stores.services.checkout_service import CheckoutService
 
 User = get_user_model()
@@ -131,3 +136,81 @@ class CheckoutServiceTestCase(TestCase):
             captured['payload']['back_urls']['pending'],
             f'https://cesaladas.com.br/pendente?order={order.id}',
         )
+
+
+class CheckoutCreateOrderTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='bulkcheckout',
+            email='bulk@example.com',
+            password='testpass123',
+            first_name='Cliente',
+        )
+        self.store = Store.objects.create(
+            name='Pastita',
+            slug='pastita',
+            status=Store.StoreStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.customer = {'name': 'Cliente Teste', 'email': 'cliente@example.com', 'phone': '63999999999'}
+
+    def _cart_with_lines(self, count, stock=10, quantity=2):
+        cart = StoreCart.objects.create(store=self.store, user=self.user)
+        for i in range(count):
+            product = StoreProduct.objects.create(
+                store=self.store,
+                name=f'Produto {i}',
+                slug=f'produto-{cart.id.hex[:6]}-{i}',
+                price=Decimal('10.00'),
+                track_stock=True,
+                stock_quantity=stock,
+            )
+            StoreCartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        return cart
+
+    def test_create_order_bulk_creates_items_and_decrements_stock(self):
+        cart = self._cart_with_lines(3)
+
+        order = CheckoutService.create_order(cart, self.customer)
+
+        self.assertEqual(order.items.count(), 3)
+        self.assertEqual(order.subtotal, Decimal('60.00'))
+        self.assertEqual(
+            sorted(StoreProduct.objects.values_list('stock_quantity', 'sold_count')),
+            [(8, 2)] * 3,
+        )
+
+    def test_query_count_does_not_grow_with_cart_lines(self):
+        small = self._cart_with_lines(2)
+        large = self._cart_with_lines(20)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            CheckoutService.create_order(small, self.customer)
+        with CaptureQueriesContext(connection) as large_queries:
+            CheckoutService.create_order(large, self.customer)
+
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_stock_is_never_decremented_below_zero(self):
+        cart = self._cart_with_lines(2, stock=5, quantity=3)
+        # A concurrent checkout sold most of the stock after the cart was read
+        StoreProduct.objects.filter(slug__endswith='-1').update(stock_quantity=1)
+        lines = list(cart.items.select_related('product', 'variant'))
+
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                CheckoutService._reserve_stock(lines, [])
+
+        self.assertEqual(
+            sorted(StoreProduct.objects.values_list('stock_quantity', flat=True)),
+            [1, 5],
+        )
+
+    def test_shortage_is_raised_even_if_stock_was_restocked_before_the_reread(self):
+        cart = self._cart_with_lines(2, stock=5, quantity=3)
+        lines = list(cart.items.select_related('product', 'variant'))
+
+        # The conditional UPDATE missed one row, which was restocked before the re-read
+        with patch.object(QuerySet, 'update', return_value=1):
+            with self.assertRaisesMessage(ValueError, 'Estoque insuficiente'):
+                CheckoutService._reserve_stock(lines, [])
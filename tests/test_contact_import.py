@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.core.files.storage import InMemoryStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.automation.models import ScheduledMessage
+from apps.automation.services import UnifiedMessagingService
+from apps.campaigns.models import Campaign, CampaignRecipient, ContactList
+from apps.campaigns.services import CampaignService
+from apps.campaigns.tasks import import_contact_list
+from apps.whatsapp.models import WhatsAppAccount
+
+CSV = (
+    "telefone,nome,cidade\n"
+    "(63) 99111-1111,Ana,Palmas\n"
+    "63991111111,Ana de novo,Palmas\n"
+    ",Sem telefone,Palmas\n"
+    "123,Curto,Palmas\n"
+    "5563992222222,Bia,Gurupi\n"
+)
+
+
+@override_settings(CONTACT_IMPORT_CHUNK_SIZE=2)
+class ContactImportTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.service = CampaignService()
+
+    def test_csv_import_normalizes_dedups_and_reports_rejects(self):
+        contact_list = self.service.import_contacts_from_csv(str(self.account.id), 'Clientes', CSV)
+
+        contact_list.refresh_from_db()
+        self.assertEqual(
+            sorted(contact_list.members.values_list('phone_number', flat=True)),
+            ['5563991111111', '5563992222222'],
+        )
+        self.assertEqual(contact_list.contact_count, 2)
+        self.assertEqual(contact_list.import_status, ContactList.ImportStatus.COMPLETED)
+        summary = contact_list.import_summary
+        self.assertEqual((summary['total_rows'], summary['imported']), (5, 2))
+        self.assertEqual((summary['duplicates'], summary['rejected']), (1, 2))
+        self.assertEqual(
+            [(row['row'], row['reason']) for row in summary['rejected_rows']],
+            [(4, 'missing phone'), (5, 'invalid phone')],
+        )
+        self.assertEqual(contact_list.members.get(phone_number='5563992222222').variables, {'cidade': 'Gurupi'})
+
+    def test_uploaded_file_is_imported_by_task(self):
+        storage = InMemoryStorage()
+        upload = SimpleUploadedFile('clientes.csv', ('\ufeff' + CSV).encode('utf-8'))
+
+        with mock.patch('apps.campaigns.services.campaign_service.default_storage', storage), \
+                mock.patch('django.core.files.storage.default_storage', storage), \
+                mock.patch('apps.campaigns.tasks.import_contact_list.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                contact_list = self.service.start_contact_import(str(self.account.id), 'Clientes', upload)
+            self.assertEqual(contact_list.import_status, ContactList.ImportStatus.PENDING)
+            list_id, file_path = delay.call_args.args
+
+            import_contact_list.run(list_id, file_path)
+
+        contact_list.refresh_from_db()
+        self.assertEqual(contact_list.import_status, ContactList.ImportStatus.COMPLETED)
+        self.assertEqual(contact_list.members.count(), 2)
+        self.assertFalse(storage.exists(file_path))
+
+    def test_contact_list_materializes_into_recipients(self):
+        contact_list = self.service.import_contacts_from_csv(str(self.account.id), 'Clientes', CSV)
+        campaign = self.service.create_campaign(
+            account_id=str(self.account.id),
+            name='Promo',
+            contact_list=[{'phone': '5563991111111', 'name': 'Ana'}],
+        )
+
+        summary = self.service.add_recipients_from_contact_list(str(campaign.id), str(contact_list.id))
+
+        campaign.refresh_from_db()
+        self.assertEqual(summary.imported, 1)
+        self.assertEqual(campaign.total_recipients, 2)
+
+    def test_campaign_messages_are_scheduled_in_bulk(self):
+        campaign = Campaign.objects.create(
+            account=self.account,
+            name='Promo',
+            message_content={'text': 'Oi'},
+        )
+        recipients = [
+            {'phone_number': f'55639{i:08d}', 'contact_name': f'C{i}', 'variables': {}}
+            for i in range(5)
+        ]
+
+        # Per chunk: savepoint, recipient upsert, scheduled insert, recipient select,
+        # recipient bulk_update, release; then the campaign total
+        with self.assertNumQueries(6 * 3 + 1):
+            count = UnifiedMessagingService.schedule_campaign_messages(campaign, iter(recipients), batch_size=2)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(ScheduledMessage.objects.filter(campaign_id=campaign.id).count(), 5)
+        recipient = CampaignRecipient.objects.get(campaign=campaign, phone_number='5563900000003')
+        self.assertEqual(
+            recipient.message_id,
+            str(ScheduledMessage.objects.get(to_number='5563900000003').id),
+        )
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.conversations.models import Conversation
+from apps.conversations.services.timeline import decode_cursor, get_conversation_timeline
+from apps.core.exceptions import ValidationError
+from apps.whatsapp.models import Message, WhatsAppAccount
+
+
+class ConversationTimelineTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.conversation = Conversation.objects.create(account=self.account, phone_number='5563911111111')
+        other = Conversation.objects.create(account=self.account, phone_number='5563922222222')
+        start = timezone.now() - timedelta(hours=1)
+        self.messages = [self._message(self.conversation, i, start + timedelta(minutes=i)) for i in range(5)]
+        # Same timestamp as the newest one: ties are broken by id
+        self.messages.append(self._message(self.conversation, 5, start + timedelta(minutes=4)))
+        self._message(other, 6, start)
+
+    def _message(self, conversation, index, created_at):
+        message = Message.objects.create(
+            account=self.account,
+            conversation=conversation,
+            whatsapp_message_id=f'wamid.{index}',
+            direction=Message.MessageDirection.INBOUND,
+            message_type=Message.MessageType.TEXT,
+            from_number=conversation.phone_number,
+            to_number=self.account.phone_number,
+            text_body=f'msg {index}',
+        )
+        Message.objects.filter(pk=message.pk).update(created_at=created_at)
+        return message
+
+    def _expected_order(self):
+        rows = Message.objects.filter(conversation=self.conversation).values_list('created_at', 'id')
+        return [str(message_id) for _, message_id in sorted(rows, key=lambda row: (row[0], str(row[1])))]
+
+    def test_pages_walk_back_through_the_thread_in_order(self):
+        with self.assertNumQueries(1):
+            first = get_conversation_timeline(self.conversation, limit=4)
+
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['results']), 4)
+        self.assertEqual(first['results'][0]['channel'], 'whatsapp')
+
+        second = get_conversation_timeline(self.conversation, cursor=first['next_cursor'], limit=4)
+        self.assertFalse(second['has_more'])
+        self.assertIsNone(second['next_cursor'])
+
+        ids = [m['id'] for m in second['results'] + first['results']]
+        self.assertEqual(ids, self._expected_order())
+        self.assertEqual(second['results'][0]['account'], str(self.account.id))
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            decode_cursor('not-a-cursor')
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.core.models import DailyMetrics
+from apps.core.services.daily_metrics import DailyMetricsReader, rebuild_daily_metrics
+from apps.stores.models import Store, StoreOrder
+from apps.whatsapp.models import Message, WhatsAppAccount
+
+User = get_user_model()
+
+
+class DailyMetricsRollupTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='metrics',
+            email='metrics@example.com',
+            password='testpass123',
+        )
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='3210',
+            waba_id='4321',
+            phone_number='5563977777777',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.user)
+        self.today = timezone.localdate()
+
+    def _create_message(self, index, direction='outbound', status='sent'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Message.objects.create(
+                account=self.account,
+                whatsapp_message_id=f'wamid.metrics.{index}',
+                direction=direction,
+                message_type='text',
+                status=status,
+                from_number='5563977777777',
+                to_number='5563911111111',
+            )
+
+    def _create_order(self, total):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StoreOrder.objects.create(
+                store=self.store,
+                customer_name='Cliente',
+                customer_phone='63999999999',
+                subtotal=Decimal(total),
+                total=Decimal(total),
+            )
+
+    def _rows(self, scope, scope_id, metrics):
+        return DailyMetricsReader(scope, [scope_id]).load(metrics, self.today)
+
+    def test_message_creation_and_status_transition(self):
+        message = self._create_message(1)
+        self._create_message(2, direction='inbound', status='delivered')
+
+        message = Message.objects.get(pk=message.pk)
+        message.status = 'read'
+        with self.captureOnCommitCallbacks(execute=True):
+            message.save()
+
+        rows = self._rows(DailyMetrics.Scope.ACCOUNT, self.account.id, ['messages', 'messages_by_status'])
+        self.assertEqual(rows.by_dimension('messages'), {'inbound': 1, 'outbound': 1})
+        self.assertEqual(rows.by_dimension('messages_by_status'), {'read': 1, 'delivered': 1})
+
+    def test_order_payment_is_counted_on_paid_date(self):
+        order = self._create_order('42.50')
+
+        order.payment_status = StoreOrder.PaymentStatus.PAID
+        order.paid_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+
+        rows = self._rows(DailyMetrics.Scope.STORE, self.store.id, ['orders', 'paid_orders', 'revenue'])
+        self.assertEqual(rows.total('orders'), 1)
+        self.assertEqual(rows.total('paid_orders', dimension='paid'), 1)
+        self.assertEqual(rows.total('revenue', dimension='paid'), Decimal('42.50'))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self._create_message(1)
+        self._create_message(2, direction='inbound', status='delivered')
+        self._create_order('10.00')
+        incremental = sorted(
+            DailyMetrics.objects.values_list('scope', 'metric', 'dimension', 'value')
+        )
+
+        DailyMetrics.objects.all().delete()
+        rebuild_daily_metrics(self.today - timedelta(days=1), self.today)
+
+        rebuilt = sorted(DailyMetrics.objects.values_list('scope', 'metric', 'dimension', 'value'))
+        self.assertEqual(rebuilt, incremental)
+
+    @override_settings(DASHBOARD_USE_DAILY_METRICS=True)
+    def test_overview_reads_from_rollup(self):
+        self._create_message(1)
+        self._create_message(2, direction='inbound', status='delivered')
+        Message.objects.all().delete()  # the view must not touch raw messages
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/v1/dashboard/overview/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['messages']['today'], 2)
+        self.assertEqual(response.data['messages']['by_direction'], {'inbound': 1, 'outbound': 1})
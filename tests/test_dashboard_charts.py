@@ -0,0 +1,71 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.core.services.time_buckets import TimeBucketAggregator
+from apps.stores.models import Store, StoreOrder
+
+User = get_user_model()
+
+
+class DashboardChartsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='dashboard',
+            email='dashboard@example.com',
+            password='testpass123',
+        )
+        self.store = Store.objects.create(
+            name='Pastita',
+            slug='pastita',
+            owner=self.user,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_order(self, total, paid_at=None):
+        return StoreOrder.objects.create(
+            store=self.store,
+            customer_name='Cliente',
+            customer_phone='63999999999',
+            subtotal=Decimal(total),
+            total=Decimal(total),
+            paid_at=paid_at,
+        )
+
+    def test_series_is_zero_filled(self):
+        now = timezone.now()
+        self._create_order('10.00', paid_at=now)
+        self._create_order('5.50', paid_at=now)
+
+        window = TimeBucketAggregator.last_days(3)
+        orders = StoreOrder.objects.filter(store=self.store)
+        series = window.series(orders, 'created_at', {'count': Count('id')})
+        revenue = window.series(orders, 'paid_at', {'revenue': Sum('total')})
+
+        self.assertEqual([entry['count'] for entry in series], [0, 0, 2])
+        self.assertEqual(revenue[-1]['revenue'], Decimal('15.50'))
+        self.assertEqual(series[-1]['date'], timezone.localdate().isoformat())
+
+    def test_query_count_does_not_grow_with_days(self):
+        self._create_order('10.00', paid_at=timezone.now() - timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as short_window:
+            response = self.client.get('/api/v1/dashboard/charts/', {'days': 7})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as long_window:
+            response = self.client.get('/api/v1/dashboard/charts/', {'days': 90})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(short_window), len(long_window))
+        self.assertEqual(len(response.data['messages_per_day']), 90)
+        self.assertEqual(sum(day['count'] for day in response.data['orders_per_day']), 1)
@@ -0,0 +1,148 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.marketing.models import EmailCampaign, EmailRecipient, Subscriber
+from apps.marketing.services.email_campaign_sender import EmailCampaignSender
+from apps.marketing.services.email_marketing_service import EmailMarketingService
+from apps.stores.models import Store, StoreOrder
+
+User = get_user_model()
+
+
+@override_settings(EMAIL_CAMPAIGN_BATCH_SIZE=2, EMAIL_CAMPAIGN_SEND_WORKERS=2)
+class EmailCampaignSenderTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mkt', email='mkt@example.com', password='testpass123')
+        self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.user)
+        Subscriber.objects.bulk_create([
+            Subscriber(store=self.store, email='ana@example.com', name='Ana Lima'),
+            Subscriber(store=self.store, email='bia@example.com', name='Bia'),
+            Subscriber(store=self.store, email='off@example.com', accepts_marketing=False),
+        ])
+        StoreOrder.objects.create(
+            store=self.store,
+            customer_name='Ana',
+            customer_email='ANA@example.com',
+            customer_phone='63999999999',
+            subtotal=Decimal('10'),
+            total=Decimal('10'),
+        )
+        StoreOrder.objects.create(
+            store=self.store,
+            customer_name='Caio',
+            customer_email='caio@example.com',
+            customer_phone='63988888888',
+            subtotal=Decimal('10'),
+            total=Decimal('10'),
+        )
+        self.campaign = EmailCampaign.objects.create(
+            store=self.store,
+            name='Newsletter',
+            subject='Oi {{first_name}}',
+            html_content='<p>{{store_name}} para {{ name }}</p>',
+        )
+        self.service = EmailMarketingService()
+        self.service.enabled = True
+        self.ids = iter(range(100))
+
+    def _batch(self, payloads):
+        return [f're_{next(self.ids)}' for _ in payloads]
+
+    def test_audience_is_deduplicated_and_sent_in_batches(self):
+        batch = mock.Mock(side_effect=self._batch)
+        with mock.patch('apps.marketing.services.email_campaign_sender._resend_batch_send', batch):
+            result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual((result['sent'], result['failed'], result['total_recipients']), (3, 0, 3))
+        self.assertEqual(batch.call_count, 2)
+        payloads = {p['to'][0]: p for call in batch.call_args_list for p in call.args[0]}
+        self.assertEqual(set(payloads), {'ana@example.com', 'bia@example.com', 'caio@example.com'})
+        self.assertEqual(payloads['ana@example.com']['subject'], 'Oi Ana')
+        self.assertEqual(payloads['ana@example.com']['html'], '<p>Pastita para Ana Lima</p>')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENT)
+        self.assertEqual(self.campaign.emails_sent, 3)
+
+    def test_crashed_send_resumes_with_pending_recipients(self):
+        calls = []
+
+        def crash_on_second_batch(payloads):
+            calls.append(payloads)
+            if len(calls) == 2:
+                raise SystemExit('worker lost')
+            return self._batch(payloads)
+
+        with mock.patch('apps.marketing.services.email_campaign_sender._resend_batch_send', crash_on_second_batch):
+            with self.assertRaises(SystemExit):
+                self.service.send_campaign(str(self.campaign.id))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENDING)
+        self.assertEqual(self.campaign.emails_sent, 2)
+
+        batch = mock.Mock(side_effect=self._batch)
+        with mock.patch('apps.marketing.services.email_campaign_sender._resend_batch_send', batch):
+            result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual(result['sent'], 1)
+        pending = EmailRecipient.objects.exclude(resend_id__in=['re_0', 're_1']).get()
+        self.assertEqual(batch.call_args.args[0][0]['to'], [pending.email])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_sent, 3)
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENT)
+
+    def test_failed_batch_marks_its_recipients_failed(self):
+        with mock.patch(
+            'apps.marketing.services.email_campaign_sender._resend_batch_send',
+            side_effect=[ValueError('invalid from'), ['re_1']],
+        ):
+            result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual((result['sent'], result['failed']), (1, 2))
+        failed = EmailRecipient.objects.filter(status=EmailRecipient.RecipientStatus.FAILED)
+        self.assertEqual(set(failed.values_list('error_message', flat=True)), {'invalid from'})
+
+    def test_rate_limited_batch_leaves_recipients_pending(self):
+        rate_limited = RuntimeError('Too many requests')
+        rate_limited.code = 429
+        batch = mock.Mock(side_effect=[rate_limited])
+        with mock.patch('apps.marketing.services.email_campaign_sender._resend_batch_send', batch):
+            result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual((result['sent'], result['failed'], result['deferred']), (0, 0, 2))
+        self.assertEqual(batch.call_count, 1)
+        self.assertFalse(EmailRecipient.objects.exclude(status=EmailRecipient.RecipientStatus.PENDING).exists())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENDING)
+
+        batch = mock.Mock(side_effect=self._batch)
+        with mock.patch('apps.marketing.services.email_campaign_sender._resend_batch_send', batch):
+            result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual((result['sent'], result['deferred']), (3, 0))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENT)
+
+    def test_single_send_pool_without_batch_endpoint(self):
+        sender = EmailCampaignSender(send_one=lambda payload: f"re_{payload['to'][0]}", use_batch=False)
+        self.campaign.status = EmailCampaign.CampaignStatus.SENDING
+        sender.materialize(self.campaign)
+
+        result = sender.send(self.campaign, sender.build_renderer(self.campaign, 'Pastita', 'contato@pastita.com.br'))
+
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(
+            EmailRecipient.objects.get(email='bia@example.com').resend_id,
+            're_bia@example.com',
+        )
+
+    def test_send_is_refused_while_another_worker_holds_the_lock(self):
+        EmailCampaignSender().acquire(self.campaign)
+        self.addCleanup(EmailCampaignSender().release, self.campaign)
+
+        result = self.service.send_campaign(str(self.campaign.id))
+
+        self.assertEqual(result, {'success': False, 'error': 'Campaign is already being sent'})
@@ -0,0 +1,109 @@
+import csv
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.automation.models import GeneratedReport
+from apps.automation.tasks import run_export_job
+from apps.whatsapp.models import Message, WhatsAppAccount
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ExportJobTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exportjob',
+            email='exportjob@example.com',
+            password='testpass123',
+        )
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='7070',
+            waba_id='7171',
+            phone_number='5563955555555',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        for i in range(3):
+            Message.objects.create(
+                account=self.account,
+                whatsapp_message_id=f'wamid.job.{i}',
+                direction='inbound',
+                message_type='text',
+                status='delivered',
+                from_number='5563911111111',
+                to_number='5563955555555',
+                text_body=f'mensagem {i}',
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_job(self, **data):
+        run_inline = lambda report_id: run_export_job.apply(args=(report_id,))
+        with patch.object(run_export_job, 'delay', side_effect=run_inline), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/export/jobs/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return GeneratedReport.objects.get(id=response.data['id'])
+
+    def test_job_writes_file_to_storage(self):
+        report = self._create_job(export_type='messages', format='csv')
+
+        self.assertEqual(report.status, GeneratedReport.Status.COMPLETED)
+        self.assertEqual(report.progress, 100)
+        self.assertEqual(report.records_count, 3)
+        self.assertTrue(report.file_exists())
+        with report.open_file() as handle:
+            rows = list(csv.reader(io.StringIO(handle.read().decode())))
+        self.assertEqual(len(rows), 4)
+
+    def test_download_honours_range_header(self):
+        report = self._create_job(export_type='messages', format='csv')
+        with report.open_file() as handle:
+            content = handle.read()
+
+        response = self.client.get(
+            f'/api/v1/export/jobs/{report.id}/download/', HTTP_RANGE='bytes=10-19'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(content)}')
+
+        response = self.client.get(
+            f'/api/v1/export/jobs/{report.id}/download/', HTTP_RANGE=f'bytes={len(content)}-'
+        )
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_unknown_export_type_is_rejected(self):
+        response = self.client.post('/api/v1/export/jobs/', {'export_type': 'nope'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(GeneratedReport.objects.exists())
+
+    def test_other_users_cannot_see_job(self):
+        report = self._create_job(export_type='messages', format='csv')
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user=other)
+
+        response = client.get(f'/api/v1/export/jobs/{report.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,78 @@
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from apps.conversations.models import Conversation
+from apps.whatsapp.models import Message, WhatsAppAccount
+
+User = get_user_model()
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class StreamingExportTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exporter',
+            email='exporter@example.com',
+            password='testpass123',
+        )
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='8080',
+            waba_id='9090',
+            phone_number='5563966666666',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        for i in range(5):
+            Message.objects.create(
+                account=self.account,
+                whatsapp_message_id=f'wamid.export.{i}',
+                direction='inbound',
+                message_type='text',
+                status='delivered',
+                from_number='5563911111111',
+                to_number='5563966666666',
+                text_body=f'mensagem {i}',
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_csv_export_streams_every_row(self):
+        response = self.client.get('/api/v1/export/messages/', {'format': 'csv'})
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:2], ['id', 'account_name'])
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(row[1] == 'Pastita' for row in rows[1:]))
+
+    def test_xlsx_export_is_written_from_a_temp_file(self):
+        response = self.client.get('/api/v1/export/messages/', {'format': 'xlsx'})
+
+        self.assertIsInstance(response, FileResponse)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        sheet = workbook['Messages']
+        self.assertEqual(sheet.max_row, 6)
+        self.assertEqual(sheet.cell(row=2, column=2).value, 'Pastita')
+
+    def test_json_list_columns_are_flattened(self):
+        Conversation.objects.create(
+            account=self.account,
+            phone_number='5563911111111',
+            tags=['vip', 'atacado'],
+        )
+
+        response = self.client.get('/api/v1/export/conversations/')
+
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(rows[0]['tags'], 'vip, atacado')
@@ -0,0 +1,77 @@
+import threading
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from apps.core.services.http_client import HTTPClient, get_http_client, get_http_metrics, reset_http_metrics
+from apps.core.utils import token_encryption
+
+
+def _response(status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    return response
+
+
+class HTTPClientTestCase(SimpleTestCase):
+    def setUp(self):
+        reset_http_metrics()
+        self.addCleanup(reset_http_metrics)
+
+    def test_shared_client_per_name(self):
+        self.assertIs(get_http_client('graph'), get_http_client('graph'))
+        self.assertIsNot(get_http_client('graph'), get_http_client('webhooks'))
+
+    def test_threads_get_own_sessions_on_one_pool(self):
+        client = HTTPClient('test', pool_connections=1, pool_maxsize=4)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(client.session))
+        thread.start()
+        thread.join()
+
+        self.assertIs(client.session, client.session)
+        self.assertIsNot(sessions[0], client.session)
+        self.assertIs(
+            sessions[0].get_adapter('https://graph.facebook.com'),
+            client.session.get_adapter('https://graph.facebook.com'),
+        )
+
+    def test_pool_is_rebuilt_after_fork(self):
+        client = HTTPClient('test', pool_connections=1, pool_maxsize=4)
+        parent_session = client.session
+
+        with mock.patch('apps.core.services.http_client.os.getpid', return_value=-1):
+            child_session = client.session
+
+        self.assertIsNot(parent_session, child_session)
+
+    def test_latency_is_recorded_per_host(self):
+        client = HTTPClient('test', pool_connections=1, pool_maxsize=4)
+        with mock.patch.object(requests.Session, 'request', side_effect=[_response(200), _response(502)]):
+            client.get('https://graph.facebook.com/v18.0/me')
+            client.post('https://graph.facebook.com/v18.0/123/messages')
+
+        stats = get_http_metrics()['test:graph.facebook.com']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_connection_errors_count_as_failures(self):
+        client = HTTPClient('test', pool_connections=1, pool_maxsize=4)
+        with mock.patch.object(requests.Session, 'request', side_effect=requests.ConnectionError):
+            with self.assertRaises(requests.ConnectionError):
+                client.get('https://graph.facebook.com/v18.0/me')
+
+        self.assertEqual(get_http_metrics()['test:graph.facebook.com']['errors'], 1)
+
+
+class TokenDecryptionCacheTestCase(SimpleTestCase):
+    def test_rotated_token_is_not_served_from_cache(self):
+        old = token_encryption.encrypt('old-token')
+        new = token_encryption.encrypt('new-token')
+
+        self.assertEqual(token_encryption.decrypt(old), 'old-token')
+        with mock.patch.object(token_encryption.cipher, 'decrypt', side_effect=AssertionError):
+            self.assertEqual(token_encryption.decrypt(old), 'old-token')
+        self.assertEqual(token_encryption.decrypt(new), 'new-token')
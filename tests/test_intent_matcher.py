@@ -0,0 +1,84 @@
+import re
+
+from django.test import SimpleTestCase
+
+from apps.automation.services import pastita_orchestrator, pastita_orchestrator_v2
+from apps.whatsapp.intents.detector import IntentDetector
+from apps.whatsapp.intents.matcher import PriorityMatcher
+
+# Inbound messages as customers actually write them (typos and all)
+CORPUS = [
+    'oi', 'Olá!', 'bom dia', 'Boa noite!!', 'eae', 'opa, tudo bem?', 'oi tudo bem', 'fala',
+    'quanto custa o rondelli de frango?', 'qual o preço da lasanha', 'valor do nhoque?',
+    'quanto fica 2 rondellis', 'custa quanto?', 'preço do molho',
+    'que horas abre?', 'qual o horário de funcionamento', 'vocês estão abertos?', 'até que horas?',
+    'tem entrega?', 'qual a taxa de entrega pro centro', 'quanto tempo demora a entrega', 'frete grátis?',
+    'cardápio', 'me manda o menu', 'o que vocês têm hoje?', 'quais são os produtos',
+    'onde está meu pedido', 'status do pedido 1234', 'quero rastrear meu pedido', 'meu pedido não chegou',
+    'status do pagamento', 'cadê o código pix', 'chave pix?',
+    'onde fica a loja', 'qual o endereço', 'tem loja física?',
+    'telefone de vocês', 'quero falar com atendente', 'atendimento humano por favor', 'chama alguém',
+    'como funciona?', 'o que é rondelli?',
+    'quero fazer pedido', 'quero pedir', 'vou querer', 'finalizar pedido', 'confirmar compra',
+    'quero cancelar', 'cancelar pedido', 'cancela tudo', 'não quero mais',
+    'trocar o sabor', 'tirar a cebola', 'adicionar mais um', 'limpar carrinho', 'ver carrinho',
+    'paguei', 'já paguei, segue o comprovante', 'enviei o pix', 'transferi agora',
+    'gerar pix', 'quero pagar', 'qr code', 'copiar código', 'ver pix',
+    'quero 2 rondelli de frango', '2 rondelis', '3 de queijo', 'me vê 4 lasanhas', 'coloca 1 coca',
+    'rondelli', 'lasanhas', 'rondelli de 4 queijos', 'nhoque', 'talharim ao sugo', 'molho extra',
+    '2', '10', 'ok', 'sim', 'tudo certo', 'pode seguir',
+    'qual é melhor, frango ou queijo?', 'me recomenda algo', 'sem cebola por favor',
+    'isso está errado', 'não entendi', 'não consegui pagar', 'quero reclamar',
+    'OI', 'QUERO PEDIR', 'Cardápio\ncompleto', 'obrigado!', 'kkkk', '', '👍',
+]
+
+
+def _reference_match(table, text, flags=0):
+    """The pre-compilation behaviour: re.search pattern by pattern."""
+    for key, patterns in table:
+        for pattern in patterns:
+            if re.search(pattern, text, flags):
+                return key
+    return None
+
+
+class PriorityMatcherTestCase(SimpleTestCase):
+    def test_priority_wins_over_position(self):
+        matcher = PriorityMatcher([('late', [r'world']), ('early', [r'hello'])])
+
+        self.assertEqual(matcher.match('hello world'), 'late')
+        self.assertEqual(matcher.match('hello'), 'early')
+        self.assertIsNone(matcher.match('nothing'))
+
+    def test_anchors_keep_search_semantics(self):
+        matcher = PriorityMatcher([('start', [r'^oi']), ('end', [r'fim$'])])
+
+        self.assertIsNone(matcher.match('e oi'))
+        self.assertEqual(matcher.match('oi e fim'), 'start')
+        self.assertEqual(matcher.match('e fim'), 'end')
+
+    def test_whatsapp_detector_parity(self):
+        detector = IntentDetector(use_llm_fallback=False)
+        table = [(intent, IntentDetector.PATTERNS.get(intent, [])) for intent in IntentDetector.PRIORITY_ORDER]
+
+        for message in CORPUS:
+            with self.subTest(message=message):
+                text = message.lower().strip()
+                self.assertEqual(detector.detect_regex(message), _reference_match(table, text))
+                self.assertEqual(
+                    detector.needs_llm(message),
+                    any(re.search(pattern, message.lower()) for pattern in IntentDetector.LLM_TRIGGERS),
+                )
+
+    def test_orchestrator_detector_parity(self):
+        for module in (pastita_orchestrator, pastita_orchestrator_v2):
+            table = list(module.IntentDetector.PATTERNS.items())
+            for message in CORPUS:
+                with self.subTest(module=module.__name__, message=message):
+                    intent, _ = module.IntentDetector().detect(message)
+                    expected = _reference_match(table, message.lower().strip(), re.IGNORECASE)
+                    if expected is not None:
+                        self.assertEqual(intent, expected)
+                    else:
+                        # Falls through to the quantity/product heuristics
+                        self.assertIn(intent, (module.IntentType.UNKNOWN, module.IntentType.ADD_TO_CART))
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.whatsapp.models import Message, WebhookEvent, WhatsAppAccount
+from apps.whatsapp.services import WebhookService
+from apps.whatsapp.services.status_service import MessageStatusService
+
+
+class MessageStatusBatchTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.service = MessageStatusService()
+        self.service.broadcast = mock.Mock()
+
+    def _messages(self, count, status=Message.MessageStatus.SENT):
+        return Message.objects.bulk_create([
+            Message(
+                account=self.account,
+                whatsapp_message_id=f'wamid.{i}',
+                direction=Message.MessageDirection.OUTBOUND,
+                message_type=Message.MessageType.TEMPLATE,
+                status=status,
+                from_number=self.account.phone_number,
+                to_number=f'55639{i:08d}',
+            )
+            for i in range(count)
+        ])
+
+    def _events(self, statuses):
+        return WebhookEvent.objects.bulk_create([
+            WebhookEvent(
+                account=self.account,
+                event_id=f'status:{wamid}:{status}:{timestamp}',
+                event_type=WebhookEvent.EventType.STATUS,
+                payload={'id': wamid, 'status': status, 'timestamp': str(timestamp)},
+            )
+            for wamid, status, timestamp in statuses
+        ])
+
+    def test_batch_uses_constant_queries(self):
+        self._messages(30)
+        events = self._events(
+            [(f'wamid.{i}', 'delivered', 1700000010) for i in range(30)]
+            + [(f'wamid.{i}', 'read', 1700000020) for i in range(30)]
+        )
+
+        # savepoint + prior-state SELECT + message UPDATE + changed-rows SELECT
+        # + event UPDATE + release
+        with self.assertNumQueries(6):
+            changed = self.service.apply_status_events(events)
+
+        self.assertEqual(len(changed), 30)
+        self.assertEqual(Message.objects.filter(status=Message.MessageStatus.READ).count(), 30)
+        self.assertEqual(Message.objects.filter(delivered_at__isnull=False).count(), 30)
+        self.assertEqual(
+            WebhookEvent.objects.filter(
+                processing_status=WebhookEvent.ProcessingStatus.COMPLETED,
+                related_message__isnull=False,
+            ).count(),
+            60,
+        )
+
+    def test_stale_statuses_do_not_regress(self):
+        message, = self._messages(1, status=Message.MessageStatus.READ)
+        events = self._events([('wamid.0', 'delivered', 1700000010)])
+
+        changed = self.service.apply_status_events(events)
+
+        message.refresh_from_db()
+        self.assertEqual(changed, [])
+        self.assertEqual(message.status, Message.MessageStatus.READ)
+        self.assertIsNone(message.delivered_at)
+        self.assertEqual(WebhookEvent.objects.get().related_message_id, message.id)
+
+    def test_failed_status_records_error(self):
+        message, = self._messages(1, status=Message.MessageStatus.DELIVERED)
+        event, = self._events([('wamid.0', 'failed', 1700000010)])
+        event.payload['errors'] = [{'code': 131026, 'title': 'Message undeliverable'}]
+
+        self.service.apply_status_events([event])
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, Message.MessageStatus.FAILED)
+        self.assertEqual(message.error_code, '131026')
+        self.assertEqual(message.error_message, 'Message undeliverable')
+
+    def test_broadcasts_are_coalesced_per_account(self):
+        self._messages(5)
+        events = self._events([(f'wamid.{i}', 'delivered', 1700000010) for i in range(5)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.apply_status_events(events)
+
+        self.service.broadcast.broadcast_status_updates.assert_called_once()
+        updates = self.service.broadcast.broadcast_status_updates.call_args.kwargs['updates']
+        self.assertEqual({update['status'] for update in updates}, {'delivered'})
+        self.assertEqual(len(updates), 5)
+
+    def test_single_event_path_returns_message(self):
+        message, = self._messages(1)
+        event, = self._events([('wamid.0', 'delivered', 1700000010)])
+
+        result = WebhookService().process_event(event)
+
+        self.assertEqual(result.id, message.id)
+        event.refresh_from_db()
+        self.assertEqual(event.processing_status, WebhookEvent.ProcessingStatus.COMPLETED)
+        self.assertEqual(event.related_message_id, message.id)
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.notifications.models import Notification, NotificationPreference, PushSubscription
+from apps.notifications.services import NotificationService
+from apps.notifications.services.notification_service import STORE_GROUP, UNREAD_KEY
+from apps.stores.models import Store
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_BULK_BATCH_SIZE=2, NOTIFICATION_PUSH_WORKERS=2)
+class NotificationFanoutTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = NotificationService()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.owner)
+        self.store.staff.add(self.staff)
+        self.channel_layer = mock.Mock()
+        patcher = mock.patch(
+            'apps.notifications.services.notification_service.get_channel_layer',
+            return_value=self.channel_layer,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        enqueue = mock.patch('apps.notifications.tasks.send_push_notifications.delay')
+        self.enqueue = enqueue.start()
+        self.addCleanup(enqueue.stop)
+
+    def test_store_broadcast_sends_one_group_message_and_batched_push(self):
+        with mock.patch('apps.notifications.services.notification_service.async_to_sync') as to_sync:
+            with self.captureOnCommitCallbacks(execute=True):
+                notifications = self.service.create_broadcast_notification(
+                    'Novo pedido', 'Pedido PAS-1', store=self.store,
+                )
+                to_sync.assert_not_called()
+
+        self.assertEqual({n.user_id for n in notifications}, {self.owner.id, self.staff.id})
+        self.assertEqual(Notification.objects.count(), 2)
+        to_sync.assert_called_once_with(self.channel_layer.group_send)
+        group, message = to_sync.return_value.call_args.args
+        self.assertEqual(group, STORE_GROUP.format(slug='pastita'))
+        self.assertEqual(message['type'], 'notification.broadcast')
+        self.assertEqual(message['ids'], {str(n.user_id): str(n.id) for n in notifications})
+        self.assertEqual(Notification.objects.filter(is_sent=True).count(), 2)
+        self.enqueue.assert_called_once()
+        self.assertEqual(set(self.enqueue.call_args.args[0]), {str(n.id) for n in notifications})
+
+    def test_push_respects_preferences_and_marks_sent(self):
+        NotificationPreference.objects.create(user=self.staff, push_system=False)
+        for user in (self.owner, self.staff):
+            PushSubscription.objects.create(user=user, endpoint=f'https://push.example.com/{user.id}')
+        notifications = self.service.create_broadcast_notification(
+            'Aviso', 'Manutenção', user_ids=[self.owner.id, self.staff.id], send_realtime=False,
+        )
+
+        with mock.patch.object(NotificationService, '_send_web_push') as push:
+            pushed = self.service.send_push_notifications([str(n.id) for n in notifications])
+            self.assertEqual(self.service.send_push_notifications([str(n.id) for n in notifications]), 0)
+
+        self.assertEqual(pushed, 1)
+        push.assert_called_once()
+        self.assertEqual(push.call_args.args[1].user_id, self.owner.id)
+        self.assertEqual(
+            list(Notification.objects.filter(push_sent=True).values_list('user_id', flat=True)),
+            [self.owner.id],
+        )
+
+    def test_unread_count_is_served_from_cache_and_kept_in_sync(self):
+        first = self.service.create_notification('Olá', 'Mensagem', user=self.other, send_realtime=False)
+        self.assertIsNone(cache.get(UNREAD_KEY.format(user_id=self.other.id)))
+
+        self.assertEqual(self.service.get_unread_count(self.other), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.create_notification('Olá', 'Outra', user=self.other, send_realtime=False)
+            self.assertEqual(cache.get(UNREAD_KEY.format(user_id=self.other.id)), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_unread_count(self.other), 2)
+
+        self.service.mark_as_read(str(first.id), self.other)
+        self.service.mark_as_read(str(first.id), self.other)
+        self.assertEqual(cache.get(UNREAD_KEY.format(user_id=self.other.id)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.create_broadcast_notification('Aviso', 'Geral', send_realtime=False, send_push=False)
+            self.assertEqual(cache.get(UNREAD_KEY.format(user_id=self.other.id)), 1)
+        self.assertIsNone(cache.get(UNREAD_KEY.format(user_id=self.other.id)))
+        self.assertEqual(self.service.get_unread_count(self.other), 2)
+
+        self.service.mark_all_as_read(self.other)
+        self.assertEqual(self.service.get_unread_count(self.other), 0)
@@ -0,0 +1,94 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.stores.models import Store, StoreOrder, StoreOrderEvent
+from apps.stores.services import order_events
+from apps.stores.services.checkout_service import CheckoutService
+
+User = get_user_model()
+
+
+@override_settings(ORDER_EVENT_MAX_ATTEMPTS=2, ORDER_EVENT_RETRY_BASE=10)
+class OrderEventOutboxTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='outbox', email='outbox@example.com', password='testpass123')
+        self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.user)
+        self.order = StoreOrder.objects.create(
+            store=self.store,
+            customer_name='Ana',
+            customer_email='ana@example.com',
+            customer_phone='63999999999',
+            subtotal=Decimal('10'),
+            total=Decimal('10'),
+            payment_id='pay-1',
+        )
+        enqueue = mock.patch('apps.stores.services.order_events._enqueue')
+        self.enqueue = enqueue.start()
+        self.addCleanup(enqueue.stop)
+
+    def test_payment_webhook_records_event_and_dispatches_after_commit(self):
+        with mock.patch('apps.stores.services.meta_pixel_service.send_purchase_event') as capi, \
+                mock.patch.object(StoreOrder, '_trigger_status_whatsapp_notification') as whatsapp:
+            with self.captureOnCommitCallbacks(execute=True):
+                CheckoutService.process_payment_webhook('pay-1', 'approved')
+                self.enqueue.assert_not_called()
+
+        capi.assert_not_called()
+        whatsapp.assert_not_called()
+        self.enqueue.assert_called_once()
+        event = StoreOrderEvent.objects.get(pk=self.enqueue.call_args.args[0])
+        self.assertEqual(event.order_id, self.order.id)
+        self.assertEqual(event.new_status, StoreOrder.OrderStatus.PAID)
+        self.assertEqual(event.payload['email_trigger'], 'payment_confirmed')
+        self.assertEqual(set(event.channels), {'webhook', 'email', 'whatsapp', 'capi'})
+
+    def test_update_status_without_email_trigger_skips_email_channel(self):
+        self.order.update_status(StoreOrder.OrderStatus.PREPARING)
+
+        event = StoreOrderEvent.objects.get(order=self.order)
+        self.assertEqual(event.channels, {'webhook': 'pending', 'whatsapp': 'pending'})
+
+    def test_failed_channel_is_retried_alone(self):
+        event = order_events.record_order_event(
+            self.order, 'pending', 'paid', channels=['webhook', 'whatsapp'],
+        )
+        webhook = mock.Mock()
+        whatsapp = mock.Mock(side_effect=[RuntimeError('graph api down'), None])
+
+        with mock.patch.dict(order_events.CHANNEL_HANDLERS, {'webhook': webhook, 'whatsapp': whatsapp}):
+            result = order_events.process_order_event(event.id)
+            self.assertEqual((result['failed_channels'], result['retry_in']), (['whatsapp'], 10))
+            self.enqueue.assert_called_with(event.id, countdown=10)
+
+            event.refresh_from_db()
+            self.assertEqual(event.status, StoreOrderEvent.EventStatus.PENDING)
+            self.assertEqual(event.channels, {'webhook': 'done', 'whatsapp': 'pending'})
+            self.assertIsNone(order_events.claim_order_event(event.id))
+
+            StoreOrderEvent.objects.filter(pk=event.pk).update(next_attempt_at=event.created_at)
+            result = order_events.process_order_event(event.id)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(webhook.call_count, 1)
+        self.assertEqual(whatsapp.call_count, 2)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (StoreOrderEvent.EventStatus.DONE, 2))
+
+    def test_event_fails_after_max_attempts(self):
+        event = order_events.record_order_event(self.order, 'pending', 'paid', channels=['capi'])
+        capi = mock.Mock(side_effect=RuntimeError('rejected'))
+
+        with mock.patch.dict(order_events.CHANNEL_HANDLERS, {'capi': capi}):
+            order_events.process_order_event(event.id)
+            StoreOrderEvent.objects.filter(pk=event.pk).update(next_attempt_at=event.created_at)
+            result = order_events.process_order_event(event.id)
+
+        self.assertIsNone(result['retry_in'])
+        event.refresh_from_db()
+        self.assertEqual(event.status, StoreOrderEvent.EventStatus.FAILED)
+        self.assertEqual(event.channels, {'capi': 'failed'})
+        self.assertEqual(event.last_error, 'capi: rejected')
+        self.assertEqual(order_events.due_order_event_ids(), [])
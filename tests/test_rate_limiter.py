@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.core.middleware import RateLimitMiddleware
+from apps.core.services.rate_limiter import RateLimiter, get_policies
+
+
+@override_settings(REDIS_URL='')
+class RateLimiterTestCase(SimpleTestCase):
+    def test_allows_limit_then_reports_retry_after(self):
+        limiter = RateLimiter()
+
+        results = [limiter.hit('ip:1', 3, 60) for _ in range(4)]
+
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results[:3]], [2, 1, 0])
+        self.assertAlmostEqual(results[3].retry_after, 20, delta=0.1)
+
+    def test_window_slides_instead_of_resetting(self):
+        limiter = RateLimiter()
+        with mock.patch('apps.core.services.rate_limiter.time.monotonic', return_value=1000.0):
+            for _ in range(3):
+                limiter.hit('ip:2', 3, 60)
+        # One emission interval later exactly one more request fits
+        with mock.patch('apps.core.services.rate_limiter.time.monotonic', return_value=1020.0):
+            self.assertTrue(limiter.hit('ip:2', 3, 60).allowed)
+            self.assertFalse(limiter.hit('ip:2', 3, 60).allowed)
+
+    def test_denied_request_is_not_counted_against_other_limits(self):
+        limiter = RateLimiter()
+        limiter.hit('user:1', 1, 60)
+
+        result = limiter.check([('ip:3', 5, 60), ('user:1', 1, 60)])
+
+        self.assertFalse(result.allowed)
+        self.assertEqual(result.policy, 'user:1')
+        self.assertEqual(limiter.hit('ip:3', 5, 60).remaining, 4)
+
+    def test_redis_errors_fail_open(self):
+        client = mock.Mock()
+        client.register_script.return_value.side_effect = ConnectionError('down')
+
+        self.assertTrue(RateLimiter(client=client).hit('ip:4', 1, 60).allowed)
+
+
+@override_settings(
+    REDIS_URL='',
+    RATE_LIMIT_REQUESTS=2,
+    RATE_LIMIT_WINDOW=60,
+    RATE_LIMIT_WHITELIST_PATHS=[],
+    RATE_LIMIT_POLICIES=[{'name': 'orders', 'limit': 1, 'window': 60, 'scope': 'tenant',
+                          'paths': ['/api/v1/orders/'], 'methods': ['post']}],
+)
+class RateLimitMiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        limiter = RateLimiter()
+        patcher = mock.patch('apps.core.middleware.get_rate_limiter', return_value=limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse())
+
+    def _request(self, method='get', path='/api/v1/products/', ip='10.0.0.1', tenant_id=None):
+        request = getattr(self.factory, method)(path, REMOTE_ADDR=ip)
+        request.tenant_id = tenant_id
+        return self.middleware(request)
+
+    def test_per_ip_default_policy(self):
+        responses = [self._request() for _ in range(3)]
+
+        self.assertEqual([r.status_code for r in responses], [200, 200, 429])
+        self.assertEqual(responses[0]['X-RateLimit-Remaining'], '1')
+        self.assertEqual(responses[2]['Retry-After'], '30')
+        self.assertEqual(self._request(ip='10.0.0.2').status_code, 200)
+
+    def test_route_policy_counts_per_tenant(self):
+        self.assertEqual(self._request('post', '/api/v1/orders/', '10.0.0.3', tenant_id=1).status_code, 200)
+
+        self.assertEqual(self._request('post', '/api/v1/orders/', '10.0.0.4', tenant_id=1).status_code, 429)
+        self.assertEqual(self._request('post', '/api/v1/orders/', '10.0.0.5', tenant_id=2).status_code, 200)
+        self.assertEqual(self._request('get', '/api/v1/orders/', '10.0.0.4', tenant_id=1).status_code, 200)
+
+    def test_policies_reject_unknown_scope(self):
+        with override_settings(RATE_LIMIT_POLICIES=[{'name': 'x', 'limit': 1, 'window': 1, 'scope': 'planet'}]):
+            with self.assertRaises(ValueError):
+                get_policies()
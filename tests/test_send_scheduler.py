@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.core.exceptions import WhatsAppAPIError, WhatsAppRateLimitError
+from apps.whatsapp.models import Message, WhatsAppAccount
+from apps.whatsapp.services import MessageService, WhatsAppAPIService
+from apps.whatsapp.services.send_scheduler import (
+    BULK,
+    TRANSACTIONAL,
+    SendScheduler,
+    current_priority,
+    send_priority,
+)
+
+
+class SendPriorityTestCase(SimpleTestCase):
+    def test_lane_is_scoped_to_block(self):
+        self.assertEqual(current_priority(), TRANSACTIONAL)
+        with send_priority(BULK):
+            self.assertEqual(current_priority(), BULK)
+        self.assertEqual(current_priority(), TRANSACTIONAL)
+
+    def test_unknown_lane_is_rejected(self):
+        with self.assertRaises(ValueError):
+            with send_priority('urgent'):
+                pass
+
+
+class SendSchedulerTestCase(SimpleTestCase):
+    def test_fails_open_without_redis(self):
+        with override_settings(REDIS_URL='', CELERY_BROKER_URL=''):
+            self.assertEqual(SendScheduler().acquire('123'), 0.0)
+
+    def test_waits_for_token_and_tracks_queue_depth(self):
+        client = mock.MagicMock()
+        scheduler = SendScheduler(client=client)
+
+        with mock.patch.object(scheduler, '_take', side_effect=[5, 5, 0]) as take, \
+                mock.patch('apps.whatsapp.services.send_scheduler.time.sleep'):
+            scheduler.acquire('123', lane=BULK)
+
+        self.assertEqual(take.call_count, 3)
+        client.pipeline.return_value.incr.assert_called_once_with('wa:send:123:waiting:bulk')
+        client.decr.assert_called_once_with('wa:send:123:waiting:bulk')
+
+    def test_gives_up_after_max_wait(self):
+        scheduler = SendScheduler(client=mock.MagicMock())
+        scheduler.config['TRANSACTIONAL_MAX_WAIT'] = 1
+
+        with mock.patch.object(scheduler, '_take', return_value=30000):
+            with self.assertRaises(WhatsAppRateLimitError):
+                scheduler.acquire('123')
+
+    def test_backoff_grows_per_strike(self):
+        client = mock.MagicMock()
+        client.pipeline.return_value.execute.side_effect = [[1, True], [True] * 2, [3, True], [True] * 2]
+        scheduler = SendScheduler(client=client)
+
+        self.assertEqual(scheduler.record_rate_limit('123'), 1.0)
+        self.assertEqual(scheduler.record_rate_limit('123'), 4.0)
+
+
+class ThrottledSendTestCase(SimpleTestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(phone_number_id='123', metadata={'send_rate': 250})
+        self.scheduler = mock.Mock()
+        patcher = mock.patch(
+            'apps.whatsapp.services.whatsapp_api_service.get_send_scheduler',
+            return_value=self.scheduler,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self):
+        with mock.patch.object(WhatsAppAccount, 'access_token', new_callable=mock.PropertyMock, return_value='t'):
+            return WhatsAppAPIService(self.account)
+
+    def test_rate_limited_send_backs_off_and_retries(self):
+        service = self._service()
+        throttled = WhatsAppAPIError(message='(#130429) Rate limit hit', code='130429')
+        with mock.patch.object(service, '_request', side_effect=[throttled, {'messages': [{'id': 'wamid.1'}]}]):
+            response = service.send_text_message(to='5563911111111', text='oi')
+
+        self.assertEqual(response['messages'][0]['id'], 'wamid.1')
+        self.scheduler.record_rate_limit.assert_called_once_with('123')
+        self.assertEqual(self.scheduler.acquire.call_count, 2)
+        self.scheduler.acquire.assert_called_with('123', rate=250)
+
+    def test_other_errors_are_not_retried(self):
+        service = self._service()
+        with mock.patch.object(service, '_request', side_effect=WhatsAppAPIError(code='131026')):
+            with self.assertRaises(WhatsAppAPIError):
+                service.send_text_message(to='5563911111111', text='oi')
+
+        self.scheduler.acquire.assert_called_once()
+        self.scheduler.record_rate_limit.assert_not_called()
+
+    def test_read_receipts_skip_the_bucket(self):
+        service = self._service()
+        with mock.patch.object(service, '_request', return_value={'success': True}):
+            service.mark_as_read('wamid.1')
+
+        self.scheduler.acquire.assert_not_called()
+
+
+class ThrottledMessageServiceTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='123',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+
+    def test_throttled_send_leaves_no_message(self):
+        scheduler = mock.Mock()
+        scheduler.acquire.side_effect = WhatsAppRateLimitError(message='Send rate limit reached for 123')
+        with mock.patch('apps.whatsapp.services.whatsapp_api_service.get_send_scheduler', return_value=scheduler):
+            with self.assertRaises(WhatsAppRateLimitError):
+                MessageService().send_text_message(str(self.account.id), '5563911111111', 'oi')
+
+        self.assertFalse(Message.objects.filter(to_number='5563911111111').exists())
@@ -0,0 +1,35 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.sse_views import WhatsAppSSEView
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class PushSSEStreamTestCase(SimpleTestCase):
+    def test_published_events_are_streamed(self):
+        view = WhatsAppSSEView()
+        group = 'whatsapp_test-account'
+
+        async def run():
+            stream = view.generate_stream([group])
+            connected = await stream.__anext__()
+
+            channel_layer = get_channel_layer()
+            await channel_layer.group_send(group, {
+                'type': 'whatsapp_status_updated',
+                'message_id': 'abc',
+                'status': 'read',
+                'timestamp': '2024-01-01T00:00:00',
+            })
+            chunk = await asyncio.wait_for(stream.__anext__(), timeout=2)
+            await stream.aclose()
+            return connected, chunk
+
+        connected, chunk = async_to_sync(run)()
+
+        self.assertIn('event: connected', connected)
+        self.assertIn('event: status_update', chunk)
+        self.assertIn('"status": "read"', chunk)
@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+from unittest import mock
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.stores.models import Store, StoreWebhook
+from apps.stores.services.webhook_service import webhook_service
+from apps.webhooks.models import WebhookDeadLetter, WebhookDeliveryAttempt, WebhookOutbox
+from apps.webhooks.services.delivery import HOST_SLOT_KEY, deliver_outbox_entry
+
+User = get_user_model()
+
+
+@override_settings(WEBHOOK_HOST_CONCURRENCY=1)
+class StoreWebhookDeliveryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='hooks', email='hooks@example.com', password='testpass123')
+        self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.user)
+        self.webhook = StoreWebhook.objects.create(
+            store=self.store,
+            name='ERP',
+            url='https://erp.example.com/hooks',
+            secret='s3cret',
+            events=['order.paid'],
+            headers={'X-Tenant': 'pastita'},
+            max_retries=0,
+        )
+        StoreWebhook.objects.create(
+            store=self.store,
+            name='Shipping',
+            url='https://ship.example.com/hooks',
+            events=['order.shipped'],
+        )
+        enqueue = mock.patch('apps.webhooks.tasks.process_outbox_entry.delay')
+        self.enqueue = enqueue.start()
+        self.addCleanup(enqueue.stop)
+
+    def _post(self, **kwargs):
+        client = mock.Mock()
+        client.post.side_effect = kwargs.get('side_effect')
+        client.post.return_value = mock.Mock(status_code=kwargs.get('status_code', 200), text='ok')
+        patcher = mock.patch('apps.webhooks.services.delivery.get_http_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client.post
+
+    def test_trigger_queues_signed_entries_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            entries = webhook_service.trigger_webhooks(
+                self.store, 'order.paid', {'order_number': 'PAS-1'}, idempotency_key='order-event:1',
+            )
+            self.enqueue.assert_not_called()
+
+        self.assertEqual(len(entries), 1)
+        entry = WebhookOutbox.objects.get()
+        self.enqueue.assert_called_once_with(str(entry.id))
+        self.assertEqual(entry.endpoint_url, 'https://erp.example.com/hooks')
+        self.assertEqual(entry.max_retries, 1)
+        self.assertEqual(entry.payload['data'], {'order_number': 'PAS-1'})
+        expected = hmac.new(b's3cret', entry.serialize_payload().encode(), hashlib.sha256).hexdigest()
+        self.assertEqual(entry.headers['X-Webhook-Signature'], expected)
+        self.assertEqual(entry.headers['X-Tenant'], 'pastita')
+
+        webhook_service.trigger_webhooks(
+            self.store, 'order.paid', {'order_number': 'PAS-1'}, idempotency_key='order-event:1',
+        )
+        self.assertEqual(WebhookOutbox.objects.count(), 1)
+
+    def test_successful_delivery_records_attempt_and_stats(self):
+        entry = webhook_service.trigger_webhooks(self.store, 'order.paid', {'order_number': 'PAS-1'})[0]
+        post = self._post()
+
+        result = deliver_outbox_entry(entry.id)
+
+        self.assertEqual(result['status'], 'sent')
+        self.assertEqual(post.call_args.kwargs['data'], entry.serialize_payload().encode())
+        self.assertEqual(post.call_args.kwargs['headers']['X-Webhook-Signature'], entry.headers['X-Webhook-Signature'])
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WebhookOutbox.Status.SENT)
+        attempt = WebhookDeliveryAttempt.objects.get(outbox=entry)
+        self.assertEqual((attempt.status, attempt.http_status), (WebhookDeliveryAttempt.Status.SUCCESS, 200))
+        self.assertIsNotNone(attempt.duration_ms)
+        self.webhook.refresh_from_db()
+        self.assertEqual((self.webhook.total_calls, self.webhook.successful_calls), (1, 1))
+        metrics = webhook_service.delivery_metrics(self.webhook)
+        self.assertEqual(metrics[0]['attempts'], 1)
+        self.assertEqual(metrics[0]['failures'], 0)
+        self.assertIsNone(deliver_outbox_entry(entry.id).get('retry_in'))
+
+    def test_exhausted_delivery_goes_to_dead_letter(self):
+        entry = webhook_service.trigger_webhooks(self.store, 'order.paid', {'order_number': 'PAS-1'})[0]
+        self._post(side_effect=requests.Timeout())
+
+        result = deliver_outbox_entry(entry.id)
+
+        self.assertTrue(result['retries_exhausted'])
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WebhookOutbox.Status.FAILED)
+        dead = WebhookDeadLetter.objects.get(original_event_id=str(entry.id))
+        self.assertEqual(dead.failure_reason, WebhookDeadLetter.FailureReason.TIMEOUT)
+        self.webhook.refresh_from_db()
+        self.assertEqual(self.webhook.failed_calls, 1)
+
+    def test_busy_host_hands_entry_back_without_spending_an_attempt(self):
+        entry = webhook_service.trigger_webhooks(self.store, 'order.paid', {'order_number': 'PAS-1'})[0]
+        cache.add(HOST_SLOT_KEY.format(host='erp.example.com', slot=0), 1, 60)
+        post = self._post()
+
+        result = deliver_outbox_entry(entry.id)
+
+        self.assertEqual(result['status'], 'throttled')
+        post.assert_not_called()
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.retry_count), (WebhookOutbox.Status.PENDING, 0))
+        self.assertEqual(deliver_outbox_entry(entry.id), {'status': 'not_claimed'})
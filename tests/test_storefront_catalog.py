@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.stores.models import Store, StoreCategory, StoreProduct
+from apps.stores.services.catalog_service import catalog_service
+
+User = get_user_model()
+
+
+class StoreCatalogCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='catalog',
+            email='catalog@example.com',
+            password='testpass123',
+        )
+        self.store = Store.objects.create(
+            name='Pastita',
+            slug='pastita',
+            status=Store.StoreStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.category = StoreCategory.objects.create(store=self.store, name='Massas', slug='massas')
+        for i in range(3):
+            StoreProduct.objects.create(
+                store=self.store,
+                category=self.category,
+                name=f'Rondelli {i}',
+                slug=f'rondelli-{i}',
+                sku=f'SKU-{i}',
+                price=Decimal('30.00'),
+                featured=i == 0,
+            )
+        self.client = APIClient()
+        self.url = f'/api/v1/stores/{self.store.slug}/catalog/'
+
+    def test_catalog_document_groups_products(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['products']), 3)
+        self.assertEqual(len(response.data['featured_products']), 1)
+        self.assertEqual(len(response.data['products_by_category']), 1)
+        self.assertEqual(len(response.data['products_by_category'][0]['products']), 3)
+        self.assertIn('ETag', response)
+
+    def test_cache_hit_costs_no_queries(self):
+        catalog_service.get_catalog(self.store.slug)
+
+        with self.assertNumQueries(0):
+            document, _ = catalog_service.get_catalog(self.store.slug)
+        self.assertEqual(len(document['products']), 3)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_product_change_bumps_catalog_version(self):
+        etag = self.client.get(self.url)['ETag']
+
+        product = StoreProduct.objects.get(slug='rondelli-1')
+        product.price = Decimal('35.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        prices = {item['slug']: item['price'] for item in response.data['products']}
+        self.assertEqual(prices['rondelli-1'], '35.00')
+
+    def test_inactive_store_is_not_served_from_cache(self):
+        self.client.get(self.url)
+
+        self.store.status = Store.StoreStatus.INACTIVE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
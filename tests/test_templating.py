@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+
+from apps.core.services.templating import (
+    ANY,
+    BLANK,
+    SINGLE,
+    compile_template,
+    render_components,
+    render_template,
+)
+
+
+class TemplateRenderTestCase(SimpleTestCase):
+    def test_double_brace_keeps_unknown_placeholders(self):
+        self.assertEqual(
+            render_template('Oi {{name}}, {{ city }} {{unknown}} {name}', {'name': 'Ana', 'city': 'Palmas'}),
+            'Oi Ana, Palmas {{unknown}} {name}',
+        )
+
+    def test_any_syntax_blanks_unknown_double_braces_but_not_css(self):
+        html = '<style>.a{color}</style>{{first_name}} {email} {{unknown}}'
+
+        self.assertEqual(
+            render_template(html, {'first_name': 'Ana', 'email': 'ana@example.com'}, syntax=ANY, missing=BLANK),
+            '<style>.a{color}</style>Ana ana@example.com ',
+        )
+
+    def test_single_brace_syntax(self):
+        self.assertEqual(
+            render_template('{customer_name}: {cart_total} {{order_id}}', {'customer_name': 'Ana', 'cart_total': 10},
+                            syntax=SINGLE),
+            'Ana: 10 {{order_id}}',
+        )
+
+    def test_values_are_not_rescanned(self):
+        self.assertEqual(render_template('{{name}}', {'name': '{{email}}', 'email': 'x'}), '{{email}}')
+
+    def test_compiled_templates_are_cached_by_content(self):
+        first = compile_template('Oi {{name}}')
+        second = compile_template(''.join(['Oi ', '{{name}}']))
+
+        self.assertIs(first, second)
+        self.assertEqual(first.names, ['name'])
+        self.assertIsNot(compile_template('Oi {{name}}', SINGLE), first)
+
+    def test_unknown_syntax_is_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_template('x', 'jinja')
+
+    def test_components_are_rendered_without_mutating_input(self):
+        components = [
+            {'type': 'header'},
+            {'type': 'body', 'parameters': [
+                {'type': 'text', 'variable': 'name'},
+                {'type': 'text', 'variable': 'code', 'text': 'PADRAO'},
+                {'type': 'image', 'image': {'link': 'https://example.com/a.png'}},
+            ]},
+        ]
+
+        rendered = render_components(components, {'name': 'Ana'})
+
+        self.assertEqual([p.get('text') for p in rendered[1]['parameters']], ['Ana', 'PADRAO', None])
+        self.assertNotIn('text', components[1]['parameters'][0])
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.core.middleware import TenantMiddleware
+from apps.core.services.tenant_resolver import get_tenant_resolver
+from apps.stores.models import Store
+
+User = get_user_model()
+
+
+class TenantMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tenant', email='tenant@example.com', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store = Store.objects.create(name='Pastita', slug='pastita', owner=self.user)
+        self.middleware = TenantMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory()
+
+    def _tenant(self, path='/api/v1/orders/', **extra):
+        request = self.factory.get(path, **extra)
+        response = self.middleware(request)
+        return request.tenant, response
+
+    def test_repeated_requests_hit_no_database(self):
+        self.assertEqual(self._tenant(HTTP_X_TENANT_ID='pastita')[0].id, self.store.id)
+
+        with self.assertNumQueries(0):
+            tenant, response = self._tenant(HTTP_X_TENANT_ID='pastita')
+
+        self.assertEqual(tenant.id, self.store.id)
+        self.assertEqual(response['X-Tenant-ID'], 'pastita')
+
+    @override_settings(ALLOWED_HOSTS=['.pastita.com.br'])
+    def test_unknown_subdomains_are_negatively_cached(self):
+        self.assertIsNone(self._tenant(HTTP_HOST='random123.pastita.com.br')[0])
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self._tenant(HTTP_HOST='random123.pastita.com.br')[0])
+
+    def test_invalid_slugs_never_query(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(self._tenant('/api/v1/stores/%27%20OR%201=1/products/')[0])
+
+    def test_detection_falls_through_to_path(self):
+        tenant, _ = self._tenant('/api/v1/stores/pastita/products/', HTTP_X_TENANT_ID='nope')
+
+        self.assertEqual(tenant.id, self.store.id)
+
+    def test_store_save_invalidates_cached_slug(self):
+        resolver = get_tenant_resolver()
+        self.assertIsNotNone(resolver.resolve('pastita'))
+
+        self.store.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store.save()
+
+        self.assertIsNone(resolver.resolve('pastita'))
@@ -0,0 +1,116 @@
+import hashlib
+from unittest import mock
+
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase
+
+from apps.whatsapp.models import Message, WebhookEvent, WhatsAppAccount
+from apps.whatsapp.services import WebhookService
+from apps.whatsapp.services.media_service import MediaIngestService
+
+
+class InboundMediaIngestTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        self.account.save()
+        self.storage = InMemoryStorage()
+        storage_patch = mock.patch('apps.whatsapp.services.media_service.default_storage', self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+
+    def _image_event(self, wamid='wamid.img1', media_id='media-1'):
+        return WebhookEvent.objects.create(
+            account=self.account,
+            event_id=f'message:{wamid}',
+            event_type=WebhookEvent.EventType.MESSAGE,
+            payload={
+                'message': {
+                    'id': wamid,
+                    'from': '5563911111111',
+                    'timestamp': '1700000000',
+                    'type': 'image',
+                    'image': {'id': media_id, 'mime_type': 'image/jpeg', 'caption': 'foto'},
+                },
+                'contact': {'wa_id': '5563911111111', 'profile': {'name': 'Cliente'}},
+            },
+        )
+
+    def _pending_message(self, wamid, media_id):
+        return Message.objects.create(
+            account=self.account,
+            whatsapp_message_id=wamid,
+            direction=Message.MessageDirection.INBOUND,
+            message_type=Message.MessageType.IMAGE,
+            from_number='5563911111111',
+            to_number=self.account.phone_number,
+            media_id=media_id,
+            media_mime_type='image/jpeg',
+            media_status=Message.MediaStatus.PENDING,
+        )
+
+    def _ingest(self, message, body):
+        api = mock.Mock()
+        api.get_media_url.return_value = 'https://lookaside.example/media'
+        api.stream_media.return_value = iter([body[:3], body[3:]])
+        service = MediaIngestService()
+        service.broadcast = mock.Mock()
+        with mock.patch('apps.whatsapp.services.media_service.WhatsAppAPIService', return_value=api):
+            service.ingest(message)
+        return service
+
+    def test_inbound_media_commits_pending_without_downloading(self):
+        event = self._image_event()
+
+        with mock.patch('apps.whatsapp.tasks.ingest_inbound_media.delay') as delay, \
+                mock.patch('apps.whatsapp.services.media_service.WhatsAppAPIService') as api:
+            with self.captureOnCommitCallbacks(execute=True):
+                message = WebhookService().process_event(event)
+
+        api.assert_not_called()
+        self.assertEqual(message.media_status, Message.MediaStatus.PENDING)
+        self.assertEqual(message.media_url, '')
+        self.assertEqual(message.text_body, 'foto')
+        delay.assert_called_once_with(str(message.id))
+
+    def test_ingest_streams_hashes_and_broadcasts(self):
+        message = self._pending_message('wamid.a', 'media-a')
+        body = b'\xff\xd8jpeg-bytes'
+
+        service = self._ingest(message, body)
+
+        message.refresh_from_db()
+        sha256 = hashlib.sha256(body).hexdigest()
+        self.assertEqual(message.media_status, Message.MediaStatus.READY)
+        self.assertEqual(message.media_sha256, sha256)
+        self.assertTrue(self.storage.exists(f'whatsapp/{self.account.id}/{sha256}.jpg'))
+        service.broadcast.broadcast_media_ready.assert_called_once()
+
+    def test_identical_media_is_stored_once(self):
+        first = self._pending_message('wamid.a', 'media-a')
+        second = self._pending_message('wamid.b', 'media-b')
+
+        self._ingest(first, b'same-bytes')
+        self._ingest(second, b'same-bytes')
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.media_url, second.media_url)
+        _, files = self.storage.listdir(f'whatsapp/{self.account.id}')
+        self.assertEqual(len(files), 1)
+
+    def test_ready_messages_are_not_downloaded_again(self):
+        message = self._pending_message('wamid.a', 'media-a')
+        Message.objects.filter(pk=message.pk).update(media_status=Message.MediaStatus.READY)
+        message.refresh_from_db()
+
+        with mock.patch('apps.whatsapp.services.media_service.WhatsAppAPIService') as api:
+            MediaIngestService().ingest(message)
+
+        api.assert_not_called()
@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.core.services.account_routing import get_account_router
+from apps.whatsapp.models import WebhookEvent, WhatsAppAccount
+from apps.whatsapp.services import WebhookService
+
+User = get_user_model()
+
+
+class WebhookBatchIngestionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='webhookowner',
+            email='webhook@example.com',
+            password='testpass123',
+        )
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='1234567890',
+            waba_id='999',
+            phone_number='5563999999999',
+            display_phone_number='+55 63 99999-9999',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+            owner=self.user,
+        )
+        self.account.access_token = 'test-token'
+        # Routes cached by earlier tests are only dropped once the save commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.save()
+        self.service = WebhookService()
+
+    def _payload(self, statuses):
+        return {
+            'object': 'whatsapp_business_account',
+            'entry': [{
+                'id': '999',
+                'changes': [{
+                    'field': 'messages',
+                    'value': {
+                        'metadata': {
+                            'phone_number_id': '1234567890',
+                            'display_phone_number': '+55 63 99999-9999',
+                        },
+                        'statuses': statuses,
+                    },
+                }],
+            }],
+        }
+
+    def _statuses(self, count, status='delivered'):
+        return [
+            {'id': f'wamid.{i}', 'status': status, 'timestamp': '1700000000'}
+            for i in range(count)
+        ]
+
+    def test_status_batch_uses_constant_queries(self):
+        payload = self._payload(self._statuses(50))
+
+        # account lookup + dedup query + bulk insert + inserted-ids check
+        with self.assertNumQueries(4):
+            events = self.service.process_webhook(payload, {})
+
+        self.assertEqual(len(events), 50)
+        self.assertEqual(
+            WebhookEvent.objects.filter(event_type=WebhookEvent.EventType.STATUS).count(),
+            50,
+        )
+
+    def test_redelivered_payload_is_deduplicated(self):
+        payload = self._payload(self._statuses(5))
+
+        first = self.service.process_webhook(payload, {})
+        second = self.service.process_webhook(payload, {})
+
+        self.assertEqual(len(first), 5)
+        self.assertEqual(second, [])
+        self.assertEqual(WebhookEvent.objects.count(), 5)
+
+    def test_duplicates_inside_one_payload_are_collapsed(self):
+        statuses = self._statuses(3) + self._statuses(3)
+
+        events = self.service.process_webhook(self._payload(statuses), {})
+
+        self.assertEqual(len(events), 3)
+
+
+class AccountRoutingCacheTestCase(TestCase):
+    def setUp(self):
+        self.account = WhatsAppAccount(
+            name='Pastita',
+            phone_number_id='5550001',
+            waba_id='777',
+            phone_number='5563988888888',
+            status=WhatsAppAccount.AccountStatus.ACTIVE,
+        )
+        self.account.access_token = 'test-token'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.save()
+        self.router = get_account_router()
+
+    def test_repeated_lookups_hit_no_database(self):
+        self.assertEqual(self.router.resolve_whatsapp(phone_number_id='5550001').id, self.account.id)
+
+        with self.assertNumQueries(0):
+            account = self.router.resolve_whatsapp(phone_number_id='5550001')
+
+        self.assertEqual(account.id, self.account.id)
+
+    def test_unknown_ids_are_negatively_cached(self):
+        self.assertIsNone(self.router.get_whatsapp_by_phone_number_id('does-not-exist'))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.router.get_whatsapp_by_phone_number_id('does-not-exist'))
+
+    def test_account_save_invalidates_routes(self):
+        self.router.resolve_whatsapp(phone_number_id='5550001')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.is_active = False
+            self.account.save()
+
+        self.assertIsNone(self.router.get_whatsapp_by_phone_number_id('5550001'))